@@ -1,7 +1,8 @@
 # PowerShell script to create automated database backup task at 1:00 PM
 # Save this as create_backup_task_1pm.ps1 in your project directory
 
-$Action = New-ScheduledTaskAction -Execute "C:\Users\utpal\OneDrive\Desktop\Programming\SocietyMgmtV1.0\ai_agent_utils\backup_scheduler.bat" -WorkingDirectory "C:\Users\utpal\OneDrive\Desktop\Programming\SocietyMgmtV1.0"
+# Uses the online backup (SQLite backup API), which is safe while the application is writing
+$Action = New-ScheduledTaskAction -Execute "python" -Argument "-m utils.db_backup --keep-days 7" -WorkingDirectory "C:\Users\utpal\OneDrive\Desktop\Programming\SocietyMgmtV1.0"
 $Trigger = New-ScheduledTaskTrigger -Daily -At 1PM
 $Settings = New-ScheduledTaskSettingsSet -AllowStartIfOnBatteries -DontStopIfGoingOnBatteries -StartWhenAvailable
 $Principal = New-ScheduledTaskPrincipal -UserId "$env:USERDOMAIN\$env:USERNAME" -LogonType S4U -RunLevel Highest
@@ -11,6 +11,7 @@ from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
 from PyQt5.QtCore import QDate, Qt
 from PyQt5.QtGui import QFont
 from utils.audit_logger import audit_logger
+from utils.audit_archiver import audit_archiver
 
 
 class AuditLogViewer(QDialog):
@@ -205,25 +206,15 @@ class AuditLogViewer(QDialog):
             start_date = self.start_date.date().toString("yyyy-MM-dd")
             end_date = self.end_date.date().toString("yyyy-MM-dd")
             
-            # Get all logs first
-            all_logs = audit_logger.get_audit_logs(limit=1000)
-            
-            # Apply filters
-            filtered_logs = []
-            for log in all_logs:
-                # Filter by user
-                if selected_user != "All users" and selected_user != "" and log['username'] != selected_user:
-                    continue
-                
-                # Filter by action
-                if selected_action != "All Actions" and selected_action != "" and log['action'] != selected_action:
-                    continue
-                
-                # For date filtering, we would need to modify the audit_logger to support it
-                # For now, we'll just include all logs that pass the other filters
-                filtered_logs.append(log)
-            
-            return filtered_logs
+            # Filters are applied in SQL; archived months are only searched when
+            # the start date reaches back into them
+            return audit_archiver.search_audit_logs(
+                start_date=start_date,
+                end_date=end_date,
+                username=None if selected_user in ("All users", "") else selected_user,
+                action=None if selected_action in ("All Actions", "") else selected_action,
+                limit=1000
+            )
         except Exception as e:
             print(f"Error getting filtered logs: {e}")
             return audit_logger.get_audit_logs(limit=1000)
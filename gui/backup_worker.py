@@ -0,0 +1,44 @@
+# gui/backup_worker.py
+"""
+Background database backup for the GUI.
+Runs utils.db_backup.backup_database on a QThread and reports progress, the
+result, a failure or a cancellation through Qt signals.
+"""
+
+import threading
+from PyQt5.QtCore import QThread, pyqtSignal
+from utils.db_backup import backup_database, BackupCancelled, PAGES_PER_STEP
+
+
+class BackupWorker(QThread):
+    """Thread that runs one online backup and reports progress."""
+
+    # Emits (pages copied, total pages)
+    progress = pyqtSignal(int, int)
+    # Emits the result dict from backup_database
+    completed = pyqtSignal(dict)
+    # Emits the error message if the backup failed
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, source_path, dest_path, pages_per_step=PAGES_PER_STEP, parent=None):
+        super().__init__(parent)
+        self.source_path = source_path
+        self.dest_path = dest_path
+        self.pages_per_step = pages_per_step
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        try:
+            result = backup_database(self.source_path, self.dest_path, self.pages_per_step,
+                                     progress_callback=self.progress.emit, cancel_event=self.cancel_event)
+        except BackupCancelled:
+            self.cancelled.emit()
+            return
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.completed.emit(result)
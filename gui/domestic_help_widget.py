@@ -12,14 +12,17 @@ from models.domestic_help import DomesticHelpManager
 
 
 class DomesticHelpWidget(QWidget):
-    def __init__(self, parent=None, resident_id=None, user_role=None):
+    def __init__(self, parent=None, resident_id=None, user_role=None, domestic_help=None):
         super().__init__(parent)
         self.resident_id = resident_id
         self.user_role = user_role
         self.domestic_help_manager = DomesticHelpManager()
         self.current_help_id = None
         self.setup_ui()
-        if resident_id:
+        # Show domestic help the caller already loaded instead of querying again
+        if domestic_help is not None:
+            self.display_domestic_help(domestic_help)
+        elif resident_id:
             self.load_domestic_help()
     
     def setup_ui(self):
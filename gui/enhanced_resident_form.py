@@ -368,8 +368,8 @@ class EnhancedResidentForm(QWidget):
             handle_database_error(self, e, "search residents")
 
     def display_residents(self, residents):
-        # Sort residents by flat number
-        residents.sort(key=lambda x: self._extract_flat_number(x.flat_no))
+        # Sort residents naturally by flat number, using the key stored with each resident
+        residents.sort(key=lambda x: (x.flat_sort_key, x.id))
         
         self.table.setRowCount(len(residents))
         
@@ -416,12 +416,6 @@ class EnhancedResidentForm(QWidget):
             # Make ID column invisible but still accessible
             self.table.setColumnHidden(0, True)
     
-    def _extract_flat_number(self, flat_no):
-        """Extract numeric part from flat number for sorting"""
-        import re
-        match = re.search(r'\d+', flat_no)
-        return int(match.group()) if match else 0
-    
     def add_resident(self):
         dialog = ResidentDialog(self, user_role=self.user_role)
         if dialog.exec_() == QDialog.Accepted:
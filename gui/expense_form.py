@@ -9,7 +9,6 @@ from PyQt5.QtCore import QDate
 from models.ledger import LedgerManager
 from models.resident import ResidentManager
 from utils.form_validation import validate_form_data
-from utils.resident_utils import get_sorted_flat_numbers
 
 class ExpenseForm(QWidget):
     def __init__(self, parent=None, current_user=None):
@@ -156,8 +155,7 @@ class ExpenseDialog(QDialog):
     
     def load_residents(self):
         """Load residents into the flat no combobox in sorted order"""
-        residents = self.resident_manager.get_all_residents()
-        sorted_flat_numbers = get_sorted_flat_numbers(residents)
+        sorted_flat_numbers = self.resident_manager.get_flat_numbers()
         
         self.flat_no_input.addItem("")  # Empty option
         for flat_no in sorted_flat_numbers:
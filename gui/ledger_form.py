@@ -12,7 +12,6 @@ from gui.reconciliation_tab import ReconciliationTab
 from models.transaction_reversal import TransactionReversalManager
 from gui.reversal_dialog import ReversalDialog
 from utils.form_validation import validate_form_data
-from utils.resident_utils import get_sorted_flat_numbers
 
 class LedgerForm(QWidget):
     def __init__(self, parent=None, current_user=None):
@@ -199,8 +198,7 @@ class PaymentTab(QWidget):
     
     def load_residents(self):
         """Load residents into the flat no combobox in sorted order"""
-        residents = self.resident_manager.get_all_residents()
-        sorted_flat_numbers = get_sorted_flat_numbers(residents)
+        sorted_flat_numbers = self.resident_manager.get_flat_numbers()
         
         self.flat_no_input.addItem("")  # Empty option
         for flat_no in sorted_flat_numbers:
@@ -349,8 +347,7 @@ class ExpenseTab(QWidget):
     
     def load_residents(self):
         """Load residents into the flat no combobox in sorted order"""
-        residents = self.resident_manager.get_all_residents()
-        sorted_flat_numbers = get_sorted_flat_numbers(residents)
+        sorted_flat_numbers = self.resident_manager.get_flat_numbers()
         
         self.flat_no_input.addItem("")  # Empty option
         for flat_no in sorted_flat_numbers:
@@ -11,7 +11,7 @@ from PyQt5.QtWidgets import (QDialog, QLabel, QLineEdit,
                              QFontDialog)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont, QPixmap
-from utils.security import authenticate_user
+from utils.auth_service import AuthenticationWorker
 from utils.session_manager import session_manager
 from utils.db_context import get_db_connection
 from utils.config import load_config, save_config
@@ -23,6 +23,8 @@ class LoginDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.is_dark_mode = False  # Default to light mode
+        self.authenticated_role = None  # Set once the background authentication succeeds
+        self.auth_worker = None
         self.setWindowTitle("Login - Society Management System v1.1")
         self.resize(1000, 600)  # Initial size
         self.setMinimumSize(800, 500)  # Minimum size
@@ -625,14 +627,28 @@ class LoginDialog(QDialog):
         try:
             # Create a session for the user (to get session ID for audit logging)
             session_id = session_manager.create_session(username)
-            
-            # Use proper authentication with audit logging
-            # Note: In a real application, you would get the actual IP address
-            # For now, we'll use a placeholder
-            ip_address = "127.0.0.1"  # Placeholder for local testing
-            user_role = authenticate_user(username, password, ip_address, session_id)
-            
+        except Exception as e:
+            self.finish_authentication()
+            QMessageBox.critical(self, "Login Failed", f"Unable to start a session: {str(e)}")
+            return
+        
+        # Use proper authentication with audit logging
+        # Note: In a real application, you would get the actual IP address
+        # For now, we'll use a placeholder
+        ip_address = "127.0.0.1"  # Placeholder for local testing
+        
+        # bcrypt runs on a worker thread so the dialog stays responsive
+        self.auth_worker = AuthenticationWorker(username, password, ip_address, session_id, self)
+        self.auth_worker.authenticated.connect(
+            lambda user_role: self.on_authenticated(username, session_id, user_role))
+        self.auth_worker.failed.connect(self.on_authentication_error)
+        self.auth_worker.start()
+    
+    def on_authenticated(self, username, session_id, user_role):
+        """Handle the result of a background authentication"""
+        try:
             if user_role:
+                self.authenticated_role = user_role
                 config = load_config()
                 if self.remember_me_checkbox.isChecked():
                     config['remember_me'] = True
@@ -668,11 +684,38 @@ class LoginDialog(QDialog):
                 self.password_input.clear()
                 self.password_input.setFocus()
         finally:
-            # Hide loading indicator
-            self.progress_bar.setVisible(False)
-            self.username_input.setEnabled(True)
-            self.password_input.setEnabled(True)
-            self.login_button.setEnabled(True)
+            self.finish_authentication()
+    
+    def on_authentication_error(self, message):
+        """Handle an error raised while authenticating in the background"""
+        self.finish_authentication()
+        QMessageBox.critical(self, "Login Failed", f"Authentication failed: {message}")
+    
+    def finish_authentication(self):
+        """Hide the loading indicator and re-enable the login form"""
+        self.progress_bar.setVisible(False)
+        self.username_input.setEnabled(True)
+        self.password_input.setEnabled(True)
+        self.login_button.setEnabled(True)
+
+    def stop_auth_worker(self):
+        """Drop a pending login result and wait for its worker thread to finish"""
+        worker, self.auth_worker = self.auth_worker, None
+        if worker is None:
+            return
+
+        try:
+            worker.authenticated.disconnect()
+            worker.failed.disconnect()
+        except TypeError:
+            pass  # Nothing connected any more
+        # bcrypt cannot be interrupted, but it is calibrated to finish quickly
+        worker.wait()
+
+    def done(self, result):
+        """Accept, reject and closing the window all end here; never leave the worker running"""
+        self.stop_auth_worker()
+        super().done(result)
 
     def load_user_preferences(self):
         config = load_config()
@@ -1077,7 +1120,7 @@ class TOTPPasswordResetDialog(QDialog):
             
         # Reset password
         try:
-            from utils.security import hash_password
+            from utils.security import hash_password, invalidate_user_cache
             from utils.db_context import get_db_connection
             
             hashed_password = hash_password(new_password)
@@ -1089,6 +1132,7 @@ class TOTPPasswordResetDialog(QDialog):
                     (hashed_password, self.username)
                 )
                 conn.commit()
+            invalidate_user_cache(self.username)
                 
             QMessageBox.information(
                 self, 
@@ -4,14 +4,11 @@ from PyQt5.QtWidgets import (QMainWindow, QTabWidget, QAction,
                              QFileDialog, QPushButton, QHBoxLayout, QWidget)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIcon
-import shutil
-from gui.resident_form import ResidentForm
-from gui.ledger_form import LedgerForm
-from gui.reports_dialog import ReportsDialog
-from gui.user_management_dialog import UserManagementDialog
-from gui.society_setup_dialog import SocietySetupDialog
 from models.society import SocietyManager
 
+# Tab modules (and the reportlab/openpyxl/PIL stacks behind them) are imported
+# when a tab is first opened, see _build_tab()
+
 class MainWindow(QMainWindow):
     def __init__(self, user_role, username, controller, parent=None):
         super().__init__(parent)
@@ -30,17 +27,21 @@ class MainWindow(QMainWindow):
         self.tabs = QTabWidget()
         self.setCentralWidget(self.tabs)
         
-        # Add modules based on user role
+        # Add modules based on user role. Tabs are placeholders until first shown.
+        self.resident_form = None
+        self.ledger_form = None
+        self.reports_form = None
+        self._lazy_tabs = {}
+        
         if self.user_role in ["Admin", "Treasurer", "System Admin"]:
-            self.resident_form = ResidentForm(user_role=self.user_role, current_user=self.username)
-            self.tabs.addTab(self.resident_form, "Resident Management")
-            
-            self.ledger_form = LedgerForm(current_user=self.username)
-            self.tabs.addTab(self.ledger_form, "Ledger")
+            self._add_lazy_tab("resident_form", "Resident Management", self._create_resident_form)
+            self._add_lazy_tab("ledger_form", "Ledger", self._create_ledger_form)
         
         if self.user_role in ["Admin", "Treasurer", "Viewer", "System Admin"]:
-            self.reports_form = ReportsDialog()
-            self.tabs.addTab(self.reports_form, "Reports")
+            self._add_lazy_tab("reports_form", "Reports", self._create_reports_form)
+        
+        self.tabs.currentChanged.connect(self._build_tab)
+        self._build_tab(self.tabs.currentIndex())
         
         # Create menu bar
         self.create_menu()
@@ -48,6 +49,48 @@ class MainWindow(QMainWindow):
         # Create custom status bar with logout button
         self.create_status_bar()
         
+    def _add_lazy_tab(self, attribute, title, factory):
+        """Add a placeholder tab whose real widget is created the first time it is shown"""
+        placeholder = QWidget()
+        self._lazy_tabs[placeholder] = (attribute, factory)
+        self.tabs.addTab(placeholder, title)
+    
+    def _build_tab(self, index):
+        """Replace the placeholder at index with its real widget"""
+        placeholder = self.tabs.widget(index)
+        if placeholder not in self._lazy_tabs:
+            return
+        
+        attribute, factory = self._lazy_tabs.pop(placeholder)
+        title = self.tabs.tabText(index)
+        widget = factory()
+        setattr(self, attribute, widget)
+        
+        self.tabs.blockSignals(True)
+        self.tabs.removeTab(index)
+        self.tabs.insertTab(index, widget, title)
+        self.tabs.setCurrentIndex(index)
+        self.tabs.blockSignals(False)
+        placeholder.deleteLater()
+    
+    def closeEvent(self, event):
+        """Close every tab too, so tabs can stop their worker threads before they are destroyed"""
+        for index in range(self.tabs.count()):
+            self.tabs.widget(index).close()
+        super().closeEvent(event)
+    
+    def _create_resident_form(self):
+        from gui.resident_form import ResidentForm
+        return ResidentForm(user_role=self.user_role, current_user=self.username)
+    
+    def _create_ledger_form(self):
+        from gui.ledger_form import LedgerForm
+        return LedgerForm(current_user=self.username)
+    
+    def _create_reports_form(self):
+        from gui.reports_dialog import ReportsDialog
+        return ReportsDialog()
+    
     def check_first_time_setup(self):
         """Check if this is the first time setup and show society setup dialog if needed"""
         if self.user_role in ["Admin", "System Admin"]:
@@ -98,6 +141,10 @@ class MainWindow(QMainWindow):
             audit_log_action = QAction("Audit Log Viewer", self)
             audit_log_action.triggered.connect(self.open_audit_log_viewer)
             tools_menu.addAction(audit_log_action)
+            
+            archive_audit_action = QAction("Archive Old Audit Logs", self)
+            archive_audit_action.triggered.connect(self.archive_audit_logs)
+            tools_menu.addAction(archive_audit_action)
         
         # Add User Profile option for all users
         user_menu = menubar.addMenu("User")
@@ -412,10 +459,12 @@ class MainWindow(QMainWindow):
             """)
 
     def open_user_management(self):
+        from gui.user_management_dialog import UserManagementDialog
         user_mgmt_dialog = UserManagementDialog(self)
         user_mgmt_dialog.exec_()
     
     def open_society_setup(self):
+        from gui.society_setup_dialog import SocietySetupDialog
         society_setup_dialog = SocietySetupDialog(self, user_role=self.user_role)
         society_setup_dialog.exec_()
     
@@ -424,6 +473,39 @@ class MainWindow(QMainWindow):
         audit_log_viewer = AuditLogViewer(self)
         audit_log_viewer.exec_()
     
+    def archive_audit_logs(self):
+        """Move audit log entries older than the configured horizon into monthly archives"""
+        from utils.audit_archiver import audit_archiver
+        from utils.config import load_config
+        
+        config = load_config()
+        horizon_days = config.get("audit_archive_horizon_days", 365)
+        storage = config.get("audit_archive_storage", "table")
+        
+        reply = QMessageBox.question(
+            self,
+            "Archive Audit Logs",
+            f"Move audit log entries older than {horizon_days} days into monthly archives?\n"
+            "Archived entries remain searchable from the Audit Log Viewer.",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return
+        
+        try:
+            archived = audit_archiver.archive_old_entries(
+                horizon_days=horizon_days,
+                storage=storage,
+                compression=config.get("audit_archive_compression", "gzip")
+            )
+            if archived:
+                summary = "\n".join(f"{month}: {count} entries" for month, count in archived.items())
+                QMessageBox.information(self, "Archive Complete", f"Archived audit logs:\n{summary}")
+            else:
+                QMessageBox.information(self, "Archive Complete", "No audit log entries were old enough to archive.")
+        except Exception as e:
+            QMessageBox.critical(self, "Archive Failed", f"Failed to archive audit logs: {str(e)}")
+    
     def open_user_profile(self):
         from gui.user_profile_dialog import UserProfileDialog
         profile_dialog = UserProfileDialog(self.username, self)
@@ -433,10 +515,14 @@ class MainWindow(QMainWindow):
         self.controller.logout()
     
     def backup_database(self):
-        # Implementation for database backup
+        """Back up the live database on a worker thread with the SQLite backup API"""
         from datetime import datetime
-        import os
-        import shutil
+        from PyQt5.QtWidgets import QProgressDialog
+        from gui.backup_worker import BackupWorker
+        
+        if getattr(self, '_backup_worker', None) is not None and self._backup_worker.isRunning():
+            QMessageBox.information(self, "Backup In Progress", "A database backup is already running.")
+            return
         
         # Generate default filename with timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -445,26 +531,48 @@ class MainWindow(QMainWindow):
         file_path, _ = QFileDialog.getSaveFileName(
             self, "Backup Database", default_filename, "SQLite Database (*.db)")
         
-        if file_path:
-            try:
-                # Copy the database file
-                source_db = "society_management.db"
-                if os.path.exists(source_db):
-                    shutil.copy2(source_db, file_path)
-                    QMessageBox.information(
-                        self, 
-                        "Backup Successful", 
-                        f"Database backup created successfully! Saved to: {file_path}"
-                    )
-                else:
-                    QMessageBox.critical(
-                        self, 
-                        "Backup Failed", 
-                        "Source database file not found!"
-                    )
-            except Exception as e:
-                QMessageBox.critical(
-                    self, 
-                    "Backup Failed", 
-                    f"Failed to create database backup: {str(e)}"
-                )
\ No newline at end of file
+        if not file_path:
+            return
+        
+        # The copy runs in the background, so the application stays usable meanwhile
+        progress_dialog = QProgressDialog("Backing up database...", "Cancel", 0, 100, self)
+        progress_dialog.setWindowTitle("Backup Database")
+        progress_dialog.setMinimumDuration(500)
+        progress_dialog.setAutoClose(False)
+        progress_dialog.setAutoReset(False)
+        
+        worker = BackupWorker("society_management.db", file_path, parent=self)
+        worker.progress.connect(
+            lambda done, total: progress_dialog.setValue(int(done * 100 / total) if total else 0))
+        progress_dialog.canceled.connect(worker.cancel)
+        
+        def finish():
+            progress_dialog.close()
+            self._backup_worker = None
+            worker.deleteLater()
+        
+        def on_completed(result):
+            finish()
+            QMessageBox.information(
+                self, 
+                "Backup Successful", 
+                f"Database backup created and verified successfully! Saved to: {result['path']}"
+            )
+        
+        def on_failed(message):
+            finish()
+            QMessageBox.critical(
+                self, 
+                "Backup Failed", 
+                f"Failed to create database backup: {message}"
+            )
+        
+        def on_cancelled():
+            finish()
+            self.statusBar().showMessage("Database backup cancelled", 5000)
+        
+        worker.completed.connect(on_completed)
+        worker.failed.connect(on_failed)
+        worker.cancelled.connect(on_cancelled)
+        self._backup_worker = worker
+        worker.start()
@@ -0,0 +1,130 @@
+# gui/photo_service.py
+"""
+Profile photo thumbnails for the GUI.
+
+Widgets ask the shared photo_service for a thumbnail pixmap. Pixmaps are kept
+in an in-memory LRU cache keyed by (photo, size, modification time), so a
+replaced photo is never served from the cache. A thumbnail that has not been
+generated yet is created by a background thread pool; pixmap() returns None
+meanwhile and thumbnail_ready is emitted once it can be shown. Originals are
+only decoded to make thumbnails, unless Pillow cannot read them.
+"""
+
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
+from PyQt5.QtGui import QPixmap
+from utils.profile_photo_manager import profile_photo_manager, THUMBNAIL_SIZES
+
+
+# Thumbnail pixmaps kept in memory
+PIXMAP_CACHE_SIZE = 300
+
+
+class PhotoService(QObject):
+    """Serves thumbnail pixmaps from an LRU cache, generating missing thumbnails in the background."""
+    
+    # Emits (photo filename, size) for every size once a photo's thumbnails can be shown
+    thumbnail_ready = pyqtSignal(str, int)
+    # Internal: emitted from a pool thread, delivered on the GUI thread
+    _generated = pyqtSignal(str, bool)
+    
+    def __init__(self, photo_manager=profile_photo_manager, cache_size=PIXMAP_CACHE_SIZE, max_workers=2, parent=None):
+        super().__init__(parent)
+        self.photo_manager = photo_manager
+        self.cache_size = cache_size
+        self._pixmaps = OrderedDict()
+        # Photo filename -> modification time of the original (None if it does not exist)
+        self._mtimes = {}
+        self._pending = set()
+        # Photos Pillow could not read; they are shown by scaling the original instead
+        self._failed = set()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="thumbnail")
+        self._generated.connect(self._on_generated, Qt.QueuedConnection)
+    
+    def _mtime(self, photo_filename):
+        # Photo files get a new name whenever they are replaced, so one stat per file is enough
+        if photo_filename not in self._mtimes:
+            try:
+                self._mtimes[photo_filename] = os.stat(os.path.join(self.photo_manager.base_path, photo_filename)).st_mtime_ns
+            except OSError:
+                self._mtimes[photo_filename] = None
+        return self._mtimes[photo_filename]
+    
+    def has_photo(self, photo_filename):
+        """True if the photo file exists"""
+        return bool(photo_filename) and self._mtime(photo_filename) is not None
+    
+    def is_pending(self, photo_filename):
+        """True while the photo's thumbnails are being generated"""
+        return photo_filename in self._pending
+    
+    def pixmap(self, photo_filename, size):
+        """
+        Get a photo's thumbnail, scaled to fit a size x size square.
+        
+        Args:
+            photo_filename (str): Name of the photo file
+            size (int): One of THUMBNAIL_SIZES
+        
+        Returns:
+            QPixmap: The thumbnail, or None if there is no photo or its thumbnail is still being generated
+        """
+        if not self.has_photo(photo_filename):
+            return None
+        key = (photo_filename, size, self._mtime(photo_filename))
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+            return pixmap
+        
+        if photo_filename in self._failed:
+            pixmap = QPixmap(os.path.join(self.photo_manager.base_path, photo_filename))
+            if pixmap.isNull():
+                return None
+            pixmap = pixmap.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        else:
+            thumbnail_path = self.photo_manager.get_thumbnail_path(photo_filename, size)
+            # Thumbnails carry the modification time of the photo they were made from
+            try:
+                fresh = os.stat(thumbnail_path).st_mtime_ns == key[2]
+            except OSError:
+                fresh = False
+            pixmap = QPixmap(thumbnail_path) if fresh else None
+            if pixmap is None or pixmap.isNull():
+                self._generate(photo_filename)
+                return None
+        
+        self._pixmaps[key] = pixmap
+        while len(self._pixmaps) > self.cache_size:
+            self._pixmaps.popitem(last=False)
+        return pixmap
+    
+    def invalidate(self, photo_filename):
+        """Forget everything cached about a photo, e.g. after it was deleted"""
+        self._mtimes.pop(photo_filename, None)
+        self._failed.discard(photo_filename)
+        for key in [key for key in self._pixmaps if key[0] == photo_filename]:
+            del self._pixmaps[key]
+    
+    def _generate(self, photo_filename):
+        if photo_filename in self._pending:
+            return
+        self._pending.add(photo_filename)
+        self._executor.submit(self._run_generate, photo_filename)
+    
+    def _run_generate(self, photo_filename):
+        # Runs on a pool thread: only touches files, never pixmaps
+        self._generated.emit(photo_filename, self.photo_manager.create_thumbnails(photo_filename))
+    
+    def _on_generated(self, photo_filename, success):
+        self._pending.discard(photo_filename)
+        if not success:
+            self._failed.add(photo_filename)
+        for size in THUMBNAIL_SIZES:
+            self.thumbnail_ready.emit(photo_filename, size)
+
+
+# Create a global instance for easy access
+photo_service = PhotoService()
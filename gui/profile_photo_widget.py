@@ -5,10 +5,14 @@ Widget for handling resident profile photos in the GUI.
 
 from PyQt5.QtWidgets import (QWidget, QPushButton, QLabel, QFileDialog, 
                              QVBoxLayout, QHBoxLayout, QMessageBox)
-from PyQt5.QtGui import QPixmap, QImage
+from PyQt5.QtGui import QImage
 from PyQt5.QtCore import Qt, pyqtSignal
 import os
-from utils.profile_photo_manager import profile_photo_manager
+from utils.profile_photo_manager import profile_photo_manager, THUMBNAIL_SIZES
+from gui.photo_service import photo_service
+
+# Edge length of the photo shown in the dialog
+PHOTO_SIZE = THUMBNAIL_SIZES[1]
 
 
 class ProfilePhotoWidget(QWidget):
@@ -18,7 +22,9 @@ class ProfilePhotoWidget(QWidget):
         super().__init__(parent)
         self.resident_id = resident_id
         self.current_photo_path = None
+        self.photo_filename = None
         self.setup_ui()
+        photo_service.thumbnail_ready.connect(self.on_thumbnail_ready)
     
     def setup_ui(self):
         layout = QVBoxLayout()
@@ -27,8 +33,8 @@ class ProfilePhotoWidget(QWidget):
         # Photo display
         self.photo_label = QLabel()
         self.photo_label.setAlignment(Qt.AlignCenter)
-        self.photo_label.setMinimumSize(150, 150)
-        self.photo_label.setMaximumSize(150, 150)
+        self.photo_label.setMinimumSize(PHOTO_SIZE, PHOTO_SIZE)
+        self.photo_label.setMaximumSize(PHOTO_SIZE, PHOTO_SIZE)
         self.photo_label.setStyleSheet("""
             QLabel {
                 border: 1px solid #bdc3c7;
@@ -69,33 +75,39 @@ class ProfilePhotoWidget(QWidget):
     
     def set_photo(self, photo_filename):
         """Set the photo to display."""
-        if not photo_filename:
+        self.photo_filename = photo_filename
+        if not photo_service.has_photo(photo_filename):
             self.set_placeholder_photo()
             self.remove_button.setEnabled(False)
             return
             
-        photo_path = profile_photo_manager.get_profile_photo_path(photo_filename)
-        if photo_path and os.path.exists(photo_path):
-            pixmap = QPixmap(photo_path)
-            if not pixmap.isNull():
-                # Scale the pixmap to fit the label while maintaining aspect ratio
-                pixmap = pixmap.scaled(150, 150, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                self.photo_label.setPixmap(pixmap)
-                self.photo_label.setStyleSheet("""
-                    QLabel {
-                        border: 1px solid #bdc3c7;
-                        border-radius: 6px;
-                        background-color: white;
-                    }
-                """)
-                self.current_photo_path = photo_path
-                self.remove_button.setEnabled(True)
+        # The thumbnail is already scaled to fit the label
+        pixmap = photo_service.pixmap(photo_filename, PHOTO_SIZE)
+        if pixmap is not None or photo_service.is_pending(photo_filename):
+            self.current_photo_path = os.path.join(profile_photo_manager.base_path, photo_filename)
+            self.remove_button.setEnabled(True)
+            if pixmap is None:
+                # on_thumbnail_ready shows the photo once its thumbnail has been generated
+                self.photo_label.setText("Loading...")
                 return
+            self.photo_label.setPixmap(pixmap)
+            self.photo_label.setStyleSheet("""
+                QLabel {
+                    border: 1px solid #bdc3c7;
+                    border-radius: 6px;
+                    background-color: white;
+                }
+            """)
+            return
         
         # If we couldn't load the photo, show placeholder
         self.set_placeholder_photo()
         self.remove_button.setEnabled(False)
     
+    def on_thumbnail_ready(self, photo_filename, size):
+        if size == PHOTO_SIZE and photo_filename == self.photo_filename:
+            self.set_photo(photo_filename)
+    
     def upload_photo(self):
         """Open file dialog to select and upload a photo."""
         file_path, _ = QFileDialog.getOpenFileName(
@@ -128,16 +140,22 @@ class ProfilePhotoWidget(QWidget):
                 
                 if photo_filename:
                     # Update the resident's photo path in the database
+                    previous_filename = self.photo_filename
                     success = profile_photo_manager.update_resident_photo_path(
                         self.resident_id, photo_filename
                     )
                     
                     if success:
+                        # The replaced photo is deleted unless someone else still uses it
+                        if previous_filename and previous_filename != photo_filename:
+                            profile_photo_manager.delete_profile_photo(previous_filename)
+                            photo_service.invalidate(previous_filename)
+                        photo_service.invalidate(photo_filename)
                         self.set_photo(photo_filename)
                         self.photoChanged.emit(photo_filename)
                         QMessageBox.information(self, "Success", "Profile photo uploaded successfully!")
                     else:
-                        # Clean up the saved photo if database update failed
+                        # Clean up the saved photo if database update failed (kept if it was already in use)
                         profile_photo_manager.delete_profile_photo(photo_filename)
                         QMessageBox.critical(self, "Error", "Failed to update resident record with photo.")
                 else:
@@ -149,8 +167,8 @@ class ProfilePhotoWidget(QWidget):
     def remove_photo(self):
         """Remove the current photo."""
         if self.current_photo_path:
-            # Extract filename from path
-            photo_filename = os.path.basename(self.current_photo_path)
+            # Photos are stored in shard folders, so the filename is not just the path's basename
+            photo_filename = self.photo_filename
             
             # Remove from database
             success = profile_photo_manager.update_resident_photo_path(
@@ -158,12 +176,14 @@ class ProfilePhotoWidget(QWidget):
             )
             
             if success:
-                # Delete the photo file
+                # Delete the photo file unless other residents share it
                 profile_photo_manager.delete_profile_photo(photo_filename)
+                photo_service.invalidate(photo_filename)
                 
                 # Update UI
                 self.set_placeholder_photo()
                 self.current_photo_path = None
+                self.photo_filename = None
                 self.remove_button.setEnabled(False)
                 self.photoChanged.emit(None)
                 QMessageBox.information(self, "Success", "Profile photo removed successfully!")
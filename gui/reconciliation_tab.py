@@ -10,6 +10,7 @@ from datetime import datetime
 import re
 from models.bank_statement import BankStatementManager, ReconciliationManager
 from models.ledger import LedgerManager
+from utils import export_engine
 from gui.advanced_filter_dialog import AdvancedFilterDialog
 from gui.matching_rules_dialog import MatchingRulesDialog
 from gui.bank_format_config_dialog import BankFormatConfigDialog
@@ -1014,82 +1015,40 @@ class ReconciliationTab(QWidget):
             QMessageBox.information(self, "Matching Rules Updated", 
                                   "Matching rules have been updated successfully.")
 
+    def export_match_info(self):
+        """Map transaction IDs to (confidence, matched bank entry) for the current matches"""
+        match_info = {}
+        for match in getattr(self, 'current_matches', None) or []:
+            if 'bank_entry' not in match:
+                continue
+            transaction_id = match['ledger_transaction'].transaction_id
+            if transaction_id in match_info:
+                continue
+            bank_description = match['bank_entry'].description
+            match_info[transaction_id] = (f"{match.get('confidence', 0):.1f}%",
+                                          bank_description[:50] if bank_description else "")
+        return match_info
+
+    def export_rows(self):
+        """Stream the reconciliation rows for the selected period straight from the database"""
+        start_date = self.start_date_input.date().toString("yyyy-MM-dd")
+        end_date = self.end_date_input.date().toString("yyyy-MM-dd")
+        return export_engine.iter_reconciliation_rows(self.ledger_manager.db_path, start_date, end_date,
+                                        self.export_match_info())
+
     def export_to_excel(self, file_path):
         """Export reconciliation data to Excel format"""
         try:
             # Check if openpyxl is available
             try:
-                from openpyxl import Workbook
-                from openpyxl.styles import Font, PatternFill
+                import openpyxl
             except ImportError:
                 QMessageBox.warning(self, "Export Error", 
                                   "Excel export requires openpyxl library. Please install it using: pip install openpyxl")
                 return
             
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Reconciliation Report"
-            
-            # Add header row
-            headers = [
-                "S.N", "Transaction ID", "Date", "Flat No", "Type", "Category", "Description",
-                "Debit", "Credit", "Balance", "Payment Mode", "Status", "Confidence", "Matched Bank Entry"
-            ]
-            ws.append(headers)
-            
-            # Style header row
-            header_font = Font(bold=True)
-            header_fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
-            for col in range(1, len(headers) + 1):
-                cell = ws.cell(row=1, column=col)
-                cell.font = header_font
-                cell.fill = header_fill
-            
-            # Add ledger data
-            for row in range(self.ledger_table.rowCount()):
-                sn = self.ledger_table.item(row, 0).text() if self.ledger_table.item(row, 0) else ""
-                txn_id = self.ledger_table.item(row, 1).text() if self.ledger_table.item(row, 1) else ""
-                date = self.ledger_table.item(row, 2).text() if self.ledger_table.item(row, 2) else ""
-                flat_no = self.ledger_table.item(row, 3).text() if self.ledger_table.item(row, 3) else ""
-                txn_type = self.ledger_table.item(row, 4).text() if self.ledger_table.item(row, 4) else ""
-                category = self.ledger_table.item(row, 5).text() if self.ledger_table.item(row, 5) else ""
-                description = self.ledger_table.item(row, 6).text() if self.ledger_table.item(row, 6) else ""
-                debit = self.ledger_table.item(row, 7).text() if self.ledger_table.item(row, 7) else ""
-                credit = self.ledger_table.item(row, 8).text() if self.ledger_table.item(row, 8) else ""
-                balance = self.ledger_table.item(row, 9).text() if self.ledger_table.item(row, 9) else ""
-                payment_mode = self.ledger_table.item(row, 10).text() if self.ledger_table.item(row, 10) else ""
-                status = self.ledger_table.item(row, 11).text() if self.ledger_table.item(row, 11) else ""
-                confidence = self.ledger_table.item(row, 12).text() if self.ledger_table.item(row, 12) else ""
-                
-                # Find matched bank entry if any
-                matched_bank = ""
-                if hasattr(self, 'current_matches'):
-                    for match in self.current_matches:
-                        if (match['ledger_transaction'].transaction_id == txn_id and 
-                            'bank_entry' in match):
-                            matched_bank = match['bank_entry'].description[:50] if match['bank_entry'].description else ""
-                            break
-                
-                ws.append([
-                    sn, txn_id, date, flat_no, txn_type, category, description,
-                    debit, credit, balance, payment_mode, status, confidence, matched_bank
-                ])
-            
-            # Auto-adjust column widths
-            for column in ws.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                ws.column_dimensions[column_letter].width = adjusted_width
-            
-            # Save workbook
-            wb.save(file_path)
+            export_engine.export_to_excel(file_path, export_engine.RECONCILIATION_EXPORT_COLUMNS,
+                                          self.export_rows(), sheet_title="Reconciliation Report")
             
         except Exception as e:
             raise Exception(f"Error exporting to Excel: {str(e)}")
@@ -1097,48 +1056,7 @@ class ReconciliationTab(QWidget):
     def export_to_csv(self, file_path):
         """Export reconciliation data to CSV format"""
         try:
-            import csv
-            
-            with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                
-                # Write header
-                headers = [
-                    "S.N", "Transaction ID", "Date", "Flat No", "Type", "Category", "Description",
-                    "Debit", "Credit", "Balance", "Payment Mode", "Status", "Confidence", "Matched Bank Entry"
-                ]
-                writer.writerow(headers)
-                
-                # Write data rows
-                for row in range(self.ledger_table.rowCount()):
-                    sn = self.ledger_table.item(row, 0).text() if self.ledger_table.item(row, 0) else ""
-                    txn_id = self.ledger_table.item(row, 1).text() if self.ledger_table.item(row, 1) else ""
-                    date = self.ledger_table.item(row, 2).text() if self.ledger_table.item(row, 2) else ""
-                    flat_no = self.ledger_table.item(row, 3).text() if self.ledger_table.item(row, 3) else ""
-                    txn_type = self.ledger_table.item(row, 4).text() if self.ledger_table.item(row, 4) else ""
-                    category = self.ledger_table.item(row, 5).text() if self.ledger_table.item(row, 5) else ""
-                    description = self.ledger_table.item(row, 6).text() if self.ledger_table.item(row, 6) else ""
-                    debit = self.ledger_table.item(row, 7).text() if self.ledger_table.item(row, 7) else ""
-                    credit = self.ledger_table.item(row, 8).text() if self.ledger_table.item(row, 8) else ""
-                    balance = self.ledger_table.item(row, 9).text() if self.ledger_table.item(row, 9) else ""
-                    payment_mode = self.ledger_table.item(row, 10).text() if self.ledger_table.item(row, 10) else ""
-                    status = self.ledger_table.item(row, 11).text() if self.ledger_table.item(row, 11) else ""
-                    confidence = self.ledger_table.item(row, 12).text() if self.ledger_table.item(row, 12) else ""
-                    
-                    # Find matched bank entry if any
-                    matched_bank = ""
-                    if hasattr(self, 'current_matches'):
-                        for match in self.current_matches:
-                            if (match['ledger_transaction'].transaction_id == txn_id and 
-                                'bank_entry' in match):
-                                matched_bank = match['bank_entry'].description[:50] if match['bank_entry'].description else ""
-                                break
-                    
-                    writer.writerow([
-                        sn, txn_id, date, flat_no, txn_type, category, description,
-                        debit, credit, balance, payment_mode, status, confidence, matched_bank
-                    ])
-                    
+            export_engine.export_to_csv(file_path, export_engine.RECONCILIATION_EXPORT_COLUMNS, self.export_rows())
         except Exception as e:
             raise Exception(f"Error exporting to CSV: {str(e)}")
 
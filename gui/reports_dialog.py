@@ -1,18 +1,30 @@
 # gui/reports_dialog.py
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, 
                             QLabel, QComboBox, QDateEdit, QMessageBox, 
-                            QFileDialog, QGroupBox, QFormLayout)
-from PyQt5.QtCore import QDate
+                            QFileDialog, QGroupBox, QFormLayout, QTableWidget,
+                            QTableWidgetItem, QProgressBar, QHeaderView, QAbstractItemView)
+from PyQt5.QtCore import QDate, Qt
 import os
 import sys
 from datetime import date
-from models.reports import ReportGenerator
+from utils.report_jobs import ReportJobQueue, CANCELLED
 
 class ReportsDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Reports")
         self.setGeometry(100, 100, 400, 350)
+        self.job_rows = {}  # job_id -> row in the jobs table
+        
+        # Reports are generated on a worker pool so the UI stays responsive
+        self.job_queue = ReportJobQueue(parent=self)
+        self.job_queue.job_queued.connect(self.on_job_queued)
+        self.job_queue.job_started.connect(self.on_job_started)
+        self.job_queue.job_progress.connect(self.on_job_progress)
+        self.job_queue.job_finished.connect(self.on_job_finished)
+        self.job_queue.job_failed.connect(self.on_job_failed)
+        self.job_queue.job_cancelled.connect(self.on_job_cancelled)
+        
         self.setup_ui()
     
     def setup_ui(self):
@@ -23,7 +35,7 @@ class ReportsDialog(QDialog):
         report_layout = QFormLayout()
         
         self.report_type_combo = QComboBox()
-        self.report_type_combo.addItems(["Ledger Report", "Resident List", "Payment Summary", "Expense Summary", "Outstanding Dues Report", "Income vs Expense Report", "Payments Report", "Expenses Report"])
+        self.report_type_combo.addItems(["Ledger Report", "Resident List", "Payment Summary", "Expense Summary", "Outstanding Dues Report", "Income vs Expense Report", "Payments Report", "Expenses Report", "Month-End Report Pack", "Dues Statements (per flat)"])
         self.report_type_combo.currentTextChanged.connect(self.on_report_type_changed)
         report_layout.addRow("Report Type:", self.report_type_combo)
         
@@ -51,6 +63,24 @@ class ReportsDialog(QDialog):
         self.generate_button.clicked.connect(self.generate_report)
         layout.addWidget(self.generate_button)
         
+        # Report jobs
+        jobs_group = QGroupBox("Report Jobs")
+        jobs_layout = QVBoxLayout()
+        
+        self.jobs_table = QTableWidget(0, 3)
+        self.jobs_table.setHorizontalHeaderLabels(["Report", "Status", "Progress"])
+        self.jobs_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.jobs_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.jobs_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        jobs_layout.addWidget(self.jobs_table)
+        
+        self.cancel_button = QPushButton("Cancel Selected")
+        self.cancel_button.clicked.connect(self.cancel_selected_jobs)
+        jobs_layout.addWidget(self.cancel_button)
+        
+        jobs_group.setLayout(jobs_layout)
+        layout.addWidget(jobs_group)
+        
         # Status label
         self.status_label = QLabel("")
         layout.addWidget(self.status_label)
@@ -62,293 +92,121 @@ class ReportsDialog(QDialog):
     
     def on_report_type_changed(self, report_type):
         # Date range is always enabled now, but we can update the info label
-        date_applicable = report_type in ["Ledger Report", "Outstanding Dues Report", "Income vs Expense Report", "Payments Report", "Expenses Report"]
+        date_applicable = report_type in ["Ledger Report", "Outstanding Dues Report", "Income vs Expense Report", "Payments Report", "Expenses Report", "Month-End Report Pack", "Dues Statements (per flat)"]
         if date_applicable:
             self.date_info_label.setText("(Date range will be applied to this report)")
         else:
             self.date_info_label.setText("(Date range applies to Ledger, Outstanding Dues, Income vs Expense, Payments, and Expenses reports)")
     
     def generate_report(self):
+        """Queue the selected report; it is generated in the background"""
         report_type = self.report_type_combo.currentText()
         
         try:
-            if report_type == "Ledger Report":
-                self.generate_ledger_report()
-            elif report_type == "Resident List":
-                self.generate_resident_report()
-            elif report_type == "Payment Summary":
-                self.generate_payment_summary()
-            elif report_type == "Expense Summary":
-                self.generate_expense_summary()
-            elif report_type == "Outstanding Dues Report":
-                self.generate_outstanding_dues_report()
-            elif report_type == "Income vs Expense Report":
-                self.generate_income_expense_report()
-            elif report_type == "Payments Report":
-                self.generate_payments_report()
-            elif report_type == "Expenses Report":
-                self.generate_expenses_report()
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to generate report: {str(e)}")
-    
-    def generate_ledger_report(self):
-        self.status_label.setText("Generating ledger report...")
-        self.repaint()  # Force UI update
-        
-        try:
-            # Get the username from the main window
-            generated_by = "System User"  # Default value
-            if hasattr(self.parent(), 'parent') and self.parent().parent():
-                main_window = self.parent().parent()
-                if hasattr(main_window, 'username'):
-                    generated_by = main_window.username
-            
             # Get date range
             start_date = self.start_date.date().toPyDate()
             end_date = self.end_date.date().toPyDate()
             
-            report_generator = ReportGenerator()
-            file_path = report_generator.generate_ledger_report(
-                generated_by,
-                start_date=start_date,
-                end_date=end_date
-            )
-            
-            self.status_label.setText(f"Report generated successfully: {file_path}")
-            QMessageBox.information(self, "Success", f"Ledger report generated successfully!\n\nSaved to: {file_path}")
-            
-            # Optionally open the file location
-            self.open_file_location(file_path)
+            self.job_queue.submit(report_type, self.get_generated_by(), start_date, end_date)
         except Exception as e:
-            self.status_label.setText("Error generating report")
-            QMessageBox.critical(self, "Error", f"Failed to generate ledger report: {str(e)}")
+            QMessageBox.critical(self, "Error", f"Failed to generate report: {str(e)}")
     
-    def generate_resident_report(self):
-        self.status_label.setText("Generating resident report...")
-        self.repaint()  # Force UI update
-        
-        try:
-            # Get the username from the main window
-            generated_by = "System User"  # Default value
-            if hasattr(self.parent(), 'parent') and self.parent().parent():
-                main_window = self.parent().parent()
-                if hasattr(main_window, 'username'):
-                    generated_by = main_window.username
-
-            report_generator = ReportGenerator()
-            file_path = report_generator.generate_resident_list_report(generated_by)
-
-            self.status_label.setText(f"Report generated successfully: {file_path}")
-            QMessageBox.information(self, "Success", f"Resident list report generated successfully!\n\nSaved to: {file_path}")
-
-            # Optionally open the file location
-            self.open_file_location(file_path)
-        except Exception as e:
-            self.status_label.setText("Error generating report")
-            QMessageBox.critical(self, "Error", f"Failed to generate resident list report: {str(e)}")
+    def get_generated_by(self):
+        """Get the username from the main window"""
+        generated_by = "System User"  # Default value
+        if hasattr(self.parent(), 'parent') and self.parent().parent():
+            main_window = self.parent().parent()
+            if hasattr(main_window, 'username'):
+                generated_by = main_window.username
+        return generated_by
     
-    def generate_payment_summary(self):
-        self.status_label.setText("Generating payment summary...")
-        self.repaint()  # Force UI update
+    def on_job_queued(self, job_id, report_type):
+        row = self.jobs_table.rowCount()
+        self.jobs_table.insertRow(row)
         
-        try:
-            # Get the username from the main window
-            generated_by = "System User"  # Default value
-            if hasattr(self.parent(), 'parent') and self.parent().parent():
-                main_window = self.parent().parent()
-                if hasattr(main_window, 'username'):
-                    generated_by = main_window.username
-
-            # Get date range
-            start_date = self.start_date.date().toPyDate()
-            end_date = self.end_date.date().toPyDate()
-
-            report_generator = ReportGenerator()
-            file_path = report_generator.generate_payment_summary_report(
-                generated_by,
-                start_date=start_date,
-                end_date=end_date
-            )
-
-            self.status_label.setText(f"Report generated successfully: {file_path}")
-            QMessageBox.information(self, "Success", f"Payment summary report generated successfully!\n\nSaved to: {file_path}")
-
-            # Optionally open the file location
-            self.open_file_location(file_path)
-        except Exception as e:
-            self.status_label.setText("Error generating report")
-            QMessageBox.critical(self, "Error", f"Failed to generate payment summary report: {str(e)}")
+        report_item = QTableWidgetItem(report_type)
+        report_item.setData(Qt.UserRole, job_id)
+        self.jobs_table.setItem(row, 0, report_item)
+        self.jobs_table.setItem(row, 1, QTableWidgetItem("Queued"))
+        
+        progress_bar = QProgressBar()
+        progress_bar.setRange(0, 100)
+        progress_bar.setValue(0)
+        self.jobs_table.setCellWidget(row, 2, progress_bar)
+        
+        self.job_rows[job_id] = row
+        self.status_label.setText(f"{report_type} queued")
+    
+    def on_job_started(self, job_id):
+        self.set_job_status(job_id, "Running")
     
-    def generate_expense_summary(self):
-        self.status_label.setText("Generating expense summary...")
-        self.repaint()  # Force UI update
+    def on_job_progress(self, job_id, percent, message):
+        row = self.job_rows.get(job_id)
+        if row is None:
+            return
+        progress_bar = self.jobs_table.cellWidget(row, 2)
+        if percent < 0:
+            # Total unknown - show a busy indicator
+            progress_bar.setRange(0, 0)
+        else:
+            progress_bar.setRange(0, 100)
+            progress_bar.setValue(percent)
+        self.set_job_status(job_id, message)
+    
+    def on_job_finished(self, job_id, file_path):
+        self.set_job_status(job_id, "Finished")
+        self.status_label.setText(f"Report generated successfully: {file_path}")
         
-        try:
-            # Get the username from the main window
-            generated_by = "System User"  # Default value
-            if hasattr(self.parent(), 'parent') and self.parent().parent():
-                main_window = self.parent().parent()
-                if hasattr(main_window, 'username'):
-                    generated_by = main_window.username
-
-            # Get date range
-            start_date = self.start_date.date().toPyDate()
-            end_date = self.end_date.date().toPyDate()
-
-            report_generator = ReportGenerator()
-            file_path = report_generator.generate_expense_summary_report(
-                generated_by,
-                start_date=start_date,
-                end_date=end_date
-            )
-
-            self.status_label.setText(f"Report generated successfully: {file_path}")
-            QMessageBox.information(self, "Success", f"Expense summary report generated successfully!\n\nSaved to: {file_path}")
-
-            # Optionally open the file location
-            self.open_file_location(file_path)
-        except Exception as e:
-            self.status_label.setText("Error generating report")
-            QMessageBox.critical(self, "Error", f"Failed to generate expense summary report: {str(e)}")
+        # Open the file location so the user can find the new report
+        self.open_file_location(file_path)
     
-    def generate_outstanding_dues_report(self):
-        self.status_label.setText("Generating outstanding dues report...")
-        self.repaint()  # Force UI update
-
-        try:
-            # Get the username from the main window
-            generated_by = "System User"  # Default value
-            if hasattr(self.parent(), 'parent') and self.parent().parent():
-                main_window = self.parent().parent()
-                if hasattr(main_window, 'username'):
-                    generated_by = main_window.username
-
-            # Get date range
-            start_date = self.start_date.date().toPyDate()
-            end_date = self.end_date.date().toPyDate()
-
-            report_generator = ReportGenerator()
-            file_path = report_generator.generate_outstanding_dues_report(
-                generated_by,
-                start_date=start_date,
-                end_date=end_date
-            )
-
-            self.status_label.setText(f"Report generated successfully: {file_path}")
-            QMessageBox.information(self, "Success", f"Outstanding dues report generated successfully!\n\nSaved to: {file_path}")
-
-            # Optionally open the file location
-            self.open_file_location(file_path)
-        except Exception as e:
-            self.status_label.setText("Error generating report")
-            QMessageBox.critical(self, "Error", f"Failed to generate outstanding dues report: {str(e)}")
-
-    def generate_income_expense_report(self):
-        self.status_label.setText("Generating income vs expense report...")
-        self.repaint()  # Force UI update
-
-        try:
-            # Get the username from the main window
-            generated_by = "System User"  # Default value
-            if hasattr(self.parent(), 'parent') and self.parent().parent():
-                main_window = self.parent().parent()
-                if hasattr(main_window, 'username'):
-                    generated_by = main_window.username
-
-            # Get date range
-            start_date = self.start_date.date().toPyDate()
-            end_date = self.end_date.date().toPyDate()
-
-            report_generator = ReportGenerator()
-            file_path = report_generator.generate_income_expense_report(
-                generated_by,
-                start_date=start_date,
-                end_date=end_date
-            )
-
-            self.status_label.setText(f"Report generated successfully: {file_path}")
-            QMessageBox.information(self, "Success", f"Income vs Expense report generated successfully!\n\nSaved to: {file_path}")
-
-            # Optionally open the file location
-            self.open_file_location(file_path)
-        except Exception as e:
-            self.status_label.setText("Error generating report")
-            QMessageBox.critical(self, "Error", f"Failed to generate income vs expense report: {str(e)}")
+    def on_job_failed(self, job_id, error):
+        self.set_job_status(job_id, "Failed", finished=True)
+        self.status_label.setText("Error generating report")
+        report_type = self.job_queue.jobs[job_id].report_type
+        QMessageBox.critical(self, "Error", f"Failed to generate {report_type.lower()}: {error}")
     
-    def generate_payments_report(self):
-        self.status_label.setText("Generating payments report...")
-        self.repaint()  # Force UI update
-
-        try:
-            # Get the username from the main window
-            generated_by = "System User"  # Default value
-            if hasattr(self.parent(), 'parent') and self.parent().parent():
-                main_window = self.parent().parent()
-                if hasattr(main_window, 'username'):
-                    generated_by = main_window.username
-
-            # Get date range
-            start_date = self.start_date.date().toPyDate()
-            end_date = self.end_date.date().toPyDate()
-
-            report_generator = ReportGenerator()
-            file_path = report_generator.generate_payments_report(
-                generated_by,
-                start_date=start_date,
-                end_date=end_date
-            )
-
-            self.status_label.setText(f"Report generated successfully: {file_path}")
-            QMessageBox.information(self, "Success", f"Payments report generated successfully!\n\nSaved to: {file_path}")
-
-            # Optionally open the file location
-            self.open_file_location(file_path)
-        except Exception as e:
-            self.status_label.setText("Error generating report")
-            QMessageBox.critical(self, "Error", f"Failed to generate payments report: {str(e)}")
+    def on_job_cancelled(self, job_id):
+        self.set_job_status(job_id, "Cancelled", finished=True)
+        self.status_label.setText("Report cancelled")
     
-    def generate_expenses_report(self):
-        self.status_label.setText("Generating expenses report...")
-        self.repaint()  # Force UI update
-
-        try:
-            # Get the username from the main window
-            generated_by = "System User"  # Default value
-            if hasattr(self.parent(), 'parent') and self.parent().parent():
-                main_window = self.parent().parent()
-                if hasattr(main_window, 'username'):
-                    generated_by = main_window.username
-
-            # Get date range
-            start_date = self.start_date.date().toPyDate()
-            end_date = self.end_date.date().toPyDate()
-
-            report_generator = ReportGenerator()
-            file_path = report_generator.generate_expenses_report(
-                generated_by,
-                start_date=start_date,
-                end_date=end_date
-            )
-
-            self.status_label.setText(f"Report generated successfully: {file_path}")
-            QMessageBox.information(self, "Success", f"Expenses report generated successfully!\n\nSaved to: {file_path}")
-
-            # Optionally open the file location
-            self.open_file_location(file_path)
-        except Exception as e:
-            self.status_label.setText("Error generating report")
-            QMessageBox.critical(self, "Error", f"Failed to generate expenses report: {str(e)}")
+    def set_job_status(self, job_id, status, finished=False):
+        row = self.job_rows.get(job_id)
+        if row is None:
+            return
+        self.jobs_table.item(row, 1).setText(status)
+        if finished:
+            progress_bar = self.jobs_table.cellWidget(row, 2)
+            progress_bar.setRange(0, 100)
+            progress_bar.setValue(0)
+    
+    def cancel_selected_jobs(self):
+        rows = {index.row() for index in self.jobs_table.selectedIndexes()}
+        if not rows:
+            QMessageBox.information(self, "Cancel Report", "Select a queued or running report to cancel.")
+            return
+        for row in rows:
+            job_id = self.jobs_table.item(row, 0).data(Qt.UserRole)
+            # Dropped jobs were already marked through job_cancelled; running ones
+            # report it once they reach their next checkpoint
+            state = self.job_queue.cancel(job_id)
+            if state and state != CANCELLED:
+                self.set_job_status(job_id, "Cancelling...")
     
     def open_file_location(self, file_path):
         """
         Open the file location in the system explorer
         """
         try:
-            directory = os.path.dirname(file_path)
+            # Report packs are folders; open them directly
+            directory = file_path if os.path.isdir(file_path) else os.path.dirname(file_path)
             if os.name == 'nt':  # Windows
                 os.startfile(directory)
             elif os.name == 'posix':  # macOS or Linux
                 os.system(f'open "{directory}"' if sys.platform == 'darwin' else f'xdg-open "{directory}"')
         except Exception as e:
             print(f"Could not open file location: {e}")
-
+    
+    def closeEvent(self, event):
+        self.job_queue.shutdown()
+        super().closeEvent(event)
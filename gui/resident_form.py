@@ -1,17 +1,24 @@
 # gui/resident_form.py
-from PyQt5.QtWidgets import (QWidget, QTableWidget, QTableWidgetItem,
+from PyQt5.QtWidgets import (QWidget, QTableView,
                             QPushButton, QVBoxLayout, QHBoxLayout,
                             QLineEdit, QComboBox, QDateEdit, QLabel,
                             QMessageBox, QHeaderView, QFormLayout,
                             QDialog, QDialogButtonBox, QDoubleSpinBox,
                             QSpinBox, QTextEdit, QTabWidget, QGroupBox,
                             QCheckBox, QScrollArea, QFrame)
-from PyQt5.QtCore import QDate, Qt
+from PyQt5.QtCore import QDate, Qt, QTimer, QSize
 from PyQt5.QtGui import QIntValidator
 from models.resident import ResidentManager
+from models.resident_search import document_matches
+from models.vehicle import VehicleManager, split_vehicle_numbers
+from gui.resident_table_model import (ResidentTableModel, ResidentFilterProxyModel, ResidentSearchWorker,
+                                      PHOTO_COLUMN, GRID_PHOTO_SIZE)
 from gui.profile_photo_widget import ProfilePhotoWidget
 from gui.domestic_help_widget import DomesticHelpWidget
 
+# Pause in typing (ms) before the search box runs a search
+SEARCH_DELAY_MS = 250
+
 
 class ResidentForm(QWidget):
     def __init__(self, parent=None, user_role=None, current_user=None):
@@ -23,6 +30,10 @@ class ResidentForm(QWidget):
         self.advanced_filters = {}  # Store advanced filter criteria
         self.current_sort_column = None
         self.current_sort_order = "ASC"
+        self._search_worker = None
+        self._pending_search = None
+        # (term, indexed text per matching resident id, fuzzy) of the last search, for refining in memory
+        self._last_search = None
         self.setup_ui()
         self.load_residents()
     
@@ -38,6 +49,12 @@ class ResidentForm(QWidget):
         self.search_input.textChanged.connect(self.filter_residents)
         search_layout.addWidget(self.search_input)
         
+        # Searches run once typing pauses
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.start_search)
+        
         # Advanced search toggle button
         self.advanced_search_toggle = QPushButton("Advanced Search ▼")
         self.advanced_search_toggle.setCheckable(True)
@@ -91,15 +108,28 @@ class ResidentForm(QWidget):
         
         main_layout.addLayout(action_layout)
         
-        # Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(9)  # Including car and scooter info
-        headers = ["ID", "Flat No", "Name", "Phone No", "Email", "Car Nos", "Scooter Nos", "Cars", "Scooters"]
-        self.table.setHorizontalHeaderLabels(headers)
+        # Table: searching filters the proxy instead of rebuilding the rows
+        self.table_model = ResidentTableModel(self)
+        self.proxy_model = ResidentFilterProxyModel(self)
+        self.proxy_model.setSourceModel(self.table_model)
+        self.table = QTableView()
+        self.table.setModel(self.proxy_model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SingleSelection)
-        self.table.itemSelectionChanged.connect(self.on_selection_changed)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setSelectionMode(QTableView.SingleSelection)
+        self.table.setEditTriggers(QTableView.NoEditTriggers)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(1, Qt.AscendingOrder)  # Flat number
+        # Make ID column invisible but still accessible
+        self.table.setColumnHidden(0, True)
+        # Thumbnail column, shown first
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(PHOTO_COLUMN, QHeaderView.Fixed)
+        header.resizeSection(PHOTO_COLUMN, GRID_PHOTO_SIZE + 8)
+        header.moveSection(header.visualIndex(PHOTO_COLUMN), 1)
+        self.table.setIconSize(QSize(GRID_PHOTO_SIZE, GRID_PHOTO_SIZE))
+        self.table.verticalHeader().setDefaultSectionSize(GRID_PHOTO_SIZE + 4)
+        self.table.selectionModel().selectionChanged.connect(self.on_selection_changed)
         self.table.horizontalHeader().sectionClicked.connect(self.on_header_clicked)
         
         main_layout.addWidget(self.table)
@@ -312,7 +342,7 @@ class ResidentForm(QWidget):
         self.reset_advanced_filters()
     
     def on_header_clicked(self, column):
-        """Handle header click for sorting."""
+        """Remember the sort chosen in the header (the view sorts itself)."""
         # Map column index to database column name
         column_mapping = {
             0: 'id',
@@ -327,17 +357,9 @@ class ResidentForm(QWidget):
         }
         
         if column in column_mapping:
-            sort_column = column_mapping[column]
-            
-            # Toggle sort order if clicking the same column
-            if self.current_sort_column == sort_column:
-                self.current_sort_order = "DESC" if self.current_sort_order == "ASC" else "ASC"
-            else:
-                self.current_sort_column = sort_column
-                self.current_sort_order = "ASC"
-            
-            # Apply sorting with current filters
-            self.apply_advanced_filters()
+            self.current_sort_column = column_mapping[column]
+            header = self.table.horizontalHeader()
+            self.current_sort_order = "ASC" if header.sortIndicatorOrder() == Qt.AscendingOrder else "DESC"
     
     def on_selection_changed(self):
         selected_rows = self.table.selectionModel().selectedRows()
@@ -349,72 +371,95 @@ class ResidentForm(QWidget):
             self.delete_button.setEnabled(False)
     
     def filter_residents(self, text):
-        if not text:
-            # If no text and no advanced filters, load all residents
-            if not self.advanced_filters:
-                self.load_residents()
-            else:
-                # Apply existing advanced filters
+        """Restart the type-ahead delay; the search runs once typing pauses."""
+        self.search_timer.start()
+    
+    def is_search_pending(self):
+        """True while a typed search has not been applied to the table yet"""
+        return self.search_timer.isActive() or self._search_worker is not None
+    
+    def start_search(self):
+        """Filter the table by the search box, refining the last results in memory when possible."""
+        term = self.search_input.text().strip()
+        if not term:
+            self._last_search = None
+            self.proxy_model.set_resident_ids(None)
+            if self.advanced_filters.get('search_term'):
+                # The table holds advanced search results for the old term
                 self.apply_advanced_filters()
             return
-            
+        
+        # A longer version of the last term can only match a subset of its results
+        last = self._last_search
+        if last and not last[2] and term.lower().startswith(last[0].lower()):
+            documents = {resident_id: document for resident_id, document in last[1].items()
+                         if document_matches(document, term)}
+            if documents:
+                self._last_search = (term, documents, False)
+                self.proxy_model.set_resident_ids(documents)
+                return
+        
+        if self._search_worker is not None:
+            # The running search is superseded: its results are dropped and this term runs next
+            self._pending_search = term
+            return
+        
+        self._search_worker = ResidentSearchWorker(self.resident_manager, term, self)
+        self._search_worker.results_ready.connect(self.on_search_results)
+        self._search_worker.failed.connect(self.on_search_failed)
+        self._search_worker.finished.connect(self.on_search_finished)
+        self._search_worker.start()
+    
+    def on_search_results(self, term, resident_ids, documents, fuzzy):
+        if self._pending_search is not None or term != self.search_input.text().strip():
+            return
+        self._last_search = (term, documents, fuzzy) if documents else None
+        self.proxy_model.set_resident_ids(resident_ids)
+    
+    def on_search_failed(self, message):
+        if self._pending_search is None:
+            QMessageBox.warning(self, "Search Error", f"Failed to search residents: {message}")
+    
+    def on_search_finished(self):
+        self._search_worker.deleteLater()
+        self._search_worker = None
+        if self._pending_search is not None:
+            self._pending_search = None
+            self.start_search()
+    
+    def stop_search_worker(self):
+        """Drop the running search's results and wait for its worker thread to finish"""
+        self.search_timer.stop()
+        self._pending_search = None
+        worker, self._search_worker = self._search_worker, None
+        if worker is None:
+            return
+        
         try:
-            residents = self.resident_manager.search_residents(text)
-            self.display_residents(residents)
-        except Exception as e:
-            from utils.database_error_handler import handle_database_error
-            handle_database_error(self, e, "search residents")
-
+            worker.results_ready.disconnect()
+            worker.failed.disconnect()
+            worker.finished.disconnect()
+        except TypeError:
+            pass  # Nothing connected any more
+        # A search is a single indexed query, so this does not block for long
+        worker.wait()
+        worker.deleteLater()
+    
+    def closeEvent(self, event):
+        """The worker is a child of this form and must not be destroyed while it runs"""
+        self.stop_search_worker()
+        super().closeEvent(event)
+    
     def display_residents(self, residents):
-        # Sort residents by flat number
-        residents.sort(key=lambda x: self._extract_flat_number(x.flat_no))
-        
-        self.table.setRowCount(len(residents))
-        
-        for row, resident in enumerate(residents):
-            self.table.setItem(row, 0, QTableWidgetItem(str(resident.id)))
-            self.table.setItem(row, 1, QTableWidgetItem(resident.flat_no))
-            self.table.setItem(row, 2, QTableWidgetItem(resident.name))
-            self.table.setItem(row, 3, QTableWidgetItem(resident.mobile_no))
-            self.table.setItem(row, 4, QTableWidgetItem(resident.email))
-            # Display car numbers (first few if many)
-            car_numbers = resident.car_numbers or ""
-            if car_numbers:
-                # Handle both \n and \r\n line endings
-                normalized_car_numbers = car_numbers.replace('\r\n', '\n')
-                car_list = [cn.strip() for cn in normalized_car_numbers.split('\n') if cn.strip()]
-                display_cars = ", ".join(car_list[:3])  # Show first 3 car numbers
-                if len(car_list) > 3:
-                    display_cars += f" (+{len(car_list)-3} more)"
-            else:
-                display_cars = ""
-            self.table.setItem(row, 5, QTableWidgetItem(display_cars))
-            
-            # Display scooter numbers (first few if many)
-            scooter_numbers = resident.scooter_numbers or ""
-            if scooter_numbers:
-                # Handle both \n and \r\n line endings
-                normalized_scooter_numbers = scooter_numbers.replace('\r\n', '\n')
-                scooter_list = [sn.strip() for sn in normalized_scooter_numbers.split('\n') if sn.strip()]
-                display_scooters = ", ".join(scooter_list[:3])  # Show first 3 scooter numbers
-                if len(scooter_list) > 3:
-                    display_scooters += f" (+{len(scooter_list)-3} more)"
-            else:
-                display_scooters = ""
-            self.table.setItem(row, 6, QTableWidgetItem(display_scooters))
-            
-            # Display counts
-            self.table.setItem(row, 7, QTableWidgetItem(str(resident.cars) if resident.cars else "0"))
-            self.table.setItem(row, 8, QTableWidgetItem(str(resident.scooters) if resident.scooters else "0"))
-            
-            # Make ID column invisible but still accessible
-            self.table.setColumnHidden(0, True)
+        self.table_model.set_residents(residents)
     
-    def _extract_flat_number(self, flat_no):
-        """Extract numeric part from flat number for sorting"""
-        import re
-        match = re.search(r'\d+', flat_no)
-        return int(match.group()) if match else 0
+    def selected_resident(self):
+        """The resident in the selected row, or None"""
+        selected_rows = self.table.selectionModel().selectedRows()
+        if not selected_rows:
+            return None
+        source_index = self.proxy_model.mapToSource(selected_rows[0])
+        return self.table_model.resident_at(source_index.row())
     
     def add_resident(self):
         dialog = ResidentDialog(self, user_role=self.user_role)
@@ -446,19 +491,19 @@ class ResidentForm(QWidget):
                 handle_database_error(self, e, "add resident")
     
     def edit_resident(self):
-        selected_rows = self.table.selectionModel().selectedRows()
-        if not selected_rows:
+        selected = self.selected_resident()
+        if not selected:
             return
             
-        row = selected_rows[0].row()
-        resident_id = int(self.table.item(row, 0).text())
+        resident_id = selected.id
         
-        resident = self.resident_manager.get_resident_by_id(resident_id)
-        if not resident:
+        # Load the resident with their vehicles and domestic help in one go
+        details = self.resident_manager.get_resident_details([resident_id]).get(resident_id)
+        if not details:
             QMessageBox.warning(self, "Error", "Resident not found.")
             return
             
-        dialog = ResidentDialog(self, resident, user_role=self.user_role)
+        dialog = ResidentDialog(self, details.resident, user_role=self.user_role, details=details)
         if dialog.exec_() == QDialog.Accepted:
             data = dialog.get_data()
             # Set fixed monthly charges
@@ -487,13 +532,12 @@ class ResidentForm(QWidget):
                 handle_database_error(self, e, "update resident")
     
     def delete_resident(self):
-        selected_rows = self.table.selectionModel().selectedRows()
-        if not selected_rows:
+        selected = self.selected_resident()
+        if not selected:
             return
             
-        row = selected_rows[0].row()
-        resident_id = int(self.table.item(row, 0).text())
-        resident_name = self.table.item(row, 2).text()
+        resident_id = selected.id
+        resident_name = selected.name
         
         reply = QMessageBox.question(
             self, "Confirm Delete", 
@@ -514,16 +558,22 @@ class ResidentForm(QWidget):
         try:
             residents = self.resident_manager.get_all_residents()
             self.display_residents(residents)
+            # Residents may have changed, so search the current term again
+            self._last_search = None
+            if self.search_input.text().strip():
+                self.start_search()
         except Exception as e:
             from utils.database_error_handler import handle_database_error
             handle_database_error(self, e, "load residents")
 
 
 class ResidentDialog(QDialog):
-    def __init__(self, parent=None, resident=None, user_role=None):
+    def __init__(self, parent=None, resident=None, user_role=None, details=None):
         super().__init__(parent)
         self.resident = resident
         self.user_role = user_role
+        # ResidentDetails with the resident's vehicles and domestic help already loaded, if available
+        self.details = details
         self.setWindowTitle("Add Resident" if not resident else "Edit Resident")
         self.setModal(True)
         self.setup_ui()
@@ -665,6 +715,13 @@ class ResidentDialog(QDialog):
         self.parking_input.setMaxLength(20)
         layout.addRow("Parking Slot:", self.parking_input)
         
+        # Registered vehicles, with the make, colour and slot the number fields don't show
+        if self.details is not None:
+            vehicles = [vehicle.describe() for vehicle in self.details.vehicles]
+            self.registered_vehicles_label = QLabel("\n".join(vehicles) or "None")
+            self.registered_vehicles_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+            layout.addRow("Registered Vehicles:", self.registered_vehicles_label)
+        
         self.vehicle_info_tab.setLayout(layout)
     
     def setup_vacant_info_tab(self):
@@ -708,7 +765,8 @@ class ResidentDialog(QDialog):
         layout = QVBoxLayout()
         self.domestic_help_widget = DomesticHelpWidget(
             resident_id=self.resident.id if self.resident else None,
-            user_role=self.user_role
+            user_role=self.user_role,
+            domestic_help=self.details.domestic_help if self.details else None
         )
         layout.addWidget(self.domestic_help_widget)
         self.domestic_help_tab.setLayout(layout)
@@ -762,10 +820,6 @@ class ResidentDialog(QDialog):
             # Show vacant info tab
             self.vacant_info_tab.setVisible(True)
             self.tab_widget.setTabEnabled(self.tab_widget.indexOf(self.vehicle_info_tab), False)
-        
-        # Load domestic help data
-        if self.domestic_help_widget and self.resident.id:
-            self.domestic_help_widget.load_domestic_help()
     
     def get_data(self):
         data = {
@@ -815,4 +869,19 @@ class ResidentDialog(QDialog):
             self.phone_input.setFocus()
             return
         
+        # A registration number can only belong to one flat
+        numbers = split_vehicle_numbers(self.car_numbers_input.toPlainText()) + \
+                  split_vehicle_numbers(self.scooter_numbers_input.toPlainText())
+        try:
+            conflicts = VehicleManager().find_plate_conflicts(self.resident.id if self.resident else None, numbers)
+        except Exception:
+            # The save itself reports database problems
+            conflicts = []
+        if conflicts:
+            number, flat_no = conflicts[0]
+            QMessageBox.warning(self, "Validation Error", f"Vehicle {number} is already registered to flat {flat_no}.")
+            self.tab_widget.setCurrentWidget(self.vehicle_info_tab)
+            self.car_numbers_input.setFocus()
+            return
+        
         super().accept()
\ No newline at end of file
@@ -0,0 +1,162 @@
+# gui/resident_table_model.py
+"""
+Table model, filter proxy and search worker behind the resident list.
+
+The model formats each resident once; searching only changes which rows the
+proxy lets through, so typing in the search box never rebuilds the table.
+The Photo column shows thumbnails from gui.photo_service.
+"""
+
+import weakref
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt, QThread, pyqtSignal
+from models.resident_search import document_matches
+from models.vehicle import split_vehicle_numbers
+from utils.profile_photo_manager import THUMBNAIL_SIZES
+from gui.photo_service import photo_service
+
+
+RESIDENT_COLUMNS = ["ID", "Flat No", "Name", "Phone No", "Email", "Car Nos", "Scooter Nos", "Cars", "Scooters", "Photo"]
+
+# Appended last so the other column numbers stay the same; the view shows it next to the flat number
+PHOTO_COLUMN = 9
+GRID_PHOTO_SIZE = THUMBNAIL_SIZES[0]
+
+# Vehicle numbers shown per resident before "(+N more)"
+VISIBLE_VEHICLE_NUMBERS = 3
+
+
+def format_vehicle_numbers(numbers):
+    """Show the first few of a newline-separated list of vehicle numbers"""
+    number_list = split_vehicle_numbers(numbers)
+    display = ", ".join(number_list[:VISIBLE_VEHICLE_NUMBERS])
+    if len(number_list) > VISIBLE_VEHICLE_NUMBERS:
+        display += f" (+{len(number_list) - VISIBLE_VEHICLE_NUMBERS} more)"
+    return display
+
+
+class ResidentTableModel(QAbstractTableModel):
+    """Residents as table rows, with display text and sort keys computed once per resident."""
+    
+    def __init__(self, parent=None, photos=photo_service):
+        super().__init__(parent)
+        self._residents = []
+        # Resident objects are shared and replaced when they change, so they can key the cache
+        self._row_cache = weakref.WeakKeyDictionary()
+        # Photo filename -> rows showing it, to repaint them once a thumbnail is generated
+        self._photo_rows = {}
+        self.photos = photos
+        self.photos.thumbnail_ready.connect(self._on_thumbnail_ready)
+    
+    def set_residents(self, residents):
+        self.beginResetModel()
+        self._residents = list(residents)
+        self._photo_rows = {}
+        for row, resident in enumerate(self._residents):
+            if resident.profile_photo_path:
+                self._photo_rows.setdefault(resident.profile_photo_path, []).append(row)
+        self.endResetModel()
+    
+    def _on_thumbnail_ready(self, photo_filename, size):
+        if size != GRID_PHOTO_SIZE:
+            return
+        for row in self._photo_rows.get(photo_filename, []):
+            index = self.index(row, PHOTO_COLUMN)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+    
+    def resident_at(self, row):
+        return self._residents[row]
+    
+    def _row(self, resident):
+        """(display texts, sort keys) for one resident"""
+        cached = self._row_cache.get(resident)
+        if cached is None:
+            texts = [
+                str(resident.id),
+                resident.flat_no or "",
+                resident.name or "",
+                resident.mobile_no or "",
+                resident.email or "",
+                format_vehicle_numbers(resident.car_numbers),
+                format_vehicle_numbers(resident.scooter_numbers),
+                str(resident.cars) if resident.cars else "0",
+                str(resident.scooters) if resident.scooters else "0",
+                "",
+            ]
+            keys = [resident.id, resident.flat_sort_key] + [text.lower() for text in texts[2:7]] + \
+                   [resident.cars or 0, resident.scooters or 0, bool(resident.profile_photo_path)]
+            cached = (texts, keys)
+            self._row_cache[resident] = cached
+        return cached
+    
+    def sort_key(self, row, column):
+        return self._row(self._residents[row])[1][column]
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._residents)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(RESIDENT_COLUMNS)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DecorationRole and index.column() == PHOTO_COLUMN:
+            # Only the rows on screen are asked for, so only their thumbnails are loaded
+            return self.photos.pixmap(self._residents[index.row()].profile_photo_path, GRID_PHOTO_SIZE)
+        if role != Qt.DisplayRole:
+            return None
+        return self._row(self._residents[index.row()])[0][index.column()]
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return RESIDENT_COLUMNS[section]
+        return super().headerData(section, orientation, role)
+
+
+class ResidentFilterProxyModel(QSortFilterProxyModel):
+    """Shows only the residents found by the current search, sorted naturally by flat."""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._resident_ids = None
+    
+    def set_resident_ids(self, resident_ids):
+        """Show only these residents (None shows all)"""
+        self._resident_ids = None if resident_ids is None else set(resident_ids)
+        self.invalidateFilter()
+    
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self._resident_ids is None:
+            return True
+        return self.sourceModel().resident_at(source_row).id in self._resident_ids
+    
+    def lessThan(self, left, right):
+        model = self.sourceModel()
+        return model.sort_key(left.row(), left.column()) < model.sort_key(right.row(), right.column())
+
+
+class ResidentSearchWorker(QThread):
+    """Thread that runs one resident search."""
+    
+    # Emits (search term, resident ids, indexed text per resident id, whether any hit was a fuzzy match)
+    results_ready = pyqtSignal(str, list, dict, bool)
+    # Emits the error message if the search failed
+    failed = pyqtSignal(str)
+    
+    def __init__(self, resident_manager, search_term, parent=None):
+        super().__init__(parent)
+        self.resident_manager = resident_manager
+        self.search_term = search_term
+    
+    def run(self):
+        try:
+            residents = self.resident_manager.search_residents(self.search_term)
+            resident_ids = [resident.id for resident in residents]
+            documents = {}
+            if self.resident_manager.search_index.ensure_initialized():
+                documents = self.resident_manager.search_index.get_documents(resident_ids)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        fuzzy = any(not document_matches(document, self.search_term) for document in documents.values())
+        self.results_ready.emit(self.search_term, resident_ids, documents, fuzzy)
@@ -4,7 +4,7 @@ from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QGridLayout,
                              QHeaderView, QAbstractItemView, QGroupBox, QWidget)
 from PyQt5.QtCore import Qt
 import sqlite3
-from utils.security import hash_password
+from utils.security import hash_password, invalidate_user_cache
 
 class UserManagementDialog(QDialog):
     def __init__(self, parent=None):
@@ -141,6 +141,7 @@ class UserManagementDialog(QDialog):
                 (username, password_hash, role)
             )
             conn.commit()
+            invalidate_user_cache(username)
             QMessageBox.information(self, "Success", "User added successfully.")
             self.clear_form()
             self.load_users()
@@ -206,6 +207,8 @@ class UserManagementDialog(QDialog):
                 )
                 
             conn.commit()
+            # The username itself may have changed, so drop every cached entry
+            invalidate_user_cache()
             QMessageBox.information(self, "Success", "User updated successfully.")
             self.clear_form()
             self.load_users()
@@ -264,6 +267,7 @@ class UserManagementDialog(QDialog):
             # Delete the user
             cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
             conn.commit()
+            invalidate_user_cache()
             
             QMessageBox.information(self, "Success", "User deleted successfully.")
             self.clear_form()
@@ -1,26 +1,38 @@
 import sys
+from utils.startup_profile import startup_profiler
+
+# Profiling must start before the GUI modules are imported
+if "--profile-startup" in sys.argv:
+    sys.argv.remove("--profile-startup")
+    startup_profiler.enable()
+
 from PyQt5.QtWidgets import QApplication, QDialog
-from gui.login_dialog import LoginDialog
-from gui.main_window import MainWindow
-from utils.security import authenticate_user
+from PyQt5.QtCore import QTimer
 
 
 class MainController:
     def __init__(self):
-        self.app = QApplication(sys.argv)
+        with startup_profiler.step("QApplication"):
+            self.app = QApplication(sys.argv)
         self.main_window = None
         self.current_username = None
         self.current_role = None
-        
+
     def show_login(self):
-        login = LoginDialog()
+        # The main window and its report/export stacks are only imported after login
+        with startup_profiler.step("import login dialog"):
+            from gui.login_dialog import LoginDialog
+        with startup_profiler.step("LoginDialog()"):
+            login = LoginDialog()
+        # Report once the dialog is actually on screen
+        QTimer.singleShot(0, lambda: startup_profiler.report("Time to login dialog"))
+
         if login.exec_() == QDialog.Accepted:
-            username = login.username_input.text()
-            password = login.password_input.text()
-            
-            # Authenticate user
-            user_role = authenticate_user(username, password)
-            if user_role:                
+            username = login.username_input.text().strip()
+
+            # The dialog has already authenticated the user on a worker thread
+            user_role = login.authenticated_role
+            if user_role:
                 print("Login successful!")
                 self.current_username = username
                 self.current_role = user_role
@@ -32,19 +44,23 @@ class MainController:
         else:
             print("Login cancelled")
             return False
-            
+
     def show_main_window(self):
         if self.main_window:
             self.main_window.close()
-        self.main_window = MainWindow(self.current_role, self.current_username, self)
+        with startup_profiler.step("import main window"):
+            from gui.main_window import MainWindow
+        with startup_profiler.step("MainWindow()"):
+            self.main_window = MainWindow(self.current_role, self.current_username, self)
         self.main_window.show()
-        
+        QTimer.singleShot(0, lambda: startup_profiler.report("Time to main window"))
+
     def logout(self):
         if self.main_window:
             self.main_window.close()
             self.main_window = None
         self.show_login()
-        
+
     def run(self):
         if self.show_login():
             sys.exit(self.app.exec_())
@@ -59,6 +59,39 @@ class DomesticHelpManager:
             # Wrap unexpected errors in DatabaseError
             raise DatabaseError("Failed to retrieve domestic help", original_error=e)
     
+    def get_domestic_help_by_residents(self, resident_ids):
+        """
+        Get the domestic help of many residents with one query per 500 residents.
+        
+        Returns:
+            dict: Resident id -> list of DomesticHelp objects (empty for residents without help)
+        """
+        resident_ids = list(dict.fromkeys(resident_ids))
+        domestic_help = {resident_id: [] for resident_id in resident_ids}
+        try:
+            with get_db_connection(self.db_path) as conn:
+                cursor = conn.cursor()
+                
+                for start in range(0, len(resident_ids), 500):
+                    chunk = resident_ids[start:start + 500]
+                    cursor.execute(f'''
+                        SELECT id, resident_id, name, role, phone, id_proof_type, id_proof_number, 
+                               photo_path, status, access_permissions
+                        FROM domestic_help 
+                        WHERE resident_id IN ({', '.join('?' * len(chunk))}) 
+                        ORDER BY role, name
+                    ''', chunk)
+                    for row in cursor.fetchall():
+                        domestic_help[row[1]].append(DomesticHelp(*row))
+                
+                return domestic_help
+        except DatabaseError:
+            # Re-raise database errors
+            raise
+        except Exception as e:
+            # Wrap unexpected errors in DatabaseError
+            raise DatabaseError("Failed to retrieve domestic help", original_error=e)
+    
     def add_domestic_help(self, resident_id, name, role, phone=None, id_proof_type=None, 
                          id_proof_number=None, photo_path=None, status="Active", access_permissions=None, 
                          current_user=None):
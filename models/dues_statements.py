@@ -0,0 +1,364 @@
+# models/dues_statements.py
+"""
+Per-flat dues statements for the Society Management System.
+
+All flats are read with one windowed query over the ledger (running balance
+partitioned by flat_no), and the statements are rendered in a process pool.
+Each PDF draws the society header, footer and watermark once as a form XObject
+that every page references. The output is a directory or zip of per-flat PDFs
+plus an index.csv.
+"""
+
+import csv
+import os
+import re
+import shutil
+import time
+import zipfile
+from xml.sax.saxutils import escape
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime
+from dateutil.relativedelta import relativedelta
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from utils.db_context import get_db_connection
+from utils.database_exceptions import DatabaseError
+from models.society import SocietyManager
+from models.report_theme import PageDecorator, get_report_theme, page_info_from_society
+
+
+# Used when a resident has no monthly charge recorded (same default as the outstanding dues report)
+DEFAULT_MONTHLY_CHARGE = 500.0
+
+# Statements rendered per worker task
+STATEMENTS_PER_TASK = 25
+
+INDEX_COLUMNS = ['flat_no', 'name', 'opening_balance', 'total_debit', 'total_credit', 'closing_balance',
+                 'months_due', 'maintenance_expected', 'maintenance_paid', 'amount_due', 'file']
+
+
+class DuesStatementGenerator:
+    def __init__(self, db_path="society_management.db"):
+        self.db_path = db_path
+        self.society_manager = SocietyManager(db_path)
+
+    def get_statement_data(self, start_date, end_date, flat_numbers=None):
+        """
+        Collect statement data for every active flat in one pass over the ledger.
+
+        Args:
+            start_date (date): Start of the statement period
+            end_date (date): End of the statement period
+            flat_numbers (list): Only these flats (default: every flat with an active resident)
+
+        Returns:
+            list: One dict per flat with opening/closing balances, the period's
+                transactions and the maintenance dues for the period
+        """
+        try:
+            with get_db_connection(self.db_path) as conn:
+                cursor = conn.cursor()
+
+                cursor.execute('''
+                    SELECT flat_no, name, date_joining, monthly_charges
+                    FROM residents
+                    WHERE status = 'Active'
+                    ORDER BY flat_no COLLATE FLAT_NATURAL, id
+                ''')
+                flats = {}
+                for flat_no, name, date_joining, monthly_charges in cursor.fetchall():
+                    if flat_numbers and flat_no not in flat_numbers:
+                        continue
+                    flat = flats.setdefault(flat_no, {
+                        'flat_no': flat_no, 'names': [], 'joining_dates': [],
+                        'monthly_charge': monthly_charges or DEFAULT_MONTHLY_CHARGE,
+                    })
+                    flat['names'].append(name)
+                    flat['joining_dates'].append(date_joining)
+
+                statements = {flat_no: self._new_statement(flat) for flat_no, flat in flats.items()}
+
+                # Running balance per flat over the whole history up to the end of the period;
+                # rows before the period only set the opening balance
+                cursor.execute('''
+                    SELECT flat_no, transaction_id, date, transaction_type, category, description,
+                           debit, credit,
+                           SUM(credit - debit) OVER (PARTITION BY flat_no ORDER BY date, id) AS running_balance
+                    FROM ledger
+                    WHERE flat_no IS NOT NULL AND flat_no != '' AND date <= ?
+                    ORDER BY flat_no, date, id
+                ''', (end_date.strftime('%Y-%m-%d'),))
+
+                period_start = start_date.strftime('%Y-%m-%d')
+                for (flat_no, transaction_id, txn_date, transaction_type, category, description,
+                     debit, credit, running_balance) in cursor:
+                    statement = statements.get(flat_no)
+                    if statement is None:
+                        continue
+                    if txn_date < period_start:
+                        statement['opening_balance'] = running_balance
+                        statement['closing_balance'] = running_balance
+                        continue
+
+                    statement['transactions'].append(
+                        (txn_date, transaction_id, transaction_type, category, description or '',
+                         debit or 0.0, credit or 0.0, running_balance)
+                    )
+                    statement['total_debit'] += debit or 0.0
+                    statement['total_credit'] += credit or 0.0
+                    statement['closing_balance'] = running_balance
+                    if category == 'Maintenance' and transaction_type == 'Payment':
+                        statement['maintenance_paid'] += credit or 0.0
+        except DatabaseError:
+            raise
+        except Exception as e:
+            raise DatabaseError("Failed to load dues statement data", original_error=e)
+
+        for statement in statements.values():
+            self._apply_dues(statement, flats[statement['flat_no']], start_date, end_date)
+        # Flats were read in natural order
+        return list(statements.values())
+
+    def _new_statement(self, flat):
+        return {
+            'flat_no': flat['flat_no'],
+            'name': ", ".join(flat['names']),
+            'opening_balance': 0.0,
+            'closing_balance': 0.0,
+            'total_debit': 0.0,
+            'total_credit': 0.0,
+            'maintenance_paid': 0.0,
+            'transactions': [],
+        }
+
+    def _apply_dues(self, statement, flat, start_date, end_date):
+        """
+        Expected maintenance for the period, counted from the earliest joining date of
+        the flat's residents. Like the outstanding dues report, residents without a
+        valid joining date owe nothing, so a flat with none of them has no dues.
+        """
+        joined = []
+        for date_joining in flat['joining_dates']:
+            try:
+                joined.append(datetime.strptime(date_joining, '%Y-%m-%d').date())
+            except (ValueError, TypeError):
+                continue
+
+        months_due = 0
+        period_start = max(min(joined), start_date) if joined else None
+        if period_start and period_start <= end_date:
+            months_due = (end_date.year - period_start.year) * 12 + (end_date.month - period_start.month) + 1
+
+        statement['months_due'] = months_due
+        statement['maintenance_expected'] = months_due * flat['monthly_charge']
+        statement['amount_due'] = max(statement['maintenance_expected'] - statement['maintenance_paid'], 0.0)
+
+    def generate_statements(self, generated_by, start_date=None, end_date=None, flat_numbers=None,
+                            as_zip=False, max_workers=None, output_name=None, progress_callback=None):
+        """
+        Generate one PDF statement per flat.
+
+        Args:
+            generated_by (str): Username printed in the statement footers
+            start_date (date): Start of the period (default: 12 months before end_date)
+            end_date (date): End of the period (default: today)
+            flat_numbers (list): Only these flats (default: every flat with an active resident)
+            as_zip (bool): Write a zip archive instead of a directory
+            max_workers (int): Number of worker processes (default: CPU count)
+            output_name (str): Directory/zip name under reports/ (default: dues_statements_<end date>);
+                a _2, _3, ... suffix is added when the name is taken
+            progress_callback (callable): Called with (statements done, statement count)
+                before the first and after every rendered batch; an exception raised from
+                it cancels the batches not started yet and removes the output directory
+
+        Returns:
+            dict: Index with the output path, total time and one entry per flat (see INDEX_COLUMNS)
+        """
+        started = time.perf_counter()
+        end_date = end_date or date.today()
+        start_date = start_date or end_date - relativedelta(months=12)
+
+        statements = self.get_statement_data(start_date, end_date, flat_numbers)
+
+        # Claim the directory atomically, so runs started together never share one. A
+        # zipped run keeps its directory until the zip is written, so checking for
+        # the zip before claiming the directory can't miss a concurrent run
+        base_dir = os.path.join("reports", output_name or f"dues_statements_{end_date.strftime('%Y-%m-%d')}")
+        output_dir = base_dir
+        suffix = 1
+        while True:
+            if not os.path.exists(output_dir + ".zip"):
+                try:
+                    os.makedirs(output_dir)
+                    break
+                except FileExistsError:
+                    pass
+            suffix += 1
+            output_dir = f"{base_dir}_{suffix}"
+
+        society_info = self.society_manager.get_society_info()
+        page_info = page_info_from_society(society_info, generated_by)
+        page_info['period'] = f"{start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}"
+
+        # Flat numbers like "A/1" and "A 1" map to the same safe name; number the
+        # later ones so no statement overwrites another
+        taken = set()
+        for statement in statements:
+            stem = f"statement_{_safe_file_name(statement['flat_no'])}"
+            file_name = f"{stem}.pdf"
+            suffix = 1
+            while file_name.lower() in taken:
+                suffix += 1
+                file_name = f"{stem}_{suffix}.pdf"
+            taken.add(file_name.lower())
+            statement['file'] = file_name
+
+        # Render in batches so each task carries a useful amount of work
+        batches = [statements[i:i + STATEMENTS_PER_TASK] for i in range(0, len(statements), STATEMENTS_PER_TASK)]
+        try:
+            if progress_callback:
+                progress_callback(0, len(statements))
+            if batches:
+                self._render_batches(output_dir, page_info, batches, max_workers, progress_callback)
+        except Exception:
+            # Interrupted (e.g. cancelled from progress_callback): drop the partial output
+            shutil.rmtree(output_dir, ignore_errors=True)
+            raise
+
+        index_path = os.path.join(output_dir, "index.csv")
+        with open(index_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=INDEX_COLUMNS, extrasaction='ignore')
+            writer.writeheader()
+            for statement in statements:
+                writer.writerow({key: round(value, 2) if isinstance(value, float) else value
+                                 for key, value in statement.items()})
+
+        output_path = output_dir
+        if as_zip:
+            output_path = output_dir + ".zip"
+            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+                for name in sorted(os.listdir(output_dir)):
+                    archive.write(os.path.join(output_dir, name), name)
+            shutil.rmtree(output_dir)
+
+        return {
+            'output': output_path,
+            'statement_count': len(statements),
+            'total_seconds': round(time.perf_counter() - started, 3),
+            'statements': [{key: statement.get(key) for key in INDEX_COLUMNS} for statement in statements],
+        }
+
+    def _render_batches(self, output_dir, page_info, batches, max_workers, progress_callback):
+        """Render statement batches in worker processes, reporting progress per finished batch"""
+        workers = max(1, min(max_workers or os.cpu_count() or 1, len(batches)))
+        total = sum(len(batch) for batch in batches)
+        done = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(_render_statement_batch, output_dir, page_info, batch): len(batch)
+                       for batch in batches}
+            try:
+                for future in as_completed(futures):
+                    future.result()
+                    done += futures[future]
+                    if progress_callback:
+                        progress_callback(done, total)
+            except Exception:
+                # Don't start the batches still queued; running ones finish on exit
+                for future in futures:
+                    future.cancel()
+                raise
+
+
+def _safe_file_name(flat_no):
+    return re.sub(r'[^A-Za-z0-9_-]+', '_', str(flat_no)).strip('_') or 'unknown'
+
+
+# Styles are built once per worker process
+_statement_styles = None
+
+
+def _get_statement_styles():
+    global _statement_styles
+    if _statement_styles is None:
+        styles = get_report_theme().styles
+        _statement_styles = {
+            'title': ParagraphStyle('StatementTitle', parent=styles['Heading1'], fontSize=16,
+                                    spaceAfter=20, alignment=1),
+            'normal': styles['Normal'],
+            'table': TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 9),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+                ('FONTSIZE', (0, 1), (-1, -1), 8),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                ('ALIGN', (4, 0), (6, -1), 'RIGHT'),
+                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.beige, colors.Color(0.9, 0.85, 0.8)]),
+            ]),
+            'summary': TableStyle([
+                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 9),
+                ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+                ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
+            ]),
+        }
+    return _statement_styles
+
+
+def _render_statement_batch(output_dir, page_info, statements):
+    """Render a batch of statements in a worker process"""
+    for statement in statements:
+        _render_statement(os.path.join(output_dir, statement['file']), page_info, statement)
+    return len(statements)
+
+
+def _render_statement(file_path, page_info, statement):
+    styles = _get_statement_styles()
+    doc = SimpleDocTemplate(file_path, pagesize=A4, topMargin=100, bottomMargin=50,
+                            leftMargin=50, rightMargin=50)
+
+    story = [
+        Paragraph("MAINTENANCE DUES STATEMENT", styles['title']),
+        Paragraph(f"<b>Flat:</b> {escape(str(statement['flat_no']))} &nbsp;&nbsp; "
+                  f"<b>Resident:</b> {escape(statement['name'] or '')}",
+                  styles['normal']),
+        Paragraph(f"<b>Period:</b> {page_info['period']}", styles['normal']),
+        Spacer(1, 0.2*inch),
+    ]
+
+    rows = [['Date', 'Txn ID', 'Type', 'Description', 'Debit', 'Credit', 'Balance'],
+            ['', '', '', 'Opening balance', '', '', f"{statement['opening_balance']:.2f}"]]
+    for txn_date, transaction_id, transaction_type, category, description, debit, credit, balance in statement['transactions']:
+        category = category or ''
+        text = f"{category}: {description}" if description else category
+        rows.append([txn_date, transaction_id, transaction_type,
+                     text[:35] + "..." if len(text) > 35 else text,
+                     f"{debit:.2f}", f"{credit:.2f}", f"{balance:.2f}"])
+    rows.append(['', '', '', 'Closing balance', f"{statement['total_debit']:.2f}",
+                 f"{statement['total_credit']:.2f}", f"{statement['closing_balance']:.2f}"])
+
+    table = Table(rows, repeatRows=1)
+    table.setStyle(styles['table'])
+    story.append(table)
+    story.append(Spacer(1, 0.3*inch))
+
+    summary = Table([
+        ['Months in period', str(statement['months_due'])],
+        ['Maintenance expected (Rs)', f"{statement['maintenance_expected']:.2f}"],
+        ['Maintenance paid (Rs)', f"{statement['maintenance_paid']:.2f}"],
+        ['Amount due (Rs)', f"{statement['amount_due']:.2f}"],
+    ], colWidths=[180, 100])
+    summary.setStyle(styles['summary'])
+    summary.hAlign = 'LEFT'
+    story.append(summary)
+
+    # One watermark in the middle of the page, the header and footer as in the reports
+    page_decorator = PageDecorator(page_info, watermarks=(A4[1]/2,))
+    doc.build(story, onFirstPage=page_decorator, onLaterPages=page_decorator)
@@ -5,6 +5,7 @@ from utils.db_context import get_db_connection
 from utils.database_exceptions import DatabaseError
 from utils.audit_logger import audit_logger
 from utils.security import get_user_id
+from models.ledger_rollup import LedgerRollup
 
 
 class LedgerTransaction:
@@ -29,6 +30,12 @@ class LedgerTransaction:
 class LedgerManager:
     def __init__(self, db_path="society_management.db"):
         self.db_path = db_path
+        
+        # Make sure the monthly rollup triggers are in place before any ledger write
+        try:
+            LedgerRollup(db_path).ensure_initialized()
+        except DatabaseError as e:
+            print(f"Error initializing ledger rollup: {e}")
     
     def generate_transaction_id(self):
         """Generate a new transaction ID in the format TXN-001, TXN-002, etc."""
@@ -189,6 +196,61 @@ class LedgerManager:
         
         return transactions
     
+    def iter_transactions(self, start_date=None, end_date=None, chunk_size=500, transaction_type=None):
+        """
+        Stream transactions in chronological order as lists of at most chunk_size.
+        Optionally filter by date range and transaction type. Only one chunk is held
+        in memory at a time.
+        """
+        query = '''
+            SELECT id, transaction_id, date, flat_no, transaction_type, category, description,
+                   debit, credit, balance, payment_mode, entered_by, created_at, reconciliation_status
+            FROM ledger
+        '''
+        conditions = []
+        params = []
+        if start_date and end_date:
+            conditions.append('date BETWEEN ? AND ?')
+            params.extend([str(start_date), str(end_date)])
+        if transaction_type:
+            conditions.append('transaction_type = ?')
+            params.append(transaction_type)
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY date ASC, id ASC'
+        
+        with get_db_connection(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [
+                    LedgerTransaction(
+                        row[0], row[1], row[2], row[3], row[4], row[5],
+                        row[6], row[7], row[8], row[9], row[10], row[11], row[12], row[13]
+                    )
+                    for row in rows
+                ]
+
+    def export_transactions(self, file_path, start_date=None, end_date=None):
+        """
+        Export transactions straight from the database to .xlsx or .csv (by file extension).
+        Rows are streamed, so memory use does not grow with the size of the ledger.
+
+        Returns:
+            int: Number of transactions exported
+        """
+        from utils import export_engine
+
+        rows = export_engine.iter_ledger_rows(self.db_path, start_date, end_date)
+        if file_path.lower().endswith('.xlsx'):
+            return export_engine.export_to_excel(file_path, export_engine.LEDGER_EXPORT_COLUMNS, rows,
+                                                 sheet_title="Ledger")
+        return export_engine.export_to_csv(file_path, export_engine.LEDGER_EXPORT_COLUMNS, rows)
+
     def get_payment_categories(self):
         """Get predefined payment categories"""
         return ["Maintenance", "Advertisement", "Donation", "Parking", "Other Income"]
@@ -0,0 +1,214 @@
+# models/ledger_aggregates.py
+"""
+Ledger aggregation for reports and charts.
+Filtering and grouping are pushed into a single SQL GROUP BY so callers get a
+handful of summary rows instead of every LedgerTransaction in the period.
+
+Groupings the monthly rollup can answer (type, category, month, flat) read whole
+months from ledger_monthly_rollup and only scan the ledger for partial months
+at the edges of the requested period.
+"""
+
+from datetime import date, timedelta
+from utils.db_context import get_db_connection
+from utils.database_exceptions import DatabaseError
+from models.ledger_rollup import LedgerRollup
+
+
+# Grouping dimension -> SQL expression over the ledger table. Empty keys group as
+# NULL, like the rollup's '' keys, so both sources return the same groups
+GROUP_DIMENSIONS = {
+    'type': "NULLIF(transaction_type, '')",
+    'category': "NULLIF(category, '')",
+    'month': "substr(date, 1, 7)",  # YYYY-MM
+    'flat': "NULLIF(flat_no, '')",
+    'payment_mode': 'payment_mode',
+}
+
+# Grouping dimension -> SQL expression over ledger_monthly_rollup
+ROLLUP_DIMENSIONS = {
+    'type': "NULLIF(transaction_type, '')",
+    'category': "NULLIF(category, '')",
+    'month': 'month',
+    'flat': "NULLIF(flat_no, '')",
+}
+
+
+def _to_date(value):
+    """Accept date objects or 'YYYY-MM-DD' strings"""
+    if isinstance(value, date):
+        return date(value.year, value.month, value.day)
+    return date.fromisoformat(str(value)[:10])
+
+
+def _full_month_span(start_date, end_date):
+    """
+    Split a period into whole months and partial edges.
+
+    Returns:
+        tuple: (first_month, last_month, edge_ranges) where the months are 'YYYY-MM'
+            strings (None if the period has no whole month) and edge_ranges is a
+            list of (start, end) date ranges that must be read from the ledger
+    """
+    start, end = _to_date(start_date), _to_date(end_date)
+    if start > end:
+        return None, None, []
+
+    first_full = start if start.day == 1 else (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    next_day = end + timedelta(days=1)
+    last_full_end = end if next_day.day == 1 else end.replace(day=1) - timedelta(days=1)
+
+    if first_full > last_full_end:
+        return None, None, [(start, end)]
+
+    edges = []
+    if start < first_full:
+        edges.append((start, first_full - timedelta(days=1)))
+    if last_full_end < end:
+        edges.append((last_full_end + timedelta(days=1), end))
+    return first_full.strftime('%Y-%m'), last_full_end.strftime('%Y-%m'), edges
+
+
+class LedgerAggregator:
+    def __init__(self, db_path="society_management.db", use_rollup=True):
+        self.db_path = db_path
+        self.use_rollup = use_rollup
+        self.rollup = LedgerRollup(db_path)
+
+    def aggregate(self, group_by=('category',), transaction_type=None, start_date=None, end_date=None,
+                  flat_no=None):
+        """
+        Sum debits and credits grouped by one or more dimensions in one query.
+
+        Args:
+            group_by (tuple): Dimensions from GROUP_DIMENSIONS ('type', 'category', 'month',
+                'flat', 'payment_mode'); empty for grand totals
+            transaction_type (str): Only include this transaction type (e.g. 'Payment')
+            start_date (date): Start of the period (inclusive)
+            end_date (date): End of the period (inclusive)
+            flat_no (str): Only include transactions for this flat
+
+        Returns:
+            list: One dict per group with the dimension values plus 'debit', 'credit' and 'count'
+        """
+        unknown = [dimension for dimension in group_by if dimension not in GROUP_DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown aggregation dimension(s): {', '.join(unknown)}")
+
+        if (self.use_rollup and set(group_by) <= set(ROLLUP_DIMENSIONS)
+                and self.rollup.ensure_initialized()):
+            return self._aggregate_with_rollup(group_by, transaction_type, start_date, end_date, flat_no)
+        return self._aggregate_ledger(group_by, transaction_type, start_date, end_date, flat_no)
+
+    def _aggregate_with_rollup(self, group_by, transaction_type, start_date, end_date, flat_no):
+        """Combine whole months from the rollup with ledger scans of the partial edge months"""
+        if start_date and end_date:
+            first_month, last_month, edges = _full_month_span(start_date, end_date)
+        else:
+            first_month, last_month, edges = '', '9999-99', []
+
+        partials = []
+        if first_month is not None:
+            partials.append(self._query(ROLLUP_DIMENSIONS, 'ledger_monthly_rollup', 'SUM(txn_count)',
+                                        group_by, transaction_type, flat_no,
+                                        'month BETWEEN ? AND ?', [first_month, last_month]))
+        for edge_start, edge_end in edges:
+            partials.append(self._aggregate_ledger(group_by, transaction_type, edge_start, edge_end, flat_no))
+
+        if len(partials) == 1:
+            return partials[0]
+
+        # Merge the pieces group by group
+        merged = {}
+        for rows in partials:
+            for row in rows:
+                key = tuple(row[dimension] for dimension in group_by)
+                if key in merged:
+                    for total in ('debit', 'credit', 'count'):
+                        merged[key][total] += row[total]
+                else:
+                    merged[key] = dict(row)
+        return [merged[key] for key in sorted(merged, key=lambda k: tuple('' if v is None else v for v in k))]
+
+    def _aggregate_ledger(self, group_by, transaction_type, start_date, end_date, flat_no):
+        """Aggregate straight from the ledger table"""
+        date_condition, date_params = None, []
+        if start_date and end_date:
+            date_condition, date_params = 'date BETWEEN ? AND ?', [str(start_date), str(end_date)]
+        return self._query(GROUP_DIMENSIONS, 'ledger', 'COUNT(*)', group_by, transaction_type, flat_no,
+                           date_condition, date_params)
+
+    def _query(self, dimensions, table, count_sql, group_by, transaction_type, flat_no,
+               date_condition, date_params):
+        """Run one grouped query against the ledger or the rollup table"""
+        columns = [f"{dimensions[dimension]} AS {dimension}" for dimension in group_by]
+        columns += ['COALESCE(SUM(debit), 0)', 'COALESCE(SUM(credit), 0)', f'COALESCE({count_sql}, 0)']
+        query = f"SELECT {', '.join(columns)} FROM {table}"
+
+        conditions = []
+        params = []
+        if transaction_type:
+            conditions.append('transaction_type = ?')
+            params.append(transaction_type)
+        if date_condition:
+            conditions.append(date_condition)
+            params.extend(date_params)
+        if flat_no:
+            conditions.append('flat_no = ?')
+            params.append(flat_no)
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        if group_by:
+            # By position: an alias named like its column would group by the raw column
+            positions = ', '.join(str(position) for position in range(1, len(group_by) + 1))
+            query += f' GROUP BY {positions} ORDER BY {positions}'
+
+        try:
+            with get_db_connection(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+                rows = cursor.fetchall()
+        except DatabaseError:
+            raise
+        except Exception as e:
+            raise DatabaseError("Failed to aggregate ledger transactions", original_error=e)
+
+        results = []
+        for row in rows:
+            result = dict(zip(group_by, row))
+            result['debit'], result['credit'], result['count'] = row[len(group_by):]
+            results.append(result)
+        return results
+
+    def category_totals(self, transaction_type, start_date=None, end_date=None):
+        """
+        Total amount per category for one transaction type, largest first.
+        Payments are summed by credit, everything else by debit.
+
+        Returns:
+            list: (category, amount) tuples
+        """
+        amount_column = 'credit' if transaction_type == 'Payment' else 'debit'
+        rows = self.aggregate(('category',), transaction_type, start_date, end_date)
+        totals = [(row['category'], row[amount_column]) for row in rows]
+        totals.sort(key=lambda item: item[1], reverse=True)
+        return totals
+
+    def income_expense_by_category(self, start_date=None, end_date=None):
+        """
+        Income (Payment credits) and expense (Expense debits) per category in one pass.
+
+        Returns:
+            tuple: (income_data, expense_data), each a list of (category, amount), largest first
+        """
+        income_data = []
+        expense_data = []
+        for row in self.aggregate(('type', 'category'), start_date=start_date, end_date=end_date):
+            if row['type'] == 'Payment':
+                income_data.append((row['category'], row['credit']))
+            elif row['type'] == 'Expense':
+                expense_data.append((row['category'], row['debit']))
+
+        income_data.sort(key=lambda item: item[1], reverse=True)
+        expense_data.sort(key=lambda item: item[1], reverse=True)
+        return income_data, expense_data
@@ -0,0 +1,227 @@
+# models/ledger_rollup.py
+"""
+Materialized monthly ledger rollup for the Society Management System.
+
+ledger_monthly_rollup holds debit/credit sums and transaction counts per
+(month, flat_no, transaction_type, category). Triggers on the ledger table keep
+it up to date on every insert, delete and amount/key change, which covers
+LedgerManager.add_transaction, delete_transaction and reversals (a reversal is
+an inserted transaction). Period reports can then read a few hundred rollup
+rows instead of scanning the whole ledger.
+
+Run `python -m models.ledger_rollup --verify` to compare the rollup with the
+ledger, or `python -m models.ledger_rollup --rebuild` to rebuild it.
+"""
+
+import sys
+import threading
+from utils.db_context import get_db_connection
+from utils.database_exceptions import DatabaseError
+
+
+# Databases whose rollup table and triggers have been set up in this process
+_initialized_paths = set()
+_init_lock = threading.Lock()
+
+# Rows are keyed with '' instead of NULL so they can be upserted
+_ROLLUP_KEY_SQL = '''substr({row}.date, 1, 7), COALESCE({row}.flat_no, ''),
+                     COALESCE({row}.transaction_type, ''), COALESCE({row}.category, '')'''
+
+_ADD_ROW_SQL = '''
+    INSERT INTO ledger_monthly_rollup (month, flat_no, transaction_type, category, debit, credit, txn_count)
+    VALUES ({key}, COALESCE(NEW.debit, 0), COALESCE(NEW.credit, 0), 1)
+    ON CONFLICT (month, flat_no, transaction_type, category) DO UPDATE SET
+        debit = debit + excluded.debit,
+        credit = credit + excluded.credit,
+        txn_count = txn_count + 1;
+'''.format(key=_ROLLUP_KEY_SQL.format(row='NEW'))
+
+_REMOVE_ROW_SQL = '''
+    UPDATE ledger_monthly_rollup SET
+        debit = debit - COALESCE(OLD.debit, 0),
+        credit = credit - COALESCE(OLD.credit, 0),
+        txn_count = txn_count - 1
+    WHERE (month, flat_no, transaction_type, category) = ({key});
+    DELETE FROM ledger_monthly_rollup
+    WHERE (month, flat_no, transaction_type, category) = ({key}) AND txn_count <= 0;
+'''.format(key=_ROLLUP_KEY_SQL.format(row='OLD'))
+
+_REBUILD_SQL = '''
+    INSERT INTO ledger_monthly_rollup (month, flat_no, transaction_type, category, debit, credit, txn_count)
+    SELECT {key}, COALESCE(SUM(ledger.debit), 0), COALESCE(SUM(ledger.credit), 0), COUNT(*)
+    FROM ledger
+    GROUP BY 1, 2, 3, 4
+'''.format(key=_ROLLUP_KEY_SQL.format(row='ledger'))
+
+
+class LedgerRollup:
+    def __init__(self, db_path="society_management.db"):
+        self.db_path = db_path
+
+    def ensure_initialized(self):
+        """
+        Create the rollup table and its triggers once per process.
+
+        Returns:
+            bool: True if the rollup is available (False if there is no ledger table yet)
+        """
+        if self.db_path in _initialized_paths:
+            return True
+
+        with _init_lock:
+            if self.db_path in _initialized_paths:
+                return True
+            if not self.init_rollup_table():
+                return False
+            _initialized_paths.add(self.db_path)
+            return True
+
+    def init_rollup_table(self):
+        """
+        Initialize the rollup table and the ledger triggers that maintain it.
+        A newly created rollup is filled from the existing ledger in the same transaction.
+
+        Returns:
+            bool: False if the ledger table does not exist yet
+        """
+        try:
+            with get_db_connection(self.db_path) as conn:
+                cursor = conn.cursor()
+
+                cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('ledger', 'ledger_monthly_rollup')")
+                existing = {row[0] for row in cursor.fetchall()}
+                if 'ledger' not in existing:
+                    return False
+
+                cursor.execute('BEGIN IMMEDIATE')
+
+                cursor.execute('''
+                CREATE TABLE IF NOT EXISTS ledger_monthly_rollup (
+                    month TEXT NOT NULL,
+                    flat_no TEXT NOT NULL,
+                    transaction_type TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    debit REAL NOT NULL DEFAULT 0,
+                    credit REAL NOT NULL DEFAULT 0,
+                    txn_count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (month, flat_no, transaction_type, category)
+                )
+                ''')
+
+                cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS ledger_rollup_insert AFTER INSERT ON ledger
+                BEGIN
+                    {_ADD_ROW_SQL}
+                END
+                ''')
+
+                cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS ledger_rollup_delete AFTER DELETE ON ledger
+                BEGIN
+                    {_REMOVE_ROW_SQL}
+                END
+                ''')
+
+                # Balance and reconciliation updates don't touch the rollup
+                cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS ledger_rollup_update
+                AFTER UPDATE OF date, flat_no, transaction_type, category, debit, credit ON ledger
+                BEGIN
+                    {_REMOVE_ROW_SQL}
+                    {_ADD_ROW_SQL}
+                END
+                ''')
+
+                if 'ledger_monthly_rollup' not in existing:
+                    cursor.execute(_REBUILD_SQL)
+
+                conn.commit()
+                return True
+        except DatabaseError:
+            raise
+        except Exception as e:
+            raise DatabaseError("Failed to initialize ledger rollup", original_error=e)
+
+    def rebuild(self):
+        """
+        Rebuild the rollup from the ledger.
+
+        Returns:
+            int: Number of rollup rows written
+        """
+        if not self.ensure_initialized():
+            return 0
+
+        try:
+            with get_db_connection(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('BEGIN IMMEDIATE')
+                cursor.execute('DELETE FROM ledger_monthly_rollup')
+                cursor.execute(_REBUILD_SQL)
+                cursor.execute('SELECT COUNT(*) FROM ledger_monthly_rollup')
+                count = cursor.fetchone()[0]
+                conn.commit()
+                return count
+        except DatabaseError:
+            raise
+        except Exception as e:
+            raise DatabaseError("Failed to rebuild ledger rollup", original_error=e)
+
+    def verify(self):
+        """
+        Compare the rollup with a fresh aggregation of the ledger.
+
+        Returns:
+            list: (month, flat_no, transaction_type, category) keys whose sums or counts differ
+        """
+        if not self.ensure_initialized():
+            return []
+
+        key = _ROLLUP_KEY_SQL.format(row='ledger')
+        try:
+            with get_db_connection(self.db_path) as conn:
+                cursor = conn.cursor()
+
+                cursor.execute(f'''
+                    SELECT {key}, ROUND(COALESCE(SUM(ledger.debit), 0), 2),
+                           ROUND(COALESCE(SUM(ledger.credit), 0), 2), COUNT(*)
+                    FROM ledger
+                    GROUP BY 1, 2, 3, 4
+                ''')
+                expected = {tuple(row[:4]): tuple(row[4:]) for row in cursor.fetchall()}
+
+                cursor.execute('''
+                    SELECT month, flat_no, transaction_type, category,
+                           ROUND(debit, 2), ROUND(credit, 2), txn_count
+                    FROM ledger_monthly_rollup
+                ''')
+                actual = {tuple(row[:4]): tuple(row[4:]) for row in cursor.fetchall()}
+        except DatabaseError:
+            raise
+        except Exception as e:
+            raise DatabaseError("Failed to verify ledger rollup", original_error=e)
+
+        return sorted(k for k in expected.keys() | actual.keys() if expected.get(k) != actual.get(k))
+
+
+def main(argv):
+    rollup = LedgerRollup()
+    if "--rebuild" in argv:
+        count = rollup.rebuild()
+        print(f"Rebuilt ledger rollup: {count} rows")
+        return 0
+
+    mismatches = rollup.verify()
+    if not mismatches:
+        print("Ledger rollup matches the ledger")
+        return 0
+
+    print(f"Ledger rollup differs from the ledger for {len(mismatches)} group(s):")
+    for month, flat_no, transaction_type, category in mismatches[:20]:
+        print(f"  {month} {flat_no or '-'} {transaction_type} {category}")
+    print("Run `python -m models.ledger_rollup --rebuild` to rebuild it")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
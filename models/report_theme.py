@@ -0,0 +1,234 @@
+# models/report_theme.py
+"""
+Shared look of the PDF reports in the Society Management System.
+
+The stylesheet, paragraph styles and table styles are built once per process
+and reused by every report. Page decoration (watermark, society header and
+footer) is drawn once per document into a form XObject that each page then
+references, so only the page number is drawn per page.
+"""
+
+import threading
+from datetime import datetime
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import TableStyle
+
+
+WATERMARK_TEXT = "NextGen Advisors"
+
+# Watermark heights on the page: top, middle and bottom
+REPORT_WATERMARKS = (A4[1] - 100, A4[1]/2, 100)
+
+# Alternating data row colours
+ROW_COLORS = [colors.beige, colors.Color(0.9, 0.85, 0.8)]
+
+# Transparency is not kept inside a form XObject, so the watermark uses the solid
+# grey that 15% gray gives on a white page (the form is drawn before the content)
+WATERMARK_COLOR = colors.Color(0.925, 0.925, 0.925)
+
+
+def page_info_from_society(society_info, generated_by, generated_on=None):
+    """
+    Collect the text drawn in the page header and footer.
+
+    Args:
+        society_info (Society): Society details (None for the default header)
+        generated_by (str): Username printed in the footer
+        generated_on (str): Timestamp printed in the footer (default: now)
+
+    Returns:
+        dict: Plain strings, so it can be passed to worker processes
+    """
+    if society_info:
+        society_name = society_info.name or "Society Management System"
+        address = society_info.address or ""
+        phone = society_info.phone or 'N/A'
+        email = society_info.email or 'N/A'
+    else:
+        society_name = "Society Management System"
+        address = "123 Main Street, City, State 12345"
+        phone = email = 'N/A'
+
+    return {
+        'society_name': society_name,
+        'address': address,
+        'phone': phone,
+        'email': email,
+        'generated_by': generated_by,
+        'generated_on': generated_on or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+class PageDecorator:
+    """
+    onPage callback for SimpleDocTemplate.build.
+    The static parts of the page are drawn into a form the first time a canvas is
+    seen; every page then references the form and draws its own page number.
+    """
+
+    FORM_NAME = 'report_page'
+
+    def __init__(self, page_info, watermarks=REPORT_WATERMARKS):
+        self.page_info = page_info
+        self.watermarks = watermarks
+
+    def __call__(self, canvas, doc):
+        if not getattr(canvas, '_report_page_form', False):
+            canvas.beginForm(self.FORM_NAME)
+            self._draw_static(canvas)
+            canvas.endForm()
+            canvas._report_page_form = True
+
+        canvas.doForm(self.FORM_NAME)
+        canvas.saveState()
+        canvas.setFont('Helvetica-Bold', 8)
+        canvas.drawCentredString(A4[0]/2, 30, f"Page {canvas.getPageNumber()}")
+        canvas.restoreState()
+
+    def _draw_static(self, canvas):
+        page_info = self.page_info
+        canvas.saveState()
+
+        # Watermarks
+        canvas.setFont('Helvetica-Bold', 50)
+        canvas.setFillColor(WATERMARK_COLOR)
+        for y in self.watermarks:
+            canvas.drawCentredString(A4[0]/2, y, WATERMARK_TEXT)
+
+        # Header
+        canvas.setFillColor(colors.black)
+        canvas.setFont('Helvetica-Bold', 14)
+        canvas.drawCentredString(A4[0]/2, A4[1] - 50, page_info['society_name'])
+        canvas.setFont('Helvetica', 10)
+        canvas.drawCentredString(A4[0]/2, A4[1] - 70, page_info['address'])
+        canvas.drawCentredString(A4[0]/2, A4[1] - 85, f"Phone: {page_info['phone']} | Email: {page_info['email']}")
+
+        # Footer (the page number is drawn per page)
+        canvas.setFont('Helvetica-Bold', 8)
+        canvas.drawString(50, 30, f"Generated by: {page_info['generated_by']}")
+        canvas.drawRightString(A4[0] - 50, 30, f"Generated on: {page_info['generated_on']}")
+
+        canvas.restoreState()
+
+
+class ReportTheme:
+    """Paragraph and table styles shared by all reports"""
+
+    def __init__(self):
+        self.styles = getSampleStyleSheet()
+        self.title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=self.styles['Heading1'],
+            fontSize=16,
+            spaceAfter=30,
+            alignment=1  # Center alignment
+        )
+        self.heading_style = ParagraphStyle(
+            'CustomHeading',
+            parent=self.styles['Heading2'],
+            fontSize=14,
+            spaceAfter=15
+        )
+        self.normal_centered = ParagraphStyle(
+            'NormalCentered',
+            parent=self.styles['Normal'],
+            alignment=1  # Center alignment
+        )
+        self._table_styles = {}
+        self._lock = threading.Lock()
+
+    def table_style(self, amount_columns=None, totals_bold=None, striped=True, header=True):
+        """
+        Get the standard report table style (grey header, beige rows, grid).
+        Styles are cached, so tables with the same layout share one TableStyle.
+
+        Args:
+            amount_columns (tuple): (first, last) columns to right align
+            totals_bold (tuple): (first, last) bold columns of a totals row; None if
+                the table has no totals row
+            striped (bool): Alternate the data row colours
+            header (bool): The first row is a header row; False for tables that
+                continue another table's columns
+
+        Returns:
+            TableStyle: The shared style
+        """
+        key = (amount_columns, totals_bold, striped, header)
+        with self._lock:
+            style = self._table_styles.get(key)
+            if style is None:
+                style = self._table_styles[key] = TableStyle(
+                    self._table_commands(amount_columns, totals_bold, striped, header))
+        return style
+
+    def _table_commands(self, amount_columns, totals_bold, striped, header):
+        first_data_row = 1 if header else 0
+        last_data_row = -1 if totals_bold is None else -2
+        commands = [('ALIGN', (0, 0), (-1, -1), 'CENTER')]
+
+        # Header row styling
+        if header:
+            commands.extend([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 10),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ])
+
+        # Data rows styling
+        commands.extend([
+            ('BACKGROUND', (0, first_data_row), (-1, last_data_row), colors.beige),
+            ('TEXTCOLOR', (0, first_data_row), (-1, last_data_row), colors.black),
+            ('FONTNAME', (0, first_data_row), (-1, last_data_row), 'Helvetica'),
+            ('FONTSIZE', (0, first_data_row), (-1, last_data_row), 8),
+        ])
+
+        # Totals row styling
+        if totals_bold is not None:
+            first_bold, last_bold = totals_bold
+            commands.append(('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey))
+            commands.append(('FONTNAME', (first_bold, -1), (last_bold, -1), 'Helvetica-Bold'))
+            if first_bold > 0:
+                commands.append(('FONTNAME', (0, -1), (first_bold - 1, -1), 'Helvetica'))
+
+        # Grid styling
+        commands.append(('GRID', (0, 0), (-1, -1), 1, colors.black))
+        if amount_columns is not None:
+            first_amount, last_amount = amount_columns
+            commands.append(('ALIGN', (first_amount, 0), (last_amount, -1), 'RIGHT'))
+
+        # Alternate row coloring for better readability
+        if striped:
+            commands.append(('ROWBACKGROUNDS', (0, first_data_row), (-1, last_data_row), ROW_COLORS))
+        return commands
+
+    def page_decorator(self, society_info, generated_by):
+        """
+        Build the onFirstPage/onLaterPages callback for one report.
+
+        Args:
+            society_info (Society): Society details for the header
+            generated_by (str): Username printed in the footer
+
+        Returns:
+            PageDecorator: Callback that draws the header, footer and watermarks
+        """
+        return PageDecorator(page_info_from_society(society_info, generated_by))
+
+
+# Theme instance for this process (built on first use)
+_report_theme = None
+_theme_lock = threading.Lock()
+
+
+def get_report_theme():
+    """Get the report theme shared by every report in this process"""
+    global _report_theme
+    if _report_theme is None:
+        with _theme_lock:
+            if _report_theme is None:
+                _report_theme = ReportTheme()
+    return _report_theme
@@ -2,20 +2,172 @@
 import os
 from datetime import datetime
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer, Image
+from reportlab.platypus import BaseDocTemplate, PageTemplate, Frame, TableStyle
 from reportlab.lib.units import inch
-from reportlab.lib import colors
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfbase.pdfmetrics import stringWidth
 import sqlite3
+import json
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
 
 from models.ledger import LedgerManager
+from models.ledger_aggregates import LedgerAggregator
 from models.society import SocietyManager
 from models.resident import ResidentManager
+from models.report_theme import get_report_theme
+from utils.chart_service import chart_service
+from utils.db_context import get_db_connection
+
+# Ledger rows per streamed table chunk; chunks split wherever the pages break
+LEDGER_CHUNK_ROWS = 30
+
+# Ledger report columns, with fixed widths (points) so every chunk lines up
+LEDGER_COLUMNS = ['Txn ID', 'Date', 'Flat No', 'Type', 'Category', 'Description', 'Debit', 'Credit', 'Balance']
+LEDGER_COLUMN_WIDTHS = [43, 54, 48, 45, 56, 90, 52, 52, 55]
+
+# Height of the 'Brought forward', 'Carried forward' and TOTALS rows
+LEDGER_TOTALS_ROW_HEIGHT = 18
+
+# Reports in the month-end pack: name -> (ReportGenerator method, takes a date range)
+REPORT_PACK_REPORTS = {
+    'ledger': ('generate_ledger_report', True),
+    'payments': ('generate_payments_report', True),
+    'expenses': ('generate_expenses_report', True),
+    'outstanding_dues': ('generate_outstanding_dues_report', True),
+    'income_expense': ('generate_income_expense_report', True),
+    'payment_summary': ('generate_payment_summary_report', True),
+    'expense_summary': ('generate_expense_summary_report', True),
+}
+
+
+class _StreamingStory(list):
+    """
+    Story list that pulls flowables from an iterable as reportlab consumes them.
+    Nested iterables (such as a generator of table chunks) are flattened lazily,
+    so only a few flowables exist at any time.
+    """
+    
+    def __init__(self, flowables, lookahead=2):
+        super().__init__()
+        self._sources = [iter(flowables)]
+        self._lookahead = lookahead
+        self._fill()
+    
+    def _fill(self):
+        while self._sources and list.__len__(self) < self._lookahead:
+            try:
+                item = next(self._sources[-1])
+            except StopIteration:
+                self._sources.pop()
+                continue
+            if hasattr(item, '__next__'):
+                self._sources.append(item)
+            else:
+                self.append(item)
+    
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+
+
+class _LedgerTable(Table):
+    """
+    Ledger table that reports the rows it draws to the page totals.
+    Split parts keep the link, so rows are counted on the page they land on.
+    """
+    
+    page_totals = None
+    
+    def split(self, availWidth, availHeight):
+        parts = super().split(availWidth, availHeight)
+        for part in parts:
+            part.page_totals = self.page_totals
+        return parts
+    
+    def drawOn(self, canvas, x, y, _sW=0):
+        super().drawOn(canvas, x, y, _sW)
+        self.page_totals.add_rows(self._cellvalues[self.repeatRows:], x, y)
+
+
+class _LedgerPageTotals:
+    """
+    Page callbacks that carry the ledger's running totals across page breaks.
+    Every page ends with a 'Carried forward' row under its last ledger row (the
+    TOTALS row on the last page), and later pages start with the column header and
+    a 'Brought forward' row above their frame.
+    """
+    
+    def __init__(self, theme, page_decorator):
+        self.page_decorator = page_decorator
+        self.header_style = theme.table_style(amount_columns=(6, 8))
+        # Same size as the data rows, so large running totals fit the amount columns
+        self.totals_style = TableStyle([('FONTSIZE', (0, 0), (-1, -1), 8)], parent=theme.table_style(
+            amount_columns=(6, 8), totals_bold=(5, -1), striped=False, header=False))
+        self.debit = 0
+        self.credit = 0
+        self.rows_drawn = 0
+        self.rows_total = None  # Known once every row has been streamed
+        self.bottom = None  # (x, y) under the last ledger row on this page
+    
+    def header_table(self, table_class=Table):
+        """Build the column header table"""
+        table = table_class([LEDGER_COLUMNS], colWidths=LEDGER_COLUMN_WIDTHS, repeatRows=1)
+        table.setStyle(self.header_style)
+        return table
+    
+    def header_height(self):
+        """Height of the header and 'Brought forward' rows drawn above later pages' frame"""
+        return self.header_table().wrap(0, 0)[1] + LEDGER_TOTALS_ROW_HEIGHT
+    
+    def add_rows(self, rows, x, y):
+        for row in rows:
+            self.debit += float(row[6])
+            self.credit += float(row[7])
+        self.rows_drawn += len(rows)
+        self.bottom = (x, y)
+    
+    def later_page(self, canvas, doc):
+        self.page_decorator(canvas, doc)
+        x = doc.leftMargin + (doc.width - sum(LEDGER_COLUMN_WIDTHS)) / 2
+        top = doc.bottomMargin + doc.height
+        header = self.header_table()
+        header_height = header.wrapOn(canvas, doc.width, doc.height)[1]
+        header.drawOn(canvas, x, top - header_height)
+        self._draw_totals_row(canvas, x, top - header_height, 'Brought forward')
+        self.bottom = (x, top - header_height - LEDGER_TOTALS_ROW_HEIGHT)
+    
+    def page_end(self, canvas, doc):
+        if self.bottom is None:
+            return
+        finished = self.rows_total is not None and self.rows_drawn == self.rows_total
+        x, y = self.bottom
+        self._draw_totals_row(canvas, x, y, 'TOTALS' if finished else 'Carried forward')
+        self.bottom = None
+    
+    def _draw_totals_row(self, canvas, x, top, label):
+        table = Table([['', '', '', '', '', label, f"{self.debit:.2f}", f"{self.credit:.2f}", '']],
+                      colWidths=LEDGER_COLUMN_WIDTHS, rowHeights=[LEDGER_TOTALS_ROW_HEIGHT])
+        table.setStyle(self.totals_style)
+        table.wrapOn(canvas, sum(LEDGER_COLUMN_WIDTHS), LEDGER_TOTALS_ROW_HEIGHT)
+        table.drawOn(canvas, x, top - LEDGER_TOTALS_ROW_HEIGHT)
+
+
+def _fit_cell(text, width, font_name='Helvetica', font_size=8):
+    """Shorten text with '...' so it fits a fixed-width table column"""
+    available = width - 12  # Default cell padding on both sides
+    if stringWidth(text, font_name, font_size) <= available:
+        return text
+    while text and stringWidth(text + "...", font_name, font_size) > available:
+        text = text[:-1]
+    return text + "..."
+
 
 class ReportGenerator:
     def __init__(self, db_path="society_management.db"):
@@ -23,6 +175,8 @@ class ReportGenerator:
         self.ledger_manager = LedgerManager(db_path)
         self.society_manager = SocietyManager(db_path)
         self.resident_manager = ResidentManager(db_path)
+        self.aggregator = LedgerAggregator(db_path)
+        self.theme = get_report_theme()
         self.setup_report_directory()
     
     def setup_report_directory(self):
@@ -30,10 +184,12 @@ class ReportGenerator:
         if not os.path.exists("reports"):
             os.makedirs("reports")
     
-    def generate_ledger_report(self, generated_by, file_name=None, start_date=None, end_date=None):
+    def generate_ledger_report(self, generated_by, file_name=None, start_date=None, end_date=None,
+                               chunk_size=LEDGER_CHUNK_ROWS, progress_callback=None):
         """
         Generate a PDF ledger report with proper header and footer
-        Optionally filter by date range
+        Optionally filter by date range. progress_callback, if given, is called with
+        the number of rows laid out so far after every chunk.
         """
         # Use default file name if not provided
         if not file_name:
@@ -45,34 +201,39 @@ class ReportGenerator:
         # Get society info
         society_info = self.society_manager.get_society_info()
         
-        # Create PDF document with custom page setup
-        doc = SimpleDocTemplate(
+        # Page callbacks that draw the header, footer and the running totals at each
+        # page break
+        page_decorator = self.theme.page_decorator(society_info, generated_by)
+        page_totals = _LedgerPageTotals(self.theme, page_decorator)
+        
+        # Create PDF document with custom page setup; the bottom margin leaves room
+        # for the row drawn under the last ledger row of each page
+        doc = BaseDocTemplate(
             file_path, 
             pagesize=A4,
             topMargin=100,
-            bottomMargin=50,
+            bottomMargin=50 + LEDGER_TOTALS_ROW_HEIGHT,
             leftMargin=50,
             rightMargin=50
         )
+        first_frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height,
+                            leftPadding=0, rightPadding=0, id='first')
+        later_frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height - page_totals.header_height(),
+                            leftPadding=0, rightPadding=0, topPadding=0, id='later')
+        doc.addPageTemplates([
+            PageTemplate('First', [first_frame], onPage=page_decorator,
+                         onPageEnd=page_totals.page_end, autoNextPageTemplate='Later'),
+            PageTemplate('Later', [later_frame], onPage=page_totals.later_page,
+                         onPageEnd=page_totals.page_end),
+        ])
         
         story = []
         
         # Get styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=16,  # Reduced font size
-            spaceAfter=30,
-            alignment=1  # Center alignment
-        )
-        
-        normal_centered = ParagraphStyle(
-            'NormalCentered',
-            parent=styles['Normal'],
-            alignment=1  # Center alignment
-        )
-        
+        styles = self.theme.styles
+        title_style = self.theme.title_style
+        normal_centered = self.theme.normal_centered
+
         # Add report title
         story.append(Paragraph("LEDGER REPORT", title_style))
         story.append(Spacer(1, 0.3*inch))
@@ -83,121 +244,75 @@ class ReportGenerator:
             story.append(Paragraph(date_range_text, styles['Normal']))
             story.append(Spacer(1, 0.2*inch))
         
-        # Get ledger data
-        if start_date and end_date:
-            transactions = self.ledger_manager.get_transactions_by_date_range(start_date, end_date)
-        else:
-            transactions = self.ledger_manager.get_all_transactions()
-        
-        # Create table data
-        table_data = [
-            ['Txn ID', 'Date', 'Flat No', 'Type', 'Category', 'Description', 'Debit', 'Credit', 'Balance']
-        ]
-        
-        total_debit = 0
-        total_credit = 0
-        
-        for transaction in transactions:
-            table_data.append([
-                transaction.transaction_id,
-                transaction.date,
-                transaction.flat_no or '',
-                transaction.transaction_type,
-                transaction.category,
-                transaction.description[:30] + "..." if len(transaction.description) > 30 else transaction.description,
-                f"{transaction.debit:.2f}",
-                f"{transaction.credit:.2f}",
-                f"{transaction.balance:.2f}"
-            ])
-            total_debit += transaction.debit
-            total_credit += transaction.credit
-        
-        # Add totals row
-        table_data.append([
-            '', '', '', '', '', 'TOTALS',
-            f"{total_debit:.2f}",
-            f"{total_credit:.2f}",
-            ''
-        ])
-        
-        # Create table with improved styling
-        table = Table(table_data, repeatRows=1)
-        table.setStyle(TableStyle([
-            # Header row styling
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            
-            # Data rows styling
-            ('BACKGROUND', (0, 1), (-1, -2), colors.beige),
-            ('TEXTCOLOR', (0, 1), (-1, -2), colors.black),
-            ('FONTNAME', (0, 1), (-1, -2), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -2), 8),
-            
-            # Totals row styling
-            ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-            ('FONTNAME', (5, -1), (-1, -1), 'Helvetica-Bold'),  # Bold for totals
-            ('FONTNAME', (0, -1), (4, -1), 'Helvetica'),  # Normal for empty cells in totals row
-            
-            # Grid styling
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('ALIGN', (6, 0), (8, -1), 'RIGHT'),  # Right align amount columns
-            
-            # Alternate row coloring for better readability
-            ('ROWBACKGROUNDS', (0, 1), (-1, -2), [colors.beige, colors.Color(0.9, 0.85, 0.8)]),
-        ]))
-        
-        story.append(table)
+        # Stream the ledger in chunks and emit one small table per chunk, so memory
+        # stays bounded and reportlab never has to lay out one giant table
+        story.append(self._ledger_table_chunks(start_date, end_date, chunk_size, page_totals, progress_callback))
         
-        # Build PDF with custom header and footer
-        doc.build(story, onFirstPage=lambda canvas, doc: self.add_header_footer(canvas, doc, society_info, generated_by), 
-                  onLaterPages=lambda canvas, doc: self.add_header_footer(canvas, doc, society_info, generated_by))
+        doc.build(_StreamingStory(story))
         
         return file_path
     
+    def _ledger_table_chunks(self, start_date, end_date, chunk_size, page_totals, progress_callback=None):
+        """
+        Yield the ledger header table, then one rows table per chunk of transactions.
+        The tables share fixed column widths and split at the real page breaks; the
+        running totals are drawn by page_totals at each break, not per chunk.
+        """
+        header = page_totals.header_table(_LedgerTable)
+        header.page_totals = page_totals
+        yield header
+        
+        style = self.theme.table_style(amount_columns=(6, 8), header=False)
+        rows_done = 0
+        
+        for chunk in self.ledger_manager.iter_transactions(start_date, end_date, chunk_size):
+            rows = []
+            for transaction in chunk:
+                rows.append([
+                    transaction.transaction_id,
+                    transaction.date,
+                    transaction.flat_no or '',
+                    transaction.transaction_type,
+                    _fit_cell(transaction.category or '', LEDGER_COLUMN_WIDTHS[4]),
+                    _fit_cell(transaction.description or '', LEDGER_COLUMN_WIDTHS[5]),
+                    f"{transaction.debit:.2f}",
+                    f"{transaction.credit:.2f}",
+                    f"{transaction.balance:.2f}"
+                ])
+            table = _LedgerTable(rows, colWidths=LEDGER_COLUMN_WIDTHS)
+            table.setStyle(style)
+            table.page_totals = page_totals
+            yield table
+            
+            rows_done += len(chunk)
+            if progress_callback:
+                progress_callback(rows_done)
+        
+        # The last page ends with the TOTALS row once every row is drawn
+        page_totals.rows_total = rows_done
     
+    def get_transactions_of_type(self, transaction_type, start_date=None, end_date=None):
+        """
+        Get transactions of one type in chronological order, filtered in SQL
+        Optionally filter by date range
+        """
+        transactions = []
+        for chunk in self.ledger_manager.iter_transactions(start_date, end_date, transaction_type=transaction_type):
+            transactions.extend(chunk)
+        return transactions
     
     def get_income_expense_data(self, start_date=None, end_date=None):
         """
         Get income and expense data for a given period
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         # Set default dates if not provided
         if not start_date:
             start_date = date.today() - relativedelta(months=12)
         if not end_date:
             end_date = date.today()
         
-        # Get income (payments) by category
-        cursor.execute('''
-            SELECT category, SUM(credit) as total_income
-            FROM ledger
-            WHERE transaction_type = 'Payment'
-            AND date BETWEEN ? AND ?
-            GROUP BY category
-            ORDER BY total_income DESC
-        ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
-        
-        income_data = cursor.fetchall()
-        
-        # Get expenses by category
-        cursor.execute('''
-            SELECT category, SUM(debit) as total_expense
-            FROM ledger
-            WHERE transaction_type = 'Expense'
-            AND date BETWEEN ? AND ?
-            GROUP BY category
-            ORDER BY total_expense DESC
-        ''', (start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
-        
-        expense_data = cursor.fetchall()
-        
-        conn.close()
+        # Income (payments) and expenses by category in one grouped query
+        income_data, expense_data = self.aggregator.income_expense_by_category(start_date, end_date)
         
         # Calculate totals
         total_income = sum(amount for _, amount in income_data)
@@ -217,84 +332,21 @@ class ReportGenerator:
     def generate_income_expense_chart(self, income_expense_data):
         """
         Generate a bar chart for income vs expense and save as PNG
+        Returns the path of a cached, uniquely named chart file, or None on failure
         """
         try:
-            import matplotlib
-            matplotlib.use('Agg')  # Use non-interactive backend
-            import matplotlib.pyplot as plt
-            import numpy as np
-            
-            # Create chart data
-            categories = []
-            income_values = []
-            expense_values = []
-            
-            # Combine all categories from both income and expense
-            all_categories = set()
-            income_dict = dict(income_expense_data['income_data'])
-            expense_dict = dict(income_expense_data['expense_data'])
-            
-            all_categories.update(income_dict.keys())
-            all_categories.update(expense_dict.keys())
-            
-            # Sort categories by total value (income + expense)
-            category_totals = {}
-            for category in all_categories:
-                total = income_dict.get(category, 0) + expense_dict.get(category, 0)
-                category_totals[category] = total
-            
-            sorted_categories = sorted(category_totals.keys(), key=lambda x: category_totals[x], reverse=True)
-            
-            for category in sorted_categories:
-                categories.append(category)
-                income_values.append(income_dict.get(category, 0))
-                expense_values.append(expense_dict.get(category, 0))
-            
-            # Create the chart
-            fig, ax = plt.subplots(figsize=(10, 6))
-            
-            x = np.arange(len(categories))
-            width = 0.35
-            
-            rects1 = ax.bar(x - width/2, income_values, width, label='Income', color='green')
-            rects2 = ax.bar(x + width/2, expense_values, width, label='Expense', color='red')
-            
-            # Add labels and title
-            ax.set_xlabel('Categories')
-            ax.set_ylabel('Amount (Rs)')
-            ax.set_title('Income vs Expense by Category')
-            ax.set_xticks(x)
-            ax.set_xticklabels(categories, rotation=45, ha='right')
-            ax.legend()
-            
-            # Add value labels on bars
-            def autolabel(rects):
-                for rect in rects:
-                    height = rect.get_height()
-                    ax.annotate(f'{height:.0f}',
-                                xy=(rect.get_x() + rect.get_width() / 2, height),
-                                xytext=(0, 3),
-                                textcoords="offset points",
-                                ha='center', va='bottom', fontsize=8)
-            
-            autolabel(rects1)
-            autolabel(rects2)
-            
-            plt.tight_layout()
-            
-            # Save chart
-            chart_path = os.path.join("reports", "income_expense_chart.png")
-            plt.savefig(chart_path, dpi=300, bbox_inches='tight')
-            plt.close()
-            
-            return chart_path
+            return chart_service.income_expense_png(income_expense_data['income_data'],
+                                                    income_expense_data['expense_data'])
         except Exception as e:
             print(f"Error generating chart: {e}")
             return None
 
-    def generate_income_expense_report(self, generated_by, file_name=None, start_date=None, end_date=None):
+    def generate_income_expense_report(self, generated_by, file_name=None, start_date=None, end_date=None,
+                                       vector_chart=True):
         """
         Generate a PDF report of income vs expense with chart
+        The chart is drawn as vector graphics unless vector_chart is False,
+        in which case a rendered PNG is embedded instead
         """
         # Use default file name if not provided
         if not file_name:
@@ -309,9 +361,6 @@ class ReportGenerator:
         # Get income/expense data
         data = self.get_income_expense_data(start_date, end_date)
         
-        # Generate chart
-        chart_path = self.generate_income_expense_chart(data)
-        
         # Create PDF document with custom page setup
         doc = SimpleDocTemplate(
             file_path, 
@@ -325,15 +374,9 @@ class ReportGenerator:
         story = []
         
         # Get styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=16,
-            spaceAfter=30,
-            alignment=1  # Center alignment
-        )
-        
+        styles = self.theme.styles
+        title_style = self.theme.title_style
+
         # Add report title
         story.append(Paragraph("INCOME VS EXPENSE REPORT", title_style))
         
@@ -342,15 +385,24 @@ class ReportGenerator:
         story.append(Paragraph(date_range_text, styles['Normal']))
         story.append(Spacer(1, 0.2*inch))
         
-        # Add chart if generated
-        if chart_path and os.path.exists(chart_path):
+        # Add chart
+        if vector_chart:
             try:
-                chart_img = Image(chart_path, width=400, height=240)
-                chart_img.hAlign = 'CENTER'
-                story.append(chart_img)
+                story.append(chart_service.income_expense_drawing(data['income_data'], data['expense_data'],
+                                                                  width=400, height=240))
                 story.append(Spacer(1, 0.2*inch))
-            except:
-                pass  # If chart fails to load, continue without it
+            except Exception as e:
+                print(f"Error generating chart: {e}")  # Continue without the chart
+        else:
+            chart_path = self.generate_income_expense_chart(data)
+            if chart_path and os.path.exists(chart_path):
+                try:
+                    chart_img = Image(chart_path, width=400, height=240)
+                    chart_img.hAlign = 'CENTER'
+                    story.append(chart_img)
+                    story.append(Spacer(1, 0.2*inch))
+                except:
+                    pass  # If chart fails to load, continue without it
         
         # Create income table
         story.append(Paragraph("INCOME (Payments Received)", styles['Heading2']))
@@ -360,22 +412,7 @@ class ReportGenerator:
         income_table_data.append(['TOTAL INCOME', f"{data['total_income']:.2f}"])
         
         income_table = Table(income_table_data, repeatRows=1)
-        income_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -2), colors.beige),
-            ('TEXTCOLOR', (0, 1), (-1, -2), colors.black),
-            ('FONTNAME', (0, 1), (-1, -2), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -2), 8),
-            ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-        ]))
+        income_table.setStyle(self.theme.table_style(amount_columns=(1, 1), totals_bold=(0, -1), striped=False))
         
         story.append(income_table)
         story.append(Spacer(1, 0.2*inch))
@@ -388,22 +425,7 @@ class ReportGenerator:
         expense_table_data.append(['TOTAL EXPENSES', f"{data['total_expense']:.2f}"])
         
         expense_table = Table(expense_table_data, repeatRows=1)
-        expense_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -2), colors.beige),
-            ('TEXTCOLOR', (0, 1), (-1, -2), colors.black),
-            ('FONTNAME', (0, 1), (-1, -2), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -2), 8),
-            ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-        ]))
+        expense_table.setStyle(self.theme.table_style(amount_columns=(1, 1), totals_bold=(0, -1), striped=False))
         
         story.append(expense_table)
         story.append(Spacer(1, 0.2*inch))
@@ -414,82 +436,25 @@ class ReportGenerator:
         story.append(Paragraph(net_text, styles['Normal']))
         story.append(Paragraph(status_text, styles['Normal']))
         
-        # Build PDF with custom header and footer
-        doc.build(story, onFirstPage=lambda canvas, doc: self.add_header_footer(canvas, doc, society_info, generated_by), 
-                  onLaterPages=lambda canvas, doc: self.add_header_footer(canvas, doc, society_info, generated_by))
-        
-        # Clean up chart file
-        if chart_path and os.path.exists(chart_path):
-            try:
-                os.remove(chart_path)
-            except:
-                pass
+        # Build PDF with the shared header/footer form
+        page_decorator = self.theme.page_decorator(society_info, generated_by)
+        doc.build(story, onFirstPage=page_decorator, onLaterPages=page_decorator)
         
         return file_path
 
     def add_header_footer(self, canvas, doc, society_info, generated_by):
         """
-        Add header and footer to each page with watermark
+        Add header and footer to each page with watermark.
+        The static parts are drawn into a form once per document (see ReportTheme).
         """
-        canvas.saveState()
-        
-        # Add watermarks at three horizontal locations for better visibility
-        canvas.setFont('Helvetica-Bold', 50)
-        canvas.setFillColor(colors.gray)
-        canvas.setFillAlpha(0.15)
-        
-        # Top watermark
-        canvas.drawCentredString(A4[0]/2, A4[1] - 100, "NextGen Advisors")
-        
-        # Middle watermark
-        canvas.drawCentredString(A4[0]/2, A4[1]/2, "NextGen Advisors")
-        
-        # Bottom watermark
-        canvas.drawCentredString(A4[0]/2, 100, "NextGen Advisors")
-        
-        canvas.setFillAlpha(1.0)  # Reset alpha
-        
-        canvas.setFillAlpha(1.0)  # Reset alpha
-        
-        # Header
-        canvas.setFont('Helvetica-Bold', 14)
-        
-        if society_info:
-            # Society name in black
-            canvas.setFillColor(colors.black)
-            canvas.drawCentredString(A4[0]/2, A4[1] - 50, society_info.name or "Society Management System")
-            
-            # Society address and contact in black
-            canvas.setFont('Helvetica', 10)
-            address_text = society_info.address or ""
-            phone_text = f"Phone: {society_info.phone or 'N/A'}"
-            email_text = f"Email: {society_info.email or 'N/A'}"
-            
-            canvas.drawCentredString(A4[0]/2, A4[1] - 70, address_text)
-            canvas.drawCentredString(A4[0]/2, A4[1] - 85, f"{phone_text} | {email_text}")
-        else:
-            # Default society info in black
-            canvas.setFillColor(colors.black)
-            canvas.drawCentredString(A4[0]/2, A4[1] - 50, "Society Management System")
-            canvas.drawCentredString(A4[0]/2, A4[1] - 70, "123 Main Street, City, State 12345")
-            canvas.drawCentredString(A4[0]/2, A4[1] - 85, "Phone: N/A | Email: N/A")
-        
-        # Footer with bold text and page number in center
-        canvas.setFont('Helvetica-Bold', 8)
-        generated_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        canvas.drawString(50, 30, f"Generated by: {generated_by}")
-        canvas.drawCentredString(A4[0]/2, 30, f"Page {canvas.getPageNumber()}")
-        canvas.drawRightString(A4[0] - 50, 30, f"Generated on: {generated_date}")
-        
-        canvas.restoreState()
+        self.theme.page_decorator(society_info, generated_by)(canvas, doc)
 
     def get_outstanding_dues(self, start_date=None, end_date=None):
         """
         Calculate outstanding dues for all residents
         If start_date and end_date are not provided, calculate for the last 12 months
         """
-        from datetime import date
-        from dateutil.relativedelta import relativedelta
+        from models.dues_statements import DEFAULT_MONTHLY_CHARGE
         
         # If no dates provided, use last 12 months
         if not start_date:
@@ -498,25 +463,24 @@ class ReportGenerator:
         if not end_date:
             end_date = date.today()
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         # Get all active residents
-        cursor.execute('''
-            SELECT flat_no, name, date_joining
-            FROM residents
-            WHERE status = 'Active'
-        ''')
+        with get_db_connection(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT flat_no, name, date_joining, monthly_charges
+                FROM residents
+                WHERE status = 'Active'
+            ''')
+            residents = cursor.fetchall()
+        
+        # Maintenance payments of every flat in the period, in one grouped query
+        maintenance_paid = {}
+        for row in self.aggregator.aggregate(('flat', 'category'), 'Payment', start_date, end_date):
+            if row['category'] == 'Maintenance' and row['flat']:
+                maintenance_paid[row['flat']] = row['credit']
         
-        residents = cursor.fetchall()
         outstanding_dues = []
-        
-        # Fixed monthly charges
-        monthly_charges = 500.0
-        
-        for resident in residents:
-            flat_no, name, date_joining_str = resident
-            
+        for flat_no, name, date_joining_str, monthly_charges in residents:
             try:
                 # Parse the date joining
                 resident_joined = datetime.strptime(date_joining_str, '%Y-%m-%d').date()
@@ -536,21 +500,9 @@ class ReportGenerator:
             # Calculate number of months in the period
             months_due = (period_end.year - period_start.year) * 12 + (period_end.month - period_start.month) + 1
             
-            # Total expected amount
-            expected_amount = months_due * monthly_charges
-            
-            # Get all maintenance payments for this resident during the period
-            cursor.execute('''
-                SELECT SUM(credit) 
-                FROM ledger 
-                WHERE flat_no = ? 
-                AND category = 'Maintenance' 
-                AND transaction_type = 'Payment'
-                AND date BETWEEN ? AND ?
-            ''', (flat_no, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')))
-            
-            payment_result = cursor.fetchone()
-            amount_paid = payment_result[0] if payment_result[0] is not None else 0.0
+            # Total expected amount at the resident's own monthly charge
+            expected_amount = months_due * (monthly_charges or DEFAULT_MONTHLY_CHARGE)
+            amount_paid = maintenance_paid.get(flat_no, 0.0)
             
             # Calculate outstanding amount
             amount_due = expected_amount - amount_paid
@@ -566,7 +518,6 @@ class ReportGenerator:
                     'amount_due': amount_due
                 })
         
-        conn.close()
         # Sort by amount due descending
         outstanding_dues.sort(key=lambda x: x['amount_due'], reverse=True)
         return outstanding_dues
@@ -598,15 +549,9 @@ class ReportGenerator:
         story = []
         
         # Get styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=16,
-            spaceAfter=30,
-            alignment=1  # Center alignment
-        )
-        
+        styles = self.theme.styles
+        title_style = self.theme.title_style
+
         # Add report title
         story.append(Paragraph("OUTSTANDING DUES REPORT", title_style))
         
@@ -660,39 +605,13 @@ class ReportGenerator:
         
         # Create table with improved styling
         table = Table(table_data, repeatRows=1)
-        table.setStyle(TableStyle([
-            # Header row styling
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            
-            # Data rows styling
-            ('BACKGROUND', (0, 1), (-1, -2), colors.beige),
-            ('TEXTCOLOR', (0, 1), (-1, -2), colors.black),
-            ('FONTNAME', (0, 1), (-1, -2), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -2), 8),
-            
-            # Totals row styling
-            ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-            ('FONTNAME', (3, -1), (-1, -1), 'Helvetica-Bold'),  # Bold for totals
-            ('FONTNAME', (0, -1), (2, -1), 'Helvetica'),  # Normal for empty cells in totals row
-            
-            # Grid styling
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('ALIGN', (3, 0), (5, -1), 'RIGHT'),  # Right align amount columns
-            
-            # Alternate row coloring for better readability
-            ('ROWBACKGROUNDS', (0, 1), (-1, -2), [colors.beige, colors.Color(0.9, 0.85, 0.8)]),
-        ]))
+        table.setStyle(self.theme.table_style(amount_columns=(3, 5), totals_bold=(3, -1)))
         
         story.append(table)
         
-        # Build PDF with custom header and footer
-        doc.build(story, onFirstPage=lambda canvas, doc: self.add_header_footer(canvas, doc, society_info, generated_by), 
-                  onLaterPages=lambda canvas, doc: self.add_header_footer(canvas, doc, society_info, generated_by))
+        # Build PDF with the shared header/footer form
+        page_decorator = self.theme.page_decorator(society_info, generated_by)
+        doc.build(story, onFirstPage=page_decorator, onLaterPages=page_decorator)
         
         return file_path
     
@@ -723,15 +642,9 @@ class ReportGenerator:
         story = []
         
         # Get styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=16,
-            spaceAfter=30,
-            alignment=1  # Center alignment
-        )
-        
+        styles = self.theme.styles
+        title_style = self.theme.title_style
+
         # Add report title
         story.append(Paragraph("PAYMENTS REPORT", title_style))
         
@@ -745,13 +658,7 @@ class ReportGenerator:
         story.append(Spacer(1, 0.2*inch))
         
         # Get payment transactions
-        if start_date and end_date:
-            all_transactions = self.ledger_manager.get_transactions_by_date_range(start_date, end_date)
-        else:
-            all_transactions = self.ledger_manager.get_all_transactions()
-        
-        # Filter only payment transactions
-        payment_transactions = [txn for txn in all_transactions if txn.transaction_type == 'Payment']
+        payment_transactions = self.get_transactions_of_type('Payment', start_date, end_date)
         
         # Create table data
         table_data = [
@@ -779,39 +686,13 @@ class ReportGenerator:
         
         # Create table with improved styling
         table = Table(table_data, repeatRows=1)
-        table.setStyle(TableStyle([
-            # Header row styling
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            
-            # Data rows styling
-            ('BACKGROUND', (0, 1), (-1, -2), colors.beige),
-            ('TEXTCOLOR', (0, 1), (-1, -2), colors.black),
-            ('FONTNAME', (0, 1), (-1, -2), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -2), 8),
-            
-            # Totals row styling
-            ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-            ('FONTNAME', (4, -1), (5, -1), 'Helvetica-Bold'),  # Bold for totals
-            ('FONTNAME', (0, -1), (3, -1), 'Helvetica'),  # Normal for empty cells in totals row
-            
-            # Grid styling
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('ALIGN', (5, 0), (5, -1), 'RIGHT'),  # Right align amount column
-            
-            # Alternate row coloring for better readability
-            ('ROWBACKGROUNDS', (0, 1), (-1, -2), [colors.beige, colors.Color(0.9, 0.85, 0.8)]),
-        ]))
+        table.setStyle(self.theme.table_style(amount_columns=(5, 5), totals_bold=(4, 5)))
         
         story.append(table)
         
-        # Build PDF with custom header and footer
-        doc.build(story, onFirstPage=lambda canvas, doc: self.add_header_footer(canvas, doc, society_info, generated_by), 
-                  onLaterPages=lambda canvas, doc: self.add_header_footer(canvas, doc, society_info, generated_by))
+        # Build PDF with the shared header/footer form
+        page_decorator = self.theme.page_decorator(society_info, generated_by)
+        doc.build(story, onFirstPage=page_decorator, onLaterPages=page_decorator)
         
         return file_path
     
@@ -842,15 +723,9 @@ class ReportGenerator:
         story = []
         
         # Get styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=16,
-            spaceAfter=30,
-            alignment=1  # Center alignment
-        )
-        
+        styles = self.theme.styles
+        title_style = self.theme.title_style
+
         # Add report title
         story.append(Paragraph("EXPENSES REPORT", title_style))
         
@@ -864,13 +739,7 @@ class ReportGenerator:
         story.append(Spacer(1, 0.2*inch))
         
         # Get expense transactions
-        if start_date and end_date:
-            all_transactions = self.ledger_manager.get_transactions_by_date_range(start_date, end_date)
-        else:
-            all_transactions = self.ledger_manager.get_all_transactions()
-        
-        # Filter only expense transactions
-        expense_transactions = [txn for txn in all_transactions if txn.transaction_type == 'Expense']
+        expense_transactions = self.get_transactions_of_type('Expense', start_date, end_date)
         
         # Create table data
         table_data = [
@@ -898,39 +767,13 @@ class ReportGenerator:
         
         # Create table with improved styling
         table = Table(table_data, repeatRows=1)
-        table.setStyle(TableStyle([
-            # Header row styling
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            
-            # Data rows styling
-            ('BACKGROUND', (0, 1), (-1, -2), colors.beige),
-            ('TEXTCOLOR', (0, 1), (-1, -2), colors.black),
-            ('FONTNAME', (0, 1), (-1, -2), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -2), 8),
-            
-            # Totals row styling
-            ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-            ('FONTNAME', (3, -1), (4, -1), 'Helvetica-Bold'),  # Bold for totals
-            ('FONTNAME', (0, -1), (2, -1), 'Helvetica'),  # Normal for empty cells in totals row
-            
-            # Grid styling
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('ALIGN', (4, 0), (4, -1), 'RIGHT'),  # Right align amount column
-            
-            # Alternate row coloring for better readability
-            ('ROWBACKGROUNDS', (0, 1), (-1, -2), [colors.beige, colors.Color(0.9, 0.85, 0.8)]),
-        ]))
+        table.setStyle(self.theme.table_style(amount_columns=(4, 4), totals_bold=(3, 4)))
         
         story.append(table)
         
-        # Build PDF with custom header and footer
-        doc.build(story, onFirstPage=lambda canvas, doc: self.add_header_footer(canvas, doc, society_info, generated_by), 
-                  onLaterPages=lambda canvas, doc: self.add_header_footer(canvas, doc, society_info, generated_by))
+        # Build PDF with the shared header/footer form
+        page_decorator = self.theme.page_decorator(society_info, generated_by)
+        doc.build(story, onFirstPage=page_decorator, onLaterPages=page_decorator)
         
         return file_path
     
@@ -961,28 +804,24 @@ class ReportGenerator:
         story = []
         
         # Get styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=16,
-            spaceAfter=30,
-            alignment=1  # Center alignment
-        )
-        
+        styles = self.theme.styles
+        title_style = self.theme.title_style
+
         # Add report title
         story.append(Paragraph("RESIDENT LIST REPORT", title_style))
         story.append(Spacer(1, 0.2*inch))
         
-        # Get resident data
+        # Get resident data, with every resident's vehicles and domestic help in two queries
         residents = self.resident_manager.get_all_residents()
+        details = self.resident_manager.get_resident_details([resident.id for resident in residents])
         
         # Create table data
         table_data = [
-            ['Flat No', 'Name', 'Type', 'Mobile', 'Email', 'Joining Date', 'Status']
+            ['Flat No', 'Name', 'Type', 'Mobile', 'Email', 'Joining Date', 'Status', 'Vehicles', 'Help']
         ]
         
         for resident in residents:
+            resident_details = details[resident.id]
             table_data.append([
                 resident.flat_no,
                 resident.name,
@@ -990,38 +829,21 @@ class ReportGenerator:
                 resident.mobile_no,
                 resident.email,
                 resident.date_joining,
-                resident.status
+                resident.status,
+                "\n".join(vehicle.registration_number or vehicle.vehicle_type
+                          for vehicle in resident_details.vehicles),
+                len(resident_details.domestic_help)
             ])
         
         # Create table with improved styling
         table = Table(table_data, repeatRows=1)
-        table.setStyle(TableStyle([
-            # Header row styling
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            
-            # Data rows styling
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            
-            # Grid styling
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            
-            # Alternate row coloring for better readability
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.beige, colors.Color(0.9, 0.85, 0.8)]),
-        ]))
+        table.setStyle(self.theme.table_style())
         
         story.append(table)
         
-        # Build PDF with custom header and footer
-        doc.build(story, onFirstPage=lambda canvas, doc: self.add_header_footer(canvas, doc, society_info, generated_by), 
-                  onLaterPages=lambda canvas, doc: self.add_header_footer(canvas, doc, society_info, generated_by))
+        # Build PDF with the shared header/footer form
+        page_decorator = self.theme.page_decorator(society_info, generated_by)
+        doc.build(story, onFirstPage=page_decorator, onLaterPages=page_decorator)
         
         return file_path
     
@@ -1052,22 +874,10 @@ class ReportGenerator:
         story = []
         
         # Get styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=16,
-            spaceAfter=30,
-            alignment=1  # Center alignment
-        )
-        
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=14,
-            spaceAfter=15
-        )
-        
+        styles = self.theme.styles
+        title_style = self.theme.title_style
+        heading_style = self.theme.heading_style
+
         # Add report title
         story.append(Paragraph("PAYMENT SUMMARY REPORT", title_style))
         
@@ -1081,27 +891,11 @@ class ReportGenerator:
         story.append(Spacer(1, 0.2*inch))
         
         # Get payment transactions
-        if start_date and end_date:
-            all_transactions = self.ledger_manager.get_transactions_by_date_range(start_date, end_date)
-        else:
-            all_transactions = self.ledger_manager.get_all_transactions()
-        
-        # Filter only payment transactions
-        payment_transactions = [txn for txn in all_transactions if txn.transaction_type == 'Payment']
+        payment_transactions = self.get_transactions_of_type('Payment', start_date, end_date)
         
-        # Group payments by category
-        category_totals = {}
-        total_payments = 0
-        
-        for transaction in payment_transactions:
-            category = transaction.category
-            amount = transaction.credit
-            
-            if category not in category_totals:
-                category_totals[category] = 0
-            
-            category_totals[category] += amount
-            total_payments += amount
+        # Category totals are grouped in SQL rather than from the transaction list
+        category_totals = self.aggregator.category_totals('Payment', start_date, end_date)
+        total_payments = sum(amount for _, amount in category_totals)
         
         # Add summary section
         story.append(Paragraph("Payment Summary by Category", heading_style))
@@ -1112,7 +906,7 @@ class ReportGenerator:
         ]
         
         # Add category rows
-        for category, total in category_totals.items():
+        for category, total in category_totals:
             summary_table_data.append([category, f"{total:.2f}"])
         
         # Add totals row
@@ -1120,29 +914,7 @@ class ReportGenerator:
         
         # Create summary table with improved styling
         summary_table = Table(summary_table_data, repeatRows=1)
-        summary_table.setStyle(TableStyle([
-            # Header row styling
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            
-            # Data rows styling
-            ('BACKGROUND', (0, 1), (-1, -2), colors.beige),
-            ('TEXTCOLOR', (0, 1), (-1, -2), colors.black),
-            ('FONTNAME', (0, 1), (-1, -2), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -2), 8),
-            
-            # Totals row styling
-            ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            
-            # Grid styling
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),  # Right align amount column
-        ]))
+        summary_table.setStyle(self.theme.table_style(amount_columns=(1, 1), totals_bold=(0, -1), striped=False))
         
         story.append(summary_table)
         story.append(Spacer(1, 0.3*inch))
@@ -1155,9 +927,6 @@ class ReportGenerator:
             ['Txn ID', 'Date', 'Flat No', 'Category', 'Description', 'Amount (Rs)', 'Payment Mode']
         ]
         
-        # Sort transactions by date
-        payment_transactions.sort(key=lambda x: x.date)
-        
         # Add transaction rows
         for transaction in payment_transactions:
             detailed_table_data.append([
@@ -1177,39 +946,13 @@ class ReportGenerator:
         
         # Create detailed transactions table with improved styling
         detailed_table = Table(detailed_table_data, repeatRows=1)
-        detailed_table.setStyle(TableStyle([
-            # Header row styling
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            
-            # Data rows styling
-            ('BACKGROUND', (0, 1), (-1, -2), colors.beige),
-            ('TEXTCOLOR', (0, 1), (-1, -2), colors.black),
-            ('FONTNAME', (0, 1), (-1, -2), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -2), 8),
-            
-            # Totals row styling
-            ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-            ('FONTNAME', (4, -1), (5, -1), 'Helvetica-Bold'),  # Bold for totals
-            ('FONTNAME', (0, -1), (3, -1), 'Helvetica'),  # Normal for empty cells in totals row
-            
-            # Grid styling
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('ALIGN', (5, 0), (5, -1), 'RIGHT'),  # Right align amount column
-            
-            # Alternate row coloring for better readability
-            ('ROWBACKGROUNDS', (0, 1), (-1, -2), [colors.beige, colors.Color(0.9, 0.85, 0.8)]),
-        ]))
+        detailed_table.setStyle(self.theme.table_style(amount_columns=(5, 5), totals_bold=(4, 5)))
         
         story.append(detailed_table)
         
-        # Build PDF with custom header and footer
-        doc.build(story, onFirstPage=lambda canvas, doc: self.add_header_footer(canvas, doc, society_info, generated_by), 
-                  onLaterPages=lambda canvas, doc: self.add_header_footer(canvas, doc, society_info, generated_by))
+        # Build PDF with the shared header/footer form
+        page_decorator = self.theme.page_decorator(society_info, generated_by)
+        doc.build(story, onFirstPage=page_decorator, onLaterPages=page_decorator)
         
         return file_path
     
@@ -1240,22 +983,10 @@ class ReportGenerator:
         story = []
         
         # Get styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=16,
-            spaceAfter=30,
-            alignment=1  # Center alignment
-        )
-        
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=14,
-            spaceAfter=15
-        )
-        
+        styles = self.theme.styles
+        title_style = self.theme.title_style
+        heading_style = self.theme.heading_style
+
         # Add report title
         story.append(Paragraph("EXPENSE SUMMARY REPORT", title_style))
         
@@ -1269,27 +1000,11 @@ class ReportGenerator:
         story.append(Spacer(1, 0.2*inch))
         
         # Get expense transactions
-        if start_date and end_date:
-            all_transactions = self.ledger_manager.get_transactions_by_date_range(start_date, end_date)
-        else:
-            all_transactions = self.ledger_manager.get_all_transactions()
-        
-        # Filter only expense transactions
-        expense_transactions = [txn for txn in all_transactions if txn.transaction_type == 'Expense']
+        expense_transactions = self.get_transactions_of_type('Expense', start_date, end_date)
         
-        # Group expenses by category
-        category_totals = {}
-        total_expenses = 0
-        
-        for transaction in expense_transactions:
-            category = transaction.category
-            amount = transaction.debit
-            
-            if category not in category_totals:
-                category_totals[category] = 0
-            
-            category_totals[category] += amount
-            total_expenses += amount
+        # Category totals are grouped in SQL rather than from the transaction list
+        category_totals = self.aggregator.category_totals('Expense', start_date, end_date)
+        total_expenses = sum(amount for _, amount in category_totals)
         
         # Add summary section
         story.append(Paragraph("Expense Summary by Category", heading_style))
@@ -1300,7 +1015,7 @@ class ReportGenerator:
         ]
         
         # Add category rows
-        for category, total in category_totals.items():
+        for category, total in category_totals:
             summary_table_data.append([category, f"{total:.2f}"])
         
         # Add totals row
@@ -1308,29 +1023,7 @@ class ReportGenerator:
         
         # Create summary table with improved styling
         summary_table = Table(summary_table_data, repeatRows=1)
-        summary_table.setStyle(TableStyle([
-            # Header row styling
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            
-            # Data rows styling
-            ('BACKGROUND', (0, 1), (-1, -2), colors.beige),
-            ('TEXTCOLOR', (0, 1), (-1, -2), colors.black),
-            ('FONTNAME', (0, 1), (-1, -2), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -2), 8),
-            
-            # Totals row styling
-            ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-            
-            # Grid styling
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),  # Right align amount column
-        ]))
+        summary_table.setStyle(self.theme.table_style(amount_columns=(1, 1), totals_bold=(0, -1), striped=False))
         
         story.append(summary_table)
         story.append(Spacer(1, 0.3*inch))
@@ -1343,9 +1036,6 @@ class ReportGenerator:
             ['Txn ID', 'Date', 'Category', 'Description', 'Amount (Rs)', 'Payment Mode', 'Entered By']
         ]
         
-        # Sort transactions by date
-        expense_transactions.sort(key=lambda x: x.date)
-        
         # Add transaction rows
         for transaction in expense_transactions:
             detailed_table_data.append([
@@ -1365,41 +1055,144 @@ class ReportGenerator:
         
         # Create detailed transactions table with improved styling
         detailed_table = Table(detailed_table_data, repeatRows=1)
-        detailed_table.setStyle(TableStyle([
-            # Header row styling
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            
-            # Data rows styling
-            ('BACKGROUND', (0, 1), (-1, -2), colors.beige),
-            ('TEXTCOLOR', (0, 1), (-1, -2), colors.black),
-            ('FONTNAME', (0, 1), (-1, -2), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -2), 8),
-            
-            # Totals row styling
-            ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-            ('FONTNAME', (3, -1), (4, -1), 'Helvetica-Bold'),  # Bold for totals
-            ('FONTNAME', (0, -1), (2, -1), 'Helvetica'),  # Normal for empty cells in totals row
-            
-            # Grid styling
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('ALIGN', (4, 0), (4, -1), 'RIGHT'),  # Right align amount column
-            
-            # Alternate row coloring for better readability
-            ('ROWBACKGROUNDS', (0, 1), (-1, -2), [colors.beige, colors.Color(0.9, 0.85, 0.8)]),
-        ]))
+        detailed_table.setStyle(self.theme.table_style(amount_columns=(4, 4), totals_bold=(3, 4)))
         
         story.append(detailed_table)
         
-        # Build PDF with custom header and footer
-        doc.build(story, onFirstPage=lambda canvas, doc: self.add_header_footer(canvas, doc, society_info, generated_by), 
-                  onLaterPages=lambda canvas, doc: self.add_header_footer(canvas, doc, society_info, generated_by))
+        # Build PDF with the shared header/footer form
+        page_decorator = self.theme.page_decorator(society_info, generated_by)
+        doc.build(story, onFirstPage=page_decorator, onLaterPages=page_decorator)
         
         return file_path
+    
+    def generate_report_pack(self, generated_by, report_names=None, start_date=None, end_date=None,
+                             max_workers=None, pack_name=None, progress_callback=None):
+        """
+        Generate several reports in parallel into one dated folder (the month-end pack).
+        
+        All reports read from one snapshot of the database taken at the start, so
+        they agree with each other even if the ledger changes while they run.
+        
+        Args:
+            generated_by (str): Username printed in the report footers
+            report_names (list): Keys of REPORT_PACK_REPORTS (default: all of them)
+            start_date (date): Start of the reporting period
+            end_date (date): End of the reporting period
+            max_workers (int): Number of worker processes (default: one per report, capped at the CPU count)
+            pack_name (str): Folder name under reports/ (default: month_end_<end date>); a
+                _2, _3, ... suffix is added when the folder already exists
+            progress_callback (callable): Called with (reports done, report count) before
+                the first and after every finished report; an exception raised from it
+                cancels the reports not started yet and removes the pack folder
+        
+        Returns:
+            dict: Manifest with the pack folder, total time and per-report file, status and timing
+        """
+        report_names = list(report_names or REPORT_PACK_REPORTS)
+        unknown = [name for name in report_names if name not in REPORT_PACK_REPORTS]
+        if unknown:
+            raise ValueError(f"Unknown report(s): {', '.join(unknown)}")
+        
+        started_at = datetime.now()
+        if not pack_name:
+            pack_name = f"month_end_{(end_date or date.today()).strftime('%Y-%m-%d')}"
+        # Claim the folder atomically: packs for the same end date can run side by
+        # side on the report job queue, so a name is only ours once makedirs succeeds
+        base_name = pack_name
+        suffix = 1
+        while True:
+            pack_dir = os.path.join("reports", pack_name)
+            try:
+                os.makedirs(pack_dir)
+                break
+            except FileExistsError:
+                suffix += 1
+                pack_name = f"{base_name}_{suffix}"
+        
+        snapshot_dir = tempfile.mkdtemp(prefix="report_pack_")
+        snapshot_path = os.path.join(snapshot_dir, "snapshot.db")
+        try:
+            if progress_callback:
+                progress_callback(0, len(report_names))
+            
+            # Consistent point-in-time copy shared by every worker
+            source = sqlite3.connect(self.db_path)
+            target = sqlite3.connect(snapshot_path)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+            
+            if max_workers is None:
+                max_workers = min(len(report_names), os.cpu_count() or 1)
+            
+            results = {}
+            with ProcessPoolExecutor(max_workers=max(1, max_workers)) as executor:
+                futures = {}
+                for name in report_names:
+                    method_name, uses_dates = REPORT_PACK_REPORTS[name]
+                    kwargs = {'file_name': os.path.join(pack_name, f"{name}.pdf")}
+                    if uses_dates:
+                        kwargs['start_date'] = start_date
+                        kwargs['end_date'] = end_date
+                    futures[executor.submit(_generate_pack_report, snapshot_path, method_name,
+                                            generated_by, kwargs)] = name
+                
+                try:
+                    for future in as_completed(futures):
+                        name = futures[future]
+                        try:
+                            file_path, seconds = future.result()
+                            results[name] = {'report': name, 'status': 'ok', 'file': file_path,
+                                             'seconds': round(seconds, 3)}
+                        except Exception as e:
+                            results[name] = {'report': name, 'status': 'failed', 'error': str(e)}
+                        if progress_callback:
+                            progress_callback(len(results), len(report_names))
+                except Exception:
+                    # Don't start the reports still queued; running ones finish on exit
+                    for future in futures:
+                        future.cancel()
+                    raise
+        except Exception:
+            # Interrupted (e.g. cancelled from progress_callback): drop the partial pack
+            shutil.rmtree(pack_dir, ignore_errors=True)
+            raise
+        finally:
+            shutil.rmtree(snapshot_dir, ignore_errors=True)
+        
+        manifest = {
+            'folder': pack_dir,
+            'generated_by': generated_by,
+            'generated_at': started_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'start_date': str(start_date) if start_date else None,
+            'end_date': str(end_date) if end_date else None,
+            'total_seconds': round((datetime.now() - started_at).total_seconds(), 3),
+            'reports': [results[name] for name in report_names],
+        }
+        with open(os.path.join(pack_dir, "manifest.json"), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        
+        return manifest
+    
+    def generate_dues_statements(self, generated_by, start_date=None, end_date=None, **kwargs):
+        """
+        Generate one dues statement PDF per flat (see DuesStatementGenerator.generate_statements)
+        """
+        from models.dues_statements import DuesStatementGenerator
+        return DuesStatementGenerator(self.db_path).generate_statements(
+            generated_by, start_date=start_date, end_date=end_date, **kwargs
+        )
+
+
+def _generate_pack_report(db_path, method_name, generated_by, kwargs):
+    """Generate one report of a pack in a worker process; returns (file path, seconds taken)"""
+    started = time.perf_counter()
+    report_generator = ReportGenerator(db_path)
+    file_path = getattr(report_generator, method_name)(generated_by, **kwargs)
+    return file_path, time.perf_counter() - started
+
 
 def generate_ledger_pdf(generated_by):
     """
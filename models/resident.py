@@ -1,18 +1,22 @@
 # models/resident.py
+import threading
 from datetime import datetime
 from utils.db_context import get_db_connection
 from utils.database_exceptions import DatabaseError
 from utils.audit_logger import audit_logger
 from utils.security import get_user_id
-from models.vehicle import VehicleManager
+from models.vehicle import VehicleManager, split_vehicle_numbers
 from models.domestic_help import DomesticHelpManager
+from models.resident_search import ResidentSearchIndex
+from utils import resident_utils
 
 
 class Resident:
     def __init__(self, resident_id, flat_no, name, resident_type, mobile_no, email, date_joining, 
                  cars, scooters, parking_slot, car_numbers, scooter_numbers, monthly_charges, status, remarks,
                  profile_photo_path=None, vacancy_reason=None, expected_occupancy_date=None, 
-                 last_maintenance_date=None, maintenance_person_name=None, maintenance_person_phone=None):
+                 last_maintenance_date=None, maintenance_person_name=None, maintenance_person_phone=None,
+                 flat_sort_key=None):
         self.id = resident_id
         self.flat_no = flat_no
         self.name = name
@@ -34,76 +38,222 @@ class Resident:
         self.last_maintenance_date = last_maintenance_date
         self.maintenance_person_name = maintenance_person_name
         self.maintenance_person_phone = maintenance_person_phone
+        # Natural order of the flat number, as stored in residents.flat_sort_key
+        self.flat_sort_key = flat_sort_key if flat_sort_key is not None else resident_utils.flat_sort_key(flat_no)
+
+
+class ResidentDetails:
+    """A resident together with their vehicles and domestic help."""
+    
+    def __init__(self, resident, vehicles, domestic_help):
+        self.resident = resident
+        self.vehicles = vehicles
+        self.domestic_help = domestic_help
+
+
+class ResidentDirectory:
+    """All residents of one database in flat order, indexed by id and flat number."""
+    
+    def __init__(self, residents):
+        # Already in natural flat order ("A-2" before "A-10"), ties broken by id
+        self.residents = residents
+        self.by_id = {resident.id: resident for resident in self.residents}
+        self.by_flat = {}
+        for resident in self.residents:
+            if resident.flat_no:
+                # The first of a flat's residents is the one with the lowest id
+                self.by_flat.setdefault(resident.flat_no, resident)
+        self.flat_numbers = list(self.by_flat)
+
+
+# Databases whose residents.flat_sort_key column has been checked in this process
+_initialized_paths = set()
+_init_lock = threading.Lock()
+
+# In-process resident directories, one per database path.
+# Dropped through invalidate_resident_cache() whenever a resident is added, changed or deleted.
+_resident_directories = {}
+_resident_directory_lock = threading.Lock()
+# Bumped on every invalidation, so a directory loaded before a change is never cached
+_resident_directory_generation = 0
+
+
+def invalidate_resident_cache(db_path=None):
+    """Drop the cached resident directory of a database (or of every database)"""
+    global _resident_directory_generation
+    with _resident_directory_lock:
+        _resident_directory_generation += 1
+        if db_path is None:
+            _resident_directories.clear()
+        else:
+            _resident_directories.pop(db_path, None)
 
 
 class ResidentManager:
     def __init__(self, db_path="society_management.db"):
         self.db_path = db_path
+        self.vehicle_manager = VehicleManager(db_path)
         self.domestic_help_manager = DomesticHelpManager(db_path)
+        self.search_index = ResidentSearchIndex(db_path)
     
-    def get_all_residents(self):
+    def ensure_initialized(self):
+        """
+        Set up the flat_sort_key column once per process.
+        
+        Returns:
+            bool: True if residents can be ordered by flat_sort_key (False without a residents table)
+        """
+        if self.db_path in _initialized_paths:
+            return True
+        
+        with _init_lock:
+            if self.db_path in _initialized_paths:
+                return True
+            if not self.init_flat_sort_keys():
+                return False
+            _initialized_paths.add(self.db_path)
+            return True
+    
+    def init_flat_sort_keys(self):
+        """
+        Add the flat_sort_key column and its index, and fill in the key of every resident
+        whose stored key does not match their flat number (e.g. rows written by other tools).
+        
+        Returns:
+            bool: False if there is no residents table
+        """
         try:
             with get_db_connection(self.db_path) as conn:
                 cursor = conn.cursor()
-                
-                cursor.execute('''
-                    SELECT id, flat_no, name, resident_type, mobile_no, email, date_joining,
-                           cars, scooters, parking_slot, car_numbers, scooter_numbers, monthly_charges, status, remarks,
-                           profile_photo_path, vacancy_reason, expected_occupancy_date, last_maintenance_date, 
-                           maintenance_person_name, maintenance_person_phone
-                    FROM residents
-                ''')
-                
-                rows = cursor.fetchall()
-                
-                residents = []
-                for row in rows:
-                    resident = Resident(
-                        row[0], row[1], row[2], row[3], row[4], row[5], row[6],
-                        row[7], row[8], row[9], row[10], row[11], row[12], row[13], row[14],
-                        row[15], row[16], row[17], row[18], row[19], row[20]
-                    )
-                    residents.append(resident)
-                
-                return residents
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'residents'")
+                if cursor.fetchone() is None:
+                    return False
+                
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.execute("PRAGMA table_info(residents)")
+                if 'flat_sort_key' not in [row[1] for row in cursor.fetchall()]:
+                    cursor.execute("ALTER TABLE residents ADD COLUMN flat_sort_key TEXT")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_residents_flat_sort ON residents(flat_sort_key, id)")
+                
+                stale = []
+                cursor.execute("SELECT id, flat_no, flat_sort_key FROM residents")
+                for resident_id, flat_no, stored_key in cursor.fetchall():
+                    key = resident_utils.flat_sort_key(flat_no)
+                    if key != stored_key:
+                        stale.append((key, resident_id))
+                cursor.executemany("UPDATE residents SET flat_sort_key = ? WHERE id = ?", stale)
+                conn.commit()
+            return True
         except DatabaseError:
-            # Re-raise database errors
             raise
         except Exception as e:
-            # Wrap unexpected errors in DatabaseError
-            raise DatabaseError("Failed to retrieve residents", original_error=e)
+            raise DatabaseError("Failed to initialize flat sort keys", original_error=e)
     
-    def get_resident_by_id(self, resident_id):
+    def get_directory(self):
+        """
+        Get the shared resident directory, reading the database only on a cache miss.
+        The Resident objects are shared between callers and must not be modified.
+        
+        Returns:
+            ResidentDirectory: Residents in flat order with id and flat number indexes
+        """
+        with _resident_directory_lock:
+            directory = _resident_directories.get(self.db_path)
+            generation = _resident_directory_generation
+        if directory:
+            return directory
+        
         try:
+            self.ensure_initialized()
             with get_db_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
+                # Walks idx_residents_flat_sort, so the rows arrive in flat order without sorting
                 cursor.execute('''
                     SELECT id, flat_no, name, resident_type, mobile_no, email, date_joining,
                            cars, scooters, parking_slot, car_numbers, scooter_numbers, monthly_charges, status, remarks,
                            profile_photo_path, vacancy_reason, expected_occupancy_date, last_maintenance_date, 
-                           maintenance_person_name, maintenance_person_phone
-                    FROM residents WHERE id = ?
-                ''', (resident_id,))
-                
-                row = cursor.fetchone()
+                           maintenance_person_name, maintenance_person_phone, flat_sort_key
+                    FROM residents
+                    ORDER BY flat_sort_key, id
+                ''')
                 
-                if row:
-                    return Resident(
-                        row[0], row[1], row[2], row[3], row[4], row[5], row[6],
-                        row[7], row[8], row[9], row[10], row[11], row[12], row[13], row[14],
-                        row[15], row[16], row[17], row[18], row[19], row[20]
-                    )
-                return None
+                directory = ResidentDirectory([Resident(*row) for row in cursor.fetchall()])
         except DatabaseError:
             # Re-raise database errors
             raise
         except Exception as e:
             # Wrap unexpected errors in DatabaseError
-            raise DatabaseError("Failed to retrieve resident", original_error=e)
+            raise DatabaseError("Failed to retrieve residents", original_error=e)
+        
+        with _resident_directory_lock:
+            if generation == _resident_directory_generation:
+                _resident_directories[self.db_path] = directory
+        return directory
+    
+    def get_all_residents(self):
+        """Get all residents, sorted by flat number"""
+        return list(self.get_directory().residents)
+    
+    def get_resident_by_id(self, resident_id):
+        return self.get_directory().by_id.get(resident_id)
+    
+    def get_resident_by_flat(self, flat_no):
+        """Get the resident of a flat, or None"""
+        return self.get_directory().by_flat.get(flat_no)
+    
+    def get_flat_numbers(self):
+        """Get the unique flat numbers, sorted naturally"""
+        return list(self.get_directory().flat_numbers)
+    
+    def get_resident_details(self, resident_ids):
+        """
+        Load residents with their vehicles and domestic help. The residents come from the
+        cached directory and their vehicles and domestic help from one query each (per 500
+        residents), however many residents are asked for. Profile photos are not resolved
+        here; the GUI loads them through its thumbnail service.
+        
+        Args:
+            resident_ids (list): Ids of the residents to load
+        
+        Returns:
+            dict: Resident id -> ResidentDetails, in the order of resident_ids (unknown ids are left out)
+        """
+        directory = self.get_directory()
+        residents = [directory.by_id[resident_id] for resident_id in dict.fromkeys(resident_ids)
+                     if resident_id in directory.by_id]
+        if not residents:
+            return {}
+        
+        ids = [resident.id for resident in residents]
+        self.vehicle_manager.ensure_initialized()
+        vehicles = self.vehicle_manager.get_vehicles_by_residents(ids)
+        domestic_help = self.domestic_help_manager.get_domestic_help_by_residents(ids)
+        return {
+            resident.id: ResidentDetails(resident, vehicles[resident.id], domestic_help[resident.id])
+            for resident in residents
+        }
     
     def search_residents(self, search_term):
+        """
+        Search residents by flat, name, mobile, email, vehicle number or domestic help name.
+        
+        Args:
+            search_term (str): Words to look for; slightly misspelt words still match
+        
+        Returns:
+            list: Matching Resident objects, best matches first
+        """
+        if not search_term.strip():
+            return self.get_all_residents()
+        if self.search_index.ensure_initialized():
+            directory = self.get_directory()
+            hits = self.search_index.search(search_term, limit=-1)
+            return [directory.by_id[hit.resident_id] for hit in hits if hit.resident_id in directory.by_id]
+        
+        # Without FTS5, fall back to a LIKE scan
         try:
+            self.ensure_initialized()
             with get_db_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
@@ -112,9 +262,10 @@ class ResidentManager:
                     SELECT id, flat_no, name, resident_type, mobile_no, email, date_joining,
                            cars, scooters, parking_slot, car_numbers, scooter_numbers, monthly_charges, status, remarks,
                            profile_photo_path, vacancy_reason, expected_occupancy_date, last_maintenance_date, 
-                           maintenance_person_name, maintenance_person_phone
+                           maintenance_person_name, maintenance_person_phone, flat_sort_key
                     FROM residents
                     WHERE flat_no LIKE ? OR name LIKE ? OR mobile_no LIKE ? OR email LIKE ?
+                    ORDER BY flat_sort_key, id
                 ''', (search_pattern, search_pattern, search_pattern, search_pattern))
                 
                 rows = cursor.fetchall()
@@ -124,7 +275,7 @@ class ResidentManager:
                     resident = Resident(
                         row[0], row[1], row[2], row[3], row[4], row[5], row[6],
                         row[7], row[8], row[9], row[10], row[11], row[12], row[13], row[14],
-                        row[15], row[16], row[17], row[18], row[19], row[20]
+                        row[15], row[16], row[17], row[18], row[19], row[20], row[21]
                     )
                     residents.append(resident)
                 
@@ -149,6 +300,7 @@ class ResidentManager:
             list: List of Resident objects matching the criteria
         """
         try:
+            self.ensure_initialized()
             with get_db_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
@@ -157,7 +309,7 @@ class ResidentManager:
                     SELECT id, flat_no, name, resident_type, mobile_no, email, date_joining,
                            cars, scooters, parking_slot, car_numbers, scooter_numbers, monthly_charges, status, remarks,
                            profile_photo_path, vacancy_reason, expected_occupancy_date, last_maintenance_date, 
-                           maintenance_person_name, maintenance_person_phone
+                           maintenance_person_name, maintenance_person_phone, flat_sort_key
                     FROM residents
                 '''
                 
@@ -167,7 +319,12 @@ class ResidentManager:
                 
                 if filters:
                     # Text search
-                    if filters.get('search_term'):
+                    if filters.get('search_term') and self.search_index.ensure_initialized():
+                        resident_ids = [hit.resident_id for hit in
+                                        self.search_index.search(filters['search_term'], limit=-1, fuzzy=False)]
+                        where_conditions.append(f"id IN ({', '.join('?' * len(resident_ids)) or 'NULL'})")
+                        params.extend(resident_ids)
+                    elif filters.get('search_term'):
                         search_pattern = f"%{filters['search_term']}%"
                         where_conditions.append('''
                             (flat_no LIKE ? OR name LIKE ? OR mobile_no LIKE ? OR email LIKE ?)
@@ -219,7 +376,8 @@ class ResidentManager:
                 if where_conditions:
                     query += ' WHERE ' + ' AND '.join(where_conditions)
                 
-                # Add ORDER BY clause
+                # Add ORDER BY clause, natural flat order by default
+                order_by = 'flat_sort_key, id'
                 if sort_by:
                     # Validate sort_by to prevent SQL injection
                     valid_sort_columns = [
@@ -229,7 +387,10 @@ class ResidentManager:
                     if sort_by in valid_sort_columns:
                         # Ensure sort_order is either ASC or DESC
                         order = "ASC" if sort_order.upper() != "DESC" else "DESC"
-                        query += f' ORDER BY {sort_by} {order}'
+                        # Flat numbers sort naturally through their stored key
+                        column = 'flat_sort_key' if sort_by == 'flat_no' else sort_by
+                        order_by = f'{column} {order}'
+                query += f' ORDER BY {order_by}'
                 
                 # Execute query
                 cursor.execute(query, params)
@@ -240,7 +401,7 @@ class ResidentManager:
                     resident = Resident(
                         row[0], row[1], row[2], row[3], row[4], row[5], row[6],
                         row[7], row[8], row[9], row[10], row[11], row[12], row[13], row[14],
-                        row[15], row[16], row[17], row[18], row[19], row[20]
+                        row[15], row[16], row[17], row[18], row[19], row[20], row[21]
                     )
                     residents.append(resident)
                 
@@ -257,6 +418,11 @@ class ResidentManager:
                      current_user=None, vacancy_reason=None, expected_occupancy_date=None, 
                      last_maintenance_date=None, maintenance_person_name=None, maintenance_person_phone=None):
         try:
+            self.ensure_initialized()
+            registry = self.vehicle_manager.ensure_initialized()
+            if registry:
+                self._check_vehicle_numbers(None, car_numbers, scooter_numbers)
+            
             with get_db_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
@@ -267,15 +433,18 @@ class ResidentManager:
                     INSERT INTO residents (flat_no, name, resident_type, mobile_no, email, date_joining,
                                           cars, scooters, parking_slot, car_numbers, scooter_numbers, monthly_charges, status, remarks,
                                           vacancy_reason, expected_occupancy_date, last_maintenance_date, 
-                                          maintenance_person_name, maintenance_person_phone)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                                          maintenance_person_name, maintenance_person_phone, flat_sort_key)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (flat_no, name, resident_type, mobile_no, email, date_joining,
                       cars, scooters, parking_slot, car_numbers, scooter_numbers, fixed_charges, status, remarks,
                       vacancy_reason, expected_occupancy_date, last_maintenance_date, 
-                      maintenance_person_name, maintenance_person_phone))
+                      maintenance_person_name, maintenance_person_phone, resident_utils.flat_sort_key(flat_no)))
+                resident_id = cursor.lastrowid
+                if registry:
+                    self.vehicle_manager.sync_resident_numbers(cursor, resident_id, car_numbers, scooter_numbers)
                 
                 conn.commit()
-                resident_id = cursor.lastrowid
+                invalidate_resident_cache(self.db_path)
                 
                 # Log the action
                 user_id = get_user_id(current_user) if current_user else None
@@ -325,6 +494,10 @@ class ResidentManager:
         try:
             # First get the old values for logging
             old_resident = self.get_resident_by_id(resident_id)
+            self.ensure_initialized()
+            registry = self.vehicle_manager.ensure_initialized()
+            if registry:
+                self._check_vehicle_numbers(resident_id, car_numbers, scooter_numbers)
             
             with get_db_connection(self.db_path) as conn:
                 cursor = conn.cursor()
@@ -336,14 +509,18 @@ class ResidentManager:
                     UPDATE residents SET flat_no=?, name=?, resident_type=?, mobile_no=?, email=?, date_joining=?,
                                         cars=?, scooters=?, parking_slot=?, car_numbers=?, scooter_numbers=?, monthly_charges=?, status=?, remarks=?,
                                         vacancy_reason=?, expected_occupancy_date=?, last_maintenance_date=?, 
-                                        maintenance_person_name=?, maintenance_person_phone=?
+                                        maintenance_person_name=?, maintenance_person_phone=?, flat_sort_key=?
                     WHERE id=?
                 ''', (flat_no, name, resident_type, mobile_no, email, date_joining,
                       cars, scooters, parking_slot, car_numbers, scooter_numbers, fixed_charges, status, remarks,
                       vacancy_reason, expected_occupancy_date, last_maintenance_date, 
-                      maintenance_person_name, maintenance_person_phone, resident_id))
+                      maintenance_person_name, maintenance_person_phone, resident_utils.flat_sort_key(flat_no),
+                      resident_id))
+                if registry:
+                    self.vehicle_manager.sync_resident_numbers(cursor, resident_id, car_numbers, scooter_numbers)
                 
                 conn.commit()
+                invalidate_resident_cache(self.db_path)
                 
                 # Log the action
                 user_id = get_user_id(current_user) if current_user else None
@@ -413,13 +590,18 @@ class ResidentManager:
         try:
             # First get the resident details for logging
             resident = self.get_resident_by_id(resident_id)
+            registry = self.vehicle_manager.ensure_initialized()
             
             with get_db_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute('DELETE FROM residents WHERE id=?', (resident_id,))
+                if registry:
+                    # Free the resident's registration numbers for other flats
+                    cursor.execute('DELETE FROM vehicles WHERE resident_id=?', (resident_id,))
                 
                 conn.commit()
+                invalidate_resident_cache(self.db_path)
                 
                 # Log the action
                 user_id = get_user_id(current_user) if current_user else None
@@ -462,6 +644,28 @@ class ResidentManager:
             # Wrap unexpected errors in DatabaseError
             raise DatabaseError("Failed to delete resident", original_error=e)
     
+    def _check_vehicle_numbers(self, resident_id, car_numbers, scooter_numbers):
+        """Raise DatabaseError if one of the numbers is registered to another flat"""
+        conflicts = self.vehicle_manager.find_plate_conflicts(
+            resident_id, split_vehicle_numbers(car_numbers) + split_vehicle_numbers(scooter_numbers))
+        if conflicts:
+            number, flat_no = conflicts[0]
+            raise DatabaseError(f"Vehicle {number} is already registered to flat {flat_no}")
+    
+    def find_residents_by_vehicle(self, registration_number):
+        """
+        Find the residents a vehicle is registered to (spaces, hyphens and case are ignored).
+        
+        Returns:
+            list: Resident objects
+        """
+        directory = self.get_directory()
+        if self.vehicle_manager.ensure_initialized():
+            vehicle = self.vehicle_manager.find_vehicle_by_plate(registration_number)
+            return [directory.by_id[vehicle.resident_id]] if vehicle and vehicle.resident_id in directory.by_id else []
+        return [directory.by_id[resident_id] for resident_id in self.search_index.find_by_plate(registration_number)
+                if resident_id in directory.by_id]
+    
     def get_domestic_help_by_resident(self, resident_id):
         """Get all domestic help for a specific resident."""
         return self.domestic_help_manager.get_domestic_help_by_resident(resident_id)
\ No newline at end of file
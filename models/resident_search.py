@@ -0,0 +1,388 @@
+# models/resident_search.py
+"""
+Full-text search over residents for the Society Management System.
+
+resident_search_index is an FTS5 table with one row per resident (rowid =
+residents.id) holding the flat number, name, mobile number, email, vehicle
+registration numbers and domestic help names. It uses the trigram tokenizer,
+so any part of a word matches ("sha" finds "Sharma", "1234" finds
+"MH12AB1234") through the index instead of a LIKE '%term%' scan. Registration
+numbers are stored upper-cased without spaces or hyphens, so "mh 12-ab" and
+"MH12AB" find the same vehicle.
+
+Triggers on residents, vehicles and domestic_help rewrite a resident's row on
+every change. The index is created and filled the first time it is used,
+and refilled when its triggers change (for example once a vehicles table
+exists). Run `python -m models.resident_search --rebuild` to rebuild it.
+
+Searches for misspelt words that find nothing fall back to matching on
+shared trigrams, scored by similarity, so "Sharam" still finds "Sharma".
+Terms containing digits are only matched exactly.
+"""
+
+import re
+import sys
+import threading
+from collections import namedtuple
+from difflib import SequenceMatcher
+from utils.db_context import get_db_connection
+from utils.database_exceptions import DatabaseError
+from models.vehicle import normalize_plate
+
+
+# Databases whose search index and triggers have been set up in this process
+_initialized_paths = set()
+_init_lock = threading.Lock()
+
+INDEX_COLUMNS = ('flat_no', 'name', 'mobile_no', 'email', 'plates', 'helpers')
+
+# bm25 weight per column, in INDEX_COLUMNS order: a hit on the flat or a plate ranks first
+COLUMN_WEIGHTS = (10.0, 5.0, 3.0, 2.0, 8.0, 1.0)
+
+# Trigram tokens need three characters; shorter words are matched with LIKE
+MIN_TOKEN_LENGTH = 3
+
+# Minimum similarity (0-1) for a misspelt word to count as a match
+FUZZY_THRESHOLD = 0.7
+
+# One ranked hit: fuzzy is True when it was found by the misspelling fallback
+SearchHit = namedtuple('SearchHit', ['resident_id', 'rank', 'fuzzy'])
+
+
+def _plates_sql(column):
+    # Newline-separated numbers become space-separated normalized numbers
+    return (f"upper(replace(replace(replace(replace({column}, char(13), ''), ' ', ''), '-', ''), "
+            f"char(10), ' '))")
+
+
+def document_matches(document, search_term):
+    """
+    Check a document from get_documents() against a search term the way search() does
+    (without the misspelling fallback), so earlier results can be narrowed in memory.
+    """
+    for word in search_term.lower().split():
+        if word not in document and normalize_plate(word).lower() not in document:
+            return False
+    return True
+
+
+def _fts_string(text):
+    """Quote text as an FTS5 string"""
+    return '"' + text.replace('"', '""') + '"'
+
+
+class ResidentSearchIndex:
+    def __init__(self, db_path="society_management.db"):
+        self.db_path = db_path
+
+    def ensure_initialized(self):
+        """
+        Create the search index and its triggers once per process.
+
+        Returns:
+            bool: True if the index is available (False without a residents table or FTS5)
+        """
+        if self.db_path in _initialized_paths:
+            return True
+
+        with _init_lock:
+            if self.db_path in _initialized_paths:
+                return True
+            if not self.init_search_index():
+                return False
+            _initialized_paths.add(self.db_path)
+            return True
+
+    def _document_sql(self, sources, where):
+        """INSERT ... SELECT that writes the index rows of the residents matching where"""
+        plates = [_plates_sql('r.car_numbers'), _plates_sql('r.scooter_numbers')]
+        if 'vehicles' in sources:
+            plates.append(f"(SELECT group_concat({_plates_sql('v.registration_number')}, ' ') "
+                          f"FROM vehicles v WHERE v.resident_id = r.id)")
+        helpers = "''"
+        if 'domestic_help' in sources:
+            helpers = "(SELECT group_concat(d.name, ' ') FROM domestic_help d WHERE d.resident_id = r.id)"
+
+        plates_sql = " || ' ' || ".join(f"COALESCE({plate}, '')" for plate in plates)
+        return f'''
+                    INSERT INTO resident_search_index (rowid, {', '.join(INDEX_COLUMNS)})
+                    SELECT r.id, r.flat_no, r.name, r.mobile_no, r.email, trim({plates_sql}), COALESCE({helpers}, '')
+                    FROM residents r WHERE {where};'''
+
+    def _refresh_sql(self, sources, resident_id):
+        return f'''
+                    DELETE FROM resident_search_index WHERE rowid = {resident_id};{self._document_sql(sources, f"r.id = {resident_id}")}'''
+
+    def _trigger_sql(self, sources):
+        """The CREATE TRIGGER statement for every trigger that keeps the index in sync"""
+        triggers = {
+            'resident_search_insert': f'''CREATE TRIGGER resident_search_insert AFTER INSERT ON residents
+                BEGIN{self._refresh_sql(sources, 'NEW.id')}
+                END''',
+            'resident_search_update': f'''CREATE TRIGGER resident_search_update
+                AFTER UPDATE OF id, flat_no, name, mobile_no, email, car_numbers, scooter_numbers ON residents
+                BEGIN
+                    DELETE FROM resident_search_index WHERE rowid = OLD.id;{self._refresh_sql(sources, 'NEW.id')}
+                END''',
+            'resident_search_delete': '''CREATE TRIGGER resident_search_delete AFTER DELETE ON residents
+                BEGIN
+                    DELETE FROM resident_search_index WHERE rowid = OLD.id;
+                END''',
+        }
+        for table, columns in (('vehicles', 'resident_id, registration_number'),
+                               ('domestic_help', 'resident_id, name')):
+            if table not in sources:
+                continue
+            triggers[f'resident_search_{table}_insert'] = f'''CREATE TRIGGER resident_search_{table}_insert
+                AFTER INSERT ON {table}
+                BEGIN{self._refresh_sql(sources, 'NEW.resident_id')}
+                END'''
+            triggers[f'resident_search_{table}_update'] = f'''CREATE TRIGGER resident_search_{table}_update
+                AFTER UPDATE OF {columns} ON {table}
+                BEGIN{self._refresh_sql(sources, 'OLD.resident_id')}{self._refresh_sql(sources, 'NEW.resident_id')}
+                END'''
+            triggers[f'resident_search_{table}_delete'] = f'''CREATE TRIGGER resident_search_{table}_delete
+                AFTER DELETE ON {table}
+                BEGIN{self._refresh_sql(sources, 'OLD.resident_id')}
+                END'''
+        return triggers
+
+    def init_search_index(self, rebuild=False):
+        """
+        Initialize the search index and the triggers that maintain it.
+        Triggers are only rewritten when they differ from the current definition
+        (for example once a vehicles table exists), and the index is then rebuilt.
+
+        Args:
+            rebuild (bool): Refill the index even if it is up to date
+
+        Returns:
+            bool: False if there is no residents table or SQLite was built without FTS5
+        """
+        try:
+            with get_db_connection(self.db_path) as conn:
+                cursor = conn.cursor()
+
+                cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name IN "
+                               "('residents', 'vehicles', 'domestic_help', 'resident_search_index')")
+                existing = {row[0] for row in cursor.fetchall()}
+                if 'residents' not in existing:
+                    return False
+
+                cursor.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'resident_search_%'")
+                current = {row[0]: row[1] for row in cursor.fetchall()}
+                wanted = self._trigger_sql(existing)
+                changed = current != wanted
+                if 'resident_search_index' in existing and not changed and not rebuild:
+                    return True
+
+                cursor.execute('BEGIN IMMEDIATE')
+
+                try:
+                    cursor.execute(f'''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS resident_search_index
+                    USING fts5({', '.join(INDEX_COLUMNS)}, tokenize = 'trigram')
+                    ''')
+                except Exception as e:
+                    if 'no such module' in str(e) or 'no such tokenizer' in str(e):
+                        conn.rollback()
+                        return False
+                    raise
+
+                if changed:
+                    for name in current:
+                        cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+                    for sql in wanted.values():
+                        cursor.execute(sql)
+
+                cursor.execute('DELETE FROM resident_search_index')
+                cursor.execute(self._document_sql(existing, '1'))
+
+                conn.commit()
+                return True
+        except DatabaseError:
+            raise
+        except Exception as e:
+            raise DatabaseError("Failed to initialize resident search index", original_error=e)
+
+    def rebuild(self):
+        """
+        Rebuild the search index from the residents, vehicles and domestic_help tables.
+
+        Returns:
+            int: Number of residents indexed
+        """
+        with _init_lock:
+            _initialized_paths.discard(self.db_path)
+            if not self.init_search_index(rebuild=True):
+                return 0
+            _initialized_paths.add(self.db_path)
+
+        try:
+            with get_db_connection(self.db_path) as conn:
+                return conn.execute("SELECT COUNT(*) FROM resident_search_index").fetchone()[0]
+        except DatabaseError:
+            raise
+        except Exception as e:
+            raise DatabaseError("Failed to rebuild resident search index", original_error=e)
+
+    def search(self, search_term, limit=100, fuzzy=True):
+        """
+        Find residents whose flat, name, mobile, email, vehicle numbers or domestic help
+        contain every word of the search term, best matches first.
+
+        Args:
+            search_term (str): Words to look for (any part of a word matches)
+            limit (int): Maximum number of hits (-1 for all)
+            fuzzy (bool): Fall back to similar words when nothing matches exactly
+
+        Returns:
+            list: SearchHit tuples ordered by rank
+        """
+        words = search_term.split()
+        if not words or not self.ensure_initialized():
+            return []
+
+        match_terms = []
+        like_words = []
+        for word in words:
+            plate = normalize_plate(word)
+            if len(word) >= MIN_TOKEN_LENGTH:
+                term = _fts_string(word)
+                if len(plate) >= MIN_TOKEN_LENGTH and plate != word.upper():
+                    term = f"({term} OR plates : {_fts_string(plate)})"
+                match_terms.append(term)
+            else:
+                like_words.append(word)
+
+        conditions = []
+        params = []
+        if match_terms:
+            conditions.append('resident_search_index MATCH ?')
+            params.append(' AND '.join(match_terms))
+        for word in like_words:
+            # LIKE is case-insensitive for ASCII, and the plates column is upper case
+            conditions.append('(' + ' OR '.join(f'{column} LIKE ?' for column in INDEX_COLUMNS) + ')')
+            params.extend([f'%{word}%'] * len(INDEX_COLUMNS))
+
+        rank = f"bm25(resident_search_index, {', '.join(map(str, COLUMN_WEIGHTS))})" if match_terms else "0"
+        try:
+            with get_db_connection(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute(f'''
+                    SELECT rowid, {rank} AS rank FROM resident_search_index
+                    WHERE {' AND '.join(conditions)}
+                    ORDER BY rank LIMIT ?
+                ''', params + [limit])
+                hits = [SearchHit(row[0], row[1], False) for row in cursor.fetchall()]
+
+                # Numbers (flats, phones, plates) are never "almost" right, so only words are fuzzy-matched
+                if not hits and fuzzy and match_terms and not any(ch.isdigit() for ch in search_term):
+                    hits = self._fuzzy_search(cursor, words, limit)
+                return hits
+        except DatabaseError:
+            raise
+        except Exception as e:
+            raise DatabaseError("Failed to search residents", original_error=e)
+
+    def _fuzzy_search(self, cursor, words, limit):
+        """Candidates sharing trigrams with the words, kept if every word is similar to one in the row"""
+        trigrams = set()
+        for word in words:
+            lowered = word.lower()
+            trigrams.update(lowered[i:i + 3] for i in range(len(lowered) - 2))
+        if not trigrams:
+            return []
+
+        cursor.execute(f'''
+            SELECT rowid, {', '.join(INDEX_COLUMNS)} FROM resident_search_index
+            WHERE resident_search_index MATCH ?
+            ORDER BY bm25(resident_search_index, {', '.join(map(str, COLUMN_WEIGHTS))}) LIMIT ?
+        ''', (' OR '.join(_fts_string(trigram) for trigram in sorted(trigrams)), limit * 5 if limit > 0 else -1))
+
+        scored = []
+        for row in cursor.fetchall():
+            tokens = {token for value in row[1:] if value for token in re.split(r'[\s@.,/\-]+', value.lower()) if token}
+            score = 0.0
+            for word in words:
+                word = word.lower()
+                best = max((SequenceMatcher(None, word, token).ratio() for token in tokens), default=0.0)
+                if best < FUZZY_THRESHOLD:
+                    break
+                score += best
+            else:
+                scored.append(SearchHit(row[0], -score, True))
+
+        scored.sort(key=lambda hit: hit.rank)
+        return scored if limit < 0 else scored[:limit]
+
+    def get_documents(self, resident_ids):
+        """
+        Get the indexed text of residents, lower-cased with the columns joined.
+
+        Returns:
+            dict: resident id -> text, for document_matches()
+        """
+        if not resident_ids or not self.ensure_initialized():
+            return {}
+
+        documents = {}
+        try:
+            with get_db_connection(self.db_path) as conn:
+                cursor = conn.cursor()
+                resident_ids = list(resident_ids)
+                # Stay well below SQLite's bound parameter limit
+                for start in range(0, len(resident_ids), 500):
+                    chunk = resident_ids[start:start + 500]
+                    cursor.execute(f'''
+                        SELECT rowid, {" || ' ' || ".join(f"COALESCE({column}, '')" for column in INDEX_COLUMNS)}
+                        FROM resident_search_index WHERE rowid IN ({', '.join('?' * len(chunk))})
+                    ''', chunk)
+                    documents.update((row[0], row[1].lower()) for row in cursor.fetchall())
+                return documents
+        except DatabaseError:
+            raise
+        except Exception as e:
+            raise DatabaseError("Failed to read resident search index", original_error=e)
+
+    def find_by_plate(self, registration_number):
+        """
+        Find the residents with a vehicle registration number (spaces, hyphens and case ignored).
+
+        Returns:
+            list: Resident ids
+        """
+        plate = normalize_plate(registration_number)
+        if len(plate) < MIN_TOKEN_LENGTH or not self.ensure_initialized():
+            return []
+
+        try:
+            with get_db_connection(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT rowid, plates FROM resident_search_index WHERE resident_search_index MATCH ?
+                ''', (f"plates : {_fts_string(plate)}",))
+                return [row[0] for row in cursor.fetchall() if plate in row[1].split()]
+        except DatabaseError:
+            raise
+        except Exception as e:
+            raise DatabaseError("Failed to look up vehicle", original_error=e)
+
+
+def main(argv):
+    index = ResidentSearchIndex()
+    if "--rebuild" in argv:
+        count = index.rebuild()
+        print(f"Rebuilt resident search index: {count} residents")
+        return 0
+
+    if not argv:
+        print("Usage: python -m models.resident_search --rebuild | <search words>")
+        return 1
+    for hit in index.search(' '.join(argv)):
+        print(f"{hit.resident_id}\t{hit.rank:.3f}{' (similar)' if hit.fuzzy else ''}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,14 +1,72 @@
 # models/vehicle.py
 """
 Vehicle data model and manager for the Society Management System.
+
+The vehicles table is the registry of registration numbers. A unique index on
+the normalized number (upper case, no spaces or hyphens) makes plate lookups
+an index search and keeps one vehicle from being registered to two flats.
+
+The car_numbers/scooter_numbers fields on residents stay as the editable,
+one-number-per-line view: ResidentManager syncs them into the registry when a
+resident is saved, VehicleManager writes them back when a vehicle changes,
+and numbers typed before the registry existed are migrated the first time it
+is used. Rows of one flat that share a number are merged into one vehicle at
+that point, with an audit log entry. Run `python -m models.vehicle --migrate`
+to migrate and list the numbers that could not be registered.
 """
 
+import re
+import sys
+import copy
+import threading
 from utils.db_context import get_db_connection
 from utils.database_exceptions import DatabaseError
 from utils.audit_logger import audit_logger
 from utils.security import get_user_id
 
 
+# Databases whose vehicle registry has been set up in this process
+_initialized_paths = set()
+_init_lock = threading.Lock()
+# Databases whose registry is unavailable because two flats share a number. Checked again by
+# init_vehicle_registry(), and after a vehicle is changed or deleted.
+_unavailable_paths = set()
+
+# Resident fields listing registration numbers one per line, and the vehicle type of each
+NUMBER_FIELDS = (('car_numbers', 'Car'), ('scooter_numbers', 'Scooter'))
+
+# normalize_plate() in SQL; queries must use this exact expression for the plate index to apply
+PLATE_KEY_SQL = ("upper(replace(replace(replace(replace(replace("
+                 "registration_number, ' ', ''), '-', ''), char(9), ''), char(10), ''), char(13), ''))")
+
+# WHERE clause of the partial plate index: vehicles without a number are not indexed
+HAS_PLATE_SQL = f"{PLATE_KEY_SQL} <> ''"
+
+_VEHICLE_COLUMNS = "id, resident_id, vehicle_type, registration_number, make, model, color, parking_slot, status"
+
+# Details filled in from duplicate rows when they are merged
+_MERGED_FIELDS = ('make', 'model', 'color', 'parking_slot')
+
+
+def normalize_plate(registration_number):
+    """Registration number in its indexed form: upper case, no spaces or hyphens"""
+    return re.sub(r'[ \t\r\n\-]', '', registration_number or '').upper()
+
+
+def split_vehicle_numbers(numbers):
+    """Registration numbers from a field with one number per line"""
+    if not numbers:
+        return []
+    # Handle both \n and \r\n line endings
+    return [number.strip() for number in numbers.replace('\r\n', '\n').split('\n') if number.strip()]
+
+
+def _invalidate_residents(db_path):
+    # Residents show their numbers, so changing a vehicle changes the cached resident directory
+    from models.resident import invalidate_resident_cache
+    invalidate_resident_cache(db_path)
+
+
 class Vehicle:
     def __init__(self, vehicle_id, resident_id, vehicle_type, registration_number=None, 
                  make=None, model=None, color=None, parking_slot=None, status="Active"):
@@ -21,12 +79,359 @@ class Vehicle:
         self.color = color
         self.parking_slot = parking_slot
         self.status = status
+    
+    def describe(self):
+        """One line summary, e.g. 'MH12AB1234 (Car, Maruti Swift, White, slot P-12)'"""
+        details = [self.vehicle_type, " ".join(filter(None, (self.make, self.model))), self.color]
+        if self.parking_slot:
+            details.append(f"slot {self.parking_slot}")
+        summary = ", ".join(detail for detail in details if detail)
+        return f"{self.registration_number or 'No registration number'} ({summary})"
 
 
 class VehicleManager:
     def __init__(self, db_path="society_management.db"):
         self.db_path = db_path
     
+    def ensure_initialized(self):
+        """
+        Set up the vehicle registry once per process.
+        
+        Returns:
+            bool: True if the registry is available (False without a residents table,
+                  or while two flats share a registration number)
+        """
+        if self.db_path in _initialized_paths:
+            return True
+        if self.db_path in _unavailable_paths:
+            return False
+        
+        with _init_lock:
+            if self.db_path in _initialized_paths:
+                return True
+            if self.db_path in _unavailable_paths:
+                return False
+            if not self.init_vehicle_registry():
+                return False
+            _initialized_paths.add(self.db_path)
+            return True
+    
+    def init_vehicle_registry(self):
+        """
+        Create the vehicles table and its indexes, and register the numbers in the residents'
+        car_numbers/scooter_numbers fields that are not in the registry yet.
+        Numbers already registered to another flat are left out (see get_unregistered_numbers).
+        Vehicle rows of one resident that share a number are merged (see _merge_duplicate_vehicles).
+        
+        Returns:
+            bool: False if there is no residents table, or if the plate index could not be
+                  created because two flats share a number (see get_duplicate_plates). The
+                  second case is remembered, so ensure_initialized() does not check again.
+        """
+        try:
+            with get_db_connection(self.db_path) as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'residents'")
+                if not cursor.fetchone():
+                    return False
+                
+                cursor.execute('BEGIN IMMEDIATE')
+                
+                cursor.execute('''
+                CREATE TABLE IF NOT EXISTS vehicles (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    resident_id INTEGER NOT NULL,
+                    vehicle_type TEXT NOT NULL,
+                    registration_number TEXT,
+                    make TEXT,
+                    model TEXT,
+                    color TEXT,
+                    parking_slot TEXT,
+                    status TEXT DEFAULT 'Active',
+                    FOREIGN KEY (resident_id) REFERENCES residents (id)
+                )
+                ''')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_vehicles_resident ON vehicles (resident_id)')
+                
+                merges = self._merge_duplicate_vehicles(cursor)
+                cursor.execute(f'''
+                    SELECT 1 FROM vehicles WHERE {HAS_PLATE_SQL} GROUP BY {PLATE_KEY_SQL} HAVING COUNT(*) > 1 LIMIT 1
+                ''')
+                available = cursor.fetchone() is None
+                if available:
+                    cursor.execute(f'''
+                        CREATE UNIQUE INDEX IF NOT EXISTS idx_vehicles_plate ON vehicles ({PLATE_KEY_SQL})
+                        WHERE {HAS_PLATE_SQL}
+                    ''')
+                    
+                    # Bulk-register the numbers typed into the residents' text fields
+                    cursor.execute(f'SELECT {PLATE_KEY_SQL} FROM vehicles WHERE {HAS_PLATE_SQL}')
+                    registered = {row[0] for row in cursor.fetchall()}
+                    cursor.execute(f"SELECT id, {', '.join(field for field, _ in NUMBER_FIELDS)} FROM residents ORDER BY id")
+                    new_vehicles = []
+                    for resident_id, *fields in cursor.fetchall():
+                        for numbers, (_, vehicle_type) in zip(fields, NUMBER_FIELDS):
+                            for number in split_vehicle_numbers(numbers):
+                                plate = normalize_plate(number)
+                                if plate and plate not in registered:
+                                    registered.add(plate)
+                                    new_vehicles.append((resident_id, vehicle_type, number))
+                    cursor.executemany('''
+                        INSERT INTO vehicles (resident_id, vehicle_type, registration_number, status)
+                        VALUES (?, ?, ?, 'Active')
+                    ''', new_vehicles)
+                
+                conn.commit()
+            if available:
+                _unavailable_paths.discard(self.db_path)
+            else:
+                _unavailable_paths.add(self.db_path)
+            self._log_merges(merges)
+            return available
+        except DatabaseError:
+            raise
+        except Exception as e:
+            raise DatabaseError("Failed to initialize vehicle registry", original_error=e)
+    
+    def _merge_duplicate_vehicles(self, cursor):
+        """
+        Merge the vehicle rows of one resident that share a registration number into the
+        oldest row, filling its empty details from the others, and delete the others.
+        
+        Returns:
+            list: (kept Vehicle, [deleted Vehicles]) per merge, for _log_merges()
+        """
+        cursor.execute(f'''
+            SELECT group_concat(id) FROM vehicles WHERE {HAS_PLATE_SQL}
+            GROUP BY resident_id, {PLATE_KEY_SQL} HAVING COUNT(*) > 1
+        ''')
+        groups = [[int(vehicle_id) for vehicle_id in row[0].split(',')] for row in cursor.fetchall()]
+        merges = []
+        for vehicle_ids in groups:
+            cursor.execute(f'''
+                SELECT {_VEHICLE_COLUMNS} FROM vehicles WHERE id IN ({', '.join('?' * len(vehicle_ids))}) ORDER BY id
+            ''', vehicle_ids)
+            kept, *duplicates = [Vehicle(*row) for row in cursor.fetchall()]
+            merged = copy.copy(kept)
+            for field in _MERGED_FIELDS:
+                if not getattr(merged, field):
+                    values = [getattr(duplicate, field) for duplicate in duplicates if getattr(duplicate, field)]
+                    setattr(merged, field, values[0] if values else getattr(merged, field))
+            cursor.execute(f"UPDATE vehicles SET {', '.join(f'{field} = ?' for field in _MERGED_FIELDS)} WHERE id = ?",
+                           [getattr(merged, field) for field in _MERGED_FIELDS] + [kept.id])
+            cursor.executemany('DELETE FROM vehicles WHERE id = ?', [(duplicate.id,) for duplicate in duplicates])
+            merges.append((merged, duplicates))
+        return merges
+    
+    def _log_merges(self, merges):
+        """Record merged duplicate vehicles in the audit log, with every deleted row's values"""
+        for merged, duplicates in merges:
+            audit_logger.log_data_change(
+                user_id=-1,
+                username="System",
+                action="MERGE_VEHICLE",
+                table_name="vehicles",
+                record_id=merged.id,
+                old_values={'merged_vehicles': [vars(duplicate) for duplicate in duplicates]},
+                new_values=vars(merged)
+            )
+    
+    def get_unregistered_numbers(self):
+        """
+        Get the numbers in residents' text fields that are registered to another flat.
+        
+        Returns:
+            list: (flat_no, registration_number, flat_no it is registered to) tuples
+        """
+        try:
+            with get_db_connection(self.db_path) as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute(f'''
+                    SELECT {PLATE_KEY_SQL}, v.resident_id, r.flat_no
+                    FROM vehicles v LEFT JOIN residents r ON r.id = v.resident_id
+                    WHERE {HAS_PLATE_SQL}
+                ''')
+                owners = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+                
+                cursor.execute(f"SELECT id, flat_no, {', '.join(field for field, _ in NUMBER_FIELDS)} FROM residents")
+                unregistered = []
+                for resident_id, flat_no, *fields in cursor.fetchall():
+                    for numbers in fields:
+                        for number in split_vehicle_numbers(numbers):
+                            owner = owners.get(normalize_plate(number))
+                            if owner and owner[0] != resident_id:
+                                unregistered.append((flat_no, number, owner[1]))
+                return unregistered
+        except DatabaseError:
+            raise
+        except Exception as e:
+            raise DatabaseError("Failed to check vehicle numbers", original_error=e)
+    
+    def get_duplicate_plates(self):
+        """
+        Get the registration numbers held by more than one vehicle row.
+        
+        Returns:
+            list: (normalized number, [resident ids]) tuples
+        """
+        try:
+            with get_db_connection(self.db_path) as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute(f'''
+                    SELECT {PLATE_KEY_SQL}, group_concat(resident_id) FROM vehicles
+                    WHERE {HAS_PLATE_SQL} GROUP BY {PLATE_KEY_SQL} HAVING COUNT(*) > 1
+                ''')
+                return [(row[0], [int(resident_id) for resident_id in row[1].split(',')])
+                        for row in cursor.fetchall()]
+        except DatabaseError:
+            raise
+        except Exception as e:
+            raise DatabaseError("Failed to check vehicle numbers", original_error=e)
+    
+    def find_vehicle_by_plate(self, registration_number):
+        """
+        Find the vehicle with a registration number (spaces, hyphens and case are ignored).
+        
+        Returns:
+            Vehicle: The vehicle, or None
+        """
+        plate = normalize_plate(registration_number)
+        if not plate or not self.ensure_initialized():
+            return None
+        
+        try:
+            with get_db_connection(self.db_path) as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute(f'''
+                    SELECT {_VEHICLE_COLUMNS} FROM vehicles WHERE {PLATE_KEY_SQL} = ? AND {HAS_PLATE_SQL}
+                ''', (plate,))
+                row = cursor.fetchone()
+                return Vehicle(*row) if row else None
+        except DatabaseError:
+            raise
+        except Exception as e:
+            raise DatabaseError("Failed to look up vehicle", original_error=e)
+    
+    def find_plate_conflicts(self, resident_id, registration_numbers):
+        """
+        Find which of a resident's registration numbers are registered to another flat.
+        
+        Args:
+            resident_id (int): The resident, or None for a new resident
+            registration_numbers (list): Registration numbers to check
+        
+        Returns:
+            list: (registration_number, flat_no it is registered to) tuples
+        """
+        plates = {}
+        for number in registration_numbers:
+            if normalize_plate(number):
+                plates.setdefault(normalize_plate(number), number)
+        if not plates or not self.ensure_initialized():
+            return []
+        
+        try:
+            with get_db_connection(self.db_path) as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute(f'''
+                    SELECT {PLATE_KEY_SQL}, r.flat_no
+                    FROM vehicles v LEFT JOIN residents r ON r.id = v.resident_id
+                    WHERE {PLATE_KEY_SQL} IN ({', '.join('?' * len(plates))}) AND {HAS_PLATE_SQL}
+                      AND v.resident_id IS NOT ?
+                ''', list(plates) + [resident_id])
+                return [(plates[row[0]], row[1]) for row in cursor.fetchall()]
+        except DatabaseError:
+            raise
+        except Exception as e:
+            raise DatabaseError("Failed to check vehicle numbers", original_error=e)
+    
+    def get_vehicles_by_residents(self, resident_ids):
+        """
+        Get the vehicles of many residents with one query per 500 residents.
+        
+        Returns:
+            dict: Resident id -> list of Vehicle objects (empty for residents without vehicles)
+        """
+        resident_ids = list(dict.fromkeys(resident_ids))
+        vehicles = {resident_id: [] for resident_id in resident_ids}
+        try:
+            with get_db_connection(self.db_path) as conn:
+                cursor = conn.cursor()
+                
+                for start in range(0, len(resident_ids), 500):
+                    chunk = resident_ids[start:start + 500]
+                    cursor.execute(f'''
+                        SELECT {_VEHICLE_COLUMNS} FROM vehicles WHERE resident_id IN ({', '.join('?' * len(chunk))})
+                        ORDER BY vehicle_type, registration_number
+                    ''', chunk)
+                    for row in cursor.fetchall():
+                        vehicles[row[1]].append(Vehicle(*row))
+                return vehicles
+        except DatabaseError:
+            raise
+        except Exception as e:
+            raise DatabaseError("Failed to retrieve vehicles", original_error=e)
+    
+    def sync_resident_numbers(self, cursor, resident_id, car_numbers, scooter_numbers):
+        """
+        Make a resident's registered cars and scooters match their text fields.
+        Vehicles recorded without a registration number are kept. Runs on the caller's
+        cursor so it commits with the resident; check the numbers with
+        find_plate_conflicts() first.
+        """
+        wanted = {}
+        for numbers, (_, vehicle_type) in zip((car_numbers, scooter_numbers), NUMBER_FIELDS):
+            for number in split_vehicle_numbers(numbers):
+                if normalize_plate(number):
+                    wanted.setdefault(normalize_plate(number), (vehicle_type, number))
+        
+        types = [vehicle_type for _, vehicle_type in NUMBER_FIELDS]
+        # Vehicles without a number are not listed in the text fields, so they are left alone
+        cursor.execute(f'''
+            SELECT id, vehicle_type, registration_number, {PLATE_KEY_SQL} FROM vehicles
+            WHERE resident_id = ? AND vehicle_type IN ({', '.join('?' * len(types))}) AND {HAS_PLATE_SQL}
+        ''', [resident_id] + types)
+        # Remove the vehicles no longer listed before adding any, so a number can move between fields
+        for vehicle_id, vehicle_type, registration_number, plate in cursor.fetchall():
+            listed = wanted.get(plate)
+            if not listed or listed[0] != vehicle_type:
+                cursor.execute('DELETE FROM vehicles WHERE id = ?', (vehicle_id,))
+                continue
+            del wanted[plate]
+            if listed[1] != registration_number:
+                # Same vehicle, number written differently
+                cursor.execute('UPDATE vehicles SET registration_number = ? WHERE id = ?', (listed[1], vehicle_id))
+        cursor.executemany('''
+            INSERT INTO vehicles (resident_id, vehicle_type, registration_number, status)
+            VALUES (?, ?, ?, 'Active')
+        ''', [(resident_id, vehicle_type, number) for vehicle_type, number in wanted.values()])
+    
+    def _write_resident_numbers(self, cursor, resident_id):
+        """Rewrite a resident's car_numbers/scooter_numbers fields from the registry"""
+        cursor.execute('''
+            SELECT vehicle_type, registration_number FROM vehicles
+            WHERE resident_id = ? AND registration_number IS NOT NULL AND registration_number <> ''
+            ORDER BY id
+        ''', (resident_id,))
+        rows = cursor.fetchall()
+        values = ['\n'.join(number for row_type, number in rows if row_type == vehicle_type) or None
+                  for _, vehicle_type in NUMBER_FIELDS]
+        cursor.execute(f'''
+            UPDATE residents SET {', '.join(f'{field} = ?' for field, _ in NUMBER_FIELDS)} WHERE id = ?
+        ''', values + [resident_id])
+    
+    def _check_plate_free(self, registration_number, vehicle_id=None):
+        """Raise DatabaseError if another vehicle has this registration number"""
+        existing = self.find_vehicle_by_plate(registration_number)
+        if existing and existing.id != vehicle_id:
+            raise DatabaseError(f"Vehicle {registration_number} is already registered")
+    
+    
     def get_vehicles_by_resident(self, resident_id):
         """Get all vehicles for a specific resident."""
         try:
@@ -59,6 +464,10 @@ class VehicleManager:
                    make=None, model=None, color=None, parking_slot=None, status="Active", current_user=None):
         """Add a new vehicle for a resident."""
         try:
+            registry = self.ensure_initialized()
+            if registry:
+                self._check_plate_free(registration_number)
+            
             with get_db_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
@@ -66,9 +475,13 @@ class VehicleManager:
                     INSERT INTO vehicles (resident_id, vehicle_type, registration_number, make, model, color, parking_slot, status)
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (resident_id, vehicle_type, registration_number, make, model, color, parking_slot, status))
+                vehicle_id = cursor.lastrowid
+                if registry:
+                    self._write_resident_numbers(cursor, resident_id)
                 
                 conn.commit()
-                vehicle_id = cursor.lastrowid
+                if registry:
+                    _invalidate_residents(self.db_path)
                 
                 # Log the action
                 user_id = get_user_id(current_user) if current_user else None
@@ -106,6 +519,9 @@ class VehicleManager:
         try:
             # First get the old values for logging
             old_vehicle = self.get_vehicle_by_id(vehicle_id)
+            registry = self.ensure_initialized() and old_vehicle is not None
+            if registry:
+                self._check_plate_free(registration_number, vehicle_id)
             
             with get_db_connection(self.db_path) as conn:
                 cursor = conn.cursor()
@@ -115,8 +531,15 @@ class VehicleManager:
                     SET vehicle_type=?, registration_number=?, make=?, model=?, color=?, parking_slot=?, status=?
                     WHERE id=?
                 ''', (vehicle_type, registration_number, make, model, color, parking_slot, status, vehicle_id))
+                if registry:
+                    self._write_resident_numbers(cursor, old_vehicle.resident_id)
                 
                 conn.commit()
+                if registry:
+                    _invalidate_residents(self.db_path)
+                else:
+                    # The change may have resolved a number shared by two flats
+                    _unavailable_paths.discard(self.db_path)
                 
                 # Log the action
                 user_id = get_user_id(current_user) if current_user else None
@@ -188,13 +611,21 @@ class VehicleManager:
         try:
             # First get the vehicle details for logging
             vehicle = self.get_vehicle_by_id(vehicle_id)
+            registry = self.ensure_initialized() and vehicle is not None
             
             with get_db_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute('DELETE FROM vehicles WHERE id=?', (vehicle_id,))
+                if registry:
+                    self._write_resident_numbers(cursor, vehicle.resident_id)
                 
                 conn.commit()
+                if registry:
+                    _invalidate_residents(self.db_path)
+                else:
+                    # The change may have resolved a number shared by two flats
+                    _unavailable_paths.discard(self.db_path)
                 
                 # Log the action
                 user_id = get_user_id(current_user) if current_user else None
@@ -252,4 +683,32 @@ class VehicleManager:
             raise
         except Exception as e:
             # Wrap unexpected errors in DatabaseError
-            raise DatabaseError("Failed to retrieve vehicle counts", original_error=e)
\ No newline at end of file
+            raise DatabaseError("Failed to retrieve vehicle counts", original_error=e)
+
+
+def main(argv):
+    manager = VehicleManager()
+    if argv == ["--migrate"]:
+        if not manager.init_vehicle_registry():
+            print("Vehicle registry is not available")
+            for plate, resident_ids in manager.get_duplicate_plates():
+                print(f"{plate} is registered to residents {', '.join(map(str, resident_ids))}")
+            return 1
+        for flat_no, number, owner_flat_no in manager.get_unregistered_numbers():
+            print(f"{flat_no}: {number} is already registered to {owner_flat_no}")
+        print("Vehicle registry is up to date")
+        return 0
+    
+    if not argv:
+        print("Usage: python -m models.vehicle --migrate | <registration number>")
+        return 1
+    vehicle = manager.find_vehicle_by_plate(' '.join(argv))
+    if not vehicle:
+        print("Not registered")
+        return 1
+    print(f"{vehicle.registration_number}\t{vehicle.vehicle_type}\tresident {vehicle.resident_id}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test script for the analytics snapshots: month partitions follow inserts, edits and deletes
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import shutil
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.analytics_export import AnalyticsExporter
+
+
+def setup_test_database(db_path):
+    """Create a ledger with two payments in each of January, February and March 2024"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE ledger (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            transaction_id TEXT UNIQUE, date TEXT, flat_no TEXT, transaction_type TEXT,
+            category TEXT, description TEXT, debit REAL DEFAULT 0, credit REAL DEFAULT 0,
+            balance REAL DEFAULT 0, payment_mode TEXT, entered_by TEXT, created_at TEXT,
+            reconciliation_status TEXT DEFAULT 'Unreconciled'
+        )
+    ''')
+    cursor.executemany('''
+        INSERT INTO ledger (transaction_id, date, flat_no, transaction_type, category, credit, balance, created_at)
+        VALUES (?, ?, 'A-101', 'Payment', 'Maintenance', 500, ?, '2024-04-01 10:00:00')
+    ''', [(f"TXN-{i}", f"2024-{(i - 1) // 2 + 1:02d}-{i:02d}", 500.0 * i) for i in range(1, 7)])
+    conn.commit()
+    conn.close()
+
+
+def modify(db_path, *statements):
+    conn = sqlite3.connect(db_path)
+    for statement in statements:
+        conn.execute(statement)
+    conn.commit()
+    conn.close()
+
+
+def read_ledger(exporter):
+    """Every exported ledger row as {transaction_id: (month, balance)}"""
+    import pandas as pd
+
+    ledger_dir = os.path.join(exporter.output_dir, "ledger")
+    rows = {}
+    for month_dir in sorted(os.listdir(ledger_dir)):
+        for name in os.listdir(os.path.join(ledger_dir, month_dir)):
+            frame = pd.read_parquet(os.path.join(ledger_dir, month_dir, name))
+            for transaction_id, balance in zip(frame['transaction_id'], frame['balance']):
+                assert transaction_id not in rows, f"{transaction_id} exported twice"
+                rows[transaction_id] = (month_dir, balance)
+    return rows
+
+
+def run_first_export_test(exporter):
+    """The first run writes every month"""
+    summary = exporter.export(tables=['ledger'])
+
+    assert summary['ledger'] == {'rows': 6, 'files': 3, 'mode': 'months'}, summary
+    assert read_ledger(exporter)['TXN-3'] == ("month=2024-02", 1500.0)
+    assert exporter.export(tables=['ledger'])['ledger']['rows'] == 0, "Unchanged months exported again"
+    print("[PASS] First export writes one partition per month")
+
+
+def run_changed_rows_test(exporter, db_path):
+    """Edited, deleted and moved rows rewrite only the months they touch"""
+    modify(db_path,
+           "UPDATE ledger SET balance = 42 WHERE transaction_id = 'TXN-1'",
+           "DELETE FROM ledger WHERE transaction_id = 'TXN-4'",
+           "UPDATE ledger SET date = '2024-05-20' WHERE transaction_id = 'TXN-6'",
+           "INSERT INTO ledger (transaction_id, date, credit) VALUES ('TXN-7', '2024-05-21', 500)")
+    summary = exporter.export(tables=['ledger'])
+    rows = read_ledger(exporter)
+
+    # January (edit), February (delete), March (TXN-6 moved out) and May (moved in, new) are rewritten
+    assert summary['ledger']['rows'] == 6, summary
+    assert rows['TXN-1'] == ("month=2024-01", 42.0), rows['TXN-1']
+    assert 'TXN-4' not in rows, "Deleted row still exported"
+    assert rows['TXN-6'][0] == "month=2024-05" and rows['TXN-7'][0] == "month=2024-05", rows
+    assert len(rows) == 6, rows
+    assert all(len(os.listdir(os.path.join(exporter.output_dir, "ledger", month))) == 1
+               for month in os.listdir(os.path.join(exporter.output_dir, "ledger"))), "Old files left behind"
+    print("[PASS] Edited and deleted ledger rows are exported again")
+
+
+def run_removed_month_test(exporter, db_path):
+    """A month without rows left is removed from the export"""
+    modify(db_path, "DELETE FROM ledger WHERE date LIKE '2024-03-%'")
+    summary = exporter.export(tables=['ledger'])
+
+    assert summary['ledger']['rows'] == 0, summary
+    assert "month=2024-03" not in os.listdir(os.path.join(exporter.output_dir, "ledger"))
+    assert sorted(read_ledger(exporter)) == ['TXN-1', 'TXN-2', 'TXN-3', 'TXN-6', 'TXN-7']
+    assert exporter.load_state()['ledger']['exported_rows'] == 5
+    print("[PASS] Emptied months are removed")
+
+
+def test_analytics_export():
+    """Run all analytics export tests on a temporary database"""
+    print("Testing analytics export...")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(temp_dir, "analytics_test.db")
+        setup_test_database(db_path)
+        exporter = AnalyticsExporter(db_path, os.path.join(temp_dir, "analytics"))
+        try:
+            exporter.check_dependencies()
+        except ImportError as e:
+            print(f"[SKIP] {e}")
+            return
+        run_first_export_test(exporter)
+        run_changed_rows_test(exporter, db_path)
+        run_removed_month_test(exporter, db_path)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_analytics_export()
+    print("\nAll analytics export tests passed!")
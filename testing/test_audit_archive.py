@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script for audit log archival and the archive-aware audit log search
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import shutil
+from datetime import datetime, timedelta
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.audit_archiver import AuditArchiver
+
+
+def setup_test_database(db_path):
+    """Create an audit_log table with one recent and two old entries"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE audit_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT, user_id INTEGER, username TEXT, action TEXT,
+            table_name TEXT, record_id INTEGER, old_values TEXT, new_values TEXT,
+            details TEXT, ip_address TEXT, session_id TEXT
+        )
+    ''')
+    recent = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    entries = [
+        ("2020-01-05 10:00:00", 1, "sysadmin", "LOGIN_SUCCESS", None, None, None, None, "old login", None, None),
+        ("2020-01-20 11:00:00", 1, "sysadmin", "CREATE_RESIDENT", "residents", 7, None,
+         '{"flat_no": "A101"}', None, None, None),
+        (recent, 1, "sysadmin", "LOGIN_SUCCESS", None, None, None, None, "new login", None, None),
+    ]
+    cursor.executemany('''
+        INSERT INTO audit_log (timestamp, user_id, username, action, table_name, record_id,
+                               old_values, new_values, details, ip_address, session_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', entries)
+    conn.commit()
+    conn.close()
+
+
+def run_archive_test(storage):
+    """Archive old entries with the given storage and check the search facade"""
+    print(f"\nTesting audit archive with '{storage}' storage...")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(temp_dir, "audit_test.db")
+        setup_test_database(db_path)
+        archiver = AuditArchiver(db_path, archive_dir=os.path.join(temp_dir, "archive"))
+
+        archived = archiver.archive_old_entries(horizon_days=90, storage=storage)
+        assert archived == {"2020-01": 2}, f"Unexpected archive result: {archived}"
+        print("[PASS] Old month archived")
+
+        conn = sqlite3.connect(db_path)
+        hot_count = conn.execute("SELECT COUNT(*) FROM audit_log").fetchone()[0]
+        conn.close()
+        assert hot_count == 1, f"Expected 1 entry left in audit_log, found {hot_count}"
+        print("[PASS] Hot table only keeps recent entries")
+
+        recent_start = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+        assert len(archiver.search_audit_logs(start_date=recent_start)) == 1, \
+            "Recent search should not include archived entries"
+
+        logs = archiver.search_audit_logs(start_date="2019-12-01")
+        assert [log['details'] for log in logs] == ["new login", None, "old login"], \
+            f"Unexpected search result across archives: {logs}"
+        assert logs[1]['new_values'] == {"flat_no": "A101"}, "Archived JSON values were not decoded"
+        print("[PASS] Search reaches into archives when the date filter does")
+
+        logs = archiver.search_audit_logs(start_date="2020-01-01", end_date="2020-01-31",
+                                          action="CREATE_RESIDENT")
+        assert len(logs) == 1, f"Expected 1 filtered archived entry, found {len(logs)}"
+        print("[PASS] Filters are applied to archived entries")
+
+        summary = archiver.get_archive_summary()
+        assert len(summary) == 1 and summary[0]['entry_count'] == 2, f"Unexpected archive summary: {summary}"
+        print("[PASS] Archive summary index is up to date")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_audit_archive():
+    """Test both archive storage modes"""
+    run_archive_test("table")
+    run_archive_test("file")
+
+
+if __name__ == "__main__":
+    test_audit_archive()
+    print("\nAll audit archive tests passed!")
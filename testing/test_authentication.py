@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script for login hashing: bcrypt calibration, rehash on login and the background worker
+"""
+
+import sys
+import os
+import json
+import sqlite3
+import tempfile
+import shutil
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication
+from utils.security import (authenticate_user, calibrate_bcrypt_rounds, hash_password, hash_password_sha256,
+                            _bcrypt_cost)
+from utils.auth_service import AuthenticationWorker
+from utils.audit_logger import audit_logger
+
+
+# Cost configured for the tests; bcrypt's minimum is 4, so these stay fast
+CONFIGURED_ROUNDS = 5
+
+
+def setup_test_database(db_path):
+    """Create users hashed below, at and above the configured cost, plus a legacy SHA-256 user"""
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE, password_hash TEXT, role TEXT,
+            failed_login_attempts INTEGER DEFAULT 0, locked_until TEXT
+        )
+    ''')
+    conn.executemany("INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)", [
+        ("weak", hash_password("secret", rounds=4).decode('utf-8'), "Treasurer"),
+        ("current", hash_password("secret", rounds=CONFIGURED_ROUNDS).decode('utf-8'), "Treasurer"),
+        ("strong", hash_password("secret", rounds=6).decode('utf-8'), "Admin"),
+        ("legacy", hash_password_sha256("secret"), "Viewer"),
+    ])
+    conn.execute('''
+        CREATE TABLE audit_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, user_id INTEGER, username TEXT,
+            action TEXT, table_name TEXT, record_id INTEGER, old_values TEXT, new_values TEXT,
+            details TEXT, ip_address TEXT, session_id TEXT
+        )
+    ''')
+    conn.commit()
+    conn.close()
+
+
+def stored_hash(db_path, username):
+    conn = sqlite3.connect(db_path)
+    row = conn.execute("SELECT password_hash FROM users WHERE username = ?", (username,)).fetchone()
+    conn.close()
+    return row[0] if isinstance(row[0], bytes) else row[0].encode('utf-8')
+
+
+def run_calibration_test():
+    """Calibration stops at the first cost over the target and never goes below min_rounds"""
+    rounds, timings = calibrate_bcrypt_rounds(target_ms=60000, min_rounds=4, max_rounds=6)
+    assert rounds == 6 and sorted(timings) == [4, 5, 6], (rounds, timings)
+    assert all(elapsed > 0 for elapsed in timings.values()), timings
+
+    rounds, timings = calibrate_bcrypt_rounds(target_ms=0, min_rounds=4, max_rounds=6)
+    assert rounds == 4 and sorted(timings) == [4], (rounds, timings)
+    print("[PASS] Calibration picks the highest cost within the target")
+
+
+def run_rehash_test(db_path):
+    """A login upgrades weaker and legacy hashes but never lowers a stronger one"""
+    strong = stored_hash(db_path, "strong")
+    current = stored_hash(db_path, "current")
+
+    for username, role in [("weak", "Treasurer"), ("current", "Treasurer"), ("strong", "Admin"),
+                           ("legacy", "Viewer")]:
+        assert authenticate_user(username, "secret") == role, f"{username} could not log in"
+
+    assert _bcrypt_cost(stored_hash(db_path, "weak")) == CONFIGURED_ROUNDS, "Weaker hash was not upgraded"
+    assert _bcrypt_cost(stored_hash(db_path, "legacy")) == CONFIGURED_ROUNDS, "Legacy hash was not upgraded"
+    assert stored_hash(db_path, "current") == current, "Hash at the configured cost was rewritten"
+    assert stored_hash(db_path, "strong") == strong, "Stronger hash was weakened to the configured cost"
+
+    # The upgraded hashes still verify, and a wrong password upgrades nothing
+    assert authenticate_user("legacy", "secret") == "Viewer", "Upgraded legacy hash does not verify"
+    weak = stored_hash(db_path, "weak")
+    assert authenticate_user("weak", "wrong") is None and stored_hash(db_path, "weak") == weak
+    print("[PASS] Hashes are only ever rehashed upwards on login")
+
+
+def run_worker_test(app):
+    """The worker authenticates off the GUI thread and emits the role, or None on failure"""
+    results = []
+    for password in ("secret", "wrong"):
+        worker = AuthenticationWorker("current", password)
+        worker.authenticated.connect(results.append)
+        worker.failed.connect(lambda message: results.append(f"error: {message}"))
+        worker.start()
+        assert worker.wait(30000), "Authentication worker did not finish"
+        app.processEvents()
+        assert worker.password is None, "Worker kept the password after authenticating"
+
+    assert results == ["Treasurer", None], results
+    print("[PASS] The authentication worker emits the login result")
+
+
+def test_authentication():
+    """Run all authentication tests in a temporary working directory"""
+    print("Testing authentication...")
+    app = QApplication.instance() or QApplication(sys.argv)
+    temp_dir = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    audit_db_path = audit_logger.db_path
+    try:
+        # The bcrypt cost is read from config.json and users from society_management.db in the working directory
+        os.chdir(temp_dir)
+        with open("config.json", "w") as f:
+            json.dump({'bcrypt_rounds': CONFIGURED_ROUNDS}, f)
+        db_path = os.path.join(temp_dir, "society_management.db")
+        setup_test_database(db_path)
+        audit_logger.db_path = db_path
+        run_calibration_test()
+        run_rehash_test(db_path)
+        run_worker_test(app)
+    finally:
+        audit_logger.db_path = audit_db_path
+        os.chdir(cwd)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_authentication()
+    print("\nAll authentication tests passed!")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Test script for the incremental deduplicated backup store
+"""
+
+import sys
+import os
+import json
+import sqlite3
+import tempfile
+import shutil
+from datetime import datetime, timedelta
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.backup_store import BackupStore
+from utils.database_exceptions import DatabaseError
+
+
+def setup_test_database(db_path, photos_dir, count=5000):
+    """Create a ledger table and a couple of photo files"""
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE ledger (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            transaction_id TEXT UNIQUE, date TEXT, description TEXT, credit REAL DEFAULT 0
+        )
+    ''')
+    conn.executemany("INSERT INTO ledger (transaction_id, date, description, credit) VALUES (?, ?, ?, ?)",
+                     [(f"TXN-{i:06d}", '2024-01-01', 'Maintenance payment ' * 5, 500.0) for i in range(count)])
+    conn.commit()
+    conn.close()
+
+    os.makedirs(photos_dir)
+    for name in ("resident_1.jpg", "resident_2.jpg"):
+        with open(os.path.join(photos_dir, name), 'wb') as f:
+            f.write(os.urandom(100 * 1024))
+
+
+def run_incremental_snapshot_test(store, db_path, photos_dir):
+    """A second snapshot after a small change stores only the changed chunks"""
+    first = store.create_snapshot(db_path, photos_dir)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO ledger (transaction_id, date, description, credit) VALUES ('NEW-1', '2024-02-01', 'x', 1)")
+    conn.commit()
+    conn.close()
+    second = store.create_snapshot(db_path, photos_dir)
+
+    stats = second['stats']
+    total_chunks = len(second['database']['chunks'])
+    assert first['stats']['new_chunks'] != 0 and stats['new_chunks'] < total_chunks / 2, \
+        f"Second snapshot was not incremental: {stats} of {total_chunks} database chunks"
+    assert stats['files_unchanged'] == 2 and stats['files_read'] == 0, f"Unchanged photos were read again: {stats}"
+    print(f"[PASS] Incremental snapshot stored {stats['new_chunks']} new chunks of {total_chunks}")
+
+
+def run_restore_test(store, temp_dir, photos_dir):
+    """Restoring an earlier snapshot brings back that database state and the photos"""
+    first, second = store.list_snapshots()[:2]
+    db_dest = os.path.join(temp_dir, "restored.db")
+    photos_dest = os.path.join(temp_dir, "restored_photos")
+    # A photo added after the snapshot was taken
+    os.makedirs(photos_dest)
+    with open(os.path.join(photos_dest, "resident_9.jpg"), 'wb') as f:
+        f.write(b"added later")
+    store.restore(db_dest, photos_dest, snapshot_id=first['id'])
+
+    conn = sqlite3.connect(db_dest)
+    count = conn.execute("SELECT COUNT(*) FROM ledger").fetchone()[0]
+    conn.close()
+    assert count == 5000, f"Restored the wrong database state: {count} rows"
+
+    assert sorted(os.listdir(photos_dest)) == sorted(os.listdir(photos_dir)), \
+        f"Restored photos do not match the snapshot: {os.listdir(photos_dest)}"
+    for name in os.listdir(photos_dir):
+        with open(os.path.join(photos_dir, name), 'rb') as f, open(os.path.join(photos_dest, name), 'rb') as g:
+            assert f.read() == g.read(), f"Restored photo differs: {name}"
+
+    store.restore(db_dest, snapshot_id=second['id'])
+    conn = sqlite3.connect(db_dest)
+    count = conn.execute("SELECT COUNT(*) FROM ledger").fetchone()[0]
+    conn.close()
+    assert count == 5001, f"Latest snapshot restored {count} rows"
+    print("[PASS] Snapshots restore to their own point in time")
+
+
+def run_corrupt_restore_test(store, temp_dir):
+    """A snapshot that fails verification leaves the existing database untouched"""
+    db_dest = os.path.join(temp_dir, "restored.db")
+    garbage_path = os.path.join(temp_dir, "garbage.db")
+    with open(garbage_path, 'wb') as f:
+        f.write(b"not a database" * 1000)
+    manifest = dict(store.list_snapshots()[-1], id="corrupt")
+    chunks, file_hash = store._store_file(garbage_path, {'new_chunks': 0, 'reused_chunks': 0, 'new_bytes': 0})
+    manifest['database'] = dict(manifest['database'], chunks=chunks, sha256=file_hash)
+    manifest_path = os.path.join(store.snapshots_dir, "corrupt.json")
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f)
+
+    try:
+        store.restore(db_dest, snapshot_id="corrupt")
+        raise AssertionError("Corrupt snapshot was restored")
+    except DatabaseError:
+        pass
+    finally:
+        os.remove(manifest_path)
+    conn = sqlite3.connect(db_dest)
+    count = conn.execute("SELECT COUNT(*) FROM ledger").fetchone()[0]
+    conn.close()
+    assert count == 5001 and not os.path.exists(db_dest + ".verifying"), \
+        "Failed restore replaced the database or left its copy behind"
+    print("[PASS] A snapshot that fails verification does not replace the database")
+
+
+def run_prune_test(store, db_path, photos_dir):
+    """Pruning keeps one snapshot per retention period and removes unreferenced chunks"""
+    # Backdate the existing manifests to the same old day, so only one of them survives
+    old_day = (datetime.now() - timedelta(days=400)).strftime("%Y-%m-%d")
+    for i, manifest in enumerate(store.list_snapshots()):
+        manifest['created_at'] = f"{old_day} 0{i}:00:00"
+        with open(os.path.join(store.snapshots_dir, manifest['id'] + ".json"), 'w') as f:
+            json.dump(manifest, f)
+
+    os.remove(os.path.join(photos_dir, "resident_2.jpg"))
+    store.create_snapshot(db_path, photos_dir)
+    result = store.prune(keep_daily=7, keep_weekly=5, keep_monthly=1)
+
+    remaining = store.list_snapshots()
+    assert len(result['removed_snapshots']) == 2 and len(remaining) == 1, \
+        f"Unexpected snapshots after pruning: {[manifest['id'] for manifest in remaining]}"
+    assert result['removed_chunks'] != 0, "Chunks of the removed photo were not collected"
+    print(f"[PASS] Pruning removed {len(result['removed_snapshots'])} snapshots and {result['removed_chunks']} chunks")
+
+
+def test_backup_store():
+    """Run all backup store tests in a temporary directory"""
+    print("Testing incremental backup store...")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(temp_dir, "store_test.db")
+        photos_dir = os.path.join(temp_dir, "photos")
+        setup_test_database(db_path, photos_dir)
+        store = BackupStore(os.path.join(temp_dir, "store"))
+        run_incremental_snapshot_test(store, db_path, photos_dir)
+        run_restore_test(store, temp_dir, photos_dir)
+        run_corrupt_restore_test(store, temp_dir)
+        run_prune_test(store, db_path, photos_dir)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_backup_store()
+    print("\nAll backup store tests passed!")
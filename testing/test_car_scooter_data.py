@@ -53,7 +53,7 @@ def test_resident_data_display():
     
     # Check that we have the correct number of rows
     expected_rows = 3
-    actual_rows = resident_form.table.rowCount()
+    actual_rows = resident_form.table.model().rowCount()
     
     print(f"Expected rows: {expected_rows}")
     print(f"Actual rows: {actual_rows}")
@@ -71,7 +71,7 @@ def test_resident_data_display():
     
     for row, expected in enumerate(test_data):
         # Check flat no (column 1)
-        actual_flat_no = resident_form.table.item(row, 1).text()
+        actual_flat_no = resident_form.table.model().index(row, 1).data()
         if actual_flat_no == expected["flat_no"]:
             print(f"PASS: Row {row} flat no is correct ({actual_flat_no})")
         else:
@@ -79,7 +79,7 @@ def test_resident_data_display():
             return False
         
         # Check name (column 2)
-        actual_name = resident_form.table.item(row, 2).text()
+        actual_name = resident_form.table.model().index(row, 2).data()
         if actual_name == expected["name"]:
             print(f"PASS: Row {row} name is correct ({actual_name})")
         else:
@@ -87,7 +87,7 @@ def test_resident_data_display():
             return False
             
         # Check cars (column 5)
-        actual_cars = resident_form.table.item(row, 5).text()
+        actual_cars = resident_form.table.model().index(row, 5).data()
         if actual_cars == expected["cars"]:
             print(f"PASS: Row {row} cars is correct ({actual_cars})")
         else:
@@ -95,7 +95,7 @@ def test_resident_data_display():
             return False
             
         # Check scooters (column 6)
-        actual_scooters = resident_form.table.item(row, 6).text()
+        actual_scooters = resident_form.table.model().index(row, 6).data()
         if actual_scooters == expected["scooters"]:
             print(f"PASS: Row {row} scooters is correct ({actual_scooters})")
         else:
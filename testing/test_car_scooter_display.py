@@ -10,6 +10,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import Qt
 from gui.resident_form import ResidentForm
 from models.resident import ResidentManager
 
@@ -22,7 +23,7 @@ def test_resident_table_columns():
     
     # Check the number of columns
     expected_columns = 7  # ID, Flat No, Name, Phone No, Email, Cars, Scooters
-    actual_columns = resident_form.table.columnCount()
+    actual_columns = resident_form.table.model().columnCount()
     
     print(f"Expected columns: {expected_columns}")
     print(f"Actual columns: {actual_columns}")
@@ -36,7 +37,7 @@ def test_resident_table_columns():
     # Check the column headers
     expected_headers = ["ID", "Flat No", "Name", "Phone No", "Email", "Cars", "Scooters"]
     for i, expected_header in enumerate(expected_headers):
-        actual_header = resident_form.table.horizontalHeaderItem(i).text()
+        actual_header = resident_form.table.model().headerData(i, Qt.Horizontal)
         if actual_header == expected_header:
             print(f"PASS: Column {i} header is correct ({actual_header})")
         else:
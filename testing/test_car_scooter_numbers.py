@@ -55,7 +55,7 @@ def test_car_scooter_numbers():
     
     # Check that we have the correct number of rows
     expected_rows = 3
-    actual_rows = resident_form.table.rowCount()
+    actual_rows = resident_form.table.model().rowCount()
     
     print(f"Expected rows: {expected_rows}")
     print(f"Actual rows: {actual_rows}")
@@ -94,7 +94,7 @@ def test_car_scooter_numbers():
     
     for row, expected in enumerate(test_data):
         # Check flat no (column 1)
-        actual_flat_no = resident_form.table.item(row, 1).text()
+        actual_flat_no = resident_form.table.model().index(row, 1).data()
         if actual_flat_no == expected["flat_no"]:
             print(f"PASS: Row {row} flat no is correct ({actual_flat_no})")
         else:
@@ -102,7 +102,7 @@ def test_car_scooter_numbers():
             return False
         
         # Check name (column 2)
-        actual_name = resident_form.table.item(row, 2).text()
+        actual_name = resident_form.table.model().index(row, 2).data()
         if actual_name == expected["name"]:
             print(f"PASS: Row {row} name is correct ({actual_name})")
         else:
@@ -110,7 +110,7 @@ def test_car_scooter_numbers():
             return False
             
         # Check car numbers (column 5)
-        actual_car_nos = resident_form.table.item(row, 5).text()
+        actual_car_nos = resident_form.table.model().index(row, 5).data()
         if actual_car_nos == expected["car_nos"]:
             print(f"PASS: Row {row} car numbers is correct ({actual_car_nos})")
         else:
@@ -118,7 +118,7 @@ def test_car_scooter_numbers():
             return False
             
         # Check scooter numbers (column 6)
-        actual_scooter_nos = resident_form.table.item(row, 6).text()
+        actual_scooter_nos = resident_form.table.model().index(row, 6).data()
         if actual_scooter_nos == expected["scooter_nos"]:
             print(f"PASS: Row {row} scooter numbers is correct ({actual_scooter_nos})")
         else:
@@ -126,7 +126,7 @@ def test_car_scooter_numbers():
             return False
             
         # Check car count (column 7)
-        actual_cars = resident_form.table.item(row, 7).text()
+        actual_cars = resident_form.table.model().index(row, 7).data()
         if actual_cars == expected["cars"]:
             print(f"PASS: Row {row} cars count is correct ({actual_cars})")
         else:
@@ -134,7 +134,7 @@ def test_car_scooter_numbers():
             return False
             
         # Check scooter count (column 8)
-        actual_scooters = resident_form.table.item(row, 8).text()
+        actual_scooters = resident_form.table.model().index(row, 8).data()
         if actual_scooters == expected["scooters"]:
             print(f"PASS: Row {row} scooters count is correct ({actual_scooters})")
         else:
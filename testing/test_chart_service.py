@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for the report chart service: series, cached vector drawings and cached PNG files
+"""
+
+import sys
+import os
+import tempfile
+import shutil
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.chart_service import ChartService, chart_series
+
+
+INCOME = [('Maintenance', 5000.0), ('Parking', 800.0)]
+EXPENSES = [('Repairs', 1200.0), ('Parking', 300.0)]
+
+
+def run_series_test():
+    """Categories of both sides are merged and sorted by their combined total"""
+    categories, income, expenses = chart_series(INCOME, EXPENSES)
+
+    assert categories == ['Maintenance', 'Repairs', 'Parking'], categories
+    assert income == [5000.0, 0, 800.0] and expenses == [0, 1200.0, 300.0], (income, expenses)
+    print("[PASS] Income and expense series are aligned by category")
+
+
+def run_drawing_cache_test(service):
+    """Vector drawings are reused for the same data and dropped least recently used first"""
+    drawing = service.income_expense_drawing(INCOME, EXPENSES)
+
+    assert service.income_expense_drawing(list(INCOME), list(EXPENSES)) is drawing, "Same data was drawn again"
+    assert service.income_expense_drawing(INCOME, EXPENSES, width=300) is not drawing, \
+        "A different size reused the cached drawing"
+    assert (drawing.width, drawing.height) == (400, 240), (drawing.width, drawing.height)
+
+    # max_drawings is 2: the 300 wide drawing is the least recently used now
+    service.income_expense_drawing(INCOME, EXPENSES)
+    service.income_expense_drawing(INCOME[:1], EXPENSES)
+    assert len(service._drawings) == 2, f"Cache holds {len(service._drawings)} drawings"
+    assert service.income_expense_drawing(INCOME, EXPENSES) is drawing, "Recently used drawing was evicted"
+    print("[PASS] Vector drawings are cached by data and size")
+
+
+def run_png_cache_test(service):
+    """PNG charts get one file per data and style, and later calls reuse it without rendering"""
+    path = service.income_expense_png(INCOME, EXPENSES)
+    assert os.path.dirname(path) == service.cache_dir and os.path.getsize(path) > 0, path
+
+    # A cached chart must not be rendered again
+    def render():
+        raise AssertionError("Cached chart was rendered again")
+
+    service._get_pyplot = render
+    try:
+        assert service.income_expense_png(INCOME, EXPENSES) == path
+    finally:
+        del service._get_pyplot
+
+    styled = service.income_expense_png(INCOME, EXPENSES, style={'title': 'Other title'})
+    other = service.income_expense_png(INCOME[:1], EXPENSES)
+    assert len({path, styled, other}) == 3, "Different data or style shared a chart file"
+
+    # max_files is 2, so the oldest chart is removed
+    charts = [name for name in os.listdir(service.cache_dir) if name.endswith('.png')]
+    assert len(charts) == 2 and os.path.basename(other) in charts, charts
+    assert not [name for name in os.listdir(service.cache_dir) if not name.endswith('.png')], \
+        "Temporary chart files left behind"
+    print("[PASS] PNG charts are cached in uniquely named files")
+
+
+def test_chart_service():
+    """Run all chart service tests in a temporary chart folder"""
+    print("Testing chart service...")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        service = ChartService(cache_dir=os.path.join(temp_dir, "charts"), max_drawings=2, max_files=2)
+        run_series_test()
+        run_drawing_cache_test(service)
+        run_png_cache_test(service)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_chart_service()
+    print("\nAll chart service tests passed!")
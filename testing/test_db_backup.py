@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script for the online database backup
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import shutil
+import threading
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.db_backup import backup_database, BackupCancelled
+
+
+def setup_test_database(db_path, count=20000):
+    """Create a ledger table large enough to need several backup steps"""
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE ledger (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            transaction_id TEXT UNIQUE, date TEXT, description TEXT, debit REAL DEFAULT 0, credit REAL DEFAULT 0
+        )
+    ''')
+    conn.executemany("INSERT INTO ledger (transaction_id, date, description, credit) VALUES (?, ?, ?, ?)",
+                     [(f"TXN-{i:06d}", '2024-01-01', 'Maintenance payment ' * 5, 500.0) for i in range(count)])
+    conn.commit()
+    conn.close()
+
+
+def run_backup_during_writes_test(db_path, temp_dir):
+    """A backup taken while another connection keeps writing is complete and consistent"""
+    stop = threading.Event()
+
+    def writer():
+        conn = sqlite3.connect(db_path, timeout=30)
+        i = 0
+        while not stop.is_set():
+            conn.execute("INSERT INTO ledger (transaction_id, date, description, debit) VALUES (?, ?, ?, ?)",
+                         (f"W-{i:06d}", '2024-02-01', 'Concurrent expense', 10.0))
+            conn.commit()
+            i += 1
+            time.sleep(0.002)
+        conn.close()
+
+    thread = threading.Thread(target=writer, daemon=True)
+    thread.start()
+    try:
+        progress = []
+        dest_path = os.path.join(temp_dir, "backup.db")
+        result = backup_database(db_path, dest_path, pages_per_step=16,
+                                 progress_callback=lambda done, total: progress.append((done, total)))
+    finally:
+        stop.set()
+        thread.join()
+
+    assert result['integrity'] == 'ok' and progress, f"Backup did not complete cleanly: {result}"
+
+    conn = sqlite3.connect(dest_path)
+    original_rows = conn.execute("SELECT COUNT(*) FROM ledger WHERE transaction_id LIKE 'TXN-%'").fetchone()[0]
+    conn.close()
+    assert original_rows == 20000, f"Backup is missing rows: {original_rows}"
+    print(f"[PASS] Backup during writes is consistent ({result['pages']} pages, {result['restarts']} restarts)")
+
+
+def run_cancel_test(db_path, temp_dir):
+    """A cancelled backup leaves no partial file behind"""
+    cancel_event = threading.Event()
+    cancel_event.set()
+    dest_path = os.path.join(temp_dir, "cancelled.db")
+    try:
+        backup_database(db_path, dest_path, pages_per_step=16, cancel_event=cancel_event)
+    except BackupCancelled:
+        pass
+    else:
+        raise AssertionError("Backup was not cancelled")
+
+    assert not os.path.exists(dest_path) and not os.path.exists(dest_path + ".partial"), \
+        "Cancelled backup left files behind"
+    print("[PASS] Cancelled backup is cleaned up")
+
+
+def test_db_backup():
+    """Run all backup tests on a temporary database"""
+    print("Testing online database backup...")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(temp_dir, "backup_test.db")
+        setup_test_database(db_path)
+        run_backup_during_writes_test(db_path, temp_dir)
+        run_cancel_test(db_path, temp_dir)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_db_backup()
+    print("\nAll database backup tests passed!")
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Test script for per-flat dues statements: balances, dues and the generated files
+"""
+
+import sys
+import os
+import csv
+import sqlite3
+import tempfile
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.dues_statements import DuesStatementGenerator
+
+
+def setup_test_database(db_path):
+    """Create residents with and without joining dates, and a ledger for 2024"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE residents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, flat_no TEXT, name TEXT, date_joining TEXT,
+            monthly_charges REAL, status TEXT
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE ledger (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            transaction_id TEXT UNIQUE, date TEXT, flat_no TEXT, transaction_type TEXT,
+            category TEXT, description TEXT, debit REAL DEFAULT 0, credit REAL DEFAULT 0,
+            balance REAL DEFAULT 0, payment_mode TEXT, entered_by TEXT, created_at TEXT,
+            reconciliation_status TEXT DEFAULT 'Unreconciled'
+        )
+    ''')
+    cursor.executemany('''
+        INSERT INTO residents (flat_no, name, date_joining, monthly_charges, status)
+        VALUES (?, ?, ?, ?, 'Active')
+    ''', [
+        ('A-10', 'Joined mid-year', '2024-07-15', 1000),
+        ('A-2', 'Owner', None, 500),
+        ('A-2', 'Tenant', '2024-03-01', 500),
+        ('B-1', 'No joining date', None, 500),
+        ('B-2', 'Invalid joining date', 'someday', 500),
+    ])
+    cursor.executemany('''
+        INSERT INTO ledger (transaction_id, date, flat_no, transaction_type, category, debit, credit)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', [
+        ('TXN-1', '2023-12-01', 'A-2', 'Payment', 'Maintenance', 0, 300),
+        ('TXN-2', '2024-04-01', 'A-2', 'Payment', 'Maintenance', 0, 2000),
+        ('TXN-3', '2024-05-01', 'A-2', 'Charge', 'Penalty', 100, 0),
+        ('TXN-4', '2024-08-01', 'A-10', 'Payment', 'Maintenance', 0, 1000),
+    ])
+    conn.commit()
+    conn.close()
+
+
+def run_statement_data_test(generator):
+    """Balances run over the whole history and dues start at the earliest valid joining date"""
+    statements = generator.get_statement_data(date(2024, 1, 1), date(2024, 12, 31))
+    by_flat = {statement['flat_no']: statement for statement in statements}
+
+    assert [statement['flat_no'] for statement in statements] == ['A-2', 'A-10', 'B-1', 'B-2']
+    a2 = by_flat['A-2']
+    assert a2['name'] == 'Owner, Tenant', a2['name']
+    assert (a2['opening_balance'], a2['closing_balance']) == (300.0, 2200.0), a2
+    assert len(a2['transactions']) == 2 and a2['maintenance_paid'] == 2000.0, a2
+    # March to December at 500 a month
+    assert (a2['months_due'], a2['maintenance_expected'], a2['amount_due']) == (10, 5000.0, 3000.0), a2
+    # July to December at the flat's own charge
+    assert (by_flat['A-10']['months_due'], by_flat['A-10']['amount_due']) == (6, 5000.0), by_flat['A-10']
+    print("[PASS] Statements carry balances and dues from the joining date")
+
+
+def run_missing_joining_date_test(generator):
+    """Flats without a valid joining date owe nothing, as in the outstanding dues report"""
+    statements = generator.get_statement_data(date(2024, 1, 1), date(2024, 12, 31), flat_numbers=['B-1', 'B-2'])
+
+    for statement in statements:
+        assert (statement['months_due'], statement['amount_due']) == (0, 0.0), statement
+    print("[PASS] Flats without a joining date have no dues")
+
+
+def run_generate_test(generator):
+    """One PDF per flat plus an index with the statement totals"""
+    index = generator.generate_statements("tester", date(2024, 1, 1), date(2024, 12, 31), max_workers=1,
+                                          output_name="statements")
+    output_dir = index['output']
+    with open(os.path.join(output_dir, "index.csv"), newline='') as f:
+        rows = list(csv.DictReader(f))
+
+    assert sorted(name for name in os.listdir(output_dir) if name.endswith(".pdf")) == \
+        sorted(row['file'] for row in rows), os.listdir(output_dir)
+    assert [row['flat_no'] for row in rows] == ['A-2', 'A-10', 'B-1', 'B-2'], rows
+    assert float(rows[0]['amount_due']) == 3000.0, rows[0]
+    print("[PASS] Statements are written with an index")
+
+
+def run_colliding_names_test(generator, db_path):
+    """Flats whose safe names clash get numbered files, and a missing category renders"""
+    flats = ['C/1', 'C 1', 'C_1']
+    conn = sqlite3.connect(db_path)
+    conn.executemany('''
+        INSERT INTO residents (flat_no, name, date_joining, monthly_charges, status)
+        VALUES (?, ?, '2024-01-01', 500, 'Active')
+    ''', [(flat_no, f"Resident {flat_no}") for flat_no in flats])
+    conn.execute('''
+        INSERT INTO ledger (transaction_id, date, flat_no, transaction_type, category, description, debit, credit)
+        VALUES ('TXN-5', '2024-06-01', 'C/1', 'Payment', NULL, NULL, 0, 500)
+    ''')
+    conn.commit()
+    conn.close()
+
+    index = generator.generate_statements("tester", date(2024, 1, 1), date(2024, 12, 31), flat_numbers=flats,
+                                          max_workers=1, output_name="colliding")
+    files = {statement['flat_no']: statement['file'] for statement in index['statements']}
+    with open(os.path.join(index['output'], "index.csv"), newline='') as f:
+        indexed = {row['flat_no']: row['file'] for row in csv.DictReader(f)}
+
+    assert sorted(files) == sorted(flats) and len(set(files.values())) == 3, files
+    assert indexed == files, indexed
+    assert sorted(name for name in os.listdir(index['output']) if name.endswith(".pdf")) == sorted(files.values())
+    print("[PASS] Clashing flat names get their own statement files")
+
+
+def run_concurrent_output_test(generator):
+    """Runs started together for the same name each get their own directory or zip"""
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(generator.generate_statements, "tester", date(2024, 1, 1), date(2024, 12, 31),
+                                   flat_numbers=['A-2'], as_zip=as_zip, max_workers=1, output_name="concurrent")
+                   for as_zip in (False, True, False)]
+        outputs = sorted(future.result()['output'] for future in futures)
+
+    assert len(set(outputs)) == 3, outputs
+    assert all(os.path.basename(output).startswith("concurrent") for output in outputs), outputs
+    assert sorted(name for name in os.listdir("reports") if name.startswith("concurrent")) == \
+        sorted(os.path.basename(output) for output in outputs), os.listdir("reports")
+
+    # A name whose zip already exists is not reused for a directory
+    index = generator.generate_statements("tester", date(2024, 1, 1), date(2024, 12, 31), flat_numbers=['A-2'],
+                                          max_workers=1, output_name="concurrent")
+    assert index['output'] not in [os.path.splitext(output)[0] for output in outputs], index['output']
+    print("[PASS] Concurrent statement runs get separate outputs")
+
+
+def test_dues_statements():
+    """Run all dues statement tests in a temporary working directory"""
+    print("Testing dues statements...")
+    temp_dir = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        # Statements are written under ./reports
+        os.chdir(temp_dir)
+        db_path = os.path.join(temp_dir, "statements_test.db")
+        setup_test_database(db_path)
+        generator = DuesStatementGenerator(db_path)
+        run_statement_data_test(generator)
+        run_missing_joining_date_test(generator)
+        run_generate_test(generator)
+        run_concurrent_output_test(generator)
+        run_colliding_names_test(generator, db_path)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_dues_statements()
+    print("\nAll dues statement tests passed!")
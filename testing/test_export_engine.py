@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for the streamed CSV/Excel export engine
+"""
+
+import sys
+import os
+import csv
+import sqlite3
+import tempfile
+import shutil
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import export_engine
+
+
+def setup_test_database(db_path):
+    """Create a ledger table with a few transactions"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE ledger (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            transaction_id TEXT UNIQUE, date TEXT, flat_no TEXT, transaction_type TEXT,
+            category TEXT, description TEXT, debit REAL DEFAULT 0, credit REAL DEFAULT 0,
+            balance REAL DEFAULT 0, payment_mode TEXT, entered_by TEXT, created_at TEXT,
+            reconciliation_status TEXT DEFAULT 'Unreconciled'
+        )
+    ''')
+    cursor.executemany('''
+        INSERT INTO ledger (transaction_id, date, flat_no, transaction_type, category, description,
+                            debit, credit, balance, payment_mode, entered_by)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [
+        ('PAY-001', '2024-01-05', 'A-101', 'Payment', 'Maintenance', 'January dues', 0, 500, 500, 'UPI', 'admin'),
+        ('EXP-001', '2024-01-10', None, 'Expense', 'Repairs', 'Lift repair', 1200.5, 0, -700.5, 'Cash', 'admin'),
+        ('PAY-002', '2024-02-05', 'B-202', 'Payment', 'Maintenance', None, 0, 500, -200.5, 'Cash', 'admin'),
+    ])
+    conn.commit()
+    conn.close()
+
+
+def run_csv_export_test(db_path, temp_dir):
+    """Reconciliation rows are streamed to CSV with match details and formatted amounts"""
+    file_path = os.path.join(temp_dir, "reconciliation.csv")
+    rows = export_engine.iter_reconciliation_rows(db_path, '2024-01-01', '2024-01-31',
+                                                  {'EXP-001': ('92.5%', 'NEFT LIFT CO')})
+    count = export_engine.export_to_csv(file_path, export_engine.RECONCILIATION_EXPORT_COLUMNS, rows)
+
+    with open(file_path, newline='', encoding='utf-8') as f:
+        lines = list(csv.reader(f))
+
+    assert count == 2 and len(lines) == 3, f"Expected 2 rows in the period, got {count}"
+    assert lines[0] == [column.header for column in export_engine.RECONCILIATION_EXPORT_COLUMNS], \
+        f"Unexpected header: {lines[0]}"
+    assert lines[2] == ['2', 'EXP-001', '2024-01-10', '', 'Expense', 'Repairs', 'Lift repair', '1200.50',
+                        '0.00', '-700.50', 'Cash', 'Unreconciled', '92.5%', 'NEFT LIFT CO'], \
+        f"Unexpected row: {lines[2]}"
+    print("[PASS] CSV export streams rows from the database")
+
+
+def run_excel_export_test(db_path, temp_dir):
+    """Ledger rows are written to Excel with numeric amount cells"""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        print("[SKIP] openpyxl is not installed")
+        return
+
+    file_path = os.path.join(temp_dir, "ledger.xlsx")
+    count = export_engine.export_to_excel(file_path, export_engine.LEDGER_EXPORT_COLUMNS,
+                                          export_engine.iter_ledger_rows(db_path), sheet_title="Ledger")
+    ws = load_workbook(file_path).active
+    rows = list(ws.iter_rows(values_only=True))
+
+    assert count == 3 and len(rows) == 4 and ws.title == "Ledger", f"Expected 3 ledger rows, got {count}"
+    assert rows[2][6] == 1200.5 and ws.cell(row=3, column=7).number_format == export_engine.AMOUNT_FORMAT, \
+        f"Amount cell not exported as a formatted number: {rows[2]}"
+    print("[PASS] Excel export writes numeric, formatted amount columns")
+
+
+def test_export_engine():
+    """Run all export tests on a temporary database"""
+    print("Testing export engine...")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(temp_dir, "export_test.db")
+        setup_test_database(db_path)
+        run_csv_export_test(db_path, temp_dir)
+        run_excel_export_test(db_path, temp_dir)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_export_engine()
+    print("\nAll export engine tests passed!")
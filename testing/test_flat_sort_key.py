@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test script for the stored natural flat order and the FLAT_NATURAL collation
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import shutil
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.resident import ResidentManager, invalidate_resident_cache
+from utils.resident_utils import flat_sort_key
+from utils.db_context import get_db_connection
+from utils.audit_logger import audit_logger
+
+
+FLATS = ['B-1', 'A-10', 'A-2', 'A-101', 'A-02B', 'A', 'a-3', 'Tower 2/12', 'Tower 2/3', 'Tower 10/1']
+NATURAL_ORDER = ['A', 'A-2', 'A-02B', 'A-10', 'A-101', 'B-1', 'Tower 2/3', 'Tower 2/12', 'Tower 10/1', 'a-3']
+
+
+def setup_test_database(db_path):
+    """Create residents (without a flat_sort_key column) and audit_log"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE residents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            flat_no TEXT, name TEXT, resident_type TEXT, mobile_no TEXT, email TEXT, date_joining TEXT,
+            cars INTEGER DEFAULT 0, scooters INTEGER DEFAULT 0, parking_slot TEXT,
+            car_numbers TEXT, scooter_numbers TEXT, monthly_charges REAL, status TEXT, remarks TEXT,
+            profile_photo_path TEXT, vacancy_reason TEXT, expected_occupancy_date TEXT,
+            last_maintenance_date TEXT, maintenance_person_name TEXT, maintenance_person_phone TEXT
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE audit_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, user_id INTEGER, username TEXT,
+            action TEXT, table_name TEXT, record_id INTEGER, old_values TEXT, new_values TEXT,
+            details TEXT, ip_address TEXT, session_id TEXT
+        )
+    ''')
+    cursor.executemany('''
+        INSERT INTO residents (flat_no, name, resident_type, mobile_no, date_joining, status)
+        VALUES (?, ?, 'Owner', '9999999999', '2023-01-01', 'Active')
+    ''', [(flat_no, f"Resident {i}") for i, flat_no in enumerate(FLATS)])
+    conn.commit()
+    conn.close()
+
+
+def run_key_test():
+    """Keys compare like the flat numbers' natural order"""
+    assert sorted(FLATS, key=flat_sort_key) == NATURAL_ORDER, \
+        f"Unexpected key order: {sorted(FLATS, key=flat_sort_key)}"
+    assert (flat_sort_key('A-007') == flat_sort_key('A-7') and flat_sort_key(None) == '' and
+            flat_sort_key('A-9') < flat_sort_key('A-10')), \
+        "Numbers are not compared by value"
+    print("[PASS] Flat sort keys follow natural order")
+
+
+def run_column_test(manager, db_path):
+    """Existing residents get a stored key, and the directory is read through its index"""
+    assert manager.get_flat_numbers() == NATURAL_ORDER, f"Unexpected directory order: {manager.get_flat_numbers()}"
+
+    conn = sqlite3.connect(db_path)
+    stored = dict(conn.execute("SELECT flat_no, flat_sort_key FROM residents").fetchall())
+    plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM residents ORDER BY flat_sort_key, id").fetchall()
+    conn.close()
+    assert not any(stored[flat_no] != flat_sort_key(flat_no) for flat_no in FLATS), "Stored keys were not filled in"
+    assert 'idx_residents_flat_sort' in str(plan) and 'TEMP B-TREE' not in str(plan), \
+        f"Ordering does not use the index: {plan}"
+    print("[PASS] Keys are stored and ordering uses the index")
+
+
+def run_write_test(manager, db_path):
+    """Adding and updating residents stores the key of the new flat number"""
+    resident_id = manager.add_resident('A-9', 'Nine', 'Tenant', '8888888888', None, '2024-01-01',
+                                       0, 0, None, None, None, 500.0, 'Active', None)
+    assert manager.get_flat_numbers()[:4] == ['A', 'A-2', 'A-02B', 'A-9'], \
+        f"Added flat out of order: {manager.get_flat_numbers()}"
+
+    manager.update_resident(resident_id, 'B-20', 'Nine', 'Tenant', '8888888888', None, '2024-01-01',
+                            0, 0, None, None, None, 500.0, 'Active', None)
+    conn = sqlite3.connect(db_path)
+    stored = conn.execute("SELECT flat_sort_key FROM residents WHERE id = ?", (resident_id,)).fetchone()[0]
+    conn.close()
+    assert stored == flat_sort_key('B-20') and manager.get_flat_numbers()[6] == 'B-20', \
+        "Updated flat number did not update its key"
+
+    residents = manager.advanced_search_residents({'status': 'Active'}, sort_by='flat_no', sort_order='DESC')
+    assert [resident.flat_no for resident in residents][:3] == ['a-3', 'Tower 10/1', 'Tower 2/12'], \
+        "Advanced search does not sort flats naturally"
+    print("[PASS] Writes keep the stored keys up to date")
+
+
+def run_collation_test(db_path):
+    """Queries without a key column can sort with the FLAT_NATURAL collation"""
+    with get_db_connection(db_path) as conn:
+        flats = [row[0] for row in conn.execute(
+            "SELECT flat_no FROM residents WHERE flat_no IN (%s) ORDER BY flat_no COLLATE FLAT_NATURAL" %
+            ', '.join('?' * len(FLATS)), FLATS)]
+    assert flats == NATURAL_ORDER, f"Unexpected collation order: {flats}"
+    print("[PASS] FLAT_NATURAL collation sorts flats naturally")
+
+
+def test_flat_sort_key():
+    """Run all flat order tests on a temporary database"""
+    print("Testing natural flat order...")
+    temp_dir = tempfile.mkdtemp()
+    audit_db_path = audit_logger.db_path
+    try:
+        db_path = os.path.join(temp_dir, "flats_test.db")
+        setup_test_database(db_path)
+        audit_logger.db_path = db_path
+        manager = ResidentManager(db_path)
+        run_key_test()
+        run_column_test(manager, db_path)
+        run_write_test(manager, db_path)
+        run_collation_test(db_path)
+    finally:
+        audit_logger.db_path = audit_db_path
+        invalidate_resident_cache()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_flat_sort_key()
+    print("\nAll natural flat order tests passed!")
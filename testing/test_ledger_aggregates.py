@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Test script for the ledger aggregation layer and the reports built on it
+"""
+
+import sys
+import os
+import random
+import sqlite3
+import tempfile
+import shutil
+from datetime import date, timedelta
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.ledger_aggregates import LedgerAggregator, GROUP_DIMENSIONS
+from models.reports import ReportGenerator
+
+
+PERIODS = [
+    (None, None),
+    (date(2024, 1, 1), date(2024, 12, 31)),
+    (date(2024, 2, 10), date(2024, 9, 20)),
+    (date(2024, 5, 3), date(2024, 5, 27)),
+]
+GROUPINGS = [(), ('category',), ('type', 'category'), ('month', 'flat'), ('flat', 'category'), ('payment_mode',)]
+
+
+def setup_test_database(db_path, count=400):
+    """Create residents and a random 2024 ledger, including rows without a flat or category"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE residents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, flat_no TEXT, name TEXT, date_joining TEXT,
+            monthly_charges REAL, status TEXT
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE ledger (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            transaction_id TEXT UNIQUE, date TEXT, flat_no TEXT, transaction_type TEXT,
+            category TEXT, description TEXT, debit REAL DEFAULT 0, credit REAL DEFAULT 0,
+            balance REAL DEFAULT 0, payment_mode TEXT, entered_by TEXT, created_at TEXT,
+            reconciliation_status TEXT DEFAULT 'Unreconciled'
+        )
+    ''')
+    cursor.executemany('''
+        INSERT INTO residents (flat_no, name, date_joining, monthly_charges, status)
+        VALUES (?, ?, ?, ?, ?)
+    ''', [
+        ('A-101', 'Paid up', '2024-01-01', 500, 'Active'),
+        ('B-202', 'Higher charge', '2024-07-01', 2000, 'Active'),
+        ('C-303', 'No payments', '2024-10-01', None, 'Active'),
+        ('D-404', 'Moved out', '2024-01-01', 500, 'Inactive'),
+    ])
+
+    random.seed(11)
+    rows = []
+    for i in range(count):
+        transaction_type = random.choice(['Payment', 'Expense'])
+        amount = float(random.randint(1, 500))
+        day = date(2024, 1, 1) + timedelta(days=random.randint(0, 365))
+        rows.append((
+            f"TXN-{i + 1:03d}", day.strftime('%Y-%m-%d'), random.choice(['A-101', 'B-202', '', None]),
+            transaction_type, random.choice(['Maintenance', 'Parking', '', None]), 'test',
+            amount if transaction_type == 'Expense' else 0.0,
+            amount if transaction_type == 'Payment' else 0.0,
+            random.choice(['Cash', 'UPI'])
+        ))
+    cursor.executemany('''
+        INSERT INTO ledger (transaction_id, date, flat_no, transaction_type, category, description,
+                            debit, credit, payment_mode)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+    conn.close()
+
+
+def ledger_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    rows = [dict(row) for row in conn.execute("SELECT * FROM ledger")]
+    conn.close()
+    return rows
+
+
+def expected_aggregate(rows, group_by, transaction_type, start_date, end_date):
+    """Group the raw ledger rows in Python, the way the aggregator is meant to"""
+    columns = {'type': 'transaction_type', 'category': 'category', 'payment_mode': 'payment_mode'}
+    totals = {}
+    for row in rows:
+        if transaction_type and row['transaction_type'] != transaction_type:
+            continue
+        if start_date and not str(start_date) <= row['date'] <= str(end_date):
+            continue
+        key = []
+        for dimension in group_by:
+            if dimension == 'month':
+                key.append(row['date'][:7])
+            elif dimension == 'flat':
+                key.append(row['flat_no'] or None)
+            else:
+                key.append(row[columns[dimension]] or None)
+        total = totals.setdefault(tuple(key), [0.0, 0.0, 0])
+        total[0] += row['debit']
+        total[1] += row['credit']
+        total[2] += 1
+    if not group_by and not totals:
+        totals[()] = [0.0, 0.0, 0]
+    return {key: (round(debit, 2), round(credit, 2), count) for key, (debit, credit, count) in totals.items()}
+
+
+def actual_aggregate(aggregator, group_by, transaction_type, start_date, end_date):
+    rows = aggregator.aggregate(group_by, transaction_type, start_date, end_date)
+    result = {}
+    for row in rows:
+        key = tuple(row[dimension] for dimension in group_by)
+        assert key not in result, f"Group {key} returned twice for {group_by}"
+        result[key] = (round(row['debit'], 2), round(row['credit'], 2), row['count'])
+    return result
+
+
+def run_aggregate_test(db_path, use_rollup):
+    """Every grouping, type filter and period matches the raw ledger"""
+    aggregator = LedgerAggregator(db_path, use_rollup=use_rollup)
+    rows = ledger_rows(db_path)
+    assert set(GROUPINGS[-1]) <= set(GROUP_DIMENSIONS)
+
+    for start_date, end_date in PERIODS:
+        for group_by in GROUPINGS:
+            for transaction_type in (None, 'Payment', 'Expense'):
+                expected = expected_aggregate(rows, group_by, transaction_type, start_date, end_date)
+                actual = actual_aggregate(aggregator, group_by, transaction_type, start_date, end_date)
+                assert actual == expected, \
+                    f"Aggregates differ for {group_by} {transaction_type} {start_date}..{end_date}"
+
+    conn = sqlite3.connect(db_path)
+    has_rollup = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE name = 'ledger_monthly_rollup'").fetchone()[0]
+    conn.close()
+    assert bool(has_rollup) == use_rollup, "Rollup table state does not match the aggregator"
+    print(f"[PASS] Aggregates match the raw ledger {'with' if use_rollup else 'without'} rollup rows")
+
+
+def run_category_totals_test(db_path):
+    """Category totals use credits for payments and debits for everything else, largest first"""
+    aggregator = LedgerAggregator(db_path)
+    rows = ledger_rows(db_path)
+    period = (date(2024, 3, 15), date(2024, 11, 10))
+
+    income, expenses = aggregator.income_expense_by_category(*period)
+    assert income == aggregator.category_totals('Payment', *period), income
+    assert expenses == aggregator.category_totals('Expense', *period), expenses
+    expected = expected_aggregate(rows, ('category',), 'Payment', *period)
+    assert {category: round(amount, 2) for category, amount in income} == \
+        {key[0]: totals[1] for key, totals in expected.items()}, income
+    assert [amount for _, amount in expenses] == sorted((amount for _, amount in expenses), reverse=True)
+    print("[PASS] Category totals are taken from the right side and sorted")
+
+
+def run_outstanding_dues_test(db_path):
+    """Outstanding dues use each flat's maintenance payments and each resident's own charge"""
+    rows = ledger_rows(db_path)
+    start_date, end_date = date(2024, 1, 1), date(2024, 12, 31)
+    paid = {}
+    for row in rows:
+        if row['transaction_type'] == 'Payment' and row['category'] == 'Maintenance' and row['flat_no']:
+            paid[row['flat_no']] = paid.get(row['flat_no'], 0.0) + row['credit']
+
+    dues = {entry['flat_no']: entry for entry in ReportGenerator(db_path).get_outstanding_dues(start_date, end_date)}
+
+    expected = {
+        'A-101': (12, 12 * 500.0),
+        'B-202': (6, 6 * 2000.0),
+        'C-303': (3, 3 * 500.0),  # No monthly charge set: the default applies
+    }
+    for flat_no, (months_due, expected_amount) in expected.items():
+        amount_due = expected_amount - paid.get(flat_no, 0.0)
+        if amount_due <= 0:
+            assert flat_no not in dues, f"{flat_no} has no dues but is listed"
+            continue
+        entry = dues[flat_no]
+        assert (entry['months_due'], entry['expected_amount']) == (months_due, expected_amount), entry
+        assert round(entry['amount_paid'], 2) == round(paid.get(flat_no, 0.0), 2), entry
+        assert round(entry['amount_due'], 2) == round(amount_due, 2), entry
+    assert 'D-404' not in dues, "Inactive resident listed"
+    assert list(dues) == sorted(dues, key=lambda flat_no: dues[flat_no]['amount_due'], reverse=True)
+    print("[PASS] Outstanding dues come from the aggregated maintenance payments")
+
+
+def test_ledger_aggregates():
+    """Run all aggregation tests in a temporary working directory"""
+    print("Testing ledger aggregates...")
+    temp_dir = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        # Reports are written under ./reports
+        os.chdir(temp_dir)
+        db_path = os.path.join(temp_dir, "aggregates_test.db")
+        setup_test_database(db_path)
+        run_aggregate_test(db_path, use_rollup=False)
+        run_aggregate_test(db_path, use_rollup=True)
+        run_category_totals_test(db_path)
+        run_outstanding_dues_test(db_path)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_ledger_aggregates()
+    print("\nAll ledger aggregate tests passed!")
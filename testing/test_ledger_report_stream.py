@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for the streamed ledger report: chunked tables and totals carried across pages
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import shutil
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models.reports as reports
+from models.reports import ReportGenerator
+
+
+def setup_test_database(db_path, rows):
+    """Create a ledger whose running debit and credit sums identify how many rows were drawn"""
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE ledger (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            transaction_id TEXT UNIQUE, date TEXT, flat_no TEXT, transaction_type TEXT,
+            category TEXT, description TEXT, debit REAL DEFAULT 0, credit REAL DEFAULT 0,
+            balance REAL DEFAULT 0, payment_mode TEXT, entered_by TEXT, created_at TEXT,
+            reconciliation_status TEXT DEFAULT 'Unreconciled'
+        )
+    ''')
+    conn.executemany('''
+        INSERT INTO ledger (transaction_id, date, flat_no, transaction_type, category, description,
+                            debit, credit, balance)
+        VALUES (?, ?, ?, 'Payment', 'Maintenance', ?, ?, ?, 0)
+    ''', [(f"TXN{i}", f"2024-{(i % 12) + 1:02d}-01", f"A-{i}", f"Row {i} with a long description " * 3,
+           float(i), 2.0 * i) for i in range(1, rows + 1)])
+    conn.commit()
+    conn.close()
+
+
+def expected_totals(db_path, rows_drawn):
+    """Debit and credit totals of the first rows_drawn rows in report order"""
+    conn = sqlite3.connect(db_path)
+    debit, credit = conn.execute('''
+        SELECT COALESCE(SUM(debit), 0), COALESCE(SUM(credit), 0)
+        FROM (SELECT debit, credit FROM ledger ORDER BY date ASC, id ASC LIMIT ?)
+    ''', (rows_drawn,)).fetchone()
+    conn.close()
+    return f"{debit:.2f}", f"{credit:.2f}"
+
+
+class RecordingPageTotals(reports._LedgerPageTotals):
+    """Page totals that record every totals row they draw"""
+
+    drawn = []
+
+    def _draw_totals_row(self, canvas, x, top, label):
+        RecordingPageTotals.drawn.append((label, f"{self.debit:.2f}", f"{self.credit:.2f}", self.rows_drawn))
+        super()._draw_totals_row(canvas, x, top, label)
+
+
+def run_stream_test(db_path, rows, chunk_size):
+    """Every page carries its running totals forward and the last page shows the full totals"""
+    RecordingPageTotals.drawn = []
+    progress = []
+    generator = ReportGenerator(db_path)
+    file_path = generator.generate_ledger_report("tester", file_name=f"ledger_{rows}.pdf", chunk_size=chunk_size,
+                                                 progress_callback=progress.append)
+    drawn = RecordingPageTotals.drawn
+
+    assert os.path.getsize(file_path) > 0, file_path
+    assert progress[-1] == rows and len(progress) == -(-rows // chunk_size), progress[-3:]
+    assert len(drawn) > 4, f"Expected several pages, got {drawn}"
+
+    # Each page after the first opens with what the previous page carried forward
+    page_ends = [entry for entry in drawn if entry[0] != 'Brought forward']
+    brought = [entry for entry in drawn if entry[0] == 'Brought forward']
+    assert len(brought) == len(page_ends) - 1, drawn
+    for carried, opened in zip(page_ends, brought):
+        assert carried[0] == 'Carried forward' and carried[1:] == opened[1:], (carried, opened)
+
+    for label, debit, credit, rows_drawn in page_ends:
+        assert (debit, credit) == expected_totals(db_path, rows_drawn), \
+            f"{label} after {rows_drawn} rows shows {debit}/{credit}"
+    assert page_ends[-1][0] == 'TOTALS' and page_ends[-1][3] == rows, page_ends[-1]
+    assert page_ends[-1][1:3] == expected_totals(db_path, rows), page_ends[-1]
+    print(f"[PASS] {rows} rows over {len(page_ends)} pages carry their totals forward")
+
+
+def test_ledger_report_stream():
+    """Run all streamed ledger report tests in a temporary working directory"""
+    print("Testing streamed ledger report...")
+    temp_dir = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    page_totals_class = reports._LedgerPageTotals
+    try:
+        # Reports are written under ./reports
+        os.chdir(temp_dir)
+        reports._LedgerPageTotals = RecordingPageTotals
+        for rows, chunk_size in [(200, 30), (1000, 37)]:
+            db_path = os.path.join(temp_dir, f"ledger_stream_{rows}.db")
+            setup_test_database(db_path, rows)
+            run_stream_test(db_path, rows, chunk_size)
+    finally:
+        reports._LedgerPageTotals = page_totals_class
+        os.chdir(cwd)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_ledger_report_stream()
+    print("\nAll streamed ledger report tests passed!")
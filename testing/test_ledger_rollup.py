@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test script for the monthly ledger rollup and the aggregation layer that reads it
+"""
+
+import sys
+import os
+import random
+import sqlite3
+import tempfile
+import shutil
+from datetime import date, timedelta
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.ledger_rollup import LedgerRollup
+from models.ledger_aggregates import LedgerAggregator
+
+
+def setup_test_database(db_path, count=500):
+    """Create a ledger table with random payments and expenses across 2024"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE ledger (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            transaction_id TEXT UNIQUE, date TEXT, flat_no TEXT, transaction_type TEXT,
+            category TEXT, description TEXT, debit REAL DEFAULT 0, credit REAL DEFAULT 0,
+            balance REAL DEFAULT 0, payment_mode TEXT, entered_by TEXT, created_at TEXT,
+            reconciliation_status TEXT DEFAULT 'Unreconciled'
+        )
+    ''')
+
+    random.seed(7)
+    rows = []
+    for i in range(count):
+        transaction_type = random.choice(['Payment', 'Expense'])
+        amount = float(random.randint(1, 5000))
+        day = date(2024, 1, 1) + timedelta(days=random.randint(0, 365))
+        rows.append((
+            f"TXN-{i + 1:03d}", day.strftime('%Y-%m-%d'), random.choice(['A-101', 'B-202', None]),
+            transaction_type, random.choice(['Maintenance', 'Parking', 'Repairs']), 'test',
+            amount if transaction_type == 'Expense' else 0.0,
+            amount if transaction_type == 'Payment' else 0.0,
+            random.choice(['Cash', 'UPI'])
+        ))
+    cursor.executemany('''
+        INSERT INTO ledger (transaction_id, date, flat_no, transaction_type, category, description,
+                            debit, credit, payment_mode)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+    conn.close()
+
+
+def run_rollup_maintenance_test(db_path):
+    """Triggers keep the rollup in line with inserts, updates and deletes"""
+    rollup = LedgerRollup(db_path)
+    rollup.ensure_initialized()
+    assert not rollup.verify(), "Rollup built from an existing ledger does not match"
+    print("[PASS] Rollup is filled from the existing ledger")
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT INTO ledger (transaction_id, date, flat_no, transaction_type, category, description,
+                            debit, credit, payment_mode)
+        VALUES ('TXN-R01', '2024-03-15', 'A-101', 'Payment Reversal', 'Maintenance', 'REVERSAL', 100, 0, 'Cash')
+    ''')
+    cursor.execute("UPDATE ledger SET date = '2024-07-02', credit = credit + 10 WHERE transaction_id = 'TXN-010'")
+    cursor.execute("UPDATE ledger SET balance = 1, reconciliation_status = 'Reconciled' WHERE id < 50")
+    cursor.execute("DELETE FROM ledger WHERE transaction_id IN ('TXN-020', 'TXN-021', 'TXN-022')")
+    conn.commit()
+    conn.close()
+
+    mismatches = rollup.verify()
+    assert not mismatches, f"Rollup drifted after ledger changes: {mismatches[:5]}"
+    print("[PASS] Rollup follows inserts, updates and deletes")
+
+    # Corrupt the rollup and check verify notices and rebuild repairs it
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE ledger_monthly_rollup SET credit = credit + 1 WHERE rowid = 1")
+    conn.commit()
+    conn.close()
+    assert len(rollup.verify()) == 1, "Verify did not report the corrupted group"
+    rollup.rebuild()
+    assert not rollup.verify(), "Rebuild did not repair the rollup"
+    print("[PASS] Verify detects drift and rebuild repairs it")
+
+
+def run_aggregates_test(db_path):
+    """Rollup-backed aggregates match a direct ledger aggregation for any period"""
+    with_rollup = LedgerAggregator(db_path)
+    without_rollup = LedgerAggregator(db_path, use_rollup=False)
+
+    periods = [
+        (None, None),
+        (date(2024, 1, 1), date(2024, 12, 31)),
+        (date(2024, 2, 10), date(2024, 9, 20)),
+        (date(2024, 5, 3), date(2024, 5, 27)),
+        (date(2024, 6, 1), date(2024, 6, 30)),
+    ]
+    groupings = [('category',), ('type', 'category'), ('month', 'flat'), ()]
+
+    for start_date, end_date in periods:
+        for group_by in groupings:
+            for transaction_type in (None, 'Payment'):
+                expected = without_rollup.aggregate(group_by, transaction_type, start_date, end_date)
+                actual = with_rollup.aggregate(group_by, transaction_type, start_date, end_date)
+                assert _normalise(expected) == _normalise(actual), \
+                    f"Aggregates differ for {group_by} {transaction_type} {start_date}..{end_date}"
+    print("[PASS] Rollup-backed aggregates match the ledger for whole and partial months")
+
+    assert (with_rollup.aggregate(('payment_mode',), 'Expense') ==
+            without_rollup.aggregate(('payment_mode',), 'Expense')), \
+        "Payment mode grouping should fall back to the ledger"
+    print("[PASS] Groupings the rollup cannot answer fall back to the ledger")
+
+
+def _normalise(rows):
+    return [{key: round(value, 2) if isinstance(value, float) else value for key, value in row.items()}
+            for row in rows]
+
+
+def test_ledger_rollup():
+    """Run all rollup tests on a temporary database"""
+    print("Testing ledger monthly rollup...")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(temp_dir, "rollup_test.db")
+        setup_test_database(db_path)
+        run_rollup_maintenance_test(db_path)
+        run_aggregates_test(db_path)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_ledger_rollup()
+    print("\nAll ledger rollup tests passed!")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test script for content-addressed photo storage and photo garbage collection
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import shutil
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.profile_photo_manager import ProfilePhotoManager, get_photo_references, main
+from utils.database_exceptions import DatabaseError
+from models.resident import invalidate_resident_cache
+
+
+def setup_test_database(db_path):
+    """Create residents and domestic_help with photo paths"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("CREATE TABLE residents (id INTEGER PRIMARY KEY AUTOINCREMENT, flat_no TEXT, profile_photo_path TEXT)")
+    cursor.execute("CREATE TABLE domestic_help (id INTEGER PRIMARY KEY AUTOINCREMENT, resident_id INTEGER, photo_path TEXT)")
+    cursor.executemany("INSERT INTO residents (flat_no) VALUES (?)", [("A-1",), ("A-2",), ("A-3",)])
+    cursor.execute("INSERT INTO domestic_help (resident_id) VALUES (1)")
+    conn.commit()
+    conn.close()
+
+
+def set_photo(db_path, table, column, row_id, photo_filename):
+    conn = sqlite3.connect(db_path)
+    conn.execute(f"UPDATE {table} SET {column} = ? WHERE id = ?", (photo_filename, row_id))
+    conn.commit()
+    conn.close()
+
+
+def make_old(path):
+    """Backdate a file past the garbage collection grace period"""
+    os.utime(path, (1000000000, 1000000000))
+
+
+def run_dedupe_test(photo_manager, db_path):
+    """Identical uploads share one sharded file, which is kept while referenced"""
+    first = photo_manager.save_profile_photo(1, b"same photo", ".JPG")
+    second = photo_manager.save_profile_photo(2, b"same photo", ".jpg")
+    other = photo_manager.save_profile_photo(3, b"other photo", ".png")
+    assert first == second and first != other and first.startswith(first[3:5] + "/") and first.endswith(".jpg"), \
+        f"Unexpected photo filenames: {first}, {second}, {other}"
+    assert len(os.listdir(os.path.join(photo_manager.base_path, first[:2]))) == 1, "Identical photo stored twice"
+
+    set_photo(db_path, "residents", "profile_photo_path", 1, first)
+    set_photo(db_path, "residents", "profile_photo_path", 2, first)
+    set_photo(db_path, "domestic_help", "photo_path", 1, other)
+    references = get_photo_references(db_path)
+    assert references[first] == 2 and references[other] == 1, f"Unexpected reference counts: {references}"
+
+    # Resident 1 removes the shared photo; resident 2 still shows it
+    set_photo(db_path, "residents", "profile_photo_path", 1, None)
+    photo_manager.delete_profile_photo(first, db_path)
+    assert photo_manager.get_profile_photo_path(first) is not None, "Shared photo deleted while still referenced"
+    set_photo(db_path, "residents", "profile_photo_path", 2, None)
+    photo_manager.delete_profile_photo(first, db_path)
+    assert photo_manager.get_profile_photo_path(first) is None, "Unreferenced photo was not deleted"
+    print("[PASS] Identical photos are stored once and deleted with their last reference")
+
+
+def run_gc_test(photo_manager, db_path):
+    """Garbage collection removes orphan photos and thumbnails, and keeps referenced and recent files"""
+    kept = photo_manager.save_profile_photo(3, b"kept photo")
+    orphan = photo_manager.save_profile_photo(3, b"replaced photo")
+    recent = photo_manager.save_profile_photo(3, b"upload in progress")
+    set_photo(db_path, "residents", "profile_photo_path", 3, kept)
+    thumbs = os.path.join(photo_manager.base_path, "thumbs")
+    orphan_thumbnail = photo_manager.get_thumbnail_path(orphan, 40)
+    kept_thumbnail = photo_manager.get_thumbnail_path(kept, 40)
+    legacy = os.path.join(photo_manager.base_path, "resident_3_20240101_120000_thumb.jpg")
+    for path in (orphan_thumbnail, kept_thumbnail, legacy):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(b"thumbnail")
+    for root, _, names in os.walk(photo_manager.base_path):
+        for name in names:
+            make_old(os.path.join(root, name))
+    # Uploading an identical photo again makes the stored copy recent
+    photo_manager.save_profile_photo(3, b"upload in progress")
+
+    dry_run = photo_manager.collect_garbage(db_path, dry_run=True)
+    assert (dry_run['removed_photos'] == [orphan] and dry_run['removed_thumbnails'] == 2 and
+            os.path.exists(os.path.join(photo_manager.base_path, orphan))), \
+        f"Unexpected dry run: {dry_run}"
+
+    result = photo_manager.collect_garbage(db_path)
+    remaining = sorted(os.path.relpath(os.path.join(root, name), photo_manager.base_path).replace(os.sep, "/")
+                       for root, _, names in os.walk(photo_manager.base_path) for name in names)
+    expected = sorted(list(get_photo_references(db_path)) +
+                      [recent, os.path.relpath(kept_thumbnail, photo_manager.base_path).replace(os.sep, "/")])
+    assert remaining == expected and result['freed_bytes'] == dry_run['freed_bytes'], \
+        f"Unexpected files after garbage collection: {remaining}"
+    assert (not os.path.exists(os.path.dirname(os.path.join(photo_manager.base_path, orphan))) and
+            not os.path.exists(os.path.dirname(orphan_thumbnail))), \
+        "Empty shard folders left behind"
+    assert os.path.isdir(thumbs), "Thumbnail folder removed"
+    print(f"[PASS] Garbage collection freed {result['freed_bytes']} bytes")
+
+
+def run_safety_test(photo_manager, temp_dir):
+    """Garbage collection refuses to run against a database without residents"""
+    empty_db = os.path.join(temp_dir, "empty.db")
+    try:
+        photo_manager.collect_garbage(empty_db)
+        raise AssertionError("Garbage collection ran without knowing the references")
+    except DatabaseError:
+        pass
+    assert main(["--db", empty_db, "--photos", photo_manager.base_path, "gc"]) == 1, \
+        "gc command did not report the error"
+    print("[PASS] Garbage collection needs the residents table")
+
+
+def run_migration_test(photo_manager, db_path):
+    """Photos saved under the old names move to their content filename"""
+    for name in ("resident_1_20240101_120000.jpg", "resident_2_20240101_120000.jpg"):
+        with open(os.path.join(photo_manager.base_path, name), "wb") as f:
+            f.write(b"old photo")
+        make_old(os.path.join(photo_manager.base_path, name))
+    set_photo(db_path, "residents", "profile_photo_path", 1, "resident_1_20240101_120000.jpg")
+    set_photo(db_path, "domestic_help", "photo_path", 1, "resident_2_20240101_120000.jpg")
+
+    assert main(["--db", db_path, "--photos", photo_manager.base_path, "migrate"]) == 0, "migrate command failed"
+    references = get_photo_references(db_path)
+    migrated = photo_manager.save_profile_photo(1, b"old photo")
+    assert references[migrated] == 2 and not any(name.startswith("resident_") for name in references), \
+        f"References not migrated: {references}"
+
+    photo_manager.collect_garbage(db_path)
+    assert not any(name.startswith("resident_") for name in os.listdir(photo_manager.base_path)), \
+        "Old photo files left after garbage collection"
+    print("[PASS] Existing photos are migrated to content filenames")
+
+
+def test_photo_storage():
+    """Run all photo storage tests in a temporary folder"""
+    print("Testing photo storage...")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(temp_dir, "photos_test.db")
+        setup_test_database(db_path)
+        photo_manager = ProfilePhotoManager(os.path.join(temp_dir, "photos"))
+        run_dedupe_test(photo_manager, db_path)
+        run_gc_test(photo_manager, db_path)
+        run_safety_test(photo_manager, temp_dir)
+        run_migration_test(photo_manager, db_path)
+    finally:
+        invalidate_resident_cache()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_photo_storage()
+    print("\nAll photo storage tests passed!")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test script for profile photo thumbnails and the pixmap cache
+"""
+
+import sys
+import os
+import time
+import tempfile
+import shutil
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import Qt
+from PyQt5.QtTest import QTest
+from utils.profile_photo_manager import ProfilePhotoManager, THUMBNAIL_SIZES
+from gui.photo_service import PhotoService
+from gui.resident_table_model import ResidentTableModel, PHOTO_COLUMN, GRID_PHOTO_SIZE
+from models.resident import Resident
+
+
+def create_photo(photo_manager, filename, color, size=(1200, 800)):
+    Image.new("RGB", size, color).save(os.path.join(photo_manager.base_path, filename), "JPEG")
+
+
+def wait_for_thumbnail(service, photo_filename, timeout=5.0):
+    """Process events until the photo's thumbnails have been generated"""
+    deadline = time.time() + timeout
+    while service.is_pending(photo_filename) and time.time() < deadline:
+        QTest.qWait(20)
+    return not service.is_pending(photo_filename)
+
+
+def run_generation_test(service, photo_manager):
+    """Missing thumbnails are generated in the background at every size"""
+    create_photo(photo_manager, "resident_1.jpg", "red")
+    assert service.pixmap("resident_1.jpg", 150) is None and service.is_pending("resident_1.jpg"), \
+        "Thumbnail was not generated in the background"
+    assert wait_for_thumbnail(service, "resident_1.jpg"), "Thumbnail generation did not finish"
+
+    for size in THUMBNAIL_SIZES:
+        pixmap = service.pixmap("resident_1.jpg", size)
+        assert pixmap is not None and max(pixmap.width(), pixmap.height()) == size, f"No {size}px thumbnail"
+        assert os.path.exists(photo_manager.get_thumbnail_path("resident_1.jpg", size)), \
+            f"{size}px thumbnail file missing"
+    assert service.pixmap("resident_1.jpg", 150) is service.pixmap("resident_1.jpg", 150), \
+        "Thumbnail pixmap was not cached"
+    assert service.pixmap("missing.jpg", 40) is None and not service.is_pending("missing.jpg"), \
+        "Missing photo was not ignored"
+    print("[PASS] Thumbnails are generated in the background and cached")
+
+
+def run_lru_test(photo_manager):
+    """The least recently used pixmap is dropped, and a changed photo gets a new thumbnail"""
+    service = PhotoService(photo_manager, cache_size=2)
+    for filename in ("resident_1.jpg", "resident_2.jpg", "resident_3.jpg"):
+        if not os.path.exists(os.path.join(photo_manager.base_path, filename)):
+            create_photo(photo_manager, filename, "blue")
+        service.pixmap(filename, 40)
+        wait_for_thumbnail(service, filename)
+        service.pixmap(filename, 40)
+    assert [key[0] for key in service._pixmaps] == ["resident_2.jpg", "resident_3.jpg"], \
+        f"Unexpected cached pixmaps: {list(service._pixmaps)}"
+
+    # Replace resident 2's photo with a portrait one
+    create_photo(photo_manager, "resident_2.jpg", "green", size=(400, 800))
+    later = time.time() + 10
+    os.utime(os.path.join(photo_manager.base_path, "resident_2.jpg"), (later, later))
+    service.invalidate("resident_2.jpg")
+    assert service.pixmap("resident_2.jpg", 40) is None, "Stale thumbnail served after the photo changed"
+    wait_for_thumbnail(service, "resident_2.jpg")
+    pixmap = service.pixmap("resident_2.jpg", 40)
+    assert pixmap is not None and (pixmap.width(), pixmap.height()) == (20, 40), \
+        "Changed photo did not get a new thumbnail"
+    print("[PASS] Pixmap cache is LRU and keyed by modification time")
+
+
+def run_unreadable_photo_test(service, photo_manager):
+    """A file that is not an image does not keep the service regenerating it"""
+    with open(os.path.join(photo_manager.base_path, "broken.jpg"), "wb") as f:
+        f.write(b"not an image")
+    service.pixmap("broken.jpg", 40)
+    wait_for_thumbnail(service, "broken.jpg")
+    assert service.pixmap("broken.jpg", 40) is None and not service.is_pending("broken.jpg"), \
+        "Unreadable photo was retried"
+    print("[PASS] Unreadable photos are not retried")
+
+
+def run_model_test(service, photo_manager):
+    """The resident list shows thumbnails and repaints rows when one is generated"""
+    create_photo(photo_manager, "resident_4.jpg", "yellow")
+    residents = [Resident(4, "A-4", "Asha", "Owner", "9999999999", None, "2023-01-01", 0, 0, None,
+                          None, None, 500.0, "Active", None, "resident_4.jpg"),
+                 Resident(5, "A-5", "Bala", "Owner", "9999999999", None, "2023-01-01", 0, 0, None,
+                          None, None, 500.0, "Active", None)]
+    model = ResidentTableModel(photos=service)
+    model.set_residents(residents)
+    changed = []
+    model.dataChanged.connect(lambda top_left, bottom_right, roles: changed.append(top_left.row()))
+
+    assert model.index(0, PHOTO_COLUMN).data(Qt.DecorationRole) is None, "Thumbnail shown before it was generated"
+    wait_for_thumbnail(service, "resident_4.jpg")
+    pixmap = model.index(0, PHOTO_COLUMN).data(Qt.DecorationRole)
+    assert changed == [0] and pixmap is not None and pixmap.width() == GRID_PHOTO_SIZE, \
+        f"Photo column not refreshed: rows {changed}"
+    assert model.index(1, PHOTO_COLUMN).data(Qt.DecorationRole) is None, "Resident without a photo shows one"
+
+    photo_manager.delete_profile_photo("resident_4.jpg")
+    thumbnails = os.listdir(os.path.join(photo_manager.base_path, "thumbs"))
+    assert not any(name.startswith("resident_4_") for name in thumbnails), \
+        "Thumbnails left behind after deleting the photo"
+    print("[PASS] Resident list shows photo thumbnails")
+
+
+def test_photo_thumbnails():
+    """Run all photo thumbnail tests in a temporary photo folder"""
+    print("Testing photo thumbnails...")
+    app = QApplication.instance() or QApplication(sys.argv)
+    temp_dir = tempfile.mkdtemp()
+    try:
+        photo_manager = ProfilePhotoManager(os.path.join(temp_dir, "photos"))
+        service = PhotoService(photo_manager)
+        run_generation_test(service, photo_manager)
+        run_lru_test(photo_manager)
+        run_unreadable_photo_test(service, photo_manager)
+        run_model_test(service, photo_manager)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_photo_thumbnails()
+    print("\nAll photo thumbnail tests passed!")
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Test script for the background report job queue: progress, cancellation and cleanup
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import shutil
+import threading
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication
+from utils.report_jobs import ReportJobQueue, FINISHED, RUNNING, CANCELLED
+
+
+def setup_test_database(db_path, flats=60):
+    """Create residents and a ledger with one maintenance payment per flat"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE residents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, flat_no TEXT, name TEXT, date_joining TEXT,
+            monthly_charges REAL, status TEXT
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE ledger (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            transaction_id TEXT UNIQUE, date TEXT, flat_no TEXT, transaction_type TEXT,
+            category TEXT, description TEXT, debit REAL DEFAULT 0, credit REAL DEFAULT 0,
+            balance REAL DEFAULT 0, payment_mode TEXT, entered_by TEXT, created_at TEXT,
+            reconciliation_status TEXT DEFAULT 'Unreconciled'
+        )
+    ''')
+    cursor.executemany('''
+        INSERT INTO residents (flat_no, name, date_joining, monthly_charges, status)
+        VALUES (?, ?, '2024-01-01', 500, 'Active')
+    ''', [(f"A-{i}", f"Resident {i}") for i in range(1, flats + 1)])
+    cursor.executemany('''
+        INSERT INTO ledger (transaction_id, date, flat_no, transaction_type, category, description, credit, balance)
+        VALUES (?, '2024-02-01', ?, 'Payment', 'Maintenance', 'February maintenance', 500, ?)
+    ''', [(f"TXN{i}", f"A-{i}", 500.0 * i) for i in range(1, flats + 1)])
+    conn.commit()
+    conn.close()
+
+
+def record_progress(queue, cancel_when=None):
+    """
+    Record the progress checkpoints of a queue's jobs, and cancel a job at the
+    first checkpoint for which cancel_when(percent) is true.
+    """
+    checkpoints = []
+
+    def checkpoint(job, percent, message):
+        checkpoints.append((percent, message))
+        if cancel_when and cancel_when(percent):
+            queue.cancel(job.job_id)
+        ReportJobQueue._report_progress(queue, job, percent, message)
+
+    queue._report_progress = checkpoint
+    return checkpoints
+
+
+def block_jobs(queue, release):
+    """Hold every running job at its first progress checkpoint until release is set"""
+    def checkpoint(job, percent, message):
+        release.wait(60)
+        ReportJobQueue._report_progress(queue, job, percent, message)
+
+    queue._report_progress = checkpoint
+
+
+def wait_until(condition, app=None):
+    deadline = time.time() + 60
+    while not condition():
+        assert time.time() < deadline, "Timed out waiting for the report jobs"
+        if app:
+            app.processEvents()
+        time.sleep(0.01)
+
+
+def run_job(queue, report_type):
+    job_id = queue.submit(report_type, "tester")
+    job = queue.jobs[job_id]
+    job.future.result(timeout=300)
+    return job
+
+
+def reports_named(prefix):
+    return [name for name in os.listdir("reports") if name.startswith(prefix)]
+
+
+def run_finished_job_test(queue):
+    """A ledger job reports its rows and leaves its PDF behind"""
+    checkpoints = record_progress(queue)
+    job = run_job(queue, "Ledger Report")
+
+    assert job.state == FINISHED, job.error
+    assert os.path.exists(job.file_path)
+    assert checkpoints and checkpoints[-1] == (-1, "60 rows laid out"), checkpoints
+    assert not queue.cancel(job.job_id), "Finished job reported as cancellable"
+    print("[PASS] Finished ledger job keeps its report")
+
+
+def run_ledger_cancel_test(queue):
+    """Cancelling a ledger job at a checkpoint stops it and removes the partial PDF"""
+    finished_reports = reports_named("ledger_report")
+    record_progress(queue, cancel_when=lambda percent: True)
+    job = run_job(queue, "Ledger Report")
+
+    assert job.state == CANCELLED, job.state
+    assert reports_named("ledger_report") == finished_reports, "Cancelled ledger report left behind"
+    print("[PASS] Cancelled ledger job stops and cleans up")
+
+
+def run_statements_cancel_test(queue):
+    """Dues statements report progress per batch and remove their folder when cancelled"""
+    checkpoints = record_progress(queue, cancel_when=lambda percent: percent > 0)
+    job = run_job(queue, "Dues Statements (per flat)")
+
+    assert job.state == CANCELLED, job.error or job.state
+    assert checkpoints[0] == (0, "0 of 60 statements done"), checkpoints
+    assert 0 < checkpoints[-1][0] < 100, checkpoints
+    assert not reports_named("dues_statements"), "Cancelled statements folder left behind"
+    print("[PASS] Cancelled statements job removes its folder")
+
+
+def run_pack_cancel_test(queue):
+    """A month-end pack cancelled before its reports finish removes its folder"""
+    checkpoints = record_progress(queue, cancel_when=lambda percent: True)
+    job = run_job(queue, "Month-End Report Pack")
+
+    assert job.state == CANCELLED, job.error or job.state
+    assert checkpoints == [(0, "0 of 7 reports done")], checkpoints
+    assert not reports_named("month_end"), "Cancelled pack folder left behind"
+    print("[PASS] Cancelled report pack removes its folder")
+
+
+def run_queued_cancel_test(queue, app):
+    """A queued job is dropped at once, while a running job only stops at its next checkpoint"""
+    release = threading.Event()
+    block_jobs(queue, release)
+    cancelled = []
+    queue.job_cancelled.connect(cancelled.append)
+    running = queue.jobs[queue.submit("Ledger Report", "tester")]
+    queued = queue.jobs[queue.submit("Ledger Report", "tester")]
+    try:
+        wait_until(lambda: running.state == RUNNING)
+        assert queue.cancel(queued.job_id) == CANCELLED and queued.state == CANCELLED, queued.state
+        assert cancelled == [queued.job_id], cancelled
+        assert queue.cancel(running.job_id) == RUNNING, "Running job reported as dropped"
+    finally:
+        release.set()
+    running.future.result(timeout=300)
+    app.processEvents()
+
+    assert running.state == CANCELLED and cancelled == [queued.job_id, running.job_id], (running.state, cancelled)
+    assert queue.cancel(queued.job_id) is None, "Cancelled job reported as cancellable"
+    queue.job_cancelled.disconnect()
+    print("[PASS] Queued jobs are dropped and running jobs stop at a checkpoint")
+
+
+def run_dialog_cancel_test(app):
+    """The jobs table shows 'Cancelled' for dropped jobs and 'Cancelling...' until running ones stop"""
+    from gui.reports_dialog import ReportsDialog
+
+    dialog = ReportsDialog()
+    queue = dialog.job_queue
+    release = threading.Event()
+    block_jobs(queue, release)
+    job_ids = [queue.submit("Ledger Report", "tester") for _ in range(3)]
+
+    def status(row):
+        return dialog.jobs_table.item(row, 1).text()
+
+    try:
+        app.processEvents()
+        wait_until(lambda: [queue.jobs[job_id].state for job_id in job_ids[:2]] == [RUNNING, RUNNING], app)
+
+        # Both workers are busy, so the third job is still queued
+        dialog.jobs_table.selectAll()
+        dialog.cancel_selected_jobs()
+        assert [status(row) for row in range(3)] == ["Cancelling...", "Cancelling...", "Cancelled"], \
+            [status(row) for row in range(3)]
+    finally:
+        # Cancel and release everything, so no job outlives the test
+        for job_id in job_ids:
+            queue.cancel(job_id)
+        release.set()
+    for job_id in job_ids[:2]:
+        queue.jobs[job_id].future.result(timeout=300)
+    app.processEvents()
+    assert [status(row) for row in range(3)] == ["Cancelled"] * 3, [status(row) for row in range(3)]
+    queue.shutdown()
+    print("[PASS] Reports dialog shows the state of cancelled jobs")
+
+
+def test_report_jobs():
+    """Run all report job tests in a temporary working directory"""
+    print("Testing report jobs...")
+    app = QApplication.instance() or QApplication(sys.argv)
+    temp_dir = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        # Reports are written under ./reports
+        os.chdir(temp_dir)
+        db_path = os.path.join(temp_dir, "report_jobs_test.db")
+        setup_test_database(db_path)
+        # One queue for every test, so job ids (and file names) stay unique
+        queue = ReportJobQueue(db_path, max_workers=1)
+        run_finished_job_test(queue)
+        run_ledger_cancel_test(queue)
+        run_statements_cancel_test(queue)
+        run_pack_cancel_test(queue)
+        run_queued_cancel_test(queue, app)
+        queue.shutdown()
+
+        # The dialog's queue reads society_management.db in the working directory
+        shutil.copy(db_path, "society_management.db")
+        run_dialog_cancel_test(app)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_report_jobs()
+    print("\nAll report job tests passed!")
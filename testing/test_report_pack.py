@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test script for the month-end report pack: parallel reports, manifest and folder handling
+"""
+
+import sys
+import os
+import json
+import sqlite3
+import tempfile
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.reports import ReportGenerator, REPORT_PACK_REPORTS
+
+
+def setup_test_database(db_path, flats=20):
+    """Create residents and a ledger with a payment per flat and one expense"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE residents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, flat_no TEXT, name TEXT, date_joining TEXT,
+            monthly_charges REAL, status TEXT
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE ledger (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            transaction_id TEXT UNIQUE, date TEXT, flat_no TEXT, transaction_type TEXT,
+            category TEXT, description TEXT, debit REAL DEFAULT 0, credit REAL DEFAULT 0,
+            balance REAL DEFAULT 0, payment_mode TEXT, entered_by TEXT, created_at TEXT,
+            reconciliation_status TEXT DEFAULT 'Unreconciled'
+        )
+    ''')
+    cursor.executemany('''
+        INSERT INTO residents (flat_no, name, date_joining, monthly_charges, status)
+        VALUES (?, ?, '2024-01-01', 500, 'Active')
+    ''', [(f"A-{i}", f"Resident {i}") for i in range(1, flats + 1)])
+    cursor.executemany('''
+        INSERT INTO ledger (transaction_id, date, flat_no, transaction_type, category, description, credit, balance)
+        VALUES (?, '2024-02-01', ?, 'Payment', 'Maintenance', 'February maintenance', 500, ?)
+    ''', [(f"TXN{i}", f"A-{i}", 500.0 * i) for i in range(1, flats + 1)])
+    cursor.execute('''
+        INSERT INTO ledger (transaction_id, date, transaction_type, category, description, debit, balance)
+        VALUES ('EXP1', '2024-02-10', 'Expense', 'Repairs', 'Lift repair', 1200, 8800)
+    ''')
+    conn.commit()
+    conn.close()
+
+
+def run_pack_test(generator):
+    """Every report of the pack is written to one folder, with a manifest of the run"""
+    progress = []
+    manifest = generator.generate_report_pack("tester", start_date=date(2024, 1, 1), end_date=date(2024, 12, 31),
+                                              max_workers=2, progress_callback=lambda *args: progress.append(args))
+    folder = manifest['folder']
+
+    assert folder == os.path.join("reports", "month_end_2024-12-31"), folder
+    assert [report['report'] for report in manifest['reports']] == list(REPORT_PACK_REPORTS), manifest['reports']
+    for report in manifest['reports']:
+        assert report['status'] == 'ok', report
+        assert report['file'] == os.path.join(folder, f"{report['report']}.pdf") and os.path.getsize(report['file']), \
+            report
+    assert progress[0] == (0, 7) and progress[-1] == (7, 7) and len(progress) == 8, progress
+    with open(os.path.join(folder, "manifest.json")) as f:
+        assert json.load(f) == manifest, "manifest.json differs from the returned manifest"
+    assert not [name for name in os.listdir(folder) if not name.endswith(('.pdf', '.json'))], os.listdir(folder)
+    print(f"[PASS] Month-end pack written in {manifest['total_seconds']}s")
+
+
+def run_selection_test(generator):
+    """A pack with chosen reports does not overwrite an existing pack folder"""
+    manifest = generator.generate_report_pack("tester", ['payments', 'expense_summary'],
+                                              end_date=date(2024, 12, 31), max_workers=1)
+
+    assert manifest['folder'] == os.path.join("reports", "month_end_2024-12-31_2"), manifest['folder']
+    assert sorted(os.listdir(manifest['folder'])) == ['expense_summary.pdf', 'manifest.json', 'payments.pdf']
+    assert len(os.listdir(os.path.join("reports", "month_end_2024-12-31"))) == 8, "Existing pack was changed"
+    print("[PASS] Selected reports go to a new folder")
+
+
+def run_concurrent_packs_test(generator):
+    """Packs for the same end date started together each get their own folder"""
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(generator.generate_report_pack, "tester", ['payments'],
+                                   end_date=date(2025, 1, 31), max_workers=1) for _ in range(3)]
+        manifests = [future.result() for future in futures]
+
+    folders = sorted(manifest['folder'] for manifest in manifests)
+    assert folders == [os.path.join("reports", name) for name in
+                       ("month_end_2025-01-31", "month_end_2025-01-31_2", "month_end_2025-01-31_3")], folders
+    for manifest in manifests:
+        assert [report['status'] for report in manifest['reports']] == ['ok'], manifest['reports']
+        assert sorted(os.listdir(manifest['folder'])) == ['manifest.json', 'payments.pdf'], manifest['folder']
+    print("[PASS] Concurrent packs for the same date get separate folders")
+
+
+def run_unknown_report_test(generator):
+    """Unknown report names are rejected before anything is written"""
+    packs = os.listdir("reports")
+    try:
+        generator.generate_report_pack("tester", ['ledger', 'balance_sheet'], pack_name="unknown")
+        raise AssertionError("Unknown report was accepted")
+    except ValueError as e:
+        assert 'balance_sheet' in str(e), str(e)
+    assert os.listdir("reports") == packs, "A folder was created for a rejected pack"
+    print("[PASS] Unknown reports are rejected")
+
+
+def test_report_pack():
+    """Run all report pack tests in a temporary working directory"""
+    print("Testing report pack...")
+    temp_dir = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        # Reports are written under ./reports
+        os.chdir(temp_dir)
+        os.makedirs("reports")
+        db_path = os.path.join(temp_dir, "report_pack_test.db")
+        setup_test_database(db_path)
+        generator = ReportGenerator(db_path)
+        run_pack_test(generator)
+        run_selection_test(generator)
+        run_concurrent_packs_test(generator)
+        run_unknown_report_test(generator)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_report_pack()
+    print("\nAll report pack tests passed!")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script for loading residents with their vehicles and domestic help
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import shutil
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.db_context
+from models.resident import ResidentManager, invalidate_resident_cache
+
+
+def setup_test_database(db_path, count=400):
+    """Create residents, each with a car and some with domestic help"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE residents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            flat_no TEXT, name TEXT, resident_type TEXT, mobile_no TEXT, email TEXT, date_joining TEXT,
+            cars INTEGER DEFAULT 0, scooters INTEGER DEFAULT 0, parking_slot TEXT,
+            car_numbers TEXT, scooter_numbers TEXT, monthly_charges REAL, status TEXT, remarks TEXT,
+            profile_photo_path TEXT, vacancy_reason TEXT, expected_occupancy_date TEXT,
+            last_maintenance_date TEXT, maintenance_person_name TEXT, maintenance_person_phone TEXT
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE domestic_help (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, resident_id INTEGER, name TEXT, role TEXT, phone TEXT,
+            id_proof_type TEXT, id_proof_number TEXT, photo_path TEXT, status TEXT DEFAULT 'Active',
+            access_permissions TEXT
+        )
+    ''')
+    cursor.executemany('''
+        INSERT INTO residents (flat_no, name, resident_type, mobile_no, date_joining, car_numbers, status)
+        VALUES (?, ?, 'Owner', '9999999999', '2023-01-01', ?, 'Active')
+    ''', [(f"A-{i}", f"Resident {i}", f"MH12AB{i:04d}") for i in range(1, count + 1)])
+    cursor.executemany("INSERT INTO domestic_help (resident_id, name, role) VALUES (?, ?, ?)",
+                       [(i, f"Helper {i}", role) for i in range(1, count + 1, 3) for role in ('Maid', 'Cook')])
+    conn.commit()
+    conn.close()
+
+
+def count_queries(action):
+    """Run action and count the SELECT statements it sends to the database"""
+    statements = []
+    connect = utils.db_context.sqlite3.connect
+
+    def traced_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    utils.db_context.sqlite3.connect = traced_connect
+    try:
+        result = action()
+    finally:
+        utils.db_context.sqlite3.connect = connect
+    return result, sum(1 for statement in statements if statement.lstrip().upper().startswith('SELECT'))
+
+
+def run_details_test(manager):
+    """Each resident comes back with their own vehicles and domestic help"""
+    details = manager.get_resident_details([4, 2, 4, 9999])
+    assert list(details) == [4, 2], f"Unexpected residents loaded: {list(details)}"
+    resident_4 = details[4]
+    assert (resident_4.resident.flat_no == 'A-4' and
+            [vehicle.registration_number for vehicle in resident_4.vehicles] == ['MH12AB0004'] and
+            [helper.role for helper in resident_4.domestic_help] == ['Cook', 'Maid'] and
+            resident_4.vehicles[0].describe() == 'MH12AB0004 (Car)'), \
+        "Resident 4 was not fully loaded"
+    assert details[2].domestic_help == [] and len(details[2].vehicles) == 1, "Resident 2 was not fully loaded"
+    print("[PASS] Residents are loaded with their vehicles and domestic help")
+
+
+def run_query_count_test(manager):
+    """Loading many residents takes no more queries than loading one"""
+    manager.get_resident_details([1])
+    _, single = count_queries(lambda: manager.get_resident_details([1]))
+    details, many = count_queries(lambda: manager.get_resident_details(list(range(1, 401))))
+    assert len(details) == 400 and sum(len(d.domestic_help) for d in details.values()) == 268, \
+        "Not every resident was loaded"
+    assert many == single and many <= 2, f"Loading 400 residents took {many} queries, one resident took {single}"
+    print(f"[PASS] 400 residents are loaded with {many} queries")
+
+
+def test_resident_details():
+    """Run all resident details tests on a temporary database"""
+    print("Testing resident details loading...")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(temp_dir, "details_test.db")
+        setup_test_database(db_path)
+        manager = ResidentManager(db_path)
+        run_details_test(manager)
+        run_query_count_test(manager)
+    finally:
+        invalidate_resident_cache()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_resident_details()
+    print("\nAll resident details tests passed!")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for the cached resident directory
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import shutil
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.resident import ResidentManager, invalidate_resident_cache
+from utils.audit_logger import audit_logger
+
+
+def setup_test_database(db_path):
+    """Create the residents and audit_log tables with a few residents"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE residents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            flat_no TEXT, name TEXT, resident_type TEXT, mobile_no TEXT, email TEXT, date_joining TEXT,
+            cars INTEGER DEFAULT 0, scooters INTEGER DEFAULT 0, parking_slot TEXT,
+            car_numbers TEXT, scooter_numbers TEXT, monthly_charges REAL, status TEXT, remarks TEXT,
+            profile_photo_path TEXT, vacancy_reason TEXT, expected_occupancy_date TEXT,
+            last_maintenance_date TEXT, maintenance_person_name TEXT, maintenance_person_phone TEXT
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE audit_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, user_id INTEGER, username TEXT,
+            action TEXT, table_name TEXT, record_id INTEGER, old_values TEXT, new_values TEXT,
+            details TEXT, ip_address TEXT, session_id TEXT
+        )
+    ''')
+    cursor.executemany('''
+        INSERT INTO residents (flat_no, name, resident_type, mobile_no, email, date_joining, status)
+        VALUES (?, ?, 'Owner', '9999999999', NULL, '2023-01-01', 'Active')
+    ''', [('A-10', 'Asha'), ('B-1', 'Bala'), ('A-2', 'Chitra'), ('A-101', 'Deepak')])
+    conn.commit()
+    conn.close()
+
+
+def run_natural_order_test(manager):
+    """Residents and flat numbers come back in natural flat order, indexed by id and flat"""
+    flats = [resident.flat_no for resident in manager.get_all_residents()]
+    assert flats == ['A-2', 'A-10', 'A-101', 'B-1'] and manager.get_flat_numbers() == flats, \
+        f"Unexpected flat order: {flats}"
+    assert manager.get_resident_by_flat('A-10').name == 'Asha' and manager.get_resident_by_id(2).flat_no == 'B-1', \
+        "Lookup by flat or id returned the wrong resident"
+    print("[PASS] Directory is sorted naturally and indexed by id and flat")
+
+
+def run_cache_test(manager, db_path):
+    """The directory is cached until a change invalidates it"""
+    first = manager.get_directory()
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE residents SET name = 'Changed outside' WHERE id = 1")
+    conn.commit()
+    conn.close()
+
+    assert ResidentManager(db_path).get_directory() is first, "Directory was not shared between managers"
+
+    invalidate_resident_cache(db_path)
+    assert manager.get_resident_by_id(1).name == 'Changed outside', "Directory was not reloaded after invalidation"
+    print("[PASS] Directory is shared and reloaded after invalidation")
+
+
+def run_invalidation_test(manager):
+    """add_resident, update_resident and delete_resident refresh the directory"""
+    resident_id = manager.add_resident('A-3', 'Esha', 'Tenant', '8888888888', None, '2024-01-01',
+                                       0, 0, None, None, None, 500.0, 'Active', None)
+    assert manager.get_flat_numbers()[:3] == ['A-2', 'A-3', 'A-10'], \
+        f"Added resident missing from the directory: {manager.get_flat_numbers()}"
+
+    manager.update_resident(resident_id, 'C-1', 'Esha', 'Tenant', '8888888888', None, '2024-01-01',
+                            0, 0, None, None, None, 500.0, 'Active', None)
+    assert not manager.get_resident_by_flat('A-3') and manager.get_resident_by_flat('C-1').id == resident_id, \
+        "Updated resident not reflected in the directory"
+
+    manager.delete_resident(resident_id)
+    assert not manager.get_resident_by_id(resident_id) and 'C-1' not in manager.get_flat_numbers(), \
+        "Deleted resident still in the directory"
+    print("[PASS] Adding, updating and deleting residents refreshes the directory")
+
+
+def test_resident_directory():
+    """Run all resident directory tests on a temporary database"""
+    print("Testing resident directory cache...")
+    temp_dir = tempfile.mkdtemp()
+    audit_db_path = audit_logger.db_path
+    try:
+        db_path = os.path.join(temp_dir, "residents_test.db")
+        setup_test_database(db_path)
+        audit_logger.db_path = db_path
+        manager = ResidentManager(db_path)
+        run_natural_order_test(manager)
+        run_cache_test(manager, db_path)
+        run_invalidation_test(manager)
+    finally:
+        audit_logger.db_path = audit_db_path
+        invalidate_resident_cache()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_resident_directory()
+    print("\nAll resident directory tests passed!")
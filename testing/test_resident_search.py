@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test script for the full-text resident search index
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import shutil
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.resident_search import ResidentSearchIndex
+
+
+def setup_test_database(db_path, count=1000):
+    """Create residents, vehicles and domestic_help tables with generated residents"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE residents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            flat_no TEXT, name TEXT, mobile_no TEXT, email TEXT, car_numbers TEXT, scooter_numbers TEXT
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE vehicles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, resident_id INTEGER, vehicle_type TEXT,
+            registration_number TEXT, status TEXT DEFAULT 'Active'
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE domestic_help (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, resident_id INTEGER, name TEXT, role TEXT
+        )
+    ''')
+    cursor.executemany('''
+        INSERT INTO residents (flat_no, name, mobile_no, email, car_numbers, scooter_numbers)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', [(f"A-{i}", f"Resident {i:04d}", f"98{i:08d}", f"resident{i}@example.com",
+           f"MH 12 AB {i:04d}\r\nMH 14 CD {i:04d}", None) for i in range(1, count + 1)])
+    cursor.execute("UPDATE residents SET name = 'Priya Sharma' WHERE id = 7")
+    conn.commit()
+    conn.close()
+
+
+def run_search_test(index, db_path):
+    """Any part of a word matches, ranked, and short words work too"""
+    assert [hit.resident_id for hit in index.search("sharm")] == [7], "Substring search did not find the resident"
+    assert [hit.resident_id for hit in index.search("A-7 priya")] == [7], \
+        "Multi-word search did not narrow to the resident"
+    assert 7 in [hit.resident_id for hit in index.search("mh12-ab 0007")], \
+        "Vehicle number search ignored spaces and hyphens"
+
+    hits = index.search("A-10")
+    assert hits[0].resident_id == 10, f"Exact flat not ranked first: {hits[:3]}"
+    print("[PASS] Search matches parts of words and ranks the exact flat first")
+
+
+def run_fuzzy_test(index):
+    """A misspelt name still finds the resident"""
+    hits = index.search("Shamra")
+    assert hits and hits[0].resident_id == 7 and hits[0].fuzzy, f"Misspelt search found {hits[:3]}"
+    print("[PASS] Misspelt names are matched by similarity")
+
+
+def run_trigger_sync_test(index, db_path):
+    """Changes to residents, vehicles and domestic help are reflected immediately"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO vehicles (resident_id, vehicle_type, registration_number) VALUES (3, 'Car', 'ka-01-x-9999')")
+    conn.execute("INSERT INTO domestic_help (resident_id, name, role) VALUES (5, 'Lakshmi Devi', 'Maid')")
+    conn.execute("UPDATE residents SET name = 'Arjun Mehta' WHERE id = 9")
+    conn.execute("DELETE FROM residents WHERE id = 11")
+    conn.commit()
+    conn.close()
+
+    checks = [
+        (index.find_by_plate("KA01X9999"), [3]),
+        ([hit.resident_id for hit in index.search("lakshmi")], [5]),
+        ([hit.resident_id for hit in index.search("mehta")], [9]),
+        ([hit.resident_id for hit in index.search("resident0011")], []),
+    ]
+    for actual, expected in checks:
+        assert actual == expected, f"Index out of sync: expected {expected}, got {actual}"
+    print("[PASS] Triggers keep the index in sync")
+
+
+def run_plate_lookup_test(index):
+    """Plate lookups go through the index instead of scanning every resident"""
+    started = time.perf_counter()
+    for i in range(100, 200):
+        assert index.find_by_plate(f"mh 14 cd {i:04d}") == [i], f"Plate lookup failed for flat {i}"
+    per_lookup_ms = (time.perf_counter() - started) * 10
+    assert per_lookup_ms <= 5, f"Plate lookup is slow: {per_lookup_ms:.3f} ms"
+    print(f"[PASS] Plate lookup takes {per_lookup_ms:.3f} ms")
+
+
+def test_resident_search():
+    """Run all resident search tests on a temporary database"""
+    print("Testing resident search index...")
+    temp_dir = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(temp_dir, "search_test.db")
+        setup_test_database(db_path)
+        index = ResidentSearchIndex(db_path)
+        run_search_test(index, db_path)
+        run_fuzzy_test(index)
+        run_trigger_sync_test(index, db_path)
+        run_plate_lookup_test(index)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_resident_search()
+    print("\nAll resident search tests passed!")
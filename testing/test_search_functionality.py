@@ -11,6 +11,7 @@ import sqlite3
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from PyQt5.QtWidgets import QApplication
+from PyQt5.QtTest import QTest
 from gui.resident_form import ResidentForm
 
 def setup_test_data():
@@ -39,6 +40,13 @@ def setup_test_data():
     conn.commit()
     conn.close()
 
+def wait_for_search(resident_form, timeout_ms=5000):
+    """Wait until the debounced search has been applied to the table"""
+    waited = 0
+    while resident_form.is_search_pending() and waited < timeout_ms:
+        QTest.qWait(20)
+        waited += 20
+
 def test_search_functionality():
     """Test that the search functionality works correctly with the updated table"""
     app = QApplication(sys.argv)
@@ -53,10 +61,11 @@ def test_search_functionality():
     # Test search by flat number
     resident_form.search_input.setText("A101")
     # The filter_residents method should be called automatically by the signal
+    wait_for_search(resident_form)
     
     # Check that we have the correct number of rows after search
     expected_rows = 1
-    actual_rows = resident_form.table.rowCount()
+    actual_rows = resident_form.table.model().rowCount()
     
     print(f"Search by flat no 'A101' - Expected rows: {expected_rows}")
     print(f"Search by flat no 'A101' - Actual rows: {actual_rows}")
@@ -70,10 +79,11 @@ def test_search_functionality():
     # Test search by name
     resident_form.search_input.setText("Jane")
     # The filter_residents method should be called automatically by the signal
+    wait_for_search(resident_form)
     
     # Check that we have the correct number of rows after search
     expected_rows = 1
-    actual_rows = resident_form.table.rowCount()
+    actual_rows = resident_form.table.model().rowCount()
     
     print(f"Search by name 'Jane' - Expected rows: {expected_rows}")
     print(f"Search by name 'Jane' - Actual rows: {actual_rows}")
@@ -87,10 +97,11 @@ def test_search_functionality():
     # Test search by phone number
     resident_form.search_input.setText("1234567890")
     # The filter_residents method should be called automatically by the signal
+    wait_for_search(resident_form)
     
     # Check that we have the correct number of rows after search
     expected_rows = 1
-    actual_rows = resident_form.table.rowCount()
+    actual_rows = resident_form.table.model().rowCount()
     
     print(f"Search by phone '1234567890' - Expected rows: {expected_rows}")
     print(f"Search by phone '1234567890' - Actual rows: {actual_rows}")
@@ -104,10 +115,11 @@ def test_search_functionality():
     # Test search by email
     resident_form.search_input.setText("example.com")
     # The filter_residents method should be called automatically by the signal
+    wait_for_search(resident_form)
     
     # Check that we have the correct number of rows after search (should find all 3)
     expected_rows = 3
-    actual_rows = resident_form.table.rowCount()
+    actual_rows = resident_form.table.model().rowCount()
     
     print(f"Search by email 'example.com' - Expected rows: {expected_rows}")
     print(f"Search by email 'example.com' - Actual rows: {actual_rows}")
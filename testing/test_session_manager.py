@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test script for the in-memory session store: lazy setup, write-through, reload and sweeping
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import shutil
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.session_manager import SessionManager
+from utils.security import invalidate_user_cache
+from utils.audit_logger import audit_logger
+
+
+def setup_test_database(db_path):
+    """Create users and audit_log tables"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE, role TEXT)")
+    conn.execute("INSERT INTO users (username, role) VALUES ('treasurer', 'Treasurer')")
+    conn.execute('''
+        CREATE TABLE audit_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, user_id INTEGER, username TEXT,
+            action TEXT, table_name TEXT, record_id INTEGER, old_values TEXT, new_values TEXT,
+            details TEXT, ip_address TEXT, session_id TEXT
+        )
+    ''')
+    conn.commit()
+    conn.close()
+
+
+def stored_sessions(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = [row[0] for row in conn.execute("SELECT session_id FROM sessions ORDER BY created_at")]
+    conn.close()
+    return rows
+
+
+def logged_actions(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = [row[0] for row in conn.execute("SELECT action FROM audit_log ORDER BY id")]
+    conn.close()
+    return rows
+
+
+def run_lazy_init_test(db_path):
+    """Creating a manager touches nothing; the first call creates the table"""
+    manager = SessionManager(db_path)
+    conn = sqlite3.connect(db_path)
+    tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+    conn.close()
+    assert 'sessions' not in tables and manager._sweeper is None, "Session store initialised on creation"
+
+    assert manager.validate_session("unknown") is None
+    assert stored_sessions(db_path) == [] and manager._sweeper.is_alive(), "First call did not initialise the store"
+    manager.stop()
+    print("[PASS] The session store initialises on first use")
+
+
+def run_session_lifecycle_test(db_path):
+    """Sessions are written through, validated from memory, reloaded and destroyed"""
+    manager = SessionManager(db_path)
+    session_id = manager.create_session("treasurer")
+    assert manager.validate_session(session_id) == "treasurer", "New session is not valid"
+    assert stored_sessions(db_path) == [session_id], "Session was not written to the database"
+
+    # A restarted application picks up the session from the database
+    reloaded = SessionManager(db_path)
+    assert reloaded.validate_session(session_id) == "treasurer", "Session was not reloaded"
+
+    reloaded.destroy_session(session_id)
+    assert reloaded.validate_session(session_id) is None, "Destroyed session is still valid"
+    assert stored_sessions(db_path) == [], "Destroyed session is still stored"
+    assert logged_actions(db_path)[-2:] == ["SESSION_CREATED", "SESSION_DESTROYED"], logged_actions(db_path)
+    manager.stop()
+    reloaded.stop()
+    print("[PASS] Sessions are written through and survive a restart")
+
+
+def run_expiry_test(db_path):
+    """Expired sessions stop validating and are swept from memory and the database"""
+    manager = SessionManager(db_path, session_hours=0.5 / 3600)
+    expiring = manager.create_session("treasurer")
+    manager.session_hours = 2
+    lasting = manager.create_session("treasurer")
+    time.sleep(0.6)
+
+    assert manager.validate_session(expiring) is None, "Expired session is still valid"
+    assert manager.sweep_expired_sessions() == 1, "Expired session was not swept"
+    assert expiring not in manager._sessions and stored_sessions(db_path) == [lasting], \
+        f"Unexpected sessions after the sweep: {stored_sessions(db_path)}"
+    assert manager.validate_session(lasting) == "treasurer", "Sweep removed an active session"
+
+    # Sessions that expire while the application is closed are dropped on startup
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE sessions SET expires_at = '2000-01-01T00:00:00'")
+    conn.commit()
+    conn.close()
+    reloaded = SessionManager(db_path)
+    assert reloaded.validate_session(lasting) is None and stored_sessions(db_path) == [], \
+        "Session expired in the database was loaded"
+    manager.stop()
+    reloaded.stop()
+    print("[PASS] Expired sessions are swept")
+
+
+def test_session_manager():
+    """Run all session manager tests on a temporary database"""
+    print("Testing session manager...")
+    temp_dir = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    audit_db_path = audit_logger.db_path
+    try:
+        # User ids for the audit log are looked up in society_management.db in the working directory
+        os.chdir(temp_dir)
+        db_path = os.path.join(temp_dir, "society_management.db")
+        setup_test_database(db_path)
+        audit_logger.db_path = db_path
+        invalidate_user_cache()
+        run_lazy_init_test(db_path)
+        run_session_lifecycle_test(db_path)
+        run_expiry_test(db_path)
+    finally:
+        audit_logger.db_path = audit_db_path
+        invalidate_user_cache()
+        os.chdir(cwd)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_session_manager()
+    print("\nAll session manager tests passed!")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script for the in-process user directory behind get_user_id and get_user_role
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import shutil
+from contextlib import contextmanager
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.security as security
+from utils.security import get_user_id, get_user_role, invalidate_user_cache
+
+
+def setup_test_database(db_path):
+    """Create a users table with two users"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE, role TEXT)")
+    conn.executemany("INSERT INTO users (username, role) VALUES (?, ?)",
+                     [("treasurer", "Treasurer"), ("viewer", "Viewer")])
+    conn.commit()
+    conn.close()
+
+
+def set_role(db_path, username, role):
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE users SET role = ? WHERE username = ?", (role, username))
+    conn.commit()
+    conn.close()
+
+
+def run_cache_test(db_path):
+    """Lookups are served from the cache until the user is invalidated"""
+    assert (get_user_id("treasurer"), get_user_role("treasurer")) == (1, "Treasurer")
+    assert get_user_id("nobody") is None and "nobody" not in security._user_directory, \
+        "Unknown user was cached"
+
+    set_role(db_path, "treasurer", "Admin")
+    assert get_user_role("treasurer") == "Treasurer", "Lookup went to the database despite a cached entry"
+
+    invalidate_user_cache("treasurer")
+    assert get_user_role("treasurer") == "Admin", "Invalidated user was still served from the cache"
+    print("[PASS] Users are cached until invalidated")
+
+
+def run_invalidate_all_test(db_path):
+    """Invalidating without a username drops every cached user"""
+    get_user_role("viewer")
+    set_role(db_path, "viewer", "Treasurer")
+    set_role(db_path, "treasurer", "Viewer")
+
+    invalidate_user_cache()
+    assert (get_user_role("viewer"), get_user_role("treasurer")) == ("Treasurer", "Viewer"), \
+        "Cached users survived invalidating the whole cache"
+    print("[PASS] Invalidating the cache drops every user")
+
+
+def run_racing_invalidation_test(db_path):
+    """A lookup that read the user before an invalidation does not cache what it read"""
+    invalidate_user_cache()
+    get_db_connection = security.get_db_connection
+
+    @contextmanager
+    def invalidated_after_read(*args, **kwargs):
+        with get_db_connection(*args, **kwargs) as conn:
+            yield conn
+        # The user is changed and invalidated after this lookup read the old row
+        set_role(db_path, "viewer", "Admin")
+        invalidate_user_cache("viewer")
+
+    security.get_db_connection = invalidated_after_read
+    try:
+        assert get_user_role("viewer") == "Treasurer"
+    finally:
+        security.get_db_connection = get_db_connection
+
+    assert "viewer" not in security._user_directory, "Row read before the invalidation was cached"
+    assert get_user_role("viewer") == "Admin", "Stale role served after the invalidation"
+    print("[PASS] A lookup racing an invalidation does not cache a stale user")
+
+
+def test_user_cache():
+    """Run all user cache tests on a temporary database"""
+    print("Testing user cache...")
+    temp_dir = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        # The user lookups read society_management.db in the working directory
+        os.chdir(temp_dir)
+        db_path = os.path.join(temp_dir, "society_management.db")
+        setup_test_database(db_path)
+        invalidate_user_cache()
+        run_cache_test(db_path)
+        run_invalidate_all_test(db_path)
+        run_racing_invalidation_test(db_path)
+    finally:
+        invalidate_user_cache()
+        os.chdir(cwd)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_user_cache()
+    print("\nAll user cache tests passed!")
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Test script for the normalized vehicle registry
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import shutil
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.resident import ResidentManager, invalidate_resident_cache
+from models.vehicle import VehicleManager, PLATE_KEY_SQL, HAS_PLATE_SQL
+from utils.database_exceptions import DatabaseError
+from utils.audit_logger import audit_logger
+
+
+def setup_test_database(db_path, count=1000):
+    """Create residents with numbers in their text fields, a vehicles table and audit_log"""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE residents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            flat_no TEXT, name TEXT, resident_type TEXT, mobile_no TEXT, email TEXT, date_joining TEXT,
+            cars INTEGER DEFAULT 0, scooters INTEGER DEFAULT 0, parking_slot TEXT,
+            car_numbers TEXT, scooter_numbers TEXT, monthly_charges REAL, status TEXT, remarks TEXT,
+            profile_photo_path TEXT, vacancy_reason TEXT, expected_occupancy_date TEXT,
+            last_maintenance_date TEXT, maintenance_person_name TEXT, maintenance_person_phone TEXT
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE vehicles (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, resident_id INTEGER, vehicle_type TEXT,
+            registration_number TEXT, make TEXT, model TEXT, color TEXT, parking_slot TEXT,
+            status TEXT DEFAULT 'Active'
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE audit_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, user_id INTEGER, username TEXT,
+            action TEXT, table_name TEXT, record_id INTEGER, old_values TEXT, new_values TEXT,
+            details TEXT, ip_address TEXT, session_id TEXT
+        )
+    ''')
+    cursor.executemany('''
+        INSERT INTO residents (flat_no, name, resident_type, mobile_no, date_joining, car_numbers, scooter_numbers, status)
+        VALUES (?, ?, 'Owner', '9999999999', '2023-01-01', ?, ?, 'Active')
+    ''', [(f"A-{i}", f"Resident {i}", f"MH 12 AB {i:04d}\r\nmh12ab{i:04d}", f"MH-14-CD-{i:04d}")
+          for i in range(1, count + 1)])
+    # Resident 2 lists resident 1's car as well
+    cursor.execute("UPDATE residents SET scooter_numbers = 'MH 14 CD 0002\nMH12AB0001' WHERE id = 2")
+    # Already registered, and entered twice for the same flat
+    cursor.executemany("INSERT INTO vehicles (resident_id, vehicle_type, registration_number, make, color) VALUES (?, ?, ?, ?, ?)",
+                       [(3, 'Car', 'MH12 AB 0003', 'Maruti', None), (3, 'Car', 'mh12ab0003', None, 'White')])
+    conn.commit()
+    conn.close()
+
+
+def run_migration_test(manager, db_path):
+    """Text fields are migrated once per number, keeping existing rows"""
+    assert manager.ensure_initialized(), "Vehicle registry was not initialized"
+
+    conn = sqlite3.connect(db_path)
+    count = conn.execute("SELECT COUNT(*) FROM vehicles").fetchone()[0]
+    cars = conn.execute("SELECT make, color FROM vehicles WHERE resident_id = 3 AND vehicle_type = 'Car'").fetchall()
+    merge_logs = conn.execute("SELECT old_values FROM audit_log WHERE action = 'MERGE_VEHICLE'").fetchall()
+    conn.close()
+    assert count == 2000 and cars == [('Maruti', 'White')], \
+        f"Migration produced {count} vehicles, resident 3 cars {cars}"
+    assert len(merge_logs) == 1 and 'mh12ab0003' in merge_logs[0][0], \
+        f"Merged duplicate not recorded in the audit log: {merge_logs}"
+
+    unregistered = manager.get_unregistered_numbers()
+    assert unregistered == [('A-2', 'MH12AB0001', 'A-1')], f"Unexpected unregistered numbers: {unregistered}"
+
+    # Running again adds nothing
+    manager.init_vehicle_registry()
+    conn = sqlite3.connect(db_path)
+    count = conn.execute("SELECT COUNT(*) FROM vehicles").fetchone()[0]
+    conn.close()
+    assert count == 2000, f"Second migration changed the registry to {count} vehicles"
+    print("[PASS] Text fields are migrated into the registry once")
+
+
+def run_lookup_test(manager, db_path):
+    """Plate lookups ignore formatting and go through the unique index"""
+    vehicle = manager.find_vehicle_by_plate("mh-14 cd 0500")
+    assert vehicle and vehicle.resident_id == 500 and vehicle.vehicle_type == 'Scooter', \
+        "Plate lookup did not find the scooter"
+    assert manager.find_vehicle_by_plate("XX 00 ZZ 0000") is None, "Unknown plate was found"
+
+    conn = sqlite3.connect(db_path)
+    plan = conn.execute(f"EXPLAIN QUERY PLAN SELECT id FROM vehicles WHERE {PLATE_KEY_SQL} = ? AND {HAS_PLATE_SQL}",
+                        ("MH14CD0500",)).fetchall()
+    conn.close()
+    assert 'idx_vehicles_plate' in str(plan), f"Plate lookup does not use the index: {plan}"
+
+    for i in range(100, 200):
+        assert manager.find_vehicle_by_plate(f"MH12AB{i:04d}").resident_id == i, f"Plate lookup failed for flat {i}"
+    print("[PASS] Plate lookup uses the index")
+
+
+def run_batched_test(manager):
+    """Vehicles of many residents come back from one call"""
+    vehicles = manager.get_vehicles_by_residents(list(range(1, 1001)) + [5000])
+    assert len(vehicles) == 1001 and vehicles[5000] == [], "Not every requested resident is in the result"
+    plates = [vehicle.registration_number for vehicle in vehicles[7]]
+    assert plates == ['MH 12 AB 0007', 'MH-14-CD-0007'], f"Unexpected vehicles for resident 7: {plates}"
+    print("[PASS] Vehicles are loaded for many residents at once")
+
+
+def run_sync_test(resident_manager, vehicle_manager):
+    """Saving a resident updates the registry, and vehicle changes update the text fields"""
+    resident = resident_manager.get_resident_by_id(10)
+    fields = [resident.flat_no, resident.name, resident.resident_type, resident.mobile_no, resident.email,
+              resident.date_joining, 1, 2, None]
+    # The car becomes a scooter, the old scooter is dropped and a new car is added
+    resident_manager.update_resident(10, *fields, 'KA 01 X 1', 'mh12ab0010\nMH 14 CD 0010 ', 500.0, 'Active', None)
+    vehicles = vehicle_manager.get_vehicles_by_residents([10])[10]
+    registered = sorted((vehicle.vehicle_type, vehicle.registration_number) for vehicle in vehicles)
+    assert registered == [('Car', 'KA 01 X 1'), ('Scooter', 'MH 14 CD 0010'), ('Scooter', 'mh12ab0010')], \
+        f"Registry not synced with the resident: {registered}"
+
+    try:
+        resident_manager.update_resident(10, *fields, 'MH12AB0011', None, 500.0, 'Active', None)
+        raise AssertionError("Another flat's car was accepted")
+    except DatabaseError as e:
+        assert 'A-11' in str(e), f"Conflict message does not name the flat: {e}"
+
+    vehicle_manager.add_vehicle(10, 'Car', 'KA-01-Y-2')
+    assert resident_manager.get_resident_by_id(10).car_numbers == 'KA 01 X 1\nKA-01-Y-2', \
+        "Added vehicle missing from the resident's car numbers"
+
+    # A car recorded without a number survives saving the resident unchanged
+    honda_id = vehicle_manager.add_vehicle(10, 'Car', None, make='Honda')
+    resident = resident_manager.get_resident_by_id(10)
+    resident_manager.update_resident(10, *fields, resident.car_numbers, resident.scooter_numbers, 500.0, 'Active', None)
+    assert vehicle_manager.get_vehicle_by_id(honda_id) is not None, \
+        "Vehicle without a registration number was deleted"
+
+    resident_manager.delete_resident(10)
+    assert (not vehicle_manager.find_vehicle_by_plate('KA01X1') and
+            not resident_manager.find_residents_by_vehicle('MH12AB0010')), \
+        "Deleted resident's vehicles are still registered"
+    print("[PASS] Residents and the registry stay in sync")
+
+
+def run_clash_test(temp_dir):
+    """A number shared by two flats disables the registry once, until a vehicle is changed"""
+    db_path = os.path.join(temp_dir, "clash_test.db")
+    setup_test_database(db_path, count=3)
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO vehicles (resident_id, vehicle_type, registration_number) VALUES (1, 'Car', 'XX 01')")
+    clashing_id = cursor.lastrowid
+    cursor.execute("INSERT INTO vehicles (resident_id, vehicle_type, registration_number) VALUES (2, 'Car', 'xx01')")
+    conn.commit()
+    conn.close()
+
+    manager = VehicleManager(db_path)
+    assert not manager.ensure_initialized() and manager.get_duplicate_plates() == [('XX01', [1, 2])], \
+        "Shared number was not reported"
+    checks = []
+    init_vehicle_registry = manager.init_vehicle_registry
+    manager.init_vehicle_registry = lambda: checks.append(1) or init_vehicle_registry()
+    assert not manager.ensure_initialized() and not checks, "Unavailable registry was checked again"
+
+    manager.delete_vehicle(clashing_id)
+    assert manager.ensure_initialized() and checks == [1], \
+        "Registry not available after the shared number was removed"
+    print("[PASS] A shared number is reported once and rechecked after a vehicle change")
+
+
+def test_vehicle_registry():
+    """Run all vehicle registry tests on a temporary database"""
+    print("Testing vehicle registry...")
+    temp_dir = tempfile.mkdtemp()
+    audit_db_path = audit_logger.db_path
+    try:
+        db_path = os.path.join(temp_dir, "vehicles_test.db")
+        setup_test_database(db_path)
+        audit_logger.db_path = db_path
+        vehicle_manager = VehicleManager(db_path)
+        run_migration_test(vehicle_manager, db_path)
+        run_lookup_test(vehicle_manager, db_path)
+        run_batched_test(vehicle_manager)
+        run_sync_test(ResidentManager(db_path), vehicle_manager)
+        run_clash_test(temp_dir)
+    finally:
+        audit_logger.db_path = audit_db_path
+        invalidate_resident_cache()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    test_vehicle_registry()
+    print("\nAll vehicle registry tests passed!")
@@ -0,0 +1,375 @@
+# utils/analytics_export.py
+"""
+Columnar analytics snapshots for the Society Management System.
+
+Dumps the ledger, bank statements, residents and reconciliation state into
+Parquet (or Feather) files with typed columns, so collections and arrears
+trends can be analysed with pandas/DuckDB/Excel Power Query without touching
+the live database.
+
+Layout under the output directory:
+
+    ledger/month=2024-05/part-<run>-<n>.parquet           rewritten when the month changes
+    bank_statements/month=2024-05/part-<run>-<n>.parquet  rewritten when the month changes
+    residents/snapshot.parquet                            rewritten every run
+    reconciliation_history/...                            appended by id
+    reconciliation_state/snapshot.parquet                 current match/status per row
+    _export_state.json                                    month fingerprints and high-water marks
+
+Ledger and bank rows can be edited or deleted after they are exported (balances
+are recalculated, transactions removed), so these tables keep a fingerprint of
+every month's rows. Each run recomputes the fingerprints in one pass over the
+table and rewrites only the months whose rows were added, changed or deleted;
+months that no longer have rows are removed. Append-only tables are exported
+incrementally: each run only reads rows newer than the last exported
+(value, id) pair. Mutable state (residents and the reconciliation status of
+every ledger and bank row) is small and rewritten in full. The database is
+opened read-only and read in chunks.
+
+Run `python -m utils.analytics_export [--out DIR] [--full] [--format parquet|feather]`.
+Requires pandas plus pyarrow (or fastparquet for Parquet).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from utils.database_exceptions import DatabaseError
+
+
+DEFAULT_OUTPUT_DIR = os.path.join("exports", "analytics")
+
+STATE_FILE = "_export_state.json"
+
+# Rows read from SQLite per chunk
+READ_CHUNK_ROWS = 50000
+
+# table -> (column used for the month partition, column used for incremental append)
+# Partitioned tables rewrite the months that changed since the last run; other tables
+# append rows past their incremental column, or are rewritten in full without one
+SNAPSHOT_TABLES = {
+    'ledger': ('date', None),
+    'bank_statements': ('date', None),
+    'reconciliation_history': (None, 'id'),
+    'residents': (None, None),
+}
+
+# Reconciliation status changes in place, so the current state is exported in full
+RECONCILIATION_STATE_QUERY = '''
+    SELECT 'ledger' AS source, id, transaction_id AS reference, date, reconciliation_status,
+           NULL AS matched_ledger_id
+    FROM ledger
+    UNION ALL
+    SELECT 'bank', id, reference_number, date, reconciliation_status, matched_ledger_id
+    FROM bank_statements
+'''
+
+
+# Month partition of a row, computed by SQLite for both the fingerprints and the export
+MONTH_EXPRESSION = "COALESCE(strftime('%Y-%m', {column}), 'unknown')"
+
+
+class _MonthFingerprint:
+    """
+    SQLite aggregate fingerprinting a group of rows: the row count plus the sum of
+    a hash of every row, so it does not depend on the order rows are visited in.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+
+    def step(self, *values):
+        digest = hashlib.blake2b(repr(values).encode('utf-8'), digest_size=8).digest()
+        self.count += 1
+        self.total = (self.total + int.from_bytes(digest, 'big')) % (1 << 64)
+
+    def finalize(self):
+        return f"{self.count}:{self.total:016x}"
+
+
+def _parquet_engine():
+    """Return the available Parquet engine name, or None"""
+    for engine in ('pyarrow', 'fastparquet'):
+        try:
+            __import__(engine)
+            return engine
+        except ImportError:
+            continue
+    return None
+
+
+class AnalyticsExporter:
+    def __init__(self, db_path="society_management.db", output_dir=DEFAULT_OUTPUT_DIR, file_format="parquet"):
+        if file_format not in ('parquet', 'feather'):
+            raise ValueError(f"Unsupported analytics format: {file_format}")
+        self.db_path = db_path
+        self.output_dir = output_dir
+        self.file_format = file_format
+        self.extension = '.parquet' if file_format == 'parquet' else '.feather'
+        self.state_path = os.path.join(output_dir, STATE_FILE)
+
+    def check_dependencies(self):
+        """
+        Make sure pandas and a writer for the chosen format are installed.
+
+        Raises:
+            ImportError: With an install hint if something is missing
+        """
+        try:
+            import pandas  # noqa: F401
+        except ImportError:
+            raise ImportError("Analytics export requires pandas. Please install it using: pip install pandas")
+
+        if self.file_format == 'feather':
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise ImportError("Feather export requires pyarrow. Please install it using: pip install pyarrow")
+        elif _parquet_engine() is None:
+            raise ImportError("Parquet export requires pyarrow or fastparquet. "
+                              "Please install one using: pip install pyarrow")
+
+    def _connect(self):
+        """Open the database read-only, so the export never takes a write lock"""
+        if not os.path.exists(self.db_path):
+            raise DatabaseError(f"Database not found: {self.db_path}")
+        uri = f"file:{os.path.abspath(self.db_path)}?mode=ro"
+        return sqlite3.connect(uri, uri=True, timeout=30)
+
+    def load_state(self):
+        try:
+            with open(self.state_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def save_state(self, state):
+        os.makedirs(self.output_dir, exist_ok=True)
+        temp_path = self.state_path + ".tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(temp_path, self.state_path)
+
+    def export(self, full=False, tables=None):
+        """
+        Export every snapshot table (incrementally unless full is True).
+
+        Args:
+            full (bool): Discard previous exports and export everything again
+            tables (list): Only export these tables (default: SNAPSHOT_TABLES plus reconciliation_state)
+
+        Returns:
+            dict: table -> {'rows': rows written this run, 'files': files written,
+                            'mode': 'months'/'append'/'full'}
+        """
+        self.check_dependencies()
+        tables = tables or list(SNAPSHOT_TABLES) + ['reconciliation_state']
+        state = self.load_state()
+        run_id = datetime.now().strftime('%Y%m%d%H%M%S%f')
+        summary = {}
+
+        conn = self._connect()
+        try:
+            existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            for table in tables:
+                if table == 'reconciliation_state':
+                    if {'ledger', 'bank_statements'} <= existing:
+                        summary[table] = self._export_snapshot(conn, table, RECONCILIATION_STATE_QUERY, {})
+                    continue
+                if table not in existing:
+                    continue
+
+                partition_column, incremental_column = SNAPSHOT_TABLES[table]
+                columns = self._column_types(conn, table)
+                if partition_column not in columns and incremental_column not in columns:
+                    summary[table] = self._export_snapshot(conn, table, f"SELECT * FROM {table}", columns)
+                    continue
+
+                if full:
+                    state.pop(table, None)
+                if table not in state:
+                    shutil.rmtree(os.path.join(self.output_dir, table), ignore_errors=True)
+                if partition_column in columns:
+                    summary[table], state[table] = self._export_months(
+                        conn, table, columns, partition_column, state.get(table), run_id)
+                else:
+                    summary[table], state[table] = self._export_increment(
+                        conn, table, columns, incremental_column, state.get(table), run_id)
+        finally:
+            conn.close()
+
+        self.save_state(state)
+        return summary
+
+    def _column_types(self, conn, table):
+        """Declared SQLite type per column, in table order"""
+        return {row[1]: (row[2] or '').upper() for row in conn.execute(f"PRAGMA table_info({table})")}
+
+    def _month_fingerprints(self, conn, table, columns, partition_column):
+        """Fingerprint of every month's rows: {month: 'count:hash'}"""
+        conn.create_aggregate('month_fingerprint', -1, _MonthFingerprint)
+        month = MONTH_EXPRESSION.format(column=partition_column)
+        row = ', '.join(['rowid'] + [f'"{column}"' for column in columns])
+        return dict(conn.execute(f"SELECT {month} AS month, month_fingerprint({row}) FROM {table} GROUP BY month"))
+
+    def _export_months(self, conn, table, columns, partition_column, table_state, run_id):
+        """Rewrite the month partitions whose rows were added, changed or deleted since the last run"""
+        import pandas as pd
+
+        fingerprints = self._month_fingerprints(conn, table, columns, partition_column)
+        previous = (table_state or {}).get('months', {})
+        changed = sorted(month for month, fingerprint in fingerprints.items() if previous.get(month) != fingerprint)
+
+        rows = 0
+        files = 0
+        if changed:
+            month = MONTH_EXPRESSION.format(column=partition_column)
+            query = f"SELECT * FROM (SELECT {month} AS _month, * FROM {table})"
+            params = []
+            if len(changed) < len(fingerprints):
+                query += f" WHERE _month IN ({', '.join('?' * len(changed))})"
+                params = changed
+            query += " ORDER BY _month, rowid"
+            for chunk_number, frame in enumerate(pd.read_sql_query(query, conn, params=params,
+                                                                   chunksize=READ_CHUNK_ROWS)):
+                months = frame.pop('_month')
+                frame = self._apply_types(frame, columns)
+                files += self._write_partitions(table, frame, months, f"part-{run_id}-{chunk_number:04d}")
+                rows += len(frame)
+
+        # Drop the previous files of rewritten months, and months that no longer have rows
+        table_dir = os.path.join(self.output_dir, table)
+        for month in changed:
+            month_dir = os.path.join(table_dir, f"month={month}")
+            for name in os.listdir(month_dir):
+                if not name.startswith(f"part-{run_id}-"):
+                    os.remove(os.path.join(month_dir, name))
+        if os.path.isdir(table_dir):
+            for name in os.listdir(table_dir):
+                if name.startswith("month=") and name[len("month="):] not in fingerprints:
+                    shutil.rmtree(os.path.join(table_dir, name), ignore_errors=True)
+
+        exported_rows = sum(int(fingerprint.split(':')[0]) for fingerprint in fingerprints.values())
+        return ({'rows': rows, 'files': files, 'mode': 'months'},
+                {'months': fingerprints, 'exported_rows': exported_rows})
+
+    def _export_increment(self, conn, table, columns, incremental_column, table_state, run_id):
+        """Append rows newer than the table's high-water mark"""
+        import pandas as pd
+
+        # (value, rowid) high-water mark, so rows sharing a timestamp are not skipped or repeated.
+        # Rows with no value sort first and are only picked up by the first (or a --full) export
+        query = f"SELECT rowid AS _rowid, * FROM {table}"
+        params = []
+        if table_state and table_state.get('last_value') is not None:
+            query += f" WHERE {incremental_column} > ? OR ({incremental_column} = ? AND rowid > ?)"
+            params = [table_state['last_value'], table_state['last_value'], table_state['last_rowid']]
+        elif table_state:
+            query += " WHERE rowid > ?"
+            params = [table_state['last_rowid']]
+        query += f" ORDER BY {incremental_column} IS NOT NULL, {incremental_column}, rowid"
+
+        rows = 0
+        files = 0
+        last_value = table_state.get('last_value') if table_state else None
+        last_rowid = table_state.get('last_rowid', 0) if table_state else 0
+        for chunk_number, frame in enumerate(pd.read_sql_query(query, conn, params=params,
+                                                               chunksize=READ_CHUNK_ROWS)):
+            if frame.empty:
+                continue
+            # Rows are ordered by the high-water mark, so the last row of a chunk is the newest
+            value = frame[incremental_column].iloc[-1]
+            if pd.notna(value):
+                last_value = value.item() if hasattr(value, 'item') else value
+            last_rowid = int(frame['_rowid'].iloc[-1])
+
+            frame = self._apply_types(frame.drop(columns=['_rowid']), columns)
+            files += self._write_partitions(table, frame, None, f"part-{run_id}-{chunk_number:04d}")
+            rows += len(frame)
+
+        return ({'rows': rows, 'files': files, 'mode': 'append'},
+                {'last_value': last_value, 'last_rowid': last_rowid,
+                 'exported_rows': (table_state or {}).get('exported_rows', 0) + rows})
+
+    def _export_snapshot(self, conn, name, query, columns):
+        """Rewrite a small table (or query result) as a single file"""
+        import pandas as pd
+
+        frame = self._apply_types(pd.read_sql_query(query, conn), columns)
+        table_dir = os.path.join(self.output_dir, name)
+        os.makedirs(table_dir, exist_ok=True)
+        self._write_file(frame, os.path.join(table_dir, "snapshot" + self.extension))
+        return {'rows': len(frame), 'files': 1, 'mode': 'full'}
+
+    def _apply_types(self, frame, columns):
+        """Give columns real types: nullable integers, floats, strings and datetimes"""
+        import pandas as pd
+
+        for column in frame.columns:
+            declared = columns.get(column, '')
+            if column == 'date' or column.endswith('_date') or column.endswith('_at') or column == 'timestamp':
+                frame[column] = pd.to_datetime(frame[column], errors='coerce')
+            elif 'INT' in declared:
+                frame[column] = pd.to_numeric(frame[column], errors='coerce').astype('Int64')
+            elif any(kind in declared for kind in ('REAL', 'FLOA', 'DOUB', 'NUMERIC', 'DECIMAL')):
+                frame[column] = pd.to_numeric(frame[column], errors='coerce').astype('float64')
+            elif frame[column].dtype == object:
+                frame[column] = frame[column].astype('string')
+        return frame
+
+    def _write_partitions(self, table, frame, months, file_stem):
+        """Write one file per month (hive-style month=YYYY-MM directories), or one file without months"""
+        if months is None:
+            partitions = [(None, frame)]
+        else:
+            partitions = frame.groupby(months, sort=True)
+
+        files = 0
+        for month, part in partitions:
+            part_dir = os.path.join(self.output_dir, table) if month is None \
+                else os.path.join(self.output_dir, table, f"month={month}")
+            os.makedirs(part_dir, exist_ok=True)
+            self._write_file(part.reset_index(drop=True), os.path.join(part_dir, file_stem + self.extension))
+            files += 1
+        return files
+
+    def _write_file(self, frame, path):
+        # Write next to the target and rename, so readers never see a partial file
+        temp_path = path + ".tmp"
+        if self.file_format == 'parquet':
+            frame.to_parquet(temp_path, engine=_parquet_engine(), index=False)
+        else:
+            frame.to_feather(temp_path)
+        os.replace(temp_path, path)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Export database snapshots for analytics")
+    parser.add_argument("--db", default="society_management.db", help="database file")
+    parser.add_argument("--out", default=DEFAULT_OUTPUT_DIR, help="output directory")
+    parser.add_argument("--format", default="parquet", choices=["parquet", "feather"])
+    parser.add_argument("--full", action="store_true", help="discard previous exports and export everything")
+    args = parser.parse_args(argv)
+
+    exporter = AnalyticsExporter(args.db, args.out, args.format)
+    started = time.perf_counter()
+    try:
+        summary = exporter.export(full=args.full)
+    except ImportError as e:
+        print(e)
+        return 1
+
+    for table, result in summary.items():
+        print(f"{table}: {result['rows']} rows, {result['files']} file(s) ({result['mode']})")
+    print(f"Exported to {args.out} in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,379 @@
+# utils/audit_archiver.py
+"""
+Audit log archival for the Society Management System.
+This module moves old audit_log entries into monthly archives (SQLite tables or
+compressed JSONL files), keeps a summary index of what was archived, and provides
+a query facade that only reads the archives when a date filter reaches back that far.
+"""
+
+import os
+import json
+import gzip
+from datetime import datetime, timedelta
+from utils.db_context import get_db_connection
+from utils.database_exceptions import DatabaseError
+
+
+AUDIT_COLUMNS = [
+    'id', 'timestamp', 'user_id', 'username', 'action', 'table_name', 'record_id',
+    'old_values', 'new_values', 'details', 'ip_address', 'session_id'
+]
+
+STORAGE_TABLE = "table"
+STORAGE_FILE = "file"
+
+
+def _month_bounds(month):
+    """Return the first timestamp of a 'YYYY-MM' month and of the month after it."""
+    year, mon = int(month[:4]), int(month[5:7])
+    next_year, next_mon = (year + 1, 1) if mon == 12 else (year, mon + 1)
+    return f"{year:04d}-{mon:02d}-01 00:00:00", f"{next_year:04d}-{next_mon:02d}-01 00:00:00"
+
+
+def _row_to_entry(row):
+    """Convert an audit_log row (in AUDIT_COLUMNS order) into a log entry dictionary."""
+    entry = dict(zip(AUDIT_COLUMNS, row))
+    for key in ('old_values', 'new_values'):
+        value = entry[key]
+        if isinstance(value, str) and value:
+            entry[key] = json.loads(value)
+        elif not value:
+            entry[key] = None
+    return entry
+
+
+class AuditArchiver:
+    """Class for archiving old audit log entries and searching across the archives."""
+
+    def __init__(self, db_path="society_management.db", archive_dir="audit_archive"):
+        self.db_path = db_path
+        self.archive_dir = archive_dir
+        self._index_ready = False
+
+    def init_archive_index(self):
+        """Initialize the archive summary index (and the hot table timestamp index) if needed"""
+        if self._index_ready:
+            return
+
+        try:
+            with get_db_connection(self.db_path) as conn:
+                cursor = conn.cursor()
+
+                cursor.execute('''
+                CREATE TABLE IF NOT EXISTS audit_archive_index (
+                    month TEXT NOT NULL,
+                    storage TEXT NOT NULL,
+                    location TEXT NOT NULL,
+                    entry_count INTEGER DEFAULT 0,
+                    first_timestamp TEXT,
+                    last_timestamp TEXT,
+                    archived_at TIMESTAMP,
+                    PRIMARY KEY (month, location)
+                )
+                ''')
+
+                # Viewers always read the newest rows first
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_audit_log_timestamp ON audit_log(timestamp)')
+
+                conn.commit()
+                self._index_ready = True
+        except DatabaseError:
+            # Re-raise database errors
+            raise
+        except Exception as e:
+            # Wrap unexpected errors in DatabaseError
+            raise DatabaseError("Failed to initialize audit archive index", original_error=e)
+
+    def archive_old_entries(self, horizon_days=365, storage=STORAGE_TABLE, compression="gzip"):
+        """
+        Move audit log entries older than the horizon into monthly archives.
+
+        Only whole months that end before the horizon are archived, so a month is
+        never split between the hot table and an archive.
+
+        Args:
+            horizon_days (int): Entries older than this many days are archived
+            storage (str): "table" for monthly archive tables, "file" for compressed JSONL files
+            compression (str): "gzip" or "zstd" (file storage only; zstd needs the zstandard package)
+
+        Returns:
+            dict: Number of entries archived per month ('YYYY-MM')
+        """
+        if storage not in (STORAGE_TABLE, STORAGE_FILE):
+            raise ValueError(f"Invalid audit archive storage: {storage}")
+
+        self.init_archive_index()
+
+        cutoff = (datetime.now() - timedelta(days=horizon_days)).replace(day=1)
+        cutoff_str = cutoff.strftime('%Y-%m-01 00:00:00')
+
+        try:
+            with get_db_connection(self.db_path) as conn:
+                cursor = conn.cursor()
+
+                cursor.execute('''
+                SELECT DISTINCT substr(timestamp, 1, 7) FROM audit_log
+                WHERE timestamp < ?
+                ORDER BY 1
+                ''', (cutoff_str,))
+                months = [row[0] for row in cursor.fetchall()]
+
+                archived = {}
+                for month in months:
+                    start, end = _month_bounds(month)
+
+                    if storage == STORAGE_TABLE:
+                        location = self._archive_month_to_table(cursor, month, start, end)
+                    else:
+                        location = self._archive_month_to_file(cursor, month, start, end, compression)
+
+                    cursor.execute('''
+                    SELECT COUNT(*), MIN(timestamp), MAX(timestamp) FROM audit_log
+                    WHERE timestamp >= ? AND timestamp < ?
+                    ''', (start, end))
+                    count, first_ts, last_ts = cursor.fetchone()
+
+                    cursor.execute('''
+                    INSERT INTO audit_archive_index
+                    (month, storage, location, entry_count, first_timestamp, last_timestamp, archived_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(month, location) DO UPDATE SET
+                        entry_count = entry_count + excluded.entry_count,
+                        first_timestamp = MIN(first_timestamp, excluded.first_timestamp),
+                        last_timestamp = MAX(last_timestamp, excluded.last_timestamp),
+                        archived_at = excluded.archived_at
+                    ''', (month, storage, location, count, first_ts, last_ts,
+                          datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+
+                    cursor.execute('DELETE FROM audit_log WHERE timestamp >= ? AND timestamp < ?', (start, end))
+                    archived[month] = count
+
+                conn.commit()
+                return archived
+        except DatabaseError:
+            # Re-raise database errors
+            raise
+        except Exception as e:
+            # Wrap unexpected errors in DatabaseError
+            raise DatabaseError("Failed to archive audit logs", original_error=e)
+
+    def _archive_month_to_table(self, cursor, month, start, end):
+        """Copy one month of audit_log into its archive table and return the table name"""
+        table = f"audit_log_archive_{month.replace('-', '_')}"
+        columns = ', '.join(AUDIT_COLUMNS)
+
+        cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS {table} (
+            id INTEGER PRIMARY KEY,
+            timestamp TEXT,
+            user_id INTEGER,
+            username TEXT,
+            action TEXT,
+            table_name TEXT,
+            record_id INTEGER,
+            old_values TEXT,
+            new_values TEXT,
+            details TEXT,
+            ip_address TEXT,
+            session_id TEXT
+        )
+        ''')
+        cursor.execute(f'''
+        INSERT OR IGNORE INTO {table} ({columns})
+        SELECT {columns} FROM audit_log WHERE timestamp >= ? AND timestamp < ?
+        ''', (start, end))
+        return table
+
+    def _archive_month_to_file(self, cursor, month, start, end, compression):
+        """Append one month of audit_log to its compressed JSONL file and return the file path"""
+        os.makedirs(self.archive_dir, exist_ok=True)
+
+        cursor.execute(f'''
+        SELECT {', '.join(AUDIT_COLUMNS)} FROM audit_log
+        WHERE timestamp >= ? AND timestamp < ?
+        ORDER BY timestamp, id
+        ''', (start, end))
+        lines = [json.dumps(dict(zip(AUDIT_COLUMNS, row))) + "\n" for row in cursor.fetchall()]
+        data = "".join(lines).encode('utf-8')
+
+        if compression == "zstd":
+            try:
+                import zstandard
+            except ImportError:
+                print("zstandard is not installed, falling back to gzip for audit archives")
+                compression = "gzip"
+
+        # Both gzip members and zstd frames may be concatenated, so a month that is
+        # archived in several runs is simply appended to its existing file.
+        if compression == "zstd":
+            path = os.path.join(self.archive_dir, f"audit_log_{month}.jsonl.zst")
+            with open(path, 'ab') as f:
+                f.write(zstandard.ZstdCompressor().compress(data))
+        else:
+            path = os.path.join(self.archive_dir, f"audit_log_{month}.jsonl.gz")
+            with gzip.open(path, 'ab') as f:
+                f.write(data)
+        return path
+
+    def get_archive_summary(self):
+        """
+        Retrieve the archive summary index.
+
+        Returns:
+            list: One dictionary per archived month and storage location
+        """
+        self.init_archive_index()
+
+        try:
+            with get_db_connection(self.db_path) as conn:
+                cursor = conn.cursor()
+
+                cursor.execute('''
+                SELECT month, storage, location, entry_count, first_timestamp, last_timestamp, archived_at
+                FROM audit_archive_index
+                ORDER BY month DESC
+                ''')
+
+                return [
+                    {
+                        'month': row[0],
+                        'storage': row[1],
+                        'location': row[2],
+                        'entry_count': row[3],
+                        'first_timestamp': row[4],
+                        'last_timestamp': row[5],
+                        'archived_at': row[6]
+                    }
+                    for row in cursor.fetchall()
+                ]
+        except DatabaseError:
+            # Re-raise database errors
+            raise
+        except Exception as e:
+            # Wrap unexpected errors in DatabaseError
+            raise DatabaseError("Failed to retrieve audit archive summary", original_error=e)
+
+    def search_audit_logs(self, start_date=None, end_date=None, username=None, action=None,
+                          limit=100, offset=0):
+        """
+        Search audit logs across the hot table and, when needed, the archives.
+
+        Archives are only read when start_date reaches back into an archived month,
+        so everyday queries touch the (small) hot table only.
+
+        Args:
+            start_date (str, optional): Earliest date to include ('YYYY-MM-DD')
+            end_date (str, optional): Latest date to include ('YYYY-MM-DD')
+            username (str, optional): Only include entries for this user
+            action (str, optional): Only include entries with this action
+            limit (int): Number of records to retrieve
+            offset (int): Offset for pagination
+
+        Returns:
+            list: List of audit log entries, newest first
+        """
+        self.init_archive_index()
+
+        conditions = []
+        params = []
+        if start_date:
+            conditions.append('timestamp >= ?')
+            params.append(f"{start_date} 00:00:00")
+        if end_date:
+            next_day = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
+            conditions.append('timestamp < ?')
+            params.append(next_day.strftime('%Y-%m-%d 00:00:00'))
+        if username:
+            conditions.append('username = ?')
+            params.append(username)
+        if action:
+            conditions.append('action = ?')
+            params.append(action)
+        where = (' WHERE ' + ' AND '.join(conditions)) if conditions else ''
+
+        # Every source is asked for enough rows to fill the requested page after merging
+        wanted = limit + offset
+
+        try:
+            with get_db_connection(self.db_path) as conn:
+                cursor = conn.cursor()
+
+                cursor.execute(f'''
+                SELECT {', '.join(AUDIT_COLUMNS)} FROM audit_log{where}
+                ORDER BY timestamp DESC, id DESC
+                LIMIT ?
+                ''', params + [wanted])
+                rows = cursor.fetchall()
+
+                archives = []
+                if start_date:
+                    cursor.execute('''
+                    SELECT storage, location FROM audit_archive_index
+                    WHERE month >= ? AND month <= ?
+                    ORDER BY month DESC
+                    ''', (start_date[:7], end_date[:7] if end_date else '9999-12'))
+                    archives = cursor.fetchall()
+
+                for storage, location in archives:
+                    if storage == STORAGE_TABLE:
+                        cursor.execute(f'''
+                        SELECT {', '.join(AUDIT_COLUMNS)} FROM {location}{where}
+                        ORDER BY timestamp DESC, id DESC
+                        LIMIT ?
+                        ''', params + [wanted])
+                        rows.extend(cursor.fetchall())
+                    else:
+                        rows.extend(self._read_archive_file(location, params, start_date, end_date,
+                                                            username, action))
+        except DatabaseError:
+            # Re-raise database errors
+            raise
+        except Exception as e:
+            # Wrap unexpected errors in DatabaseError
+            raise DatabaseError("Failed to search audit logs", original_error=e)
+
+        rows.sort(key=lambda row: (row[1] or "", row[0] or 0), reverse=True)
+        return [_row_to_entry(row) for row in rows[offset:offset + limit]]
+
+    def _read_archive_file(self, path, params, start_date, end_date, username, action):
+        """Read and filter the rows of one compressed JSONL archive file"""
+        if not os.path.exists(path):
+            print(f"Audit archive file not found: {path}")
+            return []
+
+        if path.endswith('.zst'):
+            try:
+                import zstandard
+            except ImportError:
+                raise DatabaseError(f"Reading {path} requires the zstandard package")
+            with open(path, 'rb') as f:
+                reader = zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True)
+                content = reader.read().decode('utf-8')
+        else:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                content = f.read()
+
+        # The timestamp bounds are the first entries of params when date filters are set
+        lower = params[0] if start_date else None
+        upper = params[1 if start_date else 0] if end_date else None
+
+        rows = []
+        for line in content.splitlines():
+            if not line:
+                continue
+            entry = json.loads(line)
+            timestamp = entry.get('timestamp') or ""
+            if lower and timestamp < lower:
+                continue
+            if upper and timestamp >= upper:
+                continue
+            if username and entry.get('username') != username:
+                continue
+            if action and entry.get('action') != action:
+                continue
+            rows.append(tuple(entry.get(column) for column in AUDIT_COLUMNS))
+        return rows
+
+
+# Global audit archiver instance (tables are created lazily on first use)
+audit_archiver = AuditArchiver()
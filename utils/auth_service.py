@@ -0,0 +1,36 @@
+# utils/auth_service.py
+"""
+Background authentication for the Society Management System.
+bcrypt verification is deliberately slow, so this module runs authenticate_user
+off the GUI thread and hands the result back through a Qt signal.
+"""
+
+from PyQt5.QtCore import QThread, pyqtSignal
+from utils.security import authenticate_user
+
+
+class AuthenticationWorker(QThread):
+    """Thread that authenticates one login attempt and emits the result."""
+
+    # Emits the user's role, or None if authentication failed
+    authenticated = pyqtSignal(object)
+    # Emits the error message if authentication could not be performed
+    failed = pyqtSignal(str)
+
+    def __init__(self, username, password, ip_address=None, session_id=None, parent=None):
+        super().__init__(parent)
+        self.username = username
+        self.password = password
+        self.ip_address = ip_address
+        self.session_id = session_id
+
+    def run(self):
+        try:
+            role = authenticate_user(self.username, self.password, self.ip_address, self.session_id)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        finally:
+            # Don't keep the plain-text password around longer than needed
+            self.password = None
+        self.authenticated.emit(role)
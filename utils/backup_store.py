@@ -0,0 +1,391 @@
+# utils/backup_store.py
+"""
+Incremental, deduplicated backups for the Society Management System.
+
+Each snapshot takes an online copy of the database (see utils.db_backup),
+splits it into fixed-size chunks and stores every chunk under the SHA-256 of
+its content. Chunks that are already in the store are not written again, so a
+snapshot only adds the pages that changed since any earlier snapshot. Photo
+files are chunked the same way; files whose size and modification time match
+the previous snapshot are not even read.
+
+Store layout:
+
+    backups/store/chunks/ab/abcdef...      zlib-compressed chunk, named by the hash of its content
+    backups/store/snapshots/<id>.json      manifest: chunk lists for the database and each photo
+
+Snapshots can be restored individually or as of a point in time, and prune()
+applies the daily/weekly/monthly retention policy from
+DATABASE_BACKUP_STRATEGY.md, then deletes chunks no snapshot refers to.
+
+Run `python -m utils.backup_store snapshot|list|restore|prune` (see --help).
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import zlib
+from datetime import datetime, timedelta
+from utils.db_backup import backup_database
+from utils.database_exceptions import DatabaseError
+
+
+DEFAULT_STORE_DIR = os.path.join("backups", "store")
+
+# Chunk size for splitting files (a multiple of SQLite's page size)
+CHUNK_SIZE = 64 * 1024
+
+# Retention policy: newest snapshot per day/week/month for this many days/weeks/months
+KEEP_DAILY = 7
+KEEP_WEEKLY = 5
+KEEP_MONTHLY = 12
+
+
+class BackupStore:
+    def __init__(self, store_dir=DEFAULT_STORE_DIR, chunk_size=CHUNK_SIZE):
+        self.store_dir = store_dir
+        self.chunk_size = chunk_size
+        self.chunks_dir = os.path.join(store_dir, "chunks")
+        self.snapshots_dir = os.path.join(store_dir, "snapshots")
+
+    # Chunks
+
+    def _chunk_path(self, digest):
+        return os.path.join(self.chunks_dir, digest[:2], digest)
+
+    def _store_chunk(self, data, stats):
+        """Store one chunk unless it is already in the store. Returns its hash."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._chunk_path(digest)
+        if os.path.exists(path):
+            stats['reused_chunks'] += 1
+            return digest
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        compressed = zlib.compress(data, 3)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(compressed)
+        os.replace(temp_path, path)
+        stats['new_chunks'] += 1
+        stats['new_bytes'] += len(compressed)
+        return digest
+
+    def _read_chunk(self, digest):
+        with open(self._chunk_path(digest), 'rb') as f:
+            data = zlib.decompress(f.read())
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise DatabaseError(f"Backup chunk {digest} is corrupt")
+        return data
+
+    def _store_file(self, path, stats):
+        """Split a file into chunks and store them. Returns (chunk hashes, file SHA-256)."""
+        chunks = []
+        file_hash = hashlib.sha256()
+        with open(path, 'rb') as f:
+            while True:
+                data = f.read(self.chunk_size)
+                if not data:
+                    break
+                file_hash.update(data)
+                chunks.append(self._store_chunk(data, stats))
+        return chunks, file_hash.hexdigest()
+
+    def _write_file(self, chunks, dest_path, expected_hash=None):
+        """Reassemble a file from its chunks (written next to dest_path, then renamed)"""
+        os.makedirs(os.path.dirname(os.path.abspath(dest_path)), exist_ok=True)
+        temp_path = dest_path + ".restoring"
+        file_hash = hashlib.sha256()
+        with open(temp_path, 'wb') as f:
+            for digest in chunks:
+                data = self._read_chunk(digest)
+                file_hash.update(data)
+                f.write(data)
+        if expected_hash and file_hash.hexdigest() != expected_hash:
+            os.remove(temp_path)
+            raise DatabaseError(f"Restored file does not match the snapshot: {dest_path}")
+        os.replace(temp_path, dest_path)
+
+    # Snapshots
+
+    def list_snapshots(self):
+        """
+        Get all snapshot manifests, oldest first.
+
+        Returns:
+            list: Manifest dicts
+        """
+        if not os.path.isdir(self.snapshots_dir):
+            return []
+        manifests = []
+        for name in sorted(os.listdir(self.snapshots_dir)):
+            if name.endswith(".json"):
+                with open(os.path.join(self.snapshots_dir, name), 'r') as f:
+                    manifests.append(json.load(f))
+        manifests.sort(key=lambda manifest: manifest['created_at'])
+        return manifests
+
+    def get_snapshot(self, snapshot_id=None, at=None):
+        """
+        Find a snapshot by id, or the latest one taken at or before a point in time.
+
+        Args:
+            snapshot_id (str): Snapshot id
+            at (datetime): Point in time (default: latest snapshot)
+
+        Returns:
+            dict: The manifest, or None if there is no such snapshot
+        """
+        snapshots = self.list_snapshots()
+        if snapshot_id:
+            return next((manifest for manifest in snapshots if manifest['id'] == snapshot_id), None)
+        if at is not None:
+            at_text = at.strftime("%Y-%m-%d %H:%M:%S")
+            snapshots = [manifest for manifest in snapshots if manifest['created_at'] <= at_text]
+        return snapshots[-1] if snapshots else None
+
+    def create_snapshot(self, db_path="society_management.db", photos_dir="resident_photos"):
+        """
+        Take an incremental snapshot of the database and the photo directory.
+
+        Args:
+            db_path (str): Database to back up (copied online, so it may be in use)
+            photos_dir (str): Directory of resident photos (skipped if it does not exist)
+
+        Returns:
+            dict: The snapshot manifest, including 'stats' on how much was new
+        """
+        started = time.perf_counter()
+        now = datetime.now()
+        snapshot_id = now.strftime("%Y%m%d_%H%M%S")
+        while os.path.exists(os.path.join(self.snapshots_dir, snapshot_id + ".json")):
+            snapshot_id += "_1"
+
+        stats = {'new_chunks': 0, 'reused_chunks': 0, 'new_bytes': 0, 'files_read': 0, 'files_unchanged': 0}
+        previous = self.get_snapshot()
+        previous_files = previous['files'] if previous else {}
+
+        # Consistent copy of the live database first, then chunk the copy
+        temp_dir = tempfile.mkdtemp(prefix="snapshot_")
+        try:
+            copy_path = os.path.join(temp_dir, "snapshot.db")
+            backup_database(db_path, copy_path, verify=True)
+            db_chunks, db_hash = self._store_file(copy_path, stats)
+            db_size = os.path.getsize(copy_path)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        files = {}
+        if photos_dir and os.path.isdir(photos_dir):
+            for root, _, names in os.walk(photos_dir):
+                for name in sorted(names):
+                    path = os.path.join(root, name)
+                    relative_path = os.path.relpath(path, photos_dir).replace(os.sep, '/')
+                    stat = os.stat(path)
+                    known = previous_files.get(relative_path)
+                    if known and known['size'] == stat.st_size and known['mtime'] == stat.st_mtime:
+                        files[relative_path] = known
+                        stats['files_unchanged'] += 1
+                        continue
+                    chunks, file_hash = self._store_file(path, stats)
+                    files[relative_path] = {'size': stat.st_size, 'mtime': stat.st_mtime,
+                                            'sha256': file_hash, 'chunks': chunks}
+                    stats['files_read'] += 1
+
+        manifest = {
+            'id': snapshot_id,
+            'created_at': now.strftime("%Y-%m-%d %H:%M:%S"),
+            'chunk_size': self.chunk_size,
+            'database': {'source': db_path, 'size': db_size, 'sha256': db_hash, 'chunks': db_chunks},
+            'photos_dir': photos_dir,
+            'files': files,
+            'stats': dict(stats, seconds=round(time.perf_counter() - started, 3)),
+        }
+
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+        manifest_path = os.path.join(self.snapshots_dir, snapshot_id + ".json")
+        with open(manifest_path + ".tmp", 'w') as f:
+            json.dump(manifest, f)
+        os.replace(manifest_path + ".tmp", manifest_path)
+        return manifest
+
+    def restore(self, db_dest, photos_dest=None, snapshot_id=None, at=None):
+        """
+        Restore a snapshot (by id, as of a point in time, or the latest).
+
+        Args:
+            db_dest (str): Where to write the database (replaced only once fully restored and verified)
+            photos_dest (str): Where to write the photos (None to skip them). Files there that are
+                not in the snapshot, such as photos added since, are removed.
+            snapshot_id (str): Snapshot to restore
+            at (datetime): Restore the latest snapshot taken at or before this time
+
+        Returns:
+            dict: The restored snapshot's manifest
+
+        Raises:
+            DatabaseError: If there is no matching snapshot or the restored data does not verify
+        """
+        manifest = self.get_snapshot(snapshot_id, at)
+        if manifest is None:
+            raise DatabaseError("No matching backup snapshot")
+
+        # Verify the restored copy next to db_dest, so a bad snapshot never replaces the database
+        database = manifest['database']
+        verify_path = db_dest + ".verifying"
+        self._write_file(database['chunks'], verify_path, database['sha256'])
+        try:
+            conn = sqlite3.connect(verify_path)
+            try:
+                integrity = conn.execute("PRAGMA integrity_check").fetchone()[0]
+            finally:
+                conn.close()
+        except sqlite3.DatabaseError as e:
+            integrity = str(e)
+        if integrity != 'ok':
+            os.remove(verify_path)
+            raise DatabaseError(f"Restored database failed the integrity check: {integrity}")
+        os.replace(verify_path, db_dest)
+
+        if photos_dest:
+            restored_paths = set()
+            for relative_path, entry in manifest['files'].items():
+                dest_path = os.path.join(photos_dest, *relative_path.split('/'))
+                self._write_file(entry['chunks'], dest_path, entry['sha256'])
+                os.utime(dest_path, (entry['mtime'], entry['mtime']))
+                restored_paths.add(os.path.normpath(dest_path))
+            # Photos added after the snapshot was taken
+            for root, _, names in os.walk(photos_dest):
+                for name in names:
+                    path = os.path.normpath(os.path.join(root, name))
+                    if path not in restored_paths:
+                        os.remove(path)
+        return manifest
+
+    # Retention
+
+    def prune(self, keep_daily=KEEP_DAILY, keep_weekly=KEEP_WEEKLY, keep_monthly=KEEP_MONTHLY):
+        """
+        Delete snapshots outside the retention policy, then chunks no snapshot uses.
+        The newest snapshot of each day in the last keep_daily days, of each week in the
+        last keep_weekly weeks and of each month in the last keep_monthly months is kept,
+        and so is the newest snapshot overall.
+
+        Returns:
+            dict: removed snapshot ids, removed chunk count and freed bytes
+        """
+        snapshots = self.list_snapshots()
+        keep = set()
+        if snapshots:
+            keep.add(snapshots[-1]['id'])
+        now = datetime.now()
+        windows = (
+            ('%Y-%m-%d', now - timedelta(days=keep_daily)),
+            ('%G-W%V', now - timedelta(weeks=keep_weekly)),
+            ('%Y-%m', now - timedelta(days=31 * keep_monthly)),
+        )
+        for period, cutoff in windows:
+            newest_per_period = {}
+            for manifest in snapshots:  # oldest first, so later snapshots win
+                created = datetime.strptime(manifest['created_at'], "%Y-%m-%d %H:%M:%S")
+                if created >= cutoff:
+                    newest_per_period[created.strftime(period)] = manifest['id']
+            keep.update(newest_per_period.values())
+
+        removed = [manifest['id'] for manifest in snapshots if manifest['id'] not in keep]
+        for snapshot_id in removed:
+            os.remove(os.path.join(self.snapshots_dir, snapshot_id + ".json"))
+
+        removed_chunks, freed_bytes = self.collect_garbage()
+        return {'removed_snapshots': removed, 'removed_chunks': removed_chunks, 'freed_bytes': freed_bytes}
+
+    def collect_garbage(self):
+        """
+        Delete chunks that no remaining snapshot refers to.
+
+        Returns:
+            tuple: (chunks removed, bytes freed)
+        """
+        referenced = set()
+        for manifest in self.list_snapshots():
+            referenced.update(manifest['database']['chunks'])
+            for entry in manifest['files'].values():
+                referenced.update(entry['chunks'])
+
+        removed = 0
+        freed = 0
+        if not os.path.isdir(self.chunks_dir):
+            return removed, freed
+        for prefix in os.listdir(self.chunks_dir):
+            prefix_dir = os.path.join(self.chunks_dir, prefix)
+            for name in os.listdir(prefix_dir):
+                if name not in referenced:
+                    path = os.path.join(prefix_dir, name)
+                    freed += os.path.getsize(path)
+                    os.remove(path)
+                    removed += 1
+        return removed, freed
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Incremental deduplicated backups")
+    parser.add_argument("--store", default=DEFAULT_STORE_DIR, help="backup store directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    snapshot = commands.add_parser("snapshot", help="take a snapshot of the database and photos")
+    snapshot.add_argument("--db", default="society_management.db")
+    snapshot.add_argument("--photos", default="resident_photos")
+    snapshot.add_argument("--prune", action="store_true", help="apply the retention policy afterwards")
+
+    commands.add_parser("list", help="list snapshots")
+
+    restore = commands.add_parser("restore", help="restore a snapshot")
+    restore.add_argument("snapshot_id", nargs="?", help="snapshot to restore (default: latest)")
+    restore.add_argument("--at", help="restore the latest snapshot at or before 'YYYY-MM-DD HH:MM:SS'")
+    restore.add_argument("--db", required=True, help="restored database file")
+    restore.add_argument("--photos", help="directory for the restored photos")
+
+    prune = commands.add_parser("prune", help="apply the retention policy")
+    prune.add_argument("--daily", type=int, default=KEEP_DAILY)
+    prune.add_argument("--weekly", type=int, default=KEEP_WEEKLY)
+    prune.add_argument("--monthly", type=int, default=KEEP_MONTHLY)
+
+    args = parser.parse_args(argv)
+    store = BackupStore(args.store)
+
+    try:
+        if args.command == "snapshot":
+            manifest = store.create_snapshot(args.db, args.photos)
+            stats = manifest['stats']
+            print(f"Snapshot {manifest['id']}: {stats['new_chunks']} new chunks ({stats['new_bytes']} bytes), "
+                  f"{stats['reused_chunks']} reused, {stats['files_read']} photos read, "
+                  f"{stats['files_unchanged']} unchanged, {stats['seconds']:.1f}s")
+            if args.prune:
+                result = store.prune()
+                print(f"Pruned {len(result['removed_snapshots'])} snapshots, freed {result['freed_bytes']} bytes")
+        elif args.command == "list":
+            for manifest in store.list_snapshots():
+                print(f"{manifest['id']}  {manifest['created_at']}  db {manifest['database']['size']} bytes  "
+                      f"{len(manifest['files'])} photos  +{manifest['stats']['new_bytes']} bytes")
+        elif args.command == "restore":
+            at = datetime.strptime(args.at, "%Y-%m-%d %H:%M:%S") if args.at else None
+            manifest = store.restore(args.db, args.photos, args.snapshot_id, at)
+            print(f"Restored snapshot {manifest['id']} ({manifest['created_at']}) to {args.db}")
+        elif args.command == "prune":
+            result = store.prune(args.daily, args.weekly, args.monthly)
+            print(f"Pruned {len(result['removed_snapshots'])} snapshots, removed {result['removed_chunks']} "
+                  f"chunks, freed {result['freed_bytes']} bytes")
+    except DatabaseError as e:
+        print(f"Backup store error: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,247 @@
+# utils/chart_service.py
+"""
+Chart rendering for reports in the Society Management System.
+
+Charts are cached by a hash of their data and style, so a report that is
+regenerated for the same period reuses the chart instead of redrawing it.
+Raster charts are rendered with matplotlib (imported once and kept warm) into
+uniquely named files, so concurrent reports never overwrite each other's
+charts. Vector charts are built with reportlab's own graphics and go into PDFs
+without any rasterisation.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+# Default look of the income vs expense chart
+INCOME_EXPENSE_STYLE = {
+    'title': 'Income vs Expense by Category',
+    'x_label': 'Categories',
+    'y_label': 'Amount (Rs)',
+    'income_color': 'green',
+    'expense_color': 'red',
+    'figsize': (10, 6),
+    'dpi': 150,
+}
+
+
+def chart_series(income_data, expense_data):
+    """
+    Merge income and expense (category, amount) lists into aligned series.
+    Categories are sorted by their combined total, largest first.
+
+    Returns:
+        tuple: (categories, income_values, expense_values)
+    """
+    income_dict = dict(income_data)
+    expense_dict = dict(expense_data)
+    all_categories = set(income_dict) | set(expense_dict)
+
+    categories = sorted(all_categories,
+                        key=lambda category: income_dict.get(category, 0) + expense_dict.get(category, 0),
+                        reverse=True)
+    income_values = [income_dict.get(category, 0) for category in categories]
+    expense_values = [expense_dict.get(category, 0) for category in categories]
+    return categories, income_values, expense_values
+
+
+class ChartService:
+    """Renders and caches report charts."""
+
+    def __init__(self, cache_dir=os.path.join("reports", "charts"), max_drawings=32, max_files=50):
+        self.cache_dir = cache_dir
+        self.max_drawings = max_drawings
+        self.max_files = max_files
+        self._drawings = OrderedDict()  # cache key -> reportlab Drawing (most recent last)
+        self._pyplot = None
+        self._lock = threading.Lock()  # pyplot keeps global state, so one chart at a time
+
+    def _cache_key(self, kind, series, style, **extra):
+        payload = json.dumps({'kind': kind, 'series': series, 'style': style, 'extra': extra},
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:24]
+
+    def _get_pyplot(self):
+        """Import matplotlib once and keep the non-interactive backend loaded"""
+        if self._pyplot is None:
+            import matplotlib
+            matplotlib.use('Agg')  # Use non-interactive backend
+            import matplotlib.pyplot as plt
+            self._pyplot = plt
+        return self._pyplot
+
+    def income_expense_png(self, income_data, expense_data, style=None):
+        """
+        Render the income vs expense bar chart to a PNG file.
+
+        Args:
+            income_data (list): (category, amount) tuples for income
+            expense_data (list): (category, amount) tuples for expenses
+            style (dict): Overrides for INCOME_EXPENSE_STYLE
+
+        Returns:
+            str: Path of the cached PNG (the same data and style always map to the same file)
+        """
+        style = dict(INCOME_EXPENSE_STYLE, **(style or {}))
+        series = chart_series(income_data, expense_data)
+        chart_path = os.path.join(self.cache_dir, f"income_expense_{self._cache_key('png', series, style)}.png")
+        if os.path.exists(chart_path):
+            return chart_path
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        categories, income_values, expense_values = series
+
+        with self._lock:
+            plt = self._get_pyplot()
+            fig, ax = plt.subplots(figsize=style['figsize'])
+            try:
+                positions = range(len(categories))
+                width = 0.35
+
+                rects1 = ax.bar([x - width / 2 for x in positions], income_values, width,
+                                label='Income', color=style['income_color'])
+                rects2 = ax.bar([x + width / 2 for x in positions], expense_values, width,
+                                label='Expense', color=style['expense_color'])
+
+                # Add labels and title
+                ax.set_xlabel(style['x_label'])
+                ax.set_ylabel(style['y_label'])
+                ax.set_title(style['title'])
+                ax.set_xticks(list(positions))
+                ax.set_xticklabels(categories, rotation=45, ha='right')
+                ax.legend()
+
+                # Add value labels on bars
+                for rects in (rects1, rects2):
+                    for rect in rects:
+                        height = rect.get_height()
+                        ax.annotate(f'{height:.0f}',
+                                    xy=(rect.get_x() + rect.get_width() / 2, height),
+                                    xytext=(0, 3),
+                                    textcoords="offset points",
+                                    ha='center', va='bottom', fontsize=8)
+
+                fig.tight_layout()
+
+                # Write to a temporary file first so readers never see a half-written chart
+                fd, temp_path = tempfile.mkstemp(suffix='.png', dir=self.cache_dir)
+                os.close(fd)
+                fig.savefig(temp_path, dpi=style['dpi'], bbox_inches='tight')
+                os.replace(temp_path, chart_path)
+            finally:
+                plt.close(fig)
+
+        self.prune_file_cache()
+        return chart_path
+
+    def prune_file_cache(self):
+        """Delete the oldest cached chart files beyond max_files"""
+        try:
+            files = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                     if name.endswith('.png')]
+            if len(files) <= self.max_files:
+                return
+            files.sort(key=os.path.getmtime)
+            for path in files[:len(files) - self.max_files]:
+                os.remove(path)
+        except OSError as e:
+            print(f"Could not prune chart cache: {e}")
+
+    def income_expense_drawing(self, income_data, expense_data, width=400, height=240, style=None):
+        """
+        Build the income vs expense bar chart as reportlab vector graphics.
+
+        Args:
+            income_data (list): (category, amount) tuples for income
+            expense_data (list): (category, amount) tuples for expenses
+            width (int): Drawing width in points
+            height (int): Drawing height in points
+            style (dict): Overrides for INCOME_EXPENSE_STYLE
+
+        Returns:
+            Drawing: A flowable that can be added straight to a report story
+        """
+        style = dict(INCOME_EXPENSE_STYLE, **(style or {}))
+        series = chart_series(income_data, expense_data)
+        key = self._cache_key('drawing', series, style, width=width, height=height)
+
+        with self._lock:
+            drawing = self._drawings.get(key)
+            if drawing is not None:
+                self._drawings.move_to_end(key)
+                return drawing
+
+        drawing = self._build_drawing(series, width, height, style)
+
+        with self._lock:
+            self._drawings[key] = drawing
+            while len(self._drawings) > self.max_drawings:
+                self._drawings.popitem(last=False)
+        return drawing
+
+    def _build_drawing(self, series, width, height, style):
+        from reportlab.graphics.shapes import Drawing, Group, String
+        from reportlab.graphics.charts.barcharts import VerticalBarChart
+        from reportlab.graphics.charts.legends import Legend
+        from reportlab.lib import colors
+
+        categories, income_values, expense_values = series
+        income_color = getattr(colors, style['income_color'])
+        expense_color = getattr(colors, style['expense_color'])
+
+        drawing = Drawing(width, height)
+        drawing.add(String(width / 2, height - 12, style['title'], fontName='Helvetica-Bold',
+                           fontSize=10, textAnchor='middle'))
+
+        chart = VerticalBarChart()
+        chart.x = 45
+        chart.y = 55
+        chart.width = width - 60
+        chart.height = height - 90
+        chart.data = [income_values or [0], expense_values or [0]]
+        chart.bars[0].fillColor = income_color
+        chart.bars[1].fillColor = expense_color
+        chart.barSpacing = 1
+        chart.groupSpacing = 8
+
+        chart.categoryAxis.categoryNames = categories or ['']
+        chart.categoryAxis.labels.angle = 45
+        chart.categoryAxis.labels.boxAnchor = 'ne'
+        chart.categoryAxis.labels.fontName = 'Helvetica'
+        chart.categoryAxis.labels.fontSize = 7
+        chart.valueAxis.valueMin = 0
+        chart.valueAxis.labels.fontName = 'Helvetica'
+        chart.valueAxis.labels.fontSize = 7
+
+        # Value labels on bars
+        chart.barLabelFormat = '%.0f'
+        chart.barLabels.nudge = 5
+        chart.barLabels.fontName = 'Helvetica'
+        chart.barLabels.fontSize = 6
+        drawing.add(chart)
+
+        legend = Legend()
+        legend.x = width - 110
+        legend.y = height - 25
+        legend.fontName = 'Helvetica'
+        legend.fontSize = 7
+        legend.columnMaximum = 1
+        legend.colorNamePairs = [(income_color, 'Income'), (expense_color, 'Expense')]
+        legend.alignment = 'right'
+        drawing.add(legend)
+
+        # Rotated y axis label
+        y_label = Group(String(0, 0, style['y_label'], fontName='Helvetica', fontSize=7, textAnchor='middle'))
+        y_label.transform = (0, 1, -1, 0, 12, chart.y + chart.height / 2)
+        drawing.add(y_label)
+        drawing.hAlign = 'CENTER'
+        return drawing
+
+
+# Global chart service instance (matplotlib is only imported on the first raster chart)
+chart_service = ChartService()
@@ -0,0 +1,213 @@
+# utils/db_backup.py
+"""
+Online database backup for the Society Management System.
+
+Backups use SQLite's backup API instead of copying the file, so the copy is
+always a consistent snapshot even while other connections are writing. Pages
+are copied a few hundred at a time with a short pause between steps, so
+writers are not blocked while the copy runs, and the finished copy is checked
+with PRAGMA integrity_check before it replaces the destination file.
+
+A write from another connection makes SQLite restart the copy. In WAL mode
+the backup reads from a pinned snapshot, so this never happens. In the default
+rollback-journal mode, a backup that keeps being restarted finishes in one
+pass under a read lock; writers then wait for that pass only.
+
+Run `python -m utils.db_backup` (e.g. from a scheduled task) to write a
+timestamped backup to the backups/ directory. The GUI runs backups on the
+thread in gui/backup_worker.py, so this module does not need Qt.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta
+from utils.database_exceptions import DatabaseError
+
+
+DEFAULT_BACKUP_DIR = "backups"
+
+# Pages copied per backup step (4 KB pages: about 1 MB per step)
+PAGES_PER_STEP = 256
+
+# Pause between steps so writers can get the database lock
+STEP_PAUSE_SECONDS = 0.005
+
+
+# Restarts caused by concurrent writes before the copy is finished under a read lock
+MAX_RESTARTS = 3
+
+
+class BackupCancelled(Exception):
+    """Raised when a running backup is cancelled"""
+    pass
+
+
+class _BackupStarved(Exception):
+    """Raised internally when concurrent writes keep restarting the copy"""
+    pass
+
+
+def backup_database(source_path, dest_path, pages_per_step=PAGES_PER_STEP, pause=STEP_PAUSE_SECONDS,
+                    progress_callback=None, cancel_event=None, verify=True):
+    """
+    Copy a live database to dest_path with the SQLite backup API.
+
+    Args:
+        source_path (str): Database to back up
+        dest_path (str): Backup file to create (replaced only once the copy is complete and verified)
+        pages_per_step (int): Pages copied per step
+        pause (float): Seconds to wait between steps
+        progress_callback (callable): Called as progress_callback(pages_done, total_pages) after each step
+        cancel_event (threading.Event): Set it to abandon the backup
+        verify (bool): Run PRAGMA integrity_check on the copy
+
+    Returns:
+        dict: path, pages, seconds, integrity ('ok', or None when not verified) and restarts
+
+    Raises:
+        BackupCancelled: If cancel_event was set
+        DatabaseError: If the backup fails or the copy does not pass the integrity check
+    """
+    if not os.path.exists(source_path):
+        raise DatabaseError(f"Source database file not found: {source_path}")
+
+    started = time.perf_counter()
+    dest_dir = os.path.dirname(os.path.abspath(dest_path))
+    os.makedirs(dest_dir, exist_ok=True)
+    temp_path = dest_path + ".partial"
+    state = {'total': 0, 'done': 0, 'restarts': 0, 'read_lock': False, 'wal': False}
+
+    def on_step(status, remaining, total):
+        done = total - remaining
+        # A write from another connection restarts the copy from the first page
+        if not state['read_lock'] and remaining and done <= state['done']:
+            state['restarts'] += 1
+            if state['restarts'] > MAX_RESTARTS:
+                raise _BackupStarved()
+        state['total'], state['done'] = total, done
+        if progress_callback:
+            progress_callback(done, total)
+        if cancel_event is not None and cancel_event.is_set():
+            raise BackupCancelled("Backup cancelled")
+        # Writers can get in between steps (with a read lock held this only holds for WAL databases)
+        if pause and (state['wal'] or not state['read_lock']):
+            time.sleep(pause)
+
+    try:
+        source = sqlite3.connect(source_path, timeout=30, isolation_level=None)
+        try:
+            target = sqlite3.connect(temp_path)
+            try:
+                state['wal'] = source.execute("PRAGMA journal_mode").fetchone()[0].lower() == 'wal'
+                if state['wal']:
+                    # In WAL mode a read transaction pins a snapshot without blocking writers
+                    _begin_read(source, state)
+                try:
+                    source.backup(target, pages=pages_per_step, progress=on_step)
+                except _BackupStarved:
+                    # Writers keep restarting the copy: finish it in one pass under a read lock
+                    state['done'] = 0
+                    _begin_read(source, state)
+                    source.backup(target, pages=pages_per_step, progress=on_step)
+                finally:
+                    if state['read_lock']:
+                        source.execute("COMMIT")
+                integrity = None
+                if verify:
+                    integrity = target.execute("PRAGMA integrity_check").fetchone()[0]
+            finally:
+                target.close()
+        finally:
+            source.close()
+
+        if verify and integrity != 'ok':
+            raise DatabaseError(f"Backup failed the integrity check: {integrity}")
+        os.replace(temp_path, dest_path)
+    except BackupCancelled:
+        _remove_file(temp_path)
+        raise
+    except DatabaseError:
+        _remove_file(temp_path)
+        raise
+    except Exception as e:
+        _remove_file(temp_path)
+        raise DatabaseError("Failed to back up the database", original_error=e)
+
+    return {
+        'path': dest_path,
+        'pages': state['total'],
+        'seconds': round(time.perf_counter() - started, 3),
+        'integrity': integrity,
+        'restarts': state['restarts'],
+    }
+
+
+def _begin_read(connection, state):
+    """Open a read transaction so the backup copies one consistent snapshot"""
+    connection.execute("BEGIN")
+    connection.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+    state['read_lock'] = True
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def default_backup_path(backup_dir=DEFAULT_BACKUP_DIR):
+    """Timestamped backup file name in backup_dir"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(backup_dir, f"society_management_backup_{timestamp}.db")
+
+
+def prune_backups(backup_dir=DEFAULT_BACKUP_DIR, keep_days=7):
+    """
+    Delete timestamped backups older than keep_days.
+
+    Returns:
+        list: Paths of the deleted backups
+    """
+    cutoff = time.time() - timedelta(days=keep_days).total_seconds()
+    deleted = []
+    if not os.path.isdir(backup_dir):
+        return deleted
+    for name in os.listdir(backup_dir):
+        path = os.path.join(backup_dir, name)
+        if (name.startswith("society_management_backup_") and name.endswith(".db")
+                and os.path.getmtime(path) < cutoff):
+            os.remove(path)
+            deleted.append(path)
+    return deleted
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Back up the database while it is in use")
+    parser.add_argument("--db", default="society_management.db", help="database file")
+    parser.add_argument("--dest", help="backup file (default: backups/society_management_backup_<timestamp>.db)")
+    parser.add_argument("--pages", type=int, default=PAGES_PER_STEP, help="pages copied per step")
+    parser.add_argument("--keep-days", type=int, help="delete timestamped backups older than this")
+    parser.add_argument("--no-verify", action="store_true", help="skip PRAGMA integrity_check")
+    args = parser.parse_args(argv)
+
+    dest_path = args.dest or default_backup_path()
+    try:
+        result = backup_database(args.db, dest_path, args.pages, verify=not args.no_verify)
+    except DatabaseError as e:
+        print(f"Backup failed: {e}")
+        return 1
+
+    print(f"Backed up {result['pages']} pages to {result['path']} in {result['seconds']:.1f}s"
+          + (f" (integrity: {result['integrity']})" if result['integrity'] else ""))
+    if args.keep_days is not None:
+        for path in prune_backups(os.path.dirname(dest_path) or ".", args.keep_days):
+            print(f"Deleted old backup {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
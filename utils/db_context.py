@@ -12,6 +12,7 @@ from utils.database_exceptions import (
     DatabaseError, DatabaseConnectionError, DatabaseLockError,
     DatabaseCorruptionError, DatabasePermissionError, DatabaseTimeoutError
 )
+from utils.resident_utils import register_flat_collation
 
 @contextmanager
 def get_db_connection(db_path="society_management.db", retries=3, timeout=30):
@@ -44,6 +45,8 @@ def get_db_connection(db_path="society_management.db", retries=3, timeout=30):
     for attempt in range(retries + 1):
         try:
             conn = sqlite3.connect(db_path, timeout=timeout)
+            # Lets queries sort by flat number naturally (ORDER BY flat_no COLLATE FLAT_NATURAL)
+            register_flat_collation(conn)
             yield conn
             # If we get here, the operation was successful
             return
@@ -0,0 +1,192 @@
+# utils/export_engine.py
+"""
+Tabular export engine for the Society Management System.
+
+Rows are streamed straight from a database cursor into the output file, so an
+export does not depend on what a table widget currently shows and memory use
+stays flat however many rows there are. Excel files are written with openpyxl's
+write-only mode; column widths and number formats are set up once per sheet
+rather than per cell.
+"""
+
+import csv
+from collections import namedtuple
+from utils.db_context import get_db_connection
+from utils.database_exceptions import DatabaseError
+
+
+# header: column title, width: Excel column width, amount: numeric column shown with 2 decimals
+ExportColumn = namedtuple('ExportColumn', ['header', 'width', 'amount'])
+
+AMOUNT_FORMAT = '#,##0.00'
+
+# Rows fetched from the cursor at a time
+EXPORT_CHUNK_ROWS = 2000
+
+LEDGER_EXPORT_COLUMNS = [
+    ExportColumn("Transaction ID", 18, False),
+    ExportColumn("Date", 12, False),
+    ExportColumn("Flat No", 10, False),
+    ExportColumn("Type", 18, False),
+    ExportColumn("Category", 16, False),
+    ExportColumn("Description", 40, False),
+    ExportColumn("Debit", 12, True),
+    ExportColumn("Credit", 12, True),
+    ExportColumn("Balance", 14, True),
+    ExportColumn("Payment Mode", 14, False),
+    ExportColumn("Entered By", 14, False),
+    ExportColumn("Status", 14, False),
+]
+
+RECONCILIATION_EXPORT_COLUMNS = (
+    [ExportColumn("S.N", 8, False)]
+    + [column for column in LEDGER_EXPORT_COLUMNS if column.header != "Entered By"]
+    + [ExportColumn("Confidence", 12, False), ExportColumn("Matched Bank Entry", 50, False)]
+)
+
+
+def iter_ledger_rows(db_path="society_management.db", start_date=None, end_date=None,
+                     chunk_size=EXPORT_CHUNK_ROWS):
+    """
+    Stream ledger rows in LEDGER_EXPORT_COLUMNS order, oldest first.
+
+    Args:
+        db_path (str): Path to the database file
+        start_date (str): Start of the period 'YYYY-MM-DD' (inclusive, optional)
+        end_date (str): End of the period 'YYYY-MM-DD' (inclusive, optional)
+        chunk_size (int): Rows fetched from the cursor at a time
+
+    Yields:
+        tuple: One ledger row
+    """
+    query = '''
+        SELECT transaction_id, date, COALESCE(flat_no, ''), transaction_type, category,
+               COALESCE(description, ''), COALESCE(debit, 0), COALESCE(credit, 0), COALESCE(balance, 0),
+               COALESCE(payment_mode, ''), COALESCE(entered_by, ''), COALESCE(reconciliation_status, '')
+        FROM ledger
+    '''
+    params = []
+    if start_date and end_date:
+        query += ' WHERE date BETWEEN ? AND ?'
+        params = [str(start_date), str(end_date)]
+    query += ' ORDER BY date ASC, id ASC'
+
+    try:
+        with get_db_connection(db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+    except DatabaseError:
+        raise
+    except Exception as e:
+        raise DatabaseError("Failed to read ledger for export", original_error=e)
+
+
+def iter_reconciliation_rows(db_path="society_management.db", start_date=None, end_date=None,
+                             match_info=None):
+    """
+    Stream ledger rows in RECONCILIATION_EXPORT_COLUMNS order.
+
+    Args:
+        db_path (str): Path to the database file
+        start_date (str): Start of the period 'YYYY-MM-DD' (inclusive, optional)
+        end_date (str): End of the period 'YYYY-MM-DD' (inclusive, optional)
+        match_info (dict): transaction_id -> (confidence text, matched bank description)
+
+    Yields:
+        tuple: One reconciliation row
+    """
+    match_info = match_info or {}
+    for sn, row in enumerate(iter_ledger_rows(db_path, start_date, end_date), start=1):
+        confidence, matched_bank = match_info.get(row[0], ("", ""))
+        yield (sn,) + row[:10] + row[11:] + (confidence, matched_bank)
+
+
+def export_to_csv(file_path, columns, rows):
+    """
+    Write rows to a CSV file as they are produced.
+
+    Args:
+        file_path (str): Output file
+        columns (list): ExportColumn definitions
+        rows (iterable): Row tuples in column order
+
+    Returns:
+        int: Number of data rows written
+    """
+    amount_indexes = [index for index, column in enumerate(columns) if column.amount]
+    count = 0
+    with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow([column.header for column in columns])
+        for row in rows:
+            if amount_indexes:
+                row = list(row)
+                for index in amount_indexes:
+                    if isinstance(row[index], (int, float)):
+                        row[index] = f"{row[index]:.2f}"
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def export_to_excel(file_path, columns, rows, sheet_title="Export"):
+    """
+    Write rows to an .xlsx file in openpyxl write-only mode.
+
+    Args:
+        file_path (str): Output file
+        columns (list): ExportColumn definitions
+        rows (iterable): Row tuples in column order
+        sheet_title (str): Worksheet name
+
+    Returns:
+        int: Number of data rows written
+
+    Raises:
+        ImportError: If openpyxl is not installed
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, NamedStyle, PatternFill
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_title)
+
+    # Column widths, header style and the amount format are set up once
+    for index, column in enumerate(columns, start=1):
+        ws.column_dimensions[get_column_letter(index)].width = column.width
+    ws.freeze_panes = 'A2'
+
+    header_style = NamedStyle(name='export_header', font=Font(bold=True),
+                              fill=PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid"))
+    amount_style = NamedStyle(name='export_amount', number_format=AMOUNT_FORMAT)
+    wb.add_named_style(header_style)
+    wb.add_named_style(amount_style)
+
+    header_cells = []
+    for column in columns:
+        cell = WriteOnlyCell(ws, value=column.header)
+        cell.style = header_style.name
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    amount_indexes = [index for index, column in enumerate(columns) if column.amount]
+    count = 0
+    for row in rows:
+        if amount_indexes:
+            row = list(row)
+            for index in amount_indexes:
+                cell = WriteOnlyCell(ws, value=row[index])
+                cell.style = amount_style.name
+                row[index] = cell
+        ws.append(row)
+        count += 1
+
+    wb.save(file_path)
+    return count
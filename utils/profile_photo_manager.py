@@ -1,13 +1,80 @@
 # utils/profile_photo_manager.py
 """
 Utility module for managing resident profile photos.
+
+Photos are stored under the SHA-256 of their content, sharded by the first two
+hex digits (resident_photos/ab/ab12...ef.jpg), so uploading the same picture
+twice stores it once. A photo file is shared by every resident and domestic
+help row whose photo path names it, and is only deleted once none does;
+`python -m utils.profile_photo_manager gc` removes photos and thumbnails left
+without references, and `migrate` moves photos saved under the old
+resident_<id>_<timestamp> names into the content-addressed layout.
+
+Thumbnails are kept in a thumbs/ folder next to the photos, one file per size
+in THUMBNAIL_SIZES, as WebP (or JPEG where Pillow has no WebP support). They
+are generated on first use by gui.photo_service, so saving a photo never waits
+for image resizing.
 """
 
 import os
+import sys
+import time
 import shutil
-from PIL import Image
 import hashlib
-from datetime import datetime
+import argparse
+from collections import Counter
+from utils.db_context import get_db_connection
+from utils.database_exceptions import DatabaseError
+
+
+# Thumbnail edge lengths in pixels: the resident list photo column and the resident dialog
+THUMBNAIL_SIZES = (40, 150)
+
+# Photo path columns that reference files in the photo folder
+PHOTO_REFERENCES = (('residents', 'profile_photo_path'), ('domestic_help', 'photo_path'))
+
+# Files younger than this are left alone by garbage collection: they may belong to an upload
+# whose photo path has not been saved yet
+GC_MIN_AGE_SECONDS = 3600
+
+# Bytes hashed per read when migrating existing photos
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def _reference_tables(cursor):
+    """The PHOTO_REFERENCES entries whose table exists in the database"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    tables = {row[0] for row in cursor.fetchall()}
+    return [(table, column) for table, column in PHOTO_REFERENCES if table in tables]
+
+
+def get_photo_references(db_path="society_management.db"):
+    """
+    Count how many residents and domestic help rows reference each photo file.
+    
+    Args:
+        db_path (str): Path to the database file
+        
+    Returns:
+        Counter: Photo filename -> number of rows whose photo path names it
+    """
+    references = Counter()
+    if not os.path.exists(db_path):
+        return references
+    try:
+        with get_db_connection(db_path) as conn:
+            cursor = conn.cursor()
+            for table, column in _reference_tables(cursor):
+                cursor.execute(f"""
+                    SELECT {column}, COUNT(*) FROM {table}
+                    WHERE {column} IS NOT NULL AND {column} <> '' GROUP BY {column}
+                """)
+                references.update(dict(cursor.fetchall()))
+        return references
+    except DatabaseError:
+        raise
+    except Exception as e:
+        raise DatabaseError("Failed to count photo references", original_error=e)
 
 
 class ProfilePhotoManager:
@@ -19,13 +86,46 @@ class ProfilePhotoManager:
             base_path (str): Base directory for storing profile photos
         """
         self.base_path = base_path
+        self._thumbnail_format_cache = None
         # Create the directory if it doesn't exist
         if not os.path.exists(self.base_path):
             os.makedirs(self.base_path)
     
+    def get_content_filename(self, digest, file_extension=".jpg"):
+        """
+        Get the filename a photo is stored under.
+        
+        Args:
+            digest (str): SHA-256 hex digest of the photo data
+            file_extension (str): File extension for the photo
+            
+        Returns:
+            str: Filename relative to the photo folder, e.g. "ab/ab12...ef.jpg"
+        """
+        # Always '/', since the filename is stored in the database
+        return f"{digest[:2]}/{digest}{file_extension.lower()}"
+    
+    def _store(self, filename, photo_data):
+        """Write a photo under its content filename unless an identical one is already stored"""
+        photo_path = os.path.join(self.base_path, filename)
+        try:
+            # Refresh the stored copy, so garbage collection's age guard also covers this upload
+            os.utime(photo_path)
+            return
+        except FileNotFoundError:
+            pass
+        os.makedirs(os.path.dirname(photo_path), exist_ok=True)
+        # A photo only appears under its name once it is complete, as that name vouches for the content
+        temp_path = f"{photo_path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(photo_data)
+        os.replace(temp_path, photo_path)
+    
     def save_profile_photo(self, resident_id, photo_data, file_extension=".jpg"):
         """
         Save a profile photo for a resident.
+        The photo is stored under the hash of its content, so saving the same photo again
+        returns the existing file.
         
         Args:
             resident_id (int): ID of the resident
@@ -36,44 +136,69 @@ class ProfilePhotoManager:
             str: Path to the saved photo, or None if failed
         """
         try:
-            # Generate a unique filename using resident ID and timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"resident_{resident_id}_{timestamp}{file_extension}"
-            photo_path = os.path.join(self.base_path, filename)
-            
-            # Save the photo data to file
-            with open(photo_path, "wb") as f:
-                f.write(photo_data)
-            
-            # Create a thumbnail for faster loading in lists
-            self._create_thumbnail(photo_path)
-            
+            filename = self.get_content_filename(hashlib.sha256(photo_data).hexdigest(), file_extension)
+            self._store(filename, photo_data)
             return filename
         except Exception as e:
-            print(f"Error saving profile photo: {e}")
+            print(f"Error saving profile photo for resident {resident_id}: {e}")
             return None
     
-    def _create_thumbnail(self, photo_path, size=(100, 100)):
+    def _thumbnail_format(self):
+        """(Pillow format, file extension) used for thumbnails"""
+        if self._thumbnail_format_cache is None:
+            from PIL import features
+            self._thumbnail_format_cache = ("WEBP", ".webp") if features.check("webp") else ("JPEG", ".jpg")
+        return self._thumbnail_format_cache
+    
+    def get_thumbnail_path(self, photo_filename, size):
         """
-        Create a thumbnail for a photo.
+        Get the path of a photo's thumbnail (which may not have been generated yet).
         
         Args:
-            photo_path (str): Path to the original photo
-            size (tuple): Size of the thumbnail (width, height)
+            photo_filename (str): Name of the photo file
+            size (int): One of THUMBNAIL_SIZES
+            
+        Returns:
+            str: Path to the thumbnail file
         """
-        try:
-            # Create thumbnail filename
-            base_name = os.path.basename(photo_path)
-            name, ext = os.path.splitext(base_name)
-            thumbnail_name = f"{name}_thumb{ext}"
-            thumbnail_path = os.path.join(self.base_path, thumbnail_name)
+        name = os.path.splitext(photo_filename)[0]
+        return os.path.join(self.base_path, "thumbs", f"{name}_{size}{self._thumbnail_format()[1]}")
+    
+    def create_thumbnails(self, photo_filename, sizes=THUMBNAIL_SIZES):
+        """
+        Generate the thumbnails of a photo, reading the original once.
+        Each file is written under a temporary name first, so a reader never sees half a thumbnail,
+        and is given the original's modification time, so a stale thumbnail can be recognized.
+        
+        Args:
+            photo_filename (str): Name of the photo file
+            sizes (tuple): Thumbnail edge lengths in pixels
             
-            # Create and save thumbnail
+        Returns:
+            bool: True if every thumbnail was written
+        """
+        try:
+            from PIL import Image
+            image_format = self._thumbnail_format()[0]
+            os.makedirs(os.path.dirname(self.get_thumbnail_path(photo_filename, sizes[0])), exist_ok=True)
+            photo_path = os.path.join(self.base_path, photo_filename)
+            photo_stat = os.stat(photo_path)
             with Image.open(photo_path) as img:
-                img.thumbnail(size)
-                img.save(thumbnail_path)
+                # Let JPEGs decode at a reduced scale close to the largest thumbnail
+                img.draft("RGB", (max(sizes), max(sizes)))
+                img = img.convert("RGBA" if image_format == "WEBP" else "RGB")
+                for size in sorted(sizes, reverse=True):
+                    # Shrinking the previous, larger thumbnail is faster than shrinking the original again
+                    img.thumbnail((size, size), Image.LANCZOS)
+                    thumbnail_path = self.get_thumbnail_path(photo_filename, size)
+                    temp_path = f"{thumbnail_path}.tmp"
+                    img.save(temp_path, image_format, quality=85)
+                    os.utime(temp_path, ns=(photo_stat.st_atime_ns, photo_stat.st_mtime_ns))
+                    os.replace(temp_path, thumbnail_path)
+            return True
         except Exception as e:
-            print(f"Error creating thumbnail: {e}")
+            print(f"Error creating thumbnails: {e}")
+            return False
     
     def get_profile_photo_path(self, photo_filename):
         """
@@ -91,37 +216,164 @@ class ProfilePhotoManager:
         photo_path = os.path.join(self.base_path, photo_filename)
         return photo_path if os.path.exists(photo_path) else None
     
-    def delete_profile_photo(self, photo_filename):
+    def delete_profile_photo(self, photo_filename, db_path="society_management.db"):
         """
-        Delete a profile photo.
+        Delete a profile photo, unless a resident or domestic help row still references it.
         
         Args:
             photo_filename (str): Name of the photo file to delete
+            db_path (str): Path to the database file
             
         Returns:
-            bool: True if successful, False otherwise
+            bool: True if successful (including a photo kept for other references), False otherwise
         """
         try:
             if not photo_filename:
                 return True
+            
+            # Identical photos are stored once, so another row may share this file
+            if get_photo_references(db_path)[photo_filename]:
+                return True
                 
             # Delete the main photo
             photo_path = os.path.join(self.base_path, photo_filename)
             if os.path.exists(photo_path):
                 os.remove(photo_path)
             
-            # Delete the thumbnail if it exists
+            # Delete the thumbnails, including the single _thumb file of older versions
             name, ext = os.path.splitext(photo_filename)
-            thumbnail_name = f"{name}_thumb{ext}"
-            thumbnail_path = os.path.join(self.base_path, thumbnail_name)
-            if os.path.exists(thumbnail_path):
-                os.remove(thumbnail_path)
+            thumbnail_paths = [os.path.join(self.base_path, f"{name}_thumb{ext}")]
+            thumbnail_paths += [self.get_thumbnail_path(photo_filename, size) for size in THUMBNAIL_SIZES]
+            for thumbnail_path in thumbnail_paths:
+                if os.path.exists(thumbnail_path):
+                    os.remove(thumbnail_path)
                 
             return True
         except Exception as e:
             print(f"Error deleting profile photo: {e}")
             return False
     
+    def collect_garbage(self, db_path="society_management.db", dry_run=False, min_age_seconds=GC_MIN_AGE_SECONDS):
+        """
+        Delete photos no resident or domestic help row references, and thumbnails of photos
+        that are gone.
+        
+        Args:
+            db_path (str): Path to the database file
+            dry_run (bool): Only report what would be deleted
+            min_age_seconds (int): Leave files modified more recently than this alone
+            
+        Returns:
+            dict: removed_photos (list of filenames), removed_thumbnails (int) and freed_bytes (int)
+            
+        Raises:
+            DatabaseError: If the database has no residents table, so references cannot be known
+        """
+        try:
+            with get_db_connection(db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'residents'")
+                if cursor.fetchone() is None:
+                    raise DatabaseError(f"{db_path} has no residents table; refusing to collect photos")
+        except DatabaseError:
+            raise
+        except Exception as e:
+            raise DatabaseError("Failed to open the database for photo garbage collection", original_error=e)
+        
+        references = get_photo_references(db_path)
+        cutoff = time.time() - min_age_seconds
+        thumbs_dir = os.path.join(self.base_path, "thumbs")
+        result = {'removed_photos': [], 'removed_thumbnails': 0, 'freed_bytes': 0}
+        
+        def remove(path):
+            size = os.path.getsize(path)
+            if os.path.getmtime(path) > cutoff:
+                return False
+            if not dry_run:
+                os.remove(path)
+            result['freed_bytes'] += size
+            return True
+        
+        # Photos, and the single _thumb file of older versions
+        kept = set()
+        legacy_thumbnails = []
+        for root, dirs, names in os.walk(self.base_path):
+            dirs[:] = [name for name in dirs if os.path.join(root, name) != thumbs_dir]
+            for name in names:
+                path = os.path.join(root, name)
+                filename = os.path.relpath(path, self.base_path).replace(os.sep, '/')
+                if os.path.splitext(filename)[0].endswith("_thumb"):
+                    legacy_thumbnails.append((filename, path))
+                elif references[filename] or not remove(path):
+                    kept.add(filename)
+                else:
+                    result['removed_photos'].append(filename)
+        kept_names = {os.path.splitext(filename)[0] for filename in kept}
+        
+        for filename, path in legacy_thumbnails:
+            if os.path.splitext(filename)[0][:-len("_thumb")] not in kept_names and remove(path):
+                result['removed_thumbnails'] += 1
+        
+        # Thumbnails are named <photo name>_<size>, with any leftover .tmp from an interrupted write
+        for root, _, names in os.walk(thumbs_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                thumbnail = os.path.relpath(path, thumbs_dir).replace(os.sep, '/')
+                photo_name = os.path.splitext(thumbnail)[0].rpartition("_")[0]
+                if (thumbnail.endswith(".tmp") or photo_name not in kept_names) and remove(path):
+                    result['removed_thumbnails'] += 1
+        
+        if not dry_run:
+            # Shard folders left empty
+            for root, dirs, names in os.walk(self.base_path, topdown=False):
+                if root not in (self.base_path, thumbs_dir) and not os.listdir(root):
+                    os.rmdir(root)
+        return result
+    
+    def migrate_to_content_addressed(self, db_path="society_management.db"):
+        """
+        Move referenced photos saved under their old names into the content-addressed layout
+        and point their references at the new files. The old files are left for collect_garbage.
+        
+        Args:
+            db_path (str): Path to the database file
+            
+        Returns:
+            int: Number of photo files migrated
+        """
+        renamed = {}
+        for photo_filename in get_photo_references(db_path):
+            photo_path = os.path.join(self.base_path, photo_filename)
+            if "/" in photo_filename or not os.path.isfile(photo_path):
+                continue
+            digest = hashlib.sha256()
+            with open(photo_path, "rb") as f:
+                for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                    digest.update(block)
+            filename = self.get_content_filename(digest.hexdigest(), os.path.splitext(photo_filename)[1])
+            if not os.path.exists(os.path.join(self.base_path, filename)):
+                os.makedirs(os.path.join(self.base_path, os.path.dirname(filename)), exist_ok=True)
+                shutil.copy2(photo_path, os.path.join(self.base_path, filename))
+            renamed[photo_filename] = filename
+        if not renamed:
+            return 0
+        
+        try:
+            with get_db_connection(db_path) as conn:
+                cursor = conn.cursor()
+                for table, column in _reference_tables(cursor):
+                    cursor.executemany(f"UPDATE {table} SET {column} = ? WHERE {column} = ?",
+                                       [(new, old) for old, new in renamed.items()])
+                conn.commit()
+        except DatabaseError:
+            raise
+        except Exception as e:
+            raise DatabaseError("Failed to update photo references", original_error=e)
+        # Cached resident directories hold the old photo paths
+        from models.resident import invalidate_resident_cache
+        invalidate_resident_cache(db_path)
+        return len(renamed)
+    
     def update_resident_photo_path(self, resident_id, photo_filename, db_path="society_management.db"):
         """
         Update the profile photo path in the database for a resident.
@@ -143,10 +395,46 @@ class ProfilePhotoManager:
                     (photo_filename, resident_id)
                 )
                 conn.commit()
-                return True
+            # Cached resident directories hold the old photo path
+            from models.resident import invalidate_resident_cache
+            invalidate_resident_cache(db_path)
+            return True
         except Exception as e:
             print(f"Error updating resident photo path in database: {e}")
             return False
 
 # Create a global instance for easy access
 profile_photo_manager = ProfilePhotoManager()
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Resident photo storage maintenance")
+    parser.add_argument("--db", default="society_management.db")
+    parser.add_argument("--photos", default="resident_photos")
+    commands = parser.add_subparsers(dest="command", required=True)
+    gc = commands.add_parser("gc", help="Delete photos and thumbnails nothing references")
+    gc.add_argument("--dry-run", action="store_true")
+    gc.add_argument("--min-age", type=int, default=GC_MIN_AGE_SECONDS,
+                    help="Keep files modified within this many seconds")
+    commands.add_parser("migrate", help="Store existing photos under their content hash")
+
+    args = parser.parse_args(argv)
+    manager = ProfilePhotoManager(args.photos)
+
+    try:
+        if args.command == "gc":
+            result = manager.collect_garbage(args.db, args.dry_run, args.min_age)
+            verb = "Would remove" if args.dry_run else "Removed"
+            print(f"{verb} {len(result['removed_photos'])} photos and {result['removed_thumbnails']} thumbnails, "
+                  f"{result['freed_bytes']} bytes")
+        elif args.command == "migrate":
+            print(f"Migrated {manager.migrate_to_content_addressed(args.db)} photos; "
+                  f"run gc to remove the old files")
+    except DatabaseError as e:
+        print(f"Photo storage error: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
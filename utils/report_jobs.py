@@ -0,0 +1,228 @@
+# utils/report_jobs.py
+"""
+Background report jobs for the Society Management System.
+Report generation (PDF layout, matplotlib charts) can take many seconds, so the
+reports dialog queues jobs here and a small worker pool runs them off the GUI
+thread. Progress, completion, failure and cancellation are reported through Qt
+signals, which are delivered on the GUI thread.
+"""
+
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+# Report type -> (ReportGenerator method, takes a date range, file name prefix)
+REPORT_TYPES = {
+    "Ledger Report": ("generate_ledger_report", True, "ledger_report"),
+    "Resident List": ("generate_resident_list_report", False, "resident_list_report"),
+    "Payment Summary": ("generate_payment_summary_report", True, "payment_summary_report"),
+    "Expense Summary": ("generate_expense_summary_report", True, "expense_summary_report"),
+    "Outstanding Dues Report": ("generate_outstanding_dues_report", True, "outstanding_dues_report"),
+    "Income vs Expense Report": ("generate_income_expense_report", True, "income_expense_report"),
+    "Payments Report": ("generate_payments_report", True, "payments_report"),
+    "Expenses Report": ("generate_expenses_report", True, "expenses_report"),
+    "Month-End Report Pack": ("generate_report_pack", True, "month_end"),
+    "Dues Statements (per flat)": ("generate_dues_statements", True, "dues_statements"),
+}
+
+# Jobs that produce a folder of reports rather than a single PDF
+PACK_REPORTS = {"Month-End Report Pack", "Dues Statements (per flat)"}
+
+# Job states
+QUEUED = "Queued"
+RUNNING = "Running"
+FINISHED = "Finished"
+FAILED = "Failed"
+CANCELLED = "Cancelled"
+
+
+class ReportJobCancelled(Exception):
+    """Raised inside a running job when the user cancels it"""
+    pass
+
+
+class ReportJob:
+    """A single queued report request"""
+
+    def __init__(self, job_id, report_type, generated_by, start_date=None, end_date=None):
+        self.job_id = job_id
+        self.report_type = report_type
+        self.generated_by = generated_by
+        self.start_date = start_date
+        self.end_date = end_date
+        self.state = QUEUED
+        self.file_path = None
+        self.error = None
+        self.future = None
+        self.cancel_event = threading.Event()
+
+    def file_name(self):
+        """Unique output file name, so jobs of the same type never overwrite each other"""
+        prefix = REPORT_TYPES[self.report_type][2]
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return f"{prefix}_{timestamp}_{self.job_id}.pdf"
+
+
+class ReportJobQueue(QObject):
+    """Queue of report jobs executed by a worker pool."""
+
+    # job_id, report type
+    job_queued = pyqtSignal(int, str)
+    job_started = pyqtSignal(int)
+    # job_id, percent (-1 when the total is unknown), message
+    job_progress = pyqtSignal(int, int, str)
+    # job_id, file path
+    job_finished = pyqtSignal(int, str)
+    # job_id, error message
+    job_failed = pyqtSignal(int, str)
+    job_cancelled = pyqtSignal(int)
+
+    def __init__(self, db_path="society_management.db", max_workers=2, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.jobs = {}
+        self._next_job_id = 1
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report")
+
+    def submit(self, report_type, generated_by, start_date=None, end_date=None):
+        """
+        Queue a report for generation.
+
+        Args:
+            report_type (str): One of the REPORT_TYPES keys
+            generated_by (str): Username printed in the report footer
+            start_date (date): Start of the period (ignored by reports without a date range)
+            end_date (date): End of the period
+
+        Returns:
+            int: The job id
+        """
+        if report_type not in REPORT_TYPES:
+            raise ValueError(f"Unknown report type: {report_type}")
+
+        with self._lock:
+            job_id = self._next_job_id
+            self._next_job_id += 1
+            job = ReportJob(job_id, report_type, generated_by, start_date, end_date)
+            self.jobs[job_id] = job
+
+        self.job_queued.emit(job_id, report_type)
+        job.future = self._executor.submit(self._run_job, job)
+        return job_id
+
+    def cancel(self, job_id):
+        """
+        Cancel a queued or running job.
+
+        Queued jobs are dropped before they start. Running jobs stop at the next
+        progress checkpoint (ledger rows, pack reports, statement batches) and their
+        partial output is removed; reports without checkpoints finish but are discarded.
+
+        Returns:
+            str: CANCELLED if the job was dropped before it started, its current state
+            if it is still running and stops at its next checkpoint, or None if the
+            job had already ended
+        """
+        job = self.jobs.get(job_id)
+        if not job or job.state in (FINISHED, FAILED, CANCELLED):
+            return None
+
+        job.cancel_event.set()
+        if job.future and job.future.cancel():
+            # Never started, so _run_job will not report it
+            job.state = CANCELLED
+            self.job_cancelled.emit(job_id)
+        return job.state
+
+    def active_jobs(self):
+        """Return the jobs that are still queued or running"""
+        return [job for job in self.jobs.values() if job.state in (QUEUED, RUNNING)]
+
+    def shutdown(self):
+        """Cancel everything outstanding and stop the worker pool"""
+        for job in self.active_jobs():
+            self.cancel(job.job_id)
+        self._executor.shutdown(wait=False)
+
+    def _run_job(self, job):
+        """Generate one report on a worker thread"""
+        if job.cancel_event.is_set():
+            job.state = CANCELLED
+            self.job_cancelled.emit(job.job_id)
+            return
+
+        job.state = RUNNING
+        self.job_started.emit(job.job_id)
+        self.job_progress.emit(job.job_id, -1, "Generating...")
+
+        file_name = job.file_name()
+        file_path = os.path.join("reports", file_name)
+        try:
+            # Imported here so queuing the first job doesn't pay for reportlab at dialog creation
+            from models.reports import ReportGenerator
+
+            method_name, uses_dates, _ = REPORT_TYPES[job.report_type]
+            generator = ReportGenerator(self.db_path)
+            kwargs = {'file_name': file_name}
+            if uses_dates:
+                kwargs['start_date'] = job.start_date
+                kwargs['end_date'] = job.end_date
+            if method_name == "generate_ledger_report":
+                kwargs['progress_callback'] = lambda rows: self._report_progress(
+                    job, -1, f"{rows} rows laid out")
+            elif job.report_type in PACK_REPORTS:
+                unit = "reports" if method_name == "generate_report_pack" else "statements"
+                kwargs['progress_callback'] = lambda done, total: self._report_progress(
+                    job, done * 100 // total if total else -1, f"{done} of {total} {unit} done")
+
+            method = getattr(generator, method_name)
+            if job.report_type in PACK_REPORTS:
+                # The pack runs its reports in worker processes and reports a folder
+                kwargs.pop('file_name')
+                manifest = method(job.generated_by, **kwargs)
+                file_path = manifest.get('folder') or manifest['output']
+                failed = [report['report'] for report in manifest.get('reports', []) if report['status'] != 'ok']
+                if failed:
+                    raise RuntimeError(f"Some reports in the pack failed: {', '.join(failed)} "
+                                       f"(see {os.path.join(file_path, 'manifest.json')})")
+            else:
+                file_path = method(job.generated_by, **kwargs)
+
+            if job.cancel_event.is_set():
+                raise ReportJobCancelled()
+        except ReportJobCancelled:
+            job.state = CANCELLED
+            self._remove_partial_output(file_path)
+            self.job_cancelled.emit(job.job_id)
+            return
+        except Exception as e:
+            job.state = FAILED
+            job.error = str(e)
+            self.job_failed.emit(job.job_id, str(e))
+            return
+
+        job.state = FINISHED
+        job.file_path = file_path
+        self.job_progress.emit(job.job_id, 100, "Done")
+        self.job_finished.emit(job.job_id, file_path)
+
+    def _report_progress(self, job, percent, message):
+        """Progress checkpoint for reports that support it; also where cancellation takes effect"""
+        if job.cancel_event.is_set():
+            raise ReportJobCancelled()
+        self.job_progress.emit(job.job_id, percent, message)
+
+    def _remove_partial_output(self, file_path):
+        """Remove the report file, or the folder of a pack, of a cancelled job"""
+        try:
+            if os.path.isdir(file_path):
+                shutil.rmtree(file_path)
+            elif os.path.exists(file_path):
+                os.remove(file_path)
+        except OSError as e:
+            print(f"Could not remove cancelled report {file_path}: {e}")
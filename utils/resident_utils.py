@@ -2,65 +2,72 @@
 """
 Resident utility functions for the Society Management System.
 This module provides helper functions for working with residents.
+
+Flats are ordered naturally ("A-2" before "A-10"). The order is stored in
+residents.flat_sort_key, so resident queries simply ORDER BY that indexed
+column; tables without it can use ORDER BY flat_no COLLATE FLAT_NATURAL, a
+collation registered on every connection from utils.db_context.
 """
 
 import re
+from functools import lru_cache
+
+
+# Name of the natural flat order collation registered by register_flat_collation()
+FLAT_COLLATION = "FLAT_NATURAL"
+
+_NUMBER_PARTS = re.compile('([0-9]+)')
 
-def sort_residents_by_flat(residents):
+
+@lru_cache(maxsize=4096)
+def flat_sort_key(flat_no):
     """
-    Sort residents by flat number in ascending order.
+    Natural sort key for a flat number, so that "A-2" sorts before "A-10".
     
-    This function handles alphanumeric flat numbers properly by splitting them into
-    numeric and text components and sorting accordingly.
+    The key is a string that sorts correctly with plain string (and SQLite BINARY)
+    comparison: every number is written as its digit count followed by its digits,
+    and every text part ends with "\\x00", so a shorter text sorts first.
     
     Args:
-        residents: List of resident objects with flat_no attribute
-        
+        flat_no: Flat number (may be None)
+    
     Returns:
-        List of residents sorted by flat number
+        str: Sort key ("" without a flat number)
     """
-    def extract_flat_parts(flat_no):
-        """Extract numeric and text parts from flat number for proper sorting."""
-        if not flat_no:
-            return []
-        
-        # Split into numeric and non-numeric parts
-        parts = re.split('([0-9]+)', flat_no)
-        # Convert numeric parts to integers for proper sorting
-        for i, part in enumerate(parts):
-            if part.isdigit():
-                parts[i] = int(part)
-        return parts
+    if not flat_no:
+        return ""
     
-    # Filter out residents without flat numbers and sort
-    residents_with_flats = [r for r in residents if r.flat_no]
-    return sorted(residents_with_flats, key=lambda r: extract_flat_parts(r.flat_no))
+    # Split into alternating text and numeric parts
+    parts = _NUMBER_PARTS.split(flat_no)
+    for i, part in enumerate(parts):
+        if i % 2:
+            digits = part.lstrip('0') or '0'
+            parts[i] = f"{len(digits):02d}{digits}"
+        else:
+            parts[i] = part + "\x00"
+    return "".join(parts)
 
 
-def get_sorted_flat_numbers(residents):
+def compare_flat_numbers(flat_a, flat_b):
     """
-    Get a sorted list of unique flat numbers from residents.
+    Compare two flat numbers in natural order, as a SQLite collation.
     
     Args:
-        residents: List of resident objects with flat_no attribute
-        
+        flat_a (str): First flat number
+        flat_b (str): Second flat number
+    
     Returns:
-        List of sorted flat numbers
+        int: Negative, zero or positive as flat_a sorts before, with or after flat_b
     """
-    # Get unique flat numbers and sort them
-    flat_numbers = list(set([r.flat_no for r in residents if r.flat_no]))
-    
-    def extract_flat_parts(flat_no):
-        """Extract numeric and text parts from flat number for proper sorting."""
-        if not flat_no:
-            return []
-        
-        # Split into numeric and non-numeric parts
-        parts = re.split('([0-9]+)', flat_no)
-        # Convert numeric parts to integers for proper sorting
-        for i, part in enumerate(parts):
-            if part.isdigit():
-                parts[i] = int(part)
-        return parts
+    key_a, key_b = flat_sort_key(flat_a), flat_sort_key(flat_b)
+    return (key_a > key_b) - (key_a < key_b)
+
+
+def register_flat_collation(conn):
+    """
+    Register the FLAT_NATURAL collation on a connection.
     
-    return sorted(flat_numbers, key=lambda x: extract_flat_parts(x))
\ No newline at end of file
+    Args:
+        conn: sqlite3 connection
+    """
+    conn.create_collation(FLAT_COLLATION, compare_flat_numbers)
@@ -2,14 +2,30 @@
 import bcrypt
 import hashlib
 import sqlite3
+import threading
+import time
 from datetime import datetime, timedelta
 from utils.db_context import get_db_connection
 from utils.audit_logger import audit_logger
+from utils.config import load_config, save_config
 
 
-def hash_password(password):
+# bcrypt cost used when no calibrated value is stored in config.json
+DEFAULT_BCRYPT_ROUNDS = 12
+
+# Lock accounts for 30 minutes after 5 failed login attempts
+MAX_FAILED_ATTEMPTS = 5
+LOCKOUT_MINUTES = 30
+
+
+def get_bcrypt_rounds():
+    """Get the bcrypt cost factor configured for this machine"""
+    return int(load_config().get('bcrypt_rounds', DEFAULT_BCRYPT_ROUNDS))
+
+
+def hash_password(password, rounds=None):
     # Generate a salt and hash the password with bcrypt
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=rounds or get_bcrypt_rounds())
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed
 
@@ -19,176 +35,227 @@ def hash_password_sha256(password):
     return hashlib.sha256(password.encode()).hexdigest()
 
 
+def _is_bcrypt_hash(stored_hash):
+    """Check if a stored hash is a bcrypt hash (starts with $2b$, $2a$, or $2y$)"""
+    return stored_hash.startswith(b'$2b$') or stored_hash.startswith(b'$2a$') or stored_hash.startswith(b'$2y$')
+
+
+def _bcrypt_cost(stored_hash):
+    """Read the cost factor out of a bcrypt hash such as $2b$12$..."""
+    try:
+        return int(stored_hash[4:6])
+    except ValueError:
+        return None
+
+
+def _is_locked(locked_until):
+    """Check whether a locked_until timestamp is still in the future"""
+    return bool(locked_until) and datetime.now() < datetime.fromisoformat(locked_until)
+
+
+def _verify_password(password, stored_hash):
+    """
+    Check a password against a stored bcrypt or legacy SHA-256 hash.
+    
+    Returns:
+        tuple: (verified, replacement hash or None); the replacement is set when a
+        verified hash is legacy or uses a lower cost factor than configured
+    """
+    # Handle both bytes and string password hashes
+    # Convert to bytes if it's a string
+    if isinstance(stored_hash, str):
+        stored_hash = stored_hash.encode('utf-8')
+    
+    rounds = get_bcrypt_rounds()
+    if _is_bcrypt_hash(stored_hash):
+        verified = bcrypt.checkpw(password.encode('utf-8'), stored_hash)
+        # Never rehash downwards: a lower calibrated cost must not weaken stored hashes
+        cost = _bcrypt_cost(stored_hash)
+        needs_rehash = cost is not None and cost < rounds
+    else:
+        # Legacy SHA-256 hash (stored as string)
+        verified = stored_hash.decode('utf-8') == hash_password_sha256(password)
+        needs_rehash = True
+    
+    if verified and needs_rehash:
+        return True, hash_password(password, rounds)
+    return verified, None
+
+
 def authenticate_user(username, password, ip_address=None, session_id=None):
-    # Check if the user is locked out
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        SELECT id, failed_login_attempts, locked_until FROM users WHERE username = ?
-        ''', (username,))
-        
-        lockout_result = cursor.fetchone()
-        
-        if lockout_result:
-            user_id, failed_attempts, locked_until = lockout_result
-            
-            # Check if the account is locked
-            if locked_until:
-                locked_time = datetime.fromisoformat(locked_until)
-                if datetime.now() < locked_time:
-                    # Log failed login attempt
-                    audit_logger.log_user_login(
-                        user_id=user_id,
-                        username=username,
-                        ip_address=ip_address,
-                        session_id=session_id,
-                        success=False
-                    )
-                    return None  # Account is locked
-    
-    # Proceed with authentication
+    """
+    Authenticate a user and return their role, or None if authentication fails.
+    
+    The user is read and the password verified (and rehashed if needed) outside
+    any transaction, so concurrent logins never wait on bcrypt. Only the counter
+    and hash updates take the write lock, and they re-read the row under it: a
+    lockout or password change made in the meantime fails this attempt. Audit
+    entries are written after the transaction commits so they never wait on its lock.
+    
+    This call is CPU bound (bcrypt), so GUI code should use
+    utils.auth_service.AuthenticationWorker instead of calling it directly.
+    """
+    user_role = None
+    user_id = -1
+    
     with get_db_connection() as conn:
         cursor = conn.cursor()
-        
         cursor.execute('''
-        SELECT id, password_hash, role FROM users WHERE username = ?
+        SELECT id, password_hash, role, locked_until FROM users WHERE username = ?
         ''', (username,))
-        
         result = cursor.fetchone()
+    
+    if result:
+        user_id, stored_hash, role, locked_until = result
+    
+    # A locked account is rejected without checking the password
+    if result and not _is_locked(locked_until):
+        verified, new_hash = _verify_password(password, stored_hash)
         
-        if result:
-            user_id, stored_hash, user_role = result
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
             
-            # Handle both bytes and string password hashes
-            # Convert to bytes if it's a string
-            if isinstance(stored_hash, str):
-                stored_hash = stored_hash.encode('utf-8')
+            # Take the write lock so concurrent logins cannot race the counters,
+            # and re-read the row now that it cannot change under us
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('''
+            SELECT password_hash, failed_login_attempts, locked_until FROM users WHERE id = ?
+            ''', (user_id,))
+            current = cursor.fetchone()
             
-            # Check if the stored hash is a bcrypt hash (starts with $2b$, $2a$, or $2y$)
-            if isinstance(stored_hash, bytes) and (stored_hash.startswith(b'$2b$') or 
-               stored_hash.startswith(b'$2a$') or 
-               stored_hash.startswith(b'$2y$')):
-                # New bcrypt hash
-                if bcrypt.checkpw(password.encode('utf-8'), stored_hash):
-                    # Reset failed login attempts on successful login
+            if current is None or current[0] != stored_hash or _is_locked(current[2]):
+                # Deleted, password changed or locked since it was read
+                conn.rollback()
+            elif verified:
+                # Reset failed login attempts on successful login, and upgrade the
+                # stored hash when it is legacy or uses a lower cost factor
+                if new_hash:
                     cursor.execute('''
                     UPDATE users 
-                    SET failed_login_attempts = 0, locked_until = NULL 
-                    WHERE username = ?
-                    ''', (username,))
-                    conn.commit()
-                    
-                    # Log successful login
-                    audit_logger.log_user_login(
-                        user_id=user_id,
-                        username=username,
-                        ip_address=ip_address,
-                        session_id=session_id,
-                        success=True
-                    )
-                    
-                    return user_role
-            else:
-                # Legacy SHA-256 hash (stored as string)
-                if isinstance(stored_hash, bytes):
-                    stored_hash_str = stored_hash.decode('utf-8')
+                    SET failed_login_attempts = 0, locked_until = NULL, password_hash = ?
+                    WHERE id = ?
+                    ''', (new_hash, user_id))
                 else:
-                    stored_hash_str = stored_hash
-                    
-                if stored_hash_str == hash_password_sha256(password):
-                    # Reset failed login attempts on successful login
                     cursor.execute('''
                     UPDATE users 
                     SET failed_login_attempts = 0, locked_until = NULL 
-                    WHERE username = ?
-                    ''', (username,))
-                    conn.commit()
-                    
-                    # Log successful login
-                    audit_logger.log_user_login(
-                        user_id=user_id,
-                        username=username,
-                        ip_address=ip_address,
-                        session_id=session_id,
-                        success=True
-                    )
-                    
-                    return user_role
-            
-            # Increment failed login attempts
-            cursor.execute('''
-            UPDATE users 
-            SET failed_login_attempts = failed_login_attempts + 1 
-            WHERE username = ?
-            ''', (username,))
-            
-            # Check if we need to lock the account
-            cursor.execute('''
-            SELECT failed_login_attempts FROM users WHERE username = ?
-            ''', (username,))
-            
-            new_attempts = cursor.fetchone()[0]
-            
-            # Lock account after 5 failed attempts for 30 minutes
-            if new_attempts >= 5:
-                lockout_time = datetime.now() + timedelta(minutes=30)
+                    WHERE id = ?
+                    ''', (user_id,))
+                conn.commit()
+                user_role = role
+            else:
+                # Increment failed login attempts and lock the account if needed
+                new_attempts = (current[1] or 0) + 1
+                lockout_time = None
+                if new_attempts >= MAX_FAILED_ATTEMPTS:
+                    lockout_time = (datetime.now() + timedelta(minutes=LOCKOUT_MINUTES)).isoformat()
+                
                 cursor.execute('''
                 UPDATE users 
-                SET locked_until = ? 
-                WHERE username = ?
-                ''', (lockout_time.isoformat(), username))
-            
-            conn.commit()
-            
-            # Log failed login attempt
-            audit_logger.log_user_login(
-                user_id=user_id,
-                username=username,
-                ip_address=ip_address,
-                session_id=session_id,
-                success=False
-            )
-            
-            return None
-        else:
-            # Log failed login attempt for non-existent user
-            # We don't have a user ID, so we'll use -1 as a placeholder
-            audit_logger.log_user_login(
-                user_id=-1,
-                username=username,
-                ip_address=ip_address,
-                session_id=session_id,
-                success=False
-            )
-            
-            return None
+                SET failed_login_attempts = ?, locked_until = COALESCE(?, locked_until)
+                WHERE id = ?
+                ''', (new_attempts, lockout_time, user_id))
+                conn.commit()
+    
+    # Log the login attempt. We don't have a user ID for a non-existent user,
+    # so -1 is used as a placeholder
+    audit_logger.log_user_login(
+        user_id=user_id,
+        username=username,
+        ip_address=ip_address,
+        session_id=session_id,
+        success=user_role is not None
+    )
+    
+    return user_role
 
 
-def get_user_role(username):
-    """Get the role of a user by username"""
+def calibrate_bcrypt_rounds(target_ms=250, min_rounds=10, max_rounds=16):
+    """
+    Benchmark bcrypt on this machine and pick the highest cost within a latency target.
+    
+    Args:
+        target_ms (int): Maximum acceptable time for one hash/verify, in milliseconds
+        min_rounds (int): Lowest cost factor to consider
+        max_rounds (int): Highest cost factor to consider
+    
+    Returns:
+        tuple: (chosen cost factor, {cost factor: measured milliseconds})
+    """
+    timings = {}
+    chosen = min_rounds
+    password = b"calibration-password"
+    
+    for rounds in range(min_rounds, max_rounds + 1):
+        hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+        # Take the best of three runs to reduce scheduling noise
+        best = None
+        for _ in range(3):
+            start = time.perf_counter()
+            bcrypt.checkpw(password, hashed)
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        timings[rounds] = best
+        
+        if best > target_ms:
+            break
+        chosen = rounds
+    
+    return chosen, timings
+
+
+# In-process user directory: username -> (user_id, role).
+# Entries are dropped through invalidate_user_cache() whenever a user is changed.
+_user_directory = {}
+_user_directory_lock = threading.Lock()
+# Bumped on every invalidation, so a user read before a change is never cached
+_user_directory_generation = 0
+
+
+def _lookup_user(username):
+    """Return (user_id, role) for a username, reading the database only on a cache miss"""
+    with _user_directory_lock:
+        cached = _user_directory.get(username)
+        generation = _user_directory_generation
+    if cached:
+        return cached
+    
     with get_db_connection() as conn:
         cursor = conn.cursor()
         
-        cursor.execute('SELECT role FROM users WHERE username = ?', (username,))
+        cursor.execute('SELECT id, role FROM users WHERE username = ?', (username,))
         result = cursor.fetchone()
-        
-        if result:
-            return result[0]
-    return None
+    
+    if not result:
+        return None
+    
+    with _user_directory_lock:
+        if generation == _user_directory_generation:
+            _user_directory[username] = (result[0], result[1])
+    return result[0], result[1]
+
+
+def invalidate_user_cache(username=None):
+    """Drop a cached user (or every cached user when no username is given)"""
+    global _user_directory_generation
+    with _user_directory_lock:
+        _user_directory_generation += 1
+        if username is None:
+            _user_directory.clear()
+        else:
+            _user_directory.pop(username, None)
+
+
+def get_user_role(username):
+    """Get the role of a user by username"""
+    user = _lookup_user(username)
+    return user[1] if user else None
 
 
 def get_user_id(username):
     """Get the ID of a user by username"""
-    with get_db_connection() as conn:
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT id FROM users WHERE username = ?', (username,))
-        result = cursor.fetchone()
-        
-        if result:
-            return result[0]
-    return None
+    user = _lookup_user(username)
+    return user[0] if user else None
 
 
 def is_system_admin(username):
@@ -200,4 +267,23 @@ def is_system_admin(username):
 def is_admin(username):
     """Check if a user is an Admin or System Admin"""
     role = get_user_role(username)
-    return role in ["Admin", "System Admin"]
\ No newline at end of file
+    return role in ["Admin", "System Admin"]
+
+
+if __name__ == "__main__":
+    # Usage: python -m utils.security --calibrate [target_ms]
+    import sys
+    
+    if len(sys.argv) >= 2 and sys.argv[1] == "--calibrate":
+        target_ms = int(sys.argv[2]) if len(sys.argv) >= 3 else 250
+        rounds, timings = calibrate_bcrypt_rounds(target_ms)
+        for cost, elapsed in timings.items():
+            print(f"  cost {cost}: {elapsed:.0f} ms")
+        
+        config = load_config()
+        config['bcrypt_rounds'] = rounds
+        save_config(config)
+        print(f"Saved bcrypt cost {rounds} (target {target_ms} ms). "
+              "Passwords hashed at a lower cost are rehashed on their next successful login.")
+    else:
+        print("Usage: python -m utils.security --calibrate [target_ms]")
@@ -2,10 +2,16 @@
 """
 Session management for the Society Management System.
 This module handles creating, validating, and destroying user sessions.
+
+Active sessions are kept in memory (a dict plus an expiry heap) and written
+through to the sessions table. Expired sessions are swept from both in the
+background. Nothing touches the database until the first session call.
 """
 
+import heapq
 import secrets
 import sqlite3
+import threading
 from datetime import datetime, timedelta
 from utils.db_context import get_db_connection
 from utils.audit_logger import audit_logger
@@ -13,15 +19,51 @@ from utils.security import get_user_id
 
 
 class SessionManager:
-    def __init__(self, db_path="society_management.db"):
+    def __init__(self, db_path="society_management.db", session_hours=2, sweep_interval=300):
         self.db_path = db_path
-        self.init_session_table()
-    
+        self.session_hours = session_hours
+        self.sweep_interval = sweep_interval  # Seconds between background sweeps
+        self._sessions = {}  # session_id -> (username, expires_at as a POSIX timestamp)
+        self._expiry_heap = []  # (expires_at, session_id)
+        self._lock = threading.Lock()
+        self._initialized = False
+        self._stop_event = threading.Event()
+        self._sweeper = None
+
+    def _ensure_initialized(self):
+        """Create the sessions table, load unexpired sessions and start the sweeper on first use"""
+        if self._initialized:
+            return
+
+        with self._lock:
+            if self._initialized:
+                return
+
+            self.init_session_table()
+
+            now = datetime.now()
+            with get_db_connection(self.db_path) as conn:
+                cursor = conn.cursor()
+
+                # Drop sessions that expired while the application was closed
+                cursor.execute('DELETE FROM sessions WHERE expires_at < ?', (now.isoformat(),))
+                conn.commit()
+
+                cursor.execute('SELECT session_id, username, expires_at FROM sessions')
+                for session_id, username, expires_at in cursor.fetchall():
+                    expires_ts = datetime.fromisoformat(expires_at).timestamp()
+                    self._sessions[session_id] = (username, expires_ts)
+                    heapq.heappush(self._expiry_heap, (expires_ts, session_id))
+
+            self._sweeper = threading.Thread(target=self._sweep_loop, name="session-sweeper", daemon=True)
+            self._sweeper.start()
+            self._initialized = True
+
     def init_session_table(self):
         """Initialize the sessions table in the database"""
         with get_db_connection(self.db_path) as conn:
             cursor = conn.cursor()
-            
+
             cursor.execute('''
             CREATE TABLE IF NOT EXISTS sessions (
                 session_id TEXT PRIMARY KEY,
@@ -31,84 +73,121 @@ class SessionManager:
                 FOREIGN KEY (username) REFERENCES users(username)
             )
             ''')
-            
+
             conn.commit()
-    
+
     def create_session(self, username):
         """Create a new session for a user"""
+        self._ensure_initialized()
+
         session_id = secrets.token_urlsafe(32)  # Generate a secure random session ID
         created_at = datetime.now()
-        expires_at = created_at + timedelta(hours=2)  # Session expires in 2 hours
-        
+        expires_at = created_at + timedelta(hours=self.session_hours)
+
         with get_db_connection(self.db_path) as conn:
             cursor = conn.cursor()
-            
+
             # Insert the new session
             cursor.execute('''
             INSERT INTO sessions (session_id, username, created_at, expires_at)
             VALUES (?, ?, ?, ?)
             ''', (session_id, username, created_at.isoformat(), expires_at.isoformat()))
-            
+
             conn.commit()
-            
-            # Log session creation
-            user_id = get_user_id(username)
-            if user_id:
-                audit_logger.log_action(
-                    user_id=user_id,
-                    username=username,
-                    action="SESSION_CREATED",
-                    details="User session created",
-                    session_id=session_id
-                )
-            
+
+        expires_ts = expires_at.timestamp()
+        with self._lock:
+            self._sessions[session_id] = (username, expires_ts)
+            heapq.heappush(self._expiry_heap, (expires_ts, session_id))
+
+        # Log session creation
+        user_id = get_user_id(username)
+        if user_id:
+            audit_logger.log_action(
+                user_id=user_id,
+                username=username,
+                action="SESSION_CREATED",
+                details="User session created",
+                session_id=session_id
+            )
+
         return session_id
-    
+
     def validate_session(self, session_id):
         """Validate a session and return the username if valid"""
-        with get_db_connection(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Get session details
-            cursor.execute('''
-            SELECT username, expires_at FROM sessions WHERE session_id = ?
-            ''', (session_id,))
-            
-            result = cursor.fetchone()
-            
-            if result:
-                username, expires_at = result
-                # Check if the session has expired
-                if datetime.now() < datetime.fromisoformat(expires_at):
-                    return username
-        
+        self._ensure_initialized()
+
+        with self._lock:
+            session = self._sessions.get(session_id)
+
+        # Check if the session has expired
+        if session and datetime.now().timestamp() < session[1]:
+            return session[0]
         return None
-    
+
     def destroy_session(self, session_id):
         """Destroy a session (logout)"""
-        # First get the username associated with the session for logging
-        username = self.validate_session(session_id)
-        
+        self._ensure_initialized()
+
+        # Get the username associated with the session for logging
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        username = session[0] if session and datetime.now().timestamp() < session[1] else None
+
         with get_db_connection(self.db_path) as conn:
             cursor = conn.cursor()
-            
+
             cursor.execute('''
             DELETE FROM sessions WHERE session_id = ?
             ''', (session_id,))
-            
+
+            conn.commit()
+
+        # Log session destruction
+        if username:
+            user_id = get_user_id(username)
+            if user_id:
+                audit_logger.log_action(
+                    user_id=user_id,
+                    username=username,
+                    action="SESSION_DESTROYED",
+                    details="User session destroyed (logout)",
+                    session_id=session_id
+                )
+
+    def sweep_expired_sessions(self):
+        """Remove expired sessions from memory and the database; returns the number removed"""
+        now = datetime.now()
+        now_ts = now.timestamp()
+        expired = []
+
+        with self._lock:
+            while self._expiry_heap and self._expiry_heap[0][0] <= now_ts:
+                expires_ts, session_id = heapq.heappop(self._expiry_heap)
+                session = self._sessions.get(session_id)
+                # Skip heap entries for sessions that were already destroyed
+                if session and session[1] == expires_ts:
+                    del self._sessions[session_id]
+                    expired.append(session_id)
+
+        with get_db_connection(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM sessions WHERE expires_at < ?', (now.isoformat(),))
             conn.commit()
-            
-            # Log session destruction
-            if username:
-                user_id = get_user_id(username)
-                if user_id:
-                    audit_logger.log_action(
-                        user_id=user_id,
-                        username=username,
-                        action="SESSION_DESTROYED",
-                        details="User session destroyed (logout)",
-                        session_id=session_id
-                    )
-
-# Global session manager instance
-session_manager = SessionManager()
\ No newline at end of file
+
+        return len(expired)
+
+    def _sweep_loop(self):
+        """Background loop that periodically sweeps expired sessions"""
+        while not self._stop_event.wait(self.sweep_interval):
+            try:
+                self.sweep_expired_sessions()
+            except Exception as e:
+                print(f"Error sweeping expired sessions: {e}")
+
+    def stop(self):
+        """Stop the background sweeper"""
+        self._stop_event.set()
+
+# Global session manager instance (initialised lazily on first use)
+session_manager = SessionManager()
@@ -0,0 +1,88 @@
+# utils/startup_profile.py
+"""
+Startup profiling for the Society Management System.
+Run `python main.py --profile-startup` to print how long the application spends
+importing modules and initialising each part of the UI before login appears.
+"""
+
+import builtins
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """Collects import and initialisation timings while the application starts."""
+
+    def __init__(self):
+        self.enabled = False
+        self.started_at = None
+        self.import_times = {}  # top-level package -> seconds (inclusive of its own imports)
+        self.steps = []  # (label, seconds)
+        self._original_import = None
+        self._import_depth = 0
+
+    def enable(self):
+        """Start timing imports and initialisation steps"""
+        if self.enabled:
+            return
+        self.enabled = True
+        self.started_at = time.perf_counter()
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def disable(self):
+        """Stop timing imports"""
+        if self._original_import:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+        self.enabled = False
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # Only time the outermost first-time import of a module, so nested imports
+        # are attributed to the package that pulled them in
+        top_level = name.split('.')[0]
+        if level != 0 or self._import_depth > 0 or name in sys.modules:
+            self._import_depth += 1
+            try:
+                return self._original_import(name, globals, locals, fromlist, level)
+            finally:
+                self._import_depth -= 1
+
+        self._import_depth += 1
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            self._import_depth -= 1
+            self.import_times[top_level] = self.import_times.get(top_level, 0.0) + time.perf_counter() - start
+
+    @contextmanager
+    def step(self, label):
+        """Time an initialisation step (does nothing unless profiling is enabled)"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((label, time.perf_counter() - start))
+
+    def report(self, title="Startup profile", top=15):
+        """Print the import and initialisation breakdown collected so far"""
+        if not self.enabled:
+            return
+        total = time.perf_counter() - self.started_at
+
+        print(f"\n=== {title} ({total * 1000:.0f} ms since start) ===")
+        print("Imports (inclusive, slowest first):")
+        for name, seconds in sorted(self.import_times.items(), key=lambda item: item[1], reverse=True)[:top]:
+            print(f"  {name:<30} {seconds * 1000:8.1f} ms")
+        print("Initialisation steps:")
+        for label, seconds in self.steps:
+            print(f"  {label:<30} {seconds * 1000:8.1f} ms")
+
+
+# Global startup profiler instance (disabled unless --profile-startup is given)
+startup_profiler = StartupProfiler()